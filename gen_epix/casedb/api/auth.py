@@ -8,7 +8,7 @@ from pydantic import Field
 from gen_epix.casedb.api.base import EXCLUDED_PERMISSIONS
 from gen_epix.casedb.domain import command, enum, model
 from gen_epix.fastapp import App
-from gen_epix.fastapp.api import CrudEndpointGenerator
+from gen_epix.fastapp.api import CommandExecutor, CrudEndpointGenerator
 
 
 class UserInvitationRequestBody(PydanticBaseModel):
@@ -24,9 +24,11 @@ def create_auth_endpoints(
     new_user_dependency: Callable | None = None,
     idp_user_dependency: Callable | None = None,
     handle_exception: Callable | None = None,
+    command_executor: CommandExecutor | None = None,
     **kwargs: dict,
 ) -> None:
     assert handle_exception
+    assert command_executor
 
     # Specific endpoints - Auth
     @router.get(
@@ -37,7 +39,7 @@ def create_auth_endpoints(
     async def identity_providers__get_all() -> list[model.IdentityProvider]:
         try:
             cmd = command.GetIdentityProvidersCommand(user=None)
-            retval: list[model.IdentityProvider] = app.handle(cmd)
+            retval: list[model.IdentityProvider] = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("3ddf8ebb", None, exception)
         return retval
@@ -51,7 +53,7 @@ def create_auth_endpoints(
         user: registered_user_dependency, user_invitation: UserInvitationRequestBody  # type: ignore
     ) -> model.UserInvitation:
         try:
-            retval: model.UserInvitation = app.handle(
+            retval: model.UserInvitation = await command_executor.handle(
                 command.InviteUserCommand(
                     user=user,
                     email=user_invitation.email,
@@ -76,7 +78,7 @@ def create_auth_endpoints(
                 user=user,
                 token=token,
             )
-            retval: model.User = app.handle(cmd)
+            retval: model.User = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("fc1fc53c", None, exception)
         return retval
@@ -89,5 +91,8 @@ def create_auth_endpoints(
         excluded_permissions=EXCLUDED_PERMISSIONS,
     )
     CrudEndpointGenerator.generate_endpoints(
-        router, crud_endpoint_sets, handle_exception
+        router,
+        crud_endpoint_sets,
+        handle_exception,
+        command_executor=command_executor,
     )
@@ -1,14 +1,18 @@
 from typing import Any, Callable
 from uuid import UUID
 
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, FastAPI, Request
 from pydantic import BaseModel as PydanticBaseModel
 from pydantic import Field, field_validator
 
 from gen_epix.casedb.api.base import EXCLUDED_PERMISSIONS
 from gen_epix.casedb.domain import command, enum, model
 from gen_epix.fastapp import App
-from gen_epix.fastapp.api import CrudEndpointGenerator
+from gen_epix.fastapp.api import (
+    CommandExecutor,
+    CrudEndpointGenerator,
+    ModelStreamEncoder,
+)
 
 
 class UpdateCaseTypeSetCaseTypesRequestBody(PydanticBaseModel):
@@ -74,9 +78,11 @@ def create_case_endpoints(
     new_user_dependency: Callable | None = None,
     idp_user_dependency: Callable | None = None,
     handle_exception: Callable | None = None,
+    command_executor: CommandExecutor | None = None,
     **kwargs: dict,
 ) -> None:
     assert handle_exception
+    assert command_executor
 
     # Specific endpoints - Case
     @router.put(
@@ -96,7 +102,7 @@ def create_case_endpoints(
                 association_objs=request_body.case_type_set_members,
                 props={"return_id": False},
             )
-            retval: list[model.CaseSetMember] = app.handle(cmd)
+            retval: list[model.CaseSetMember] = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("fbe272b9", user, exception)
         return retval
@@ -118,7 +124,9 @@ def create_case_endpoints(
                 association_objs=request_body.case_type_col_set_members,
                 props={"return_id": False},
             )
-            retval: list[model.CaseTypeColSetMember] = app.handle(cmd)
+            retval: list[model.CaseTypeColSetMember] = await command_executor.handle(
+                cmd
+            )
         except Exception as exception:
             handle_exception("ab010768", user, exception)
         return retval
@@ -136,7 +144,7 @@ def create_case_endpoints(
             cmd = command.RetrieveCompleteCaseTypeCommand(
                 user=user, case_type_id=case_type_id
             )
-            retval: model.CompleteCaseType = app.handle(cmd)
+            retval: model.CompleteCaseType = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("c6c17125", user, exception)
         return retval
@@ -156,7 +164,7 @@ def create_case_endpoints(
                 cases=request_body.cases,
                 data_collection_ids=request_body.data_collection_ids,
             )
-            retval: list[model.Case] = app.handle(cmd)
+            retval: list[model.Case] = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("b413ab76", user, exception)
         return retval
@@ -177,7 +185,7 @@ def create_case_endpoints(
                 data_collection_ids=request_body.data_collection_ids,
                 case_ids=request_body.case_ids,
             )
-            retval: model.CaseSet = app.handle(cmd)
+            retval: model.CaseSet = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("c39c42f9", user, exception)
         return retval
@@ -194,7 +202,7 @@ def create_case_endpoints(
         try:
             cmd = request_body
             cmd.user = user
-            retval: list[model.CaseTypeStat] = app.handle(cmd)
+            retval: list[model.CaseTypeStat] = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("80c99f53", user, exception)
         return retval
@@ -209,7 +217,7 @@ def create_case_endpoints(
     ) -> list[model.CaseSetStat]:
         try:
             cmd = command.RetrieveCaseSetStatsCommand(user=user)
-            retval: list[model.CaseSetStat] = app.handle(cmd)
+            retval: list[model.CaseSetStat] = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("be54843e", user, exception)
         return retval
@@ -222,7 +230,7 @@ def create_case_endpoints(
         request_body: model.CaseQuery,
     ) -> list[UUID]:
         try:
-            retval: list[UUID] = app.handle(
+            retval: list[UUID] = await command_executor.handle(
                 command.RetrieveCasesByQueryCommand(
                     user=user,
                     case_query=request_body,
@@ -232,18 +240,34 @@ def create_case_endpoints(
             handle_exception("a8f773fe", user, exception)
         return retval
 
-    @router.post("/retrieve/cases_by_ids", operation_id="retrieve__cases_by_ids")
+    @router.post(
+        "/retrieve/cases_by_ids",
+        operation_id="retrieve__cases_by_ids",
+        responses=CrudEndpointGenerator.STREAMING_RESPONSES,
+    )
     async def retrieve__cases_by_ids(
         user: registered_user_dependency,  # type: ignore
         request_body: list[UUID],
+        request: Request,
     ) -> list[model.Case]:
         try:
-            retval: list[model.Case] = app.handle(
+            # Stream the cases in batches if requested in the Accept header
+            media_type = ModelStreamEncoder.get_media_type(
+                request.headers.get("accept")
+            )
+            retval = await command_executor.handle(
                 command.RetrieveCasesByIdCommand(
                     user=user,
                     case_ids=request_body,
+                    batch_size=(
+                        ModelStreamEncoder.DEFAULT_BATCH_SIZE if media_type else None
+                    ),
                 )
             )
+            if media_type:
+                retval = await ModelStreamEncoder.create_response(
+                    media_type, model.Case, retval
+                )
         except Exception as exception:
             handle_exception("f6d423fe", user, exception)
         return retval
@@ -257,7 +281,7 @@ def create_case_endpoints(
         request_body: list[UUID],
     ) -> list[model.CaseRights]:
         try:
-            retval: list[model.CaseRights] = app.handle(
+            retval: list[model.CaseRights] = await command_executor.handle(
                 command.RetrieveCaseRightsCommand(
                     user=user,
                     case_ids=request_body,
@@ -276,7 +300,7 @@ def create_case_endpoints(
         request_body: list[UUID],
     ) -> list[model.CaseSetRights]:
         try:
-            retval: list[model.CaseSetRights] = app.handle(
+            retval: list[model.CaseSetRights] = await command_executor.handle(
                 command.RetrieveCaseSetRightsCommand(
                     user=user,
                     case_set_ids=request_body,
@@ -295,7 +319,7 @@ def create_case_endpoints(
         request_body: list[UUID],
     ) -> list[model.CaseSetRights]:
         try:
-            retval: list[model.CaseSetRights] = app.handle(
+            retval: list[model.CaseSetRights] = await command_executor.handle(
                 command.RetrieveCaseSetRightsCommand(
                     user=user,
                     case_set_ids=request_body,
@@ -312,7 +336,7 @@ def create_case_endpoints(
         user: registered_user_dependency, request_body: RetrieveOrganizationContactRequestBody  # type: ignore
     ) -> list[model.Contact]:
         try:
-            retval: list[model.Contact] = app.handle(
+            retval: list[model.Contact] = await command_executor.handle(
                 command.RetrieveOrganizationContactCommand(
                     user=user,
                     organization_ids=request_body.organization_ids,
@@ -339,7 +363,7 @@ def create_case_endpoints(
         user: registered_user_dependency, request_body: RetrievePhylogeneticTreeRequestBody  # type: ignore
     ) -> model.PhylogeneticTree:
         try:
-            retval: model.PhylogeneticTree = app.handle(
+            retval: model.PhylogeneticTree = await command_executor.handle(
                 command.RetrievePhylogeneticTreeByCasesCommand(
                     user=user,
                     genetic_distance_case_type_col_id=request_body.genetic_distance_case_type_col_id,
@@ -361,7 +385,7 @@ def create_case_endpoints(
         request_body: RetrieveGeneticSequenceRequestBody,
     ) -> list[model.GeneticSequence]:
         try:
-            retval: list[model.GeneticSequence] = app.handle(
+            retval: list[model.GeneticSequence] = await command_executor.handle(
                 command.RetrieveGeneticSequenceByCaseCommand(
                     user=user,
                     genetic_sequence_case_type_col_id=request_body.genetic_sequence_case_type_col_id,
@@ -398,5 +422,8 @@ def create_case_endpoints(
         excluded_permissions=EXCLUDED_PERMISSIONS,
     )
     CrudEndpointGenerator.generate_endpoints(
-        router, crud_endpoint_sets, handle_exception
+        router,
+        crud_endpoint_sets,
+        handle_exception,
+        command_executor=command_executor,
     )
@@ -7,6 +7,7 @@ from pydantic import BaseModel as PydanticBaseModel
 from gen_epix.casedb.api.base import EXCLUDED_PERMISSIONS
 from gen_epix.casedb.domain import command, enum, model
 from gen_epix.fastapp import App
+from gen_epix.fastapp.api.command_executor import CommandExecutor
 from gen_epix.fastapp.api.crud_endpoint_generator import CrudEndpointGenerator
 
 
@@ -25,9 +26,11 @@ def create_ontology_endpoints(
     new_user_dependency: Callable | None = None,
     idp_user_dependency: Callable | None = None,
     handle_exception: Callable | None = None,
+    command_executor: CommandExecutor | None = None,
     **kwargs: dict,
 ) -> None:
     assert handle_exception
+    assert command_executor
 
     @router.put(
         "/concept_sets/{concept_set_id}/concepts",
@@ -46,7 +49,7 @@ def create_ontology_endpoints(
                 association_objs=request_body.concept_set_members,
                 props={"return_id": False},
             )
-            retval: list[model.ConceptSetMember] = app.handle(cmd)
+            retval: list[model.ConceptSetMember] = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("da821eb5", user, exception)
         return retval
@@ -68,7 +71,7 @@ def create_ontology_endpoints(
                 association_objs=request_body.etiologies,
                 props={"return_id": False},
             )
-            retval: list[model.Etiology] = app.handle(cmd)
+            retval: list[model.Etiology] = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("d5459ee4", user, exception)
         return retval
@@ -81,5 +84,8 @@ def create_ontology_endpoints(
         excluded_permissions=EXCLUDED_PERMISSIONS,
     )
     CrudEndpointGenerator.generate_endpoints(
-        router, crud_endpoint_sets, handle_exception
+        router,
+        crud_endpoint_sets,
+        handle_exception,
+        command_executor=command_executor,
     )
@@ -8,6 +8,7 @@ from gen_epix.casedb.api.base import EXCLUDED_PERMISSIONS
 from gen_epix.casedb.api.model import CompleteUser
 from gen_epix.casedb.domain import command, enum, model
 from gen_epix.fastapp import App
+from gen_epix.fastapp.api.command_executor import CommandExecutor
 from gen_epix.fastapp.api.crud_endpoint_generator import CrudEndpointGenerator
 
 
@@ -36,9 +37,11 @@ def create_organization_endpoints(
     new_user_dependency: Callable | None = None,
     idp_user_dependency: Callable | None = None,
     handle_exception: Callable | None = None,
+    command_executor: CommandExecutor | None = None,
     **kwargs: dict,
 ) -> None:
     assert handle_exception
+    assert command_executor
 
     @router.put(
         "/organization_sets/{organization_set_id}/organizations",
@@ -57,7 +60,9 @@ def create_organization_endpoints(
                 association_objs=request_body.organization_set_members,
                 props={"return_id": False},
             )
-            retval: list[model.OrganizationSetMember] = app.handle(cmd)
+            retval: list[model.OrganizationSetMember] = await command_executor.handle(
+                cmd
+            )
         except Exception as exception:
             handle_exception("c026628e", user, exception)
         return retval
@@ -79,7 +84,9 @@ def create_organization_endpoints(
                 association_objs=request_body.data_collection_set_members,
                 props={"return_id": False},
             )
-            retval: list[model.DataCollectionSetMember] = app.handle(cmd)
+            retval: list[model.DataCollectionSetMember] = await command_executor.handle(
+                cmd
+            )
         except Exception as exception:
             handle_exception("cf892de0", user, exception)
         return retval
@@ -94,7 +101,7 @@ def create_organization_endpoints(
     ) -> CompleteUser:
         try:
             cmd = command.RetrieveCompleteUserCommand(user=user)
-            app_retval: model.CompleteUser = app.handle(cmd)
+            app_retval: model.CompleteUser = await command_executor.handle(cmd)
             retval: CompleteUser = CompleteUser.from_model(app_retval)
         except Exception as exception:
             handle_exception("f98b34ec", user, exception)
@@ -116,7 +123,7 @@ def create_organization_endpoints(
                 roles=request_body.roles,
                 organization_id=request_body.organization_id,
             )
-            retval: model.User = app.handle(cmd)
+            retval: model.User = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("a594ba2b", None, exception)
         return retval
@@ -131,7 +138,7 @@ def create_organization_endpoints(
             cmd = command.RetrieveOrganizationAdminNameEmailsCommand(
                 user=user,
             )
-            retval: list[model.UserNameEmail] = app.handle(cmd)
+            retval: list[model.UserNameEmail] = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("fd6a9c3e", None, exception)
         return retval
@@ -149,7 +156,7 @@ def create_organization_endpoints(
                 user=user,
                 organization_id=data.organization_id,
             )
-            retval: model.User = app.handle(cmd)
+            retval: model.User = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("c2382b65", None, exception)
         return retval
@@ -162,5 +169,8 @@ def create_organization_endpoints(
         excluded_permissions=EXCLUDED_PERMISSIONS,
     )
     CrudEndpointGenerator.generate_endpoints(
-        router, crud_endpoint_sets, handle_exception
+        router,
+        crud_endpoint_sets,
+        handle_exception,
+        command_executor=command_executor,
     )
@@ -5,7 +5,7 @@ from fastapi import APIRouter, FastAPI
 from gen_epix.casedb.api.base import EXCLUDED_PERMISSIONS
 from gen_epix.casedb.domain import enum
 from gen_epix.fastapp import App
-from gen_epix.fastapp.api import CrudEndpointGenerator
+from gen_epix.fastapp.api import CommandExecutor, CrudEndpointGenerator
 
 
 def create_rbac_endpoints(
@@ -15,10 +15,12 @@ def create_rbac_endpoints(
     new_user_dependency: Callable | None = None,
     idp_user_dependency: Callable | None = None,
     handle_exception: Callable | None = None,
+    command_executor: CommandExecutor | None = None,
     **kwargs: dict,
 ) -> None:
 
     assert handle_exception
+    assert command_executor
 
     # CRUD
     crud_endpoint_sets = CrudEndpointGenerator.create_crud_endpoint_set_for_domain(
@@ -28,5 +30,8 @@ def create_rbac_endpoints(
         excluded_permissions=EXCLUDED_PERMISSIONS,
     )
     CrudEndpointGenerator.generate_endpoints(
-        router, crud_endpoint_sets, handle_exception
+        router,
+        crud_endpoint_sets,
+        handle_exception,
+        command_executor=command_executor,
     )
@@ -11,6 +11,7 @@ from gen_epix.casedb.api.organization import create_organization_endpoints
 from gen_epix.casedb.api.rbac import create_rbac_endpoints
 from gen_epix.casedb.api.system import create_system_endpoints
 from gen_epix.fastapp import App
+from gen_epix.fastapp.api import CommandExecutor
 
 
 def create_routers(
@@ -19,9 +20,12 @@ def create_routers(
     new_user_dependency: Callable | None = None,
     idp_user_dependency: Callable | None = None,
     handle_exception: Callable | None = None,
+    command_executor: CommandExecutor | None = None,
     router_kwargs: dict = {},
 ) -> list[APIRouter]:
     assert app
+    if command_executor is None:
+        command_executor = CommandExecutor(app)
     router_data = [
         {
             "name": "auth",
@@ -70,6 +74,7 @@ def create_routers(
             new_user_dependency=new_user_dependency,
             idp_user_dependency=idp_user_dependency,
             handle_exception=handle_exception,
+            command_executor=command_executor,
         )
         routers.append(router)
     return routers
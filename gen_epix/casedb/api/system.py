@@ -10,7 +10,7 @@ from gen_epix.casedb.api.base import EXCLUDED_PERMISSIONS
 from gen_epix.casedb.domain import command, enum, model
 from gen_epix.common.api import exc
 from gen_epix.fastapp import App, LogLevel
-from gen_epix.fastapp.api import CrudEndpointGenerator
+from gen_epix.fastapp.api import CommandExecutor, CrudEndpointGenerator
 
 external_logger_fmap = exc.get_logger_fmap(logging.getLogger("casedb.external"))
 
@@ -45,10 +45,12 @@ def create_system_endpoints(
     new_user_dependency: Callable | None = None,
     idp_user_dependency: Callable | None = None,
     handle_exception: Callable | None = None,
+    command_executor: CommandExecutor | None = None,
     **kwargs: dict,
 ) -> None:
 
     assert handle_exception
+    assert command_executor
 
     # Health endpoint
     @router.get(
@@ -93,7 +95,7 @@ def create_system_endpoints(
     ) -> list[model.Outage]:
         try:
             cmd = command.RetrieveOutagesCommand(user=None)
-            retval: list[model.Outage] = app.handle(cmd)
+            retval: list[model.Outage] = await command_executor.handle(cmd)
         except Exception as exception:
             handle_exception("6b47b8b6", None, exception)
         return retval
@@ -106,5 +108,8 @@ def create_system_endpoints(
         excluded_permissions=EXCLUDED_PERMISSIONS,
     )
     CrudEndpointGenerator.generate_endpoints(
-        router, crud_endpoint_sets, handle_exception
+        router,
+        crud_endpoint_sets,
+        handle_exception,
+        command_executor=command_executor,
     )
@@ -4,6 +4,7 @@ from gen_epix.casedb.app_setup import create_fast_api
 from gen_epix.casedb.domain import enum
 from gen_epix.casedb.domain.enum import ServiceType
 from gen_epix.casedb.env import AppEnv
+from gen_epix.fastapp import App
 from util.cfg import AppCfg
 
 APP_NAME = "CASEDB"
@@ -29,6 +30,13 @@ SCHEMA_KWARGS = {
 APP_CFG = AppCfg(APP_NAME, enum.ServiceType, enum.RepositoryType)
 APP_ENV = AppEnv(APP_CFG)
 
+
+def get_app() -> App:
+    # App factory for the processes of the command executor, which import this module
+    # and thereby create their own app environment
+    return APP_ENV.app
+
+
 # Create fastapi
 FAST_API = create_fast_api(
     APP_CFG.cfg,
@@ -40,6 +48,7 @@ FAST_API = create_fast_api(
     setup_logger=APP_CFG.setup_logger,
     api_logger=APP_CFG.api_logger,
     debug=APP_CFG.cfg.app.debug,
+    app_factory=get_app,
     update_openapi_schema=True,
     update_openapi_kwargs={
         "get_openapi_kwargs": SCHEMA_KWARGS,
@@ -9,8 +9,10 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
 from gen_epix.casedb.api.router import create_routers
+from gen_epix.casedb.domain import command
 from gen_epix.common.api.exc import generate_handle_exception_function
-from gen_epix.fastapp import App
+from gen_epix.fastapp import App, ExecutionStrategy
+from gen_epix.fastapp.api import CommandExecutor
 from gen_epix.fastapp.api.openapi import create_custom_openapi_function
 from gen_epix.fastapp.middleware import (
     HandleAuthExceptionMiddleware,
@@ -34,6 +36,25 @@ def create_fast_api(
 
     app_id = kwargs.pop("app_id", app.generate_id())
 
+    # Set up the execution of the commands of the endpoints. Commands handled in a
+    # process pool require an app factory to create the app of each process.
+    execution_cfg = cfg.api.get("execution", {})
+    command_executor = CommandExecutor(
+        app,
+        strategy=ExecutionStrategy[execution_cfg.get("strategy", "THREAD_POOL")],
+        strategy_by_command_class={
+            getattr(command, x): ExecutionStrategy.PROCESS_POOL
+            for x in execution_cfg.get("process_commands", [])
+        },
+        max_threads=execution_cfg.get(
+            "max_threads", CommandExecutor.DEFAULT_MAX_THREADS
+        ),
+        max_processes=execution_cfg.get(
+            "max_processes", CommandExecutor.DEFAULT_MAX_PROCESSES
+        ),
+        app_factory=kwargs.pop("app_factory", None),  # type: ignore[arg-type]
+    )
+
     # Set up lifespan
     @asynccontextmanager
     async def lifespan(fast_api: FastAPI) -> Any:
@@ -45,6 +66,7 @@ def create_fast_api(
                 )
             )
         yield
+        command_executor.shutdown()
         if setup_logger:
             setup_logger.info(
                 app.create_log_message(
@@ -104,6 +126,7 @@ def create_fast_api(
         new_user_dependency=new_user_dependency,
         idp_user_dependency=idp_user_dependency,
         handle_exception=handle_exception,
+        command_executor=command_executor,
     )
     for router in routers:
         fast_api.include_router(router, prefix=cfg.api.route.v1)
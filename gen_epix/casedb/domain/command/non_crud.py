@@ -183,6 +183,24 @@ class RetrieveCaseTypeStatsCommand(Command):
         return value
 
 
+class RebuildCaseStatsCommand(Command):
+    """
+    Rebuild the case statistics buckets from the cases, returning whether the
+    incrementally maintained buckets were consistent with them.
+    """
+
+    SERVICE_TYPE: ClassVar = enum.ServiceType.CASE
+
+
+class RebuildTypedCaseContentCommand(Command):
+    """
+    Rebuild the typed copy of the case content that is used to filter cases, e.g.
+    after the cases were changed other than through the application.
+    """
+
+    SERVICE_TYPE: ClassVar = enum.ServiceType.CASE
+
+
 class RetrieveCompleteCaseTypeCommand(Command):
     SERVICE_TYPE: ClassVar = enum.ServiceType.CASE
 
@@ -201,6 +219,11 @@ class RetrieveCasesByIdCommand(Command):
     case_ids: list[UUID] = Field(
         description="The case ids to retrieve cases for. UNIQUE"
     )
+    batch_size: int | None = Field(
+        default=None,
+        description="If set, the cases are returned as an iterator over lists of at most this number of cases, which are retrieved and filtered one list at a time, rather than as a single list.",
+        gt=0,
+    )
 
     @field_validator("case_ids", mode="after")
     def _validate_case_ids(cls, value: list[UUID]) -> list[UUID]:
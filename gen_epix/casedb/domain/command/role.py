@@ -27,6 +27,8 @@ class RoleGenerator:
             (command.CaseSetStatusCrudCommand, PermissionTypeSet.CU),
             (command.CaseTypeSetCategoryCrudCommand, PermissionTypeSet.D),
             (command.CaseTypeSetCrudCommand, PermissionTypeSet.D),
+            (command.RebuildCaseStatsCommand, PermissionTypeSet.E),
+            (command.RebuildTypedCaseContentCommand, PermissionTypeSet.E),
             (
                 command.DataCollectionSetDataCollectionUpdateAssociationCommand,  # type: ignore[arg-type]
                 PermissionTypeSet.E,
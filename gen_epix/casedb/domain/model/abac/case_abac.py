@@ -148,6 +148,18 @@ class CaseAbac(PydanticBaseModel):
                 retval[case_type_id] = data_collection_ids
         return retval
 
+    def get_combinations_with_private_data_collection(self) -> dict[UUID, set[UUID]]:
+        """
+        Get the dict[case_type_id, set[data_collection_ids]] combinations for which
+        the data collection is private. The sets are guaranteed to be non-empty.
+        """
+        retval = {}
+        for case_type_id, data in self.case_type_access_abacs.items():
+            data_collection_ids = {x for x, y in data.items() if y.is_private}
+            if data_collection_ids:
+                retval[case_type_id] = data_collection_ids
+        return retval
+
     def get_case_types_with_access_right(self, right: CaseRight) -> set[UUID]:
         """
         Get the set[case_type_id] for which there is the given right in at least one of
@@ -540,6 +540,7 @@ class Case(Model):
         snake_case_plural_name="cases",
         table_name="case",
         persistable=True,
+        query_keys=create_keys({1: ("case_type_id", "case_date"), 2: "case_date"}),
         links=create_links(
             {
                 1: ("case_type_id", CaseType, "case_type"),
@@ -1,10 +1,145 @@
-from gen_epix.casedb.domain import DOMAIN
+import abc
+import datetime
+from typing import Type
+from uuid import UUID
+
+from gen_epix.casedb.domain import DOMAIN, enum
 from gen_epix.casedb.domain import model as model  # forces models to be registered now
 from gen_epix.casedb.domain.enum import ServiceType
-from gen_epix.fastapp import BaseRepository
+from gen_epix.fastapp import BaseRepository, BaseUnitOfWork
+from gen_epix.filter import CompositeFilter, DatetimeRangeFilter, Filter
 
 
 class BaseCaseRepository(BaseRepository):
     ENTITIES = DOMAIN.get_dag_sorted_entities(
         service_type=ServiceType.CASE, persistable=True
     )
+
+    @abc.abstractmethod
+    def retrieve_case_ids_by_content_filter(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        filter: CompositeFilter,
+        col_types: dict[UUID, enum.ColType],
+        case_type_ids: set[UUID] | None = None,
+        datetime_range_filter: DatetimeRangeFilter | None = None,
+    ) -> list[UUID] | None:
+        """
+        Retrieve the ids of the cases whose content matches the filter, with the
+        filter keys being case type col ids and col_types giving the type of the
+        corresponding col. The result may be a superset of the matching cases, so
+        the caller remains responsible for applying the filter to the (access
+        filtered) content. None is returned if the filter cannot be applied by the
+        repository.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def rebuild_typed_content(self, uow: BaseUnitOfWork, user_id: UUID | None) -> bool:
+        """
+        Rebuild the typed copy of the case content that the repository may maintain
+        to apply content filters, from all current cases. Returns whether the
+        repository maintains such a copy, with nothing being rebuilt if it does not.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def retrieve_by_data_collection_access(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        model_class: Type[model.Case] | Type[model.CaseSet],
+        has_access: dict[UUID, set[UUID]],
+        obj_ids: list[UUID] | None = None,
+        filter: Filter | None = None,
+        limit: int | None = None,
+        cursor: UUID | None = None,
+    ) -> tuple[
+        list[model.Case] | list[model.CaseSet], set[UUID], dict[UUID, set[UUID]]
+    ]:
+        """
+        Retrieve cases or case sets and determine which of them are accessible given
+        has_access, a dict[case_type_id, set[data_collection_id]] as returned by
+        CaseAbac.get_combinations_with_access_right. An obj is accessible if its
+        case type is in has_access and its created_in_data_collection_id or any of
+        the data collections it is linked to is in the corresponding set.
+
+        If obj_ids is given, the corresponding objs are returned in the same order,
+        including the inaccessible ones, and an InvalidIdsError is raised for ids
+        that do not exist. Otherwise only the accessible objs matching the filter
+        are returned. The second element of the return value contains the ids of
+        the accessible objs, and the third element maps each of these ids to the
+        data collections the obj is linked to.
+
+        Without obj_ids, the accessible objs can be paginated by passing limit and/or
+        cursor as for read all, in which case they are ordered by id.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def retrieve_case_stats_by_case_type(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        has_access: dict[UUID, set[UUID]] | None,
+        case_type_ids: set[UUID] | None = None,
+        datetime_range_filter: DatetimeRangeFilter | None = None,
+    ) -> dict[UUID, tuple[int, datetime.datetime, datetime.datetime]]:
+        """
+        Get the number of cases and the first and last case date per case type, as
+        dict[case_type_id, (n_cases, first_case_date, last_case_date)], counting only
+        the cases that are accessible given has_access (see
+        retrieve_by_data_collection_access), or all cases if has_access is None.
+        Case types without any such cases are not included.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def retrieve_case_stats_by_case_type_from_buckets(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        has_access: dict[UUID, set[UUID]] | None,
+        case_type_ids: set[UUID] | None = None,
+    ) -> dict[UUID, tuple[int, str | None, str | None]] | None:
+        """
+        Same as retrieve_case_stats_by_case_type without datetime_range_filter, but
+        with the first and last case month formatted as YYYY-MM and obtained from the
+        case stats buckets that the repository may maintain per case type,
+        combination of data collections and month. None is returned if the
+        repository does not maintain such buckets.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def rebuild_case_stats(
+        self, uow: BaseUnitOfWork, user_id: UUID | None
+    ) -> bool | None:
+        """
+        Rebuild the case stats buckets that the repository may maintain from all
+        current cases. Returns whether the previous buckets were consistent with
+        them, or None if the repository does not maintain such buckets, with nothing
+        being rebuilt.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def retrieve_case_stats_by_case_set(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        has_access: dict[UUID, set[UUID]] | None,
+        own_data_collections: dict[UUID, set[UUID]],
+        case_set_ids: set[UUID] | None = None,
+    ) -> dict[UUID, tuple[int, int, datetime.datetime, datetime.datetime]]:
+        """
+        Get the number of cases, the number of own cases and the first and last case
+        date per case set, as dict[case_set_id, (n_cases, n_own_cases,
+        first_case_date, last_case_date)]. Only the case sets that are accessible
+        given has_access are included, or all case sets if has_access is None, and
+        only if they have any cases. A case is considered own when its created in
+        data collection is in own_data_collections, given as
+        dict[case_type_id, set[data_collection_id]], for its case type.
+        """
+        raise NotImplementedError()
@@ -1,5 +1,5 @@
 import abc
-from typing import Type
+from typing import Iterator, Type
 from uuid import UUID
 
 from gen_epix.casedb.domain import command, model
@@ -69,6 +69,8 @@ class BaseCaseService(BaseService):
         f(command.RetrieveCompleteCaseTypeCommand, self.retrieve_complete_case_type)
         f(command.RetrieveCaseTypeStatsCommand, self.retrieve_case_type_stats)
         f(command.RetrieveCaseSetStatsCommand, self.retrieve_case_set_stats)
+        f(command.RebuildCaseStatsCommand, self.rebuild_case_stats)
+        f(command.RebuildTypedCaseContentCommand, self.rebuild_typed_case_content)
         f(command.RetrieveCasesByQueryCommand, self.retrieve_cases_by_query)
         f(command.RetrieveCasesByIdCommand, self.retrieve_cases_by_id)
         f(command.RetrieveCaseRightsCommand, self.retrieve_case_or_set_rights)
@@ -107,6 +109,20 @@ class BaseCaseService(BaseService):
     ) -> list[model.CaseTypeStat]:
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def rebuild_case_stats(
+        self,
+        cmd: command.RebuildCaseStatsCommand,
+    ) -> bool:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def rebuild_typed_case_content(
+        self,
+        cmd: command.RebuildTypedCaseContentCommand,
+    ) -> None:
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def retrieve_cases_by_query(
         self, cmd: command.RetrieveCasesByQueryCommand
@@ -116,7 +132,7 @@ class BaseCaseService(BaseService):
     @abc.abstractmethod
     def retrieve_cases_by_id(
         self, cmd: command.RetrieveCasesByIdCommand
-    ) -> list[model.Case]:
+    ) -> list[model.Case] | Iterator[list[model.Case]]:
         raise NotImplementedError()
 
     @abc.abstractmethod
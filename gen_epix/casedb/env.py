@@ -142,6 +142,20 @@ class AppEnv(BaseAppEnv):
                         enum.RepositoryType.DICT: CaseDictRepository,
                         enum.RepositoryType.SA_SQL: CaseSARepository,
                     },
+                    "repository_kwargs": {
+                        "use_typed_content": cfg.service.case.get(
+                            "use_typed_content", False
+                        ),
+                        "use_case_stats": cfg.service.case.get("use_case_stats", False),
+                        "text_index_columns": cfg.service.case.get(
+                            "text_index_columns", []
+                        ),
+                        "id_join_threshold": cfg.service.case.get(
+                            "id_join_threshold",
+                            SARepository.DEFAULT_ID_JOIN_THRESHOLD,
+                        ),
+                        "trusted_load": cfg.service.case.get("trusted_load", False),
+                    },
                 },
                 enum.ServiceType.ABAC: {
                     "service_class": AbacService,
@@ -191,6 +205,7 @@ class AppEnv(BaseAppEnv):
                     "timestamp_factory"
                 ]
                 additional_service_kwargs: dict = data.get("kwargs", {})  # type: ignore
+                additional_repository_kwargs: dict = data.get("repository_kwargs", {})  # type: ignore
 
                 # Create repository if necessary
                 if "repository_class" in data:
@@ -223,6 +238,7 @@ class AppEnv(BaseAppEnv):
                             "sqlite:///" + repository_cfg["file"],
                             name=service_type.value,
                             timestamp_factory=timestamp_factory,
+                            **additional_repository_kwargs,
                         )
                     elif repository_type == enum.RepositoryType.SA_SQL:
                         assert issubclass(repository_class, SARepository)
@@ -231,6 +247,7 @@ class AppEnv(BaseAppEnv):
                             repository_cfg["connection_string"],
                             name=service_type.value,
                             timestamp_factory=timestamp_factory,
+                            **additional_repository_kwargs,
                         )
                     else:
                         raise NotImplementedError()
@@ -1,6 +1,192 @@
+import datetime
+from typing import Type
+from uuid import UUID
+
+from gen_epix.casedb.domain import enum, model
 from gen_epix.casedb.domain.repository.case import BaseCaseRepository
+from gen_epix.fastapp import BaseRepository, BaseUnitOfWork
 from gen_epix.fastapp.repositories import DictRepository
+from gen_epix.filter import CompositeFilter, DatetimeRangeFilter, Filter
+from util.util import map_paired_elements
 
 
 class CaseDictRepository(DictRepository, BaseCaseRepository):
-    pass
+    DATA_COLLECTION_LINKS: dict[Type[model.Model], tuple[Type[model.Model], str]] = {
+        model.Case: (model.CaseDataCollectionLink, "case_id"),
+        model.CaseSet: (model.CaseSetDataCollectionLink, "case_set_id"),
+    }
+
+    def retrieve_case_ids_by_content_filter(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        filter: CompositeFilter,
+        col_types: dict[UUID, enum.ColType],
+        case_type_ids: set[UUID] | None = None,
+        datetime_range_filter: DatetimeRangeFilter | None = None,
+    ) -> list[UUID] | None:
+        # The content filter is not applied here: the values are only typed by the
+        # caller, which is expected to apply the filter anyway
+        cases: list[model.Case] = list(
+            self._db[model.Case].values()  # type:ignore[arg-type]
+        )
+        if case_type_ids is not None:
+            cases = [x for x in cases if x.case_type_id in case_type_ids]
+        if datetime_range_filter:
+            cases = [x for x in cases if datetime_range_filter.match_value(x.case_date)]
+        return [x.id for x in cases]  # type:ignore[misc]
+
+    def rebuild_typed_content(self, uow: BaseUnitOfWork, user_id: UUID | None) -> bool:
+        # The case content is only kept as is
+        return False
+
+    def retrieve_by_data_collection_access(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        model_class: Type[model.Case] | Type[model.CaseSet],
+        has_access: dict[UUID, set[UUID]],
+        obj_ids: list[UUID] | None = None,
+        filter: Filter | None = None,
+        limit: int | None = None,
+        cursor: UUID | None = None,
+    ) -> tuple[
+        list[model.Case] | list[model.CaseSet], set[UUID], dict[UUID, set[UUID]]
+    ]:
+        if obj_ids is not None:
+            objs = self.read_some(model_class, obj_ids)
+        else:
+            objs = self.read_all(model_class, filter)
+        accessible_obj_ids, data_collection_ids = self._get_accessible_obj_ids(
+            model_class, objs, has_access
+        )
+        if obj_ids is None:
+            objs = [x for x in objs if x.id in accessible_obj_ids]
+            if limit is not None or cursor is not None:
+                objs = BaseRepository.get_page(
+                    objs, lambda x: x.id, limit=limit, cursor=cursor
+                )
+                accessible_obj_ids = {x.id for x in objs}
+        return (
+            objs,
+            accessible_obj_ids,
+            {x: y for x, y in data_collection_ids.items() if x in accessible_obj_ids},
+        )
+
+    def retrieve_case_stats_by_case_type(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        has_access: dict[UUID, set[UUID]] | None,
+        case_type_ids: set[UUID] | None = None,
+        datetime_range_filter: DatetimeRangeFilter | None = None,
+    ) -> dict[UUID, tuple[int, datetime.datetime, datetime.datetime]]:
+        cases: list[model.Case] = list(
+            self._db[model.Case].values()  # type:ignore[arg-type]
+        )
+        if case_type_ids is not None:
+            cases = [x for x in cases if x.case_type_id in case_type_ids]
+        if datetime_range_filter:
+            cases = [x for x in cases if datetime_range_filter.match_value(x.case_date)]
+        if has_access is not None:
+            accessible_case_ids, _ = self._get_accessible_obj_ids(
+                model.Case, cases, has_access
+            )
+            cases = [x for x in cases if x.id in accessible_case_ids]
+        case_dates: dict[UUID, list[datetime.datetime]] = map_paired_elements(  # type: ignore[assignment]
+            (x.case_type_id, x.case_date) for x in cases
+        )
+        return {x: (len(y), min(y), max(y)) for x, y in case_dates.items()}
+
+    def retrieve_case_stats_by_case_type_from_buckets(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        has_access: dict[UUID, set[UUID]] | None,
+        case_type_ids: set[UUID] | None = None,
+    ) -> dict[UUID, tuple[int, str | None, str | None]] | None:
+        # No case stats buckets are maintained
+        return None
+
+    def rebuild_case_stats(
+        self, uow: BaseUnitOfWork, user_id: UUID | None
+    ) -> bool | None:
+        return None
+
+    def retrieve_case_stats_by_case_set(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        has_access: dict[UUID, set[UUID]] | None,
+        own_data_collections: dict[UUID, set[UUID]],
+        case_set_ids: set[UUID] | None = None,
+    ) -> dict[UUID, tuple[int, int, datetime.datetime, datetime.datetime]]:
+        case_set_members: list[model.CaseSetMember] = list(
+            self._db[model.CaseSetMember].values()  # type:ignore[arg-type]
+        )
+        if case_set_ids is not None:
+            case_set_members = [
+                x for x in case_set_members if x.case_set_id in case_set_ids
+            ]
+        if has_access is not None:
+            case_sets: list[model.CaseSet] = [
+                self._db[model.CaseSet][x]  # type:ignore[misc]
+                for x in {x.case_set_id for x in case_set_members}
+            ]
+            accessible_case_set_ids, _ = self._get_accessible_obj_ids(
+                model.CaseSet, case_sets, has_access
+            )
+            case_set_members = [
+                x for x in case_set_members if x.case_set_id in accessible_case_set_ids
+            ]
+        cases: dict[UUID, model.Case] = self._db[model.Case]  # type:ignore[assignment]
+        case_set_cases: dict[UUID, set[UUID]] = map_paired_elements(  # type: ignore[assignment]
+            ((x.case_set_id, x.case_id) for x in case_set_members), as_set=True
+        )
+        stats = {}
+        for case_set_id, case_ids in case_set_cases.items():
+            case_dates = [cases[x].case_date for x in case_ids]
+            n_own_cases = sum(
+                cases[x].created_in_data_collection_id
+                in own_data_collections.get(cases[x].case_type_id, set())
+                for x in case_ids
+            )
+            stats[case_set_id] = (
+                len(case_ids),
+                n_own_cases,
+                min(case_dates),
+                max(case_dates),
+            )
+        return stats
+
+    def _get_accessible_obj_ids(
+        self,
+        model_class: Type[model.Case] | Type[model.CaseSet],
+        objs: list[model.Case] | list[model.CaseSet],
+        has_access: dict[UUID, set[UUID]],
+    ) -> tuple[set[UUID], dict[UUID, set[UUID]]]:
+        """
+        Get the ids of the objs that are accessible given has_access, and the data
+        collections the objs are linked to.
+        """
+        link_class, link_field_name = CaseDictRepository.DATA_COLLECTION_LINKS[
+            model_class
+        ]
+        obj_ids = {x.id for x in objs}
+        data_collection_ids: dict[UUID, set[UUID]] = {}
+        for link in self._db[link_class].values():
+            obj_id = getattr(link, link_field_name)
+            if obj_id in obj_ids:
+                data_collection_ids.setdefault(obj_id, set()).add(
+                    link.data_collection_id  # type:ignore[attr-defined]
+                )
+        accessible_obj_ids = set()
+        for obj in objs:
+            case_type_data_collection_ids = has_access.get(obj.case_type_id)
+            if not case_type_data_collection_ids:
+                continue
+            if obj.created_in_data_collection_id in case_type_data_collection_ids or (
+                data_collection_ids.get(obj.id, set()) & case_type_data_collection_ids
+            ):
+                accessible_obj_ids.add(obj.id)  # type:ignore[arg-type]
+        return accessible_obj_ids, data_collection_ids
@@ -1,17 +1,117 @@
-from sqlalchemy import Engine
+import datetime
+import hashlib
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Hashable, Iterable, Type
+from uuid import UUID, uuid4
 
+import sqlalchemy as sa
+from sqlalchemy import Engine, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from gen_epix.casedb.domain import enum, model
 from gen_epix.casedb.domain.repository.case import BaseCaseRepository
 from gen_epix.casedb.repositories.sa_model.base import (
     DB_METADATA_FIELDS,
     GENERATE_SERVICE_METADATA,
     SERVICE_METADATA_FIELDS,
 )
+from gen_epix.casedb.repositories.sa_model.case import (
+    CaseContentState,
+    CaseContentValue,
+    CaseStatsBucket,
+    CaseStatsBucketDataCollection,
+    CaseStatsState,
+)
+from gen_epix.fastapp import BaseUnitOfWork, CrudOperation, exc
+from gen_epix.fastapp.enum import CrudOperationSet
 from gen_epix.fastapp.repositories import SARepository
+from gen_epix.fastapp.repositories.sa.unit_of_work import SAUnitOfWork
+from gen_epix.filter import (
+    BooleanOperator,
+    CompositeFilter,
+    DatetimeRangeFilter,
+    ExistsFilter,
+    Filter,
+)
+from util.util import map_paired_elements
+
+# Case stats bucket key: (case_type_id, data_collection_ids, month) with
+# data_collection_ids the created in and linked data collections of the case and
+# month formatted as YYYY-MM
+CaseStatsKey = tuple[UUID, frozenset[UUID], str | None]
 
 
 class CaseSARepository(SARepository, BaseCaseRepository):
+    # SQL type to cast the text stored in the case content to, per col type, in
+    # line with the conversions applied when filtering case content in Python.
+    # Col types that are absent cannot be filtered in SQL.
+    CONTENT_SA_TYPES: dict[enum.ColType, sa.types.TypeEngine | None] = {
+        enum.ColType.TIME_DAY: sa.Date(),
+        enum.ColType.TIME_WEEK: None,
+        enum.ColType.TIME_MONTH: None,
+        enum.ColType.TIME_QUARTER: None,
+        enum.ColType.TIME_YEAR: None,
+        enum.ColType.GEO_REGION: None,
+        enum.ColType.NOMINAL: None,
+        enum.ColType.ORDINAL: None,
+        enum.ColType.INTERVAL: None,
+        enum.ColType.TEXT: None,
+        enum.ColType.ID_DIRECT: None,
+        enum.ColType.ID_PSEUDONYMISED: None,
+        enum.ColType.ORGANIZATION: None,
+        enum.ColType.OTHER: None,
+        enum.ColType.DECIMAL_0: sa.Integer(),
+        enum.ColType.DECIMAL_1: sa.Numeric(38, 6),
+        enum.ColType.DECIMAL_2: sa.Numeric(38, 6),
+        enum.ColType.DECIMAL_3: sa.Numeric(38, 6),
+        enum.ColType.DECIMAL_4: sa.Numeric(38, 6),
+        enum.ColType.DECIMAL_5: sa.Numeric(38, 6),
+        enum.ColType.DECIMAL_6: sa.Numeric(38, 6),
+    }
+
+    DATA_COLLECTION_LINKS: dict[Type[model.Model], tuple[Type[model.Model], str]] = {
+        model.Case: (model.CaseDataCollectionLink, "case_id"),
+        model.CaseSet: (model.CaseSetDataCollectionLink, "case_set_id"),
+    }
+
+    # Column of CaseContentValue in which the typed case content is stored and the
+    # function to parse the text value, per col type. Col types that are absent are
+    # not stored and are filtered on the JSON content instead.
+    TYPED_CONTENT_COLUMNS: dict[enum.ColType, tuple[str, Callable[[str], Any]]] = {
+        enum.ColType.TIME_DAY: ("value_date", datetime.date.fromisoformat),
+        enum.ColType.DECIMAL_0: ("value_number", lambda x: Decimal(int(x))),
+        enum.ColType.DECIMAL_1: ("value_number", Decimal),
+        enum.ColType.DECIMAL_2: ("value_number", Decimal),
+        enum.ColType.DECIMAL_3: ("value_number", Decimal),
+        enum.ColType.DECIMAL_4: ("value_number", Decimal),
+        enum.ColType.DECIMAL_5: ("value_number", Decimal),
+        enum.ColType.DECIMAL_6: ("value_number", Decimal),
+        enum.ColType.TEXT: ("value_text", str),
+        enum.ColType.ID_DIRECT: ("value_text", str),
+        enum.ColType.ID_PSEUDONYMISED: ("value_text", str),
+    }
+
+    # Number of cases per statement when writing the typed content
+    TYPED_CONTENT_BATCH_SIZE = 1000
+
+    # Models whose changes may change the col type of a case type col and therefore
+    # require the typed content of that case type col to be rebuilt
+    TYPED_CONTENT_METADATA_MODELS: tuple[Type[model.Model], ...] = (
+        model.Col,
+        model.CaseTypeCol,
+    )
+
+    # Models whose changes may change the case stats bucket of a case
+    CASE_STATS_MODELS: tuple[Type[model.Model], ...] = (
+        model.Case,
+        model.CaseDataCollectionLink,
+    )
+
     def __init__(self, engine: Engine, **kwargs: dict):
         entities = kwargs.pop("entities", BaseCaseRepository.ENTITIES)
+        self._use_typed_content: bool = kwargs.pop("use_typed_content", False)  # type: ignore[assignment]
+        self._use_case_stats: bool = kwargs.pop("use_case_stats", False)  # type: ignore[assignment]
         super().__init__(
             engine,
             entities=entities,
@@ -20,3 +120,795 @@ class CaseSARepository(SARepository, BaseCaseRepository):
             generate_service_metadata=GENERATE_SERVICE_METADATA,
             **kwargs,
         )
+
+    @property
+    def use_typed_content(self) -> bool:
+        return self._use_typed_content
+
+    @property
+    def use_case_stats(self) -> bool:
+        return self._use_case_stats
+
+    @classmethod
+    def create_sa_repository(
+        cls,
+        entities: list,
+        connection_string: str,
+        **kwargs: dict,
+    ) -> "CaseSARepository":
+        repository: CaseSARepository = super().create_sa_repository(  # type: ignore[assignment]
+            entities, connection_string, **kwargs
+        )
+        # Bring the typed content in line with the current cases if it is missing
+        # or out of date, i.e. if it was not enabled before or cases have changed
+        # since while it was not enabled
+        if repository.use_typed_content:
+            with repository.uow() as uow:
+                if not repository.is_typed_content_current(uow):
+                    repository.rebuild_typed_content(uow, None)
+        # Same for the case stats buckets
+        if repository.use_case_stats:
+            with repository.uow() as uow:
+                if not repository.is_case_stats_current(uow):
+                    repository.rebuild_case_stats(uow, None)
+        return repository
+
+    def crud(  # type: ignore
+        self,
+        uow: BaseUnitOfWork,
+        user_id: Hashable | None,
+        model_class: Type[model.Model],
+        objs: model.Model | Iterable[model.Model] | None,
+        obj_ids: Hashable | Iterable[Hashable] | None,
+        operation: CrudOperation,
+        filter: Filter | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        is_typed_content_model = (
+            model_class is model.Case
+            or model_class in CaseSARepository.TYPED_CONTENT_METADATA_MODELS
+        )
+        is_case_stats_model = model_class in CaseSARepository.CASE_STATS_MODELS
+        if operation in CrudOperationSet.READ_OR_EXISTS.value or not (
+            is_typed_content_model or is_case_stats_model
+        ):
+            return super().crud(
+                uow, user_id, model_class, objs, obj_ids, operation, filter, **kwargs
+            )
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        session = uow.session
+        # Mark the typed content and case stats as out of date if not enabled, so
+        # that they are rebuilt once enabled
+        if is_typed_content_model and not self._use_typed_content:
+            session.execute(delete(CaseContentState))
+        if is_case_stats_model and not self._use_case_stats:
+            session.execute(delete(CaseStatsState))
+        update_typed_content = is_typed_content_model and self._use_typed_content
+        update_case_stats = is_case_stats_model and self._use_case_stats
+        is_case_delete = (
+            model_class is model.Case and operation in CrudOperationSet.DELETE.value
+        )
+        if update_case_stats or (update_typed_content and is_case_delete):
+            # Get the affected cases before they are written
+            case_ids = self._retrieve_written_case_ids(
+                session,
+                model_class,
+                objs,
+                obj_ids,
+                operation,
+                filter,
+                kwargs.get("obj_filter"),
+            )
+        if update_case_stats:
+            old_case_stats_keys = self._retrieve_case_stats_keys(session, case_ids)
+        is_metadata_change = (
+            model_class in CaseSARepository.TYPED_CONTENT_METADATA_MODELS
+            and operation not in CrudOperationSet.CREATE.value
+        )
+        if update_typed_content and is_metadata_change:
+            old_col_types = self._retrieve_typed_col_types(session)
+        if update_typed_content and is_case_delete and case_ids:
+            # Remove the typed content of the cases to be deleted first
+            ids = list(case_ids)
+            with SARepository._in_session_get_id_where_clause(
+                session, CaseContentValue.case_id, ids, self._is_id_join(ids)
+            ) as where_clause:
+                session.execute(delete(CaseContentValue).where(where_clause))
+        retval = super().crud(
+            uow, user_id, model_class, objs, obj_ids, operation, filter, **kwargs
+        )
+        if update_typed_content:
+            if model_class is model.Case:
+                if operation in CrudOperationSet.WRITE.value:
+                    cases: list[model.Case] = objs if isinstance(objs, list) else [objs]  # type: ignore[list-item,assignment]
+                    self._write_typed_content(
+                        session,
+                        [(x.id, x.content) for x in cases],  # type: ignore[misc]
+                        self._retrieve_typed_col_types(session),
+                        replace=operation not in CrudOperationSet.CREATE.value,
+                    )
+            elif is_metadata_change:
+                # Rebuild the typed content of the case type cols whose col type
+                # changed, including those that are no longer or newly typed
+                new_col_types = self._retrieve_typed_col_types(session)
+                case_type_col_ids = {
+                    x
+                    for x in old_col_types.keys() | new_col_types.keys()
+                    if old_col_types.get(x) != new_col_types.get(x)
+                }
+                if case_type_col_ids:
+                    self._rebuild_typed_content(session, case_type_col_ids)
+        if update_case_stats:
+            if model_class is model.Case and operation in CrudOperationSet.CREATE.value:
+                # Created cases only have an id once written
+                case_ids = {x.id for x in (objs if isinstance(objs, list) else [objs])}  # type: ignore[union-attr]
+            self._update_case_stats_buckets(
+                session,
+                old_case_stats_keys,
+                self._retrieve_case_stats_keys(session, case_ids),
+            )
+        return retval
+
+    def is_typed_content_current(self, uow: BaseUnitOfWork) -> bool:
+        """
+        Whether the typed content is in line with the current cases, as far as
+        changes made through this repository are concerned.
+        """
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        return uow.session.execute(select(CaseContentState.id)).first() is not None
+
+    def rebuild_typed_content(self, uow: BaseUnitOfWork, user_id: UUID | None) -> bool:
+        """
+        Replace the typed content by that of all current cases, returning whether
+        typed content is enabled. Nothing is rebuilt if it is not.
+        """
+        if not self._use_typed_content:
+            return False
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        session = uow.session
+        session.execute(delete(CaseContentState))
+        session.execute(insert(CaseContentState).values(id=1))
+        self._rebuild_typed_content(session, None)
+        return True
+
+    def is_case_stats_current(self, uow: BaseUnitOfWork) -> bool:
+        """
+        Whether the case stats buckets are in line with the current cases, as far as
+        changes made through this repository are concerned.
+        """
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        return uow.session.execute(select(CaseStatsState.id)).first() is not None
+
+    def rebuild_case_stats(
+        self, uow: BaseUnitOfWork, user_id: UUID | None
+    ) -> bool | None:
+        """
+        Replace the case stats buckets by those of all current cases, returning
+        whether the previous buckets were consistent with them, or None if case
+        stats are not enabled, in which case nothing is rebuilt.
+        """
+        if not self._use_case_stats:
+            return None
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        session = uow.session
+        keys = self._retrieve_case_stats_keys(session, None)
+        is_consistent = self.is_case_stats_current(uow) and (
+            self._retrieve_case_stats_n_cases(session) == dict(Counter(keys.values()))
+        )
+        session.execute(delete(CaseStatsBucketDataCollection))
+        session.execute(delete(CaseStatsBucket))
+        session.execute(delete(CaseStatsState))
+        session.execute(insert(CaseStatsState).values(id=1))
+        self._update_case_stats_buckets(session, {}, keys)
+        return is_consistent
+
+    def retrieve_case_ids_by_content_filter(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        filter: CompositeFilter,
+        col_types: dict[UUID, enum.ColType],
+        case_type_ids: set[UUID] | None = None,
+        datetime_range_filter: DatetimeRangeFilter | None = None,
+    ) -> list[UUID] | None:
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        if any(x not in CaseSARepository.CONTENT_SA_TYPES for x in col_types.values()):
+            return None
+        row_class = self.get_mapper(model.Case).row_class
+        key_types = {
+            x: CaseSARepository.CONTENT_SA_TYPES[y] for x, y in col_types.items()
+        }
+        try:
+            if self._use_typed_content:
+                where_clause = self._get_typed_content_where_clause(
+                    row_class, filter, col_types, key_types
+                )
+            else:
+                where_clause = self.get_where_clause_from_json_filter(
+                    row_class.content, filter, key_types=key_types
+                )
+        except exc.InvalidArgumentsError:
+            # Filter cannot be expressed in SQL
+            return None
+        stmt = select(row_class.id).where(where_clause)
+        if case_type_ids is not None:
+            stmt = stmt.where(row_class.case_type_id.in_(case_type_ids))
+        if datetime_range_filter:
+            stmt = stmt.where(
+                self.get_where_clause_from_filter(row_class, datetime_range_filter)
+            )
+        return [x[0] for x in uow.session.execute(stmt).all()]
+
+    def retrieve_by_data_collection_access(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        model_class: Type[model.Case] | Type[model.CaseSet],
+        has_access: dict[UUID, set[UUID]],
+        obj_ids: list[UUID] | None = None,
+        filter: Filter | None = None,
+        limit: int | None = None,
+        cursor: UUID | None = None,
+    ) -> tuple[
+        list[model.Case] | list[model.CaseSet], set[UUID], dict[UUID, set[UUID]]
+    ]:
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        session = uow.session
+        link_class, link_field_name = CaseSARepository.DATA_COLLECTION_LINKS[
+            model_class
+        ]
+        row_class = self.get_mapper(model_class).row_class
+        link_row_class = self.get_mapper(link_class).row_class
+        link_obj_id = getattr(link_row_class, link_field_name)
+        access_clause = self._get_data_collection_access_clause(model_class, has_access)
+
+        # Retrieve objs and determine which ones are accessible
+        accessible_stmt = select(row_class.id).where(access_clause)
+        if obj_ids is not None:
+            objs = self.read_some(model_class, obj_ids, session=session)
+            accessible_stmt = accessible_stmt.where(row_class.id.in_(obj_ids))
+            accessible_obj_ids = {x[0] for x in session.execute(accessible_stmt)}
+        else:
+            stmt = select(row_class).where(access_clause)
+            if filter:
+                where_clause = self.get_where_clause_from_filter(row_class, filter)
+                stmt = stmt.where(where_clause)
+                accessible_stmt = accessible_stmt.where(where_clause)
+            if limit is not None or cursor is not None:
+                # Keyset pagination of the accessible objs
+                stmt = stmt.order_by(row_class.id)
+                if cursor is not None:
+                    stmt = stmt.where(row_class.id > cursor)
+                if limit is not None:
+                    stmt = stmt.limit(limit)
+            objs = self.from_sql(
+                model_class, [x[0] for x in session.execute(stmt).all()]
+            )
+            accessible_obj_ids = {x.id for x in objs}
+
+        # Retrieve the data collections of the accessible objs, being those on the
+        # page only if paginated
+        link_stmt = select(link_obj_id, link_row_class.data_collection_id).where(
+            link_obj_id.in_(
+                accessible_obj_ids
+                if limit is not None or cursor is not None
+                else accessible_stmt
+            )
+        )
+        data_collection_ids: dict[UUID, set[UUID]] = map_paired_elements(  # type: ignore[assignment]
+            session.execute(link_stmt).all(), as_set=True
+        )
+        return objs, accessible_obj_ids, data_collection_ids
+
+    def retrieve_case_stats_by_case_type(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        has_access: dict[UUID, set[UUID]] | None,
+        case_type_ids: set[UUID] | None = None,
+        datetime_range_filter: DatetimeRangeFilter | None = None,
+    ) -> dict[UUID, tuple[int, datetime.datetime, datetime.datetime]]:
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        row_class = self.get_mapper(model.Case).row_class
+        stmt = select(
+            row_class.case_type_id,
+            sa.func.count(row_class.id),
+            sa.func.min(row_class.case_date),
+            sa.func.max(row_class.case_date),
+        ).group_by(row_class.case_type_id)
+        if has_access is not None:
+            stmt = stmt.where(
+                self._get_data_collection_access_clause(model.Case, has_access)
+            )
+        if case_type_ids is not None:
+            stmt = stmt.where(row_class.case_type_id.in_(case_type_ids))
+        if datetime_range_filter:
+            stmt = stmt.where(
+                self.get_where_clause_from_filter(row_class, datetime_range_filter)
+            )
+        return {x[0]: tuple(x[1:]) for x in uow.session.execute(stmt).all()}
+
+    def retrieve_case_stats_by_case_type_from_buckets(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        has_access: dict[UUID, set[UUID]] | None,
+        case_type_ids: set[UUID] | None = None,
+    ) -> dict[UUID, tuple[int, str | None, str | None]] | None:
+        if not self._use_case_stats:
+            return None
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        stmt = (
+            select(
+                CaseStatsBucket.case_type_id,
+                sa.func.sum(CaseStatsBucket.n_cases),
+                sa.func.min(CaseStatsBucket.month),
+                sa.func.max(CaseStatsBucket.month),
+            )
+            .where(CaseStatsBucket.n_cases > 0)
+            .group_by(CaseStatsBucket.case_type_id)
+        )
+        if has_access is not None:
+            # A bucket is accessible if any of its data collections is
+            stmt = stmt.where(
+                select(CaseStatsBucketDataCollection.bucket_id)
+                .where(
+                    CaseStatsBucketDataCollection.bucket_id == CaseStatsBucket.id,
+                    CaseSARepository._get_case_type_data_collection_clause(
+                        CaseStatsBucket.case_type_id,
+                        CaseStatsBucketDataCollection.data_collection_id,
+                        has_access,
+                    ),
+                )
+                .exists()
+            )
+        if case_type_ids is not None:
+            stmt = stmt.where(CaseStatsBucket.case_type_id.in_(case_type_ids))
+        return {x[0]: (int(x[1]), x[2], x[3]) for x in uow.session.execute(stmt).all()}
+
+    def retrieve_case_stats_by_case_set(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: UUID | None,
+        has_access: dict[UUID, set[UUID]] | None,
+        own_data_collections: dict[UUID, set[UUID]],
+        case_set_ids: set[UUID] | None = None,
+    ) -> dict[UUID, tuple[int, int, datetime.datetime, datetime.datetime]]:
+        if not isinstance(uow, SAUnitOfWork):
+            raise exc.RepositoryServiceError(f"Invalid UnitOfWork: {uow}")
+        case_row_class = self.get_mapper(model.Case).row_class
+        case_set_row_class = self.get_mapper(model.CaseSet).row_class
+        member_row_class = self.get_mapper(model.CaseSetMember).row_class
+        own_case_id = sa.case(
+            (
+                CaseSARepository._get_case_type_data_collection_clause(
+                    case_row_class.case_type_id,
+                    case_row_class.created_in_data_collection_id,
+                    own_data_collections,
+                ),
+                case_row_class.id,
+            )
+        )
+        stmt = (
+            select(
+                member_row_class.case_set_id,
+                sa.func.count(sa.distinct(case_row_class.id)),
+                sa.func.count(sa.distinct(own_case_id)),
+                sa.func.min(case_row_class.case_date),
+                sa.func.max(case_row_class.case_date),
+            )
+            .join(case_row_class, case_row_class.id == member_row_class.case_id)
+            .group_by(member_row_class.case_set_id)
+        )
+        if has_access is not None:
+            stmt = stmt.join(
+                case_set_row_class,
+                case_set_row_class.id == member_row_class.case_set_id,
+            ).where(self._get_data_collection_access_clause(model.CaseSet, has_access))
+        if case_set_ids is not None:
+            stmt = stmt.where(member_row_class.case_set_id.in_(case_set_ids))
+        return {x[0]: tuple(x[1:]) for x in uow.session.execute(stmt).all()}
+
+    def _get_typed_content_where_clause(
+        self,
+        row_class: Type,
+        filter: Filter,
+        col_types: dict[UUID, enum.ColType],
+        key_types: dict[UUID, sa.types.TypeEngine | None],
+    ) -> sa.ColumnElement:
+        """
+        Get the where clause for the case content filter, comparing the typed
+        content for the keys whose col type is stored in it and the JSON content
+        for the other keys. Same limitations as get_where_clause_from_json_filter.
+        """
+        if filter.invert:
+            raise exc.InvalidArgumentsError("Unsupported inverted filter")
+        if isinstance(filter, CompositeFilter):
+            args = [
+                self._get_typed_content_where_clause(row_class, x, col_types, key_types)
+                for x in filter.filters
+            ]
+            if filter.operator == BooleanOperator.AND:
+                return sa.and_(*args)
+            if filter.operator == BooleanOperator.OR:
+                return sa.or_(*args)
+            raise exc.InvalidArgumentsError(
+                f"Unsupported filter operator: {filter.operator.value}"
+            )
+        key = filter.get_key()
+        typed_column = CaseSARepository.TYPED_CONTENT_COLUMNS.get(col_types[key])  # type: ignore[index]
+        if typed_column is None or isinstance(filter, ExistsFilter):
+            return self.get_where_clause_from_json_filter(
+                row_class.content, filter, key_types=key_types
+            )
+        value_clause = SARepository.get_where_clause_from_value_filter(
+            getattr(CaseContentValue, typed_column[0]),
+            filter,
+            key_types[key],  # type: ignore[index]
+            dialect_name=self.dialect_name,
+        )
+        return row_class.id.in_(
+            select(CaseContentValue.case_id).where(
+                CaseContentValue.case_type_col_id == key, value_clause
+            )
+        )
+
+    def _rebuild_typed_content(
+        self, session: Session, case_type_col_ids: set[UUID] | None
+    ) -> None:
+        """
+        Replace the typed content of the given case type cols, or of all case type
+        cols if case_type_col_ids is None, by that of the current cases.
+        """
+        row_class = self.get_mapper(model.Case).row_class
+        stmt = select(row_class.id, row_class.content)
+        col_types = self._retrieve_typed_col_types(session)
+        if case_type_col_ids is None:
+            session.execute(delete(CaseContentValue))
+        else:
+            session.execute(
+                delete(CaseContentValue).where(
+                    CaseContentValue.case_type_col_id.in_(case_type_col_ids)
+                )
+            )
+            col_types = {x: y for x, y in col_types.items() if x in case_type_col_ids}
+            # Only the cases of the case types of these case type cols can have
+            # content for them
+            case_type_col_row_class = self.get_mapper(model.CaseTypeCol).row_class
+            stmt = stmt.where(
+                row_class.case_type_id.in_(
+                    select(case_type_col_row_class.case_type_id).where(
+                        case_type_col_row_class.id.in_(list(col_types))
+                    )
+                )
+            )
+        if not col_types:
+            return
+        result = session.execute(
+            stmt.execution_options(yield_per=CaseSARepository.TYPED_CONTENT_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+            CaseSARepository._write_typed_content(
+                session,
+                [(x[0], {UUID(str(y)): z for y, z in x[1].items()}) for x in rows],
+                col_types,
+            )
+
+    def _retrieve_typed_col_types(self, session: Session) -> dict[UUID, enum.ColType]:
+        """
+        Get the col type of the case type cols whose values are stored in the typed
+        content.
+        """
+        case_type_col_row_class = self.get_mapper(model.CaseTypeCol).row_class
+        col_row_class = self.get_mapper(model.Col).row_class
+        stmt = (
+            select(case_type_col_row_class.id, col_row_class.col_type)
+            .join(col_row_class, col_row_class.id == case_type_col_row_class.col_id)
+            .where(col_row_class.col_type.in_(CaseSARepository.TYPED_CONTENT_COLUMNS))
+        )
+        return {x[0]: x[1] for x in session.execute(stmt).all()}
+
+    @staticmethod
+    def _write_typed_content(
+        session: Session,
+        contents: list[tuple[UUID, dict[UUID, str]]],
+        col_types: dict[UUID, enum.ColType],
+        replace: bool = False,
+    ) -> None:
+        """
+        Write the typed content for the given (case_id, content) pairs, replacing
+        any existing typed content of these cases if replace is True. Values that
+        cannot be parsed are not stored and therefore never match a filter.
+        """
+        if replace and contents:
+            for i in range(0, len(contents), CaseSARepository.TYPED_CONTENT_BATCH_SIZE):
+                session.execute(
+                    delete(CaseContentValue).where(
+                        CaseContentValue.case_id.in_(
+                            [
+                                x[0]
+                                for x in contents[
+                                    i : i + CaseSARepository.TYPED_CONTENT_BATCH_SIZE
+                                ]
+                            ]
+                        )
+                    )
+                )
+        rows = []
+        for case_id, content in contents:
+            for case_type_col_id, value in content.items():
+                col_type = col_types.get(case_type_col_id)
+                if col_type is None or value is None:
+                    continue
+                column_name, parse = CaseSARepository.TYPED_CONTENT_COLUMNS[col_type]
+                try:
+                    typed_value = parse(value)
+                except (ValueError, TypeError, InvalidOperation):
+                    continue
+                rows.append(
+                    {
+                        "case_id": case_id,
+                        "case_type_col_id": case_type_col_id,
+                        column_name: typed_value,
+                    }
+                )
+        if rows:
+            session.execute(insert(CaseContentValue), rows)
+
+    def _retrieve_written_case_ids(
+        self,
+        session: Session,
+        model_class: Type[model.Model],
+        objs: model.Model | Iterable[model.Model] | None,
+        obj_ids: Hashable | Iterable[Hashable] | None,
+        operation: CrudOperation,
+        filter: Filter | None,
+        obj_filter: Filter | None,
+    ) -> set[UUID]:
+        """
+        Get the ids of the existing cases that are affected by a write of cases or
+        case data collection links, to be called before the write. Cases that are
+        created are therefore not included.
+        """
+        objs = [] if objs is None else objs if isinstance(objs, list) else [objs]
+        if operation == CrudOperation.DELETE_ALL:
+            written_objs = self.read_all(
+                model_class, filter, session=session, obj_filter=obj_filter
+            )
+            if model_class is model.Case:
+                return {x.id for x in written_objs}
+            return {x.case_id for x in written_objs}
+        if model_class is model.Case:
+            if operation in CrudOperationSet.CREATE.value:
+                return set()
+            if operation in CrudOperationSet.DELETE.value:
+                return set(obj_ids if isinstance(obj_ids, list) else [obj_ids])  # type: ignore[arg-type]
+            return {x.id for x in objs}  # type: ignore[attr-defined]
+        # Case data collection links: the cases of the written links and, for
+        # existing links, the cases they are linked to before the write
+        case_ids = {x.case_id for x in objs}  # type: ignore[attr-defined]
+        if operation in CrudOperationSet.DELETE.value:
+            link_ids = list(obj_ids if isinstance(obj_ids, list) else [obj_ids])  # type: ignore[arg-type]
+        elif operation in CrudOperationSet.CREATE.value:
+            link_ids = []
+        else:
+            link_ids = [x.id for x in objs if x.id is not None]
+        if link_ids:
+            link_row_class = self.get_mapper(model_class).row_class
+            with SARepository._in_session_get_id_where_clause(
+                session, link_row_class.id, link_ids, self._is_id_join(link_ids)
+            ) as where_clause:
+                case_ids.update(
+                    x[0]
+                    for x in session.execute(
+                        select(link_row_class.case_id).where(where_clause)
+                    )
+                )
+        return case_ids
+
+    def _retrieve_case_stats_keys(
+        self, session: Session, case_ids: set[UUID] | None
+    ) -> dict[UUID, CaseStatsKey]:
+        """
+        Get the case stats bucket key of the given cases, or of all cases if
+        case_ids is None. Cases that do not exist are absent.
+        """
+        if case_ids is not None and not case_ids:
+            return {}
+        case_row_class = self.get_mapper(model.Case).row_class
+        link_row_class = self.get_mapper(model.CaseDataCollectionLink).row_class
+        case_stmt = select(
+            case_row_class.id,
+            case_row_class.case_type_id,
+            case_row_class.created_in_data_collection_id,
+            case_row_class.case_date,
+        )
+        link_stmt = select(link_row_class.case_id, link_row_class.data_collection_id)
+        if case_ids is None:
+            case_rows = session.execute(case_stmt).all()
+            link_rows = session.execute(link_stmt).all()
+        else:
+            ids = list(case_ids)
+            use_id_join = self._is_id_join(ids)
+            with SARepository._in_session_get_id_where_clause(
+                session, case_row_class.id, ids, use_id_join
+            ) as where_clause:
+                case_rows = session.execute(case_stmt.where(where_clause)).all()
+            with SARepository._in_session_get_id_where_clause(
+                session, link_row_class.case_id, ids, use_id_join
+            ) as where_clause:
+                link_rows = session.execute(link_stmt.where(where_clause)).all()
+        data_collection_ids: dict[UUID, set[UUID]] = map_paired_elements(  # type: ignore[assignment]
+            link_rows, as_set=True
+        )
+        return {
+            x[0]: (
+                x[1],
+                frozenset(data_collection_ids.get(x[0], set()) | {x[2]}),
+                x[3].isoformat()[0:7] if x[3] else None,
+            )
+            for x in case_rows
+        }
+
+    @staticmethod
+    def _retrieve_case_stats_n_cases(session: Session) -> dict[CaseStatsKey, int]:
+        """
+        Get the number of cases per non-empty case stats bucket.
+        """
+        rows = session.execute(
+            select(
+                CaseStatsBucket.id,
+                CaseStatsBucket.case_type_id,
+                CaseStatsBucket.month,
+                CaseStatsBucket.n_cases,
+                CaseStatsBucketDataCollection.data_collection_id,
+            )
+            .join(
+                CaseStatsBucketDataCollection,
+                CaseStatsBucketDataCollection.bucket_id == CaseStatsBucket.id,
+            )
+            .where(CaseStatsBucket.n_cases > 0)
+        ).all()
+        data_collection_ids: dict[UUID, set[UUID]] = map_paired_elements(  # type: ignore[assignment]
+            ((x[0], x[4]) for x in rows), as_set=True
+        )
+        return {(x[1], frozenset(data_collection_ids[x[0]]), x[2]): x[3] for x in rows}
+
+    @staticmethod
+    def _update_case_stats_buckets(
+        session: Session,
+        old_keys: dict[UUID, CaseStatsKey],
+        new_keys: dict[UUID, CaseStatsKey],
+    ) -> None:
+        """
+        Move the cases from their old to their new case stats bucket, given the
+        bucket key of each case before and after a write. Buckets are incremented in
+        the database rather than overwritten, so that concurrent writes to the same
+        bucket are not lost, and are kept when they become empty until the next
+        rebuild for the same reason.
+        """
+        delta_n_cases: Counter[CaseStatsKey] = Counter(new_keys.values())
+        delta_n_cases.subtract(old_keys.values())
+        get_data_collection_key = CaseSARepository._get_case_stats_data_collection_key
+        deltas = {
+            (x[0], get_data_collection_key(x[1]), x[2]): (x[1], y)
+            for x, y in delta_n_cases.items()
+            if y
+        }
+        if not deltas:
+            return
+        bucket_ids = {
+            (x[1], x[2], x[3]): x[0]
+            for x in session.execute(
+                select(
+                    CaseStatsBucket.id,
+                    CaseStatsBucket.case_type_id,
+                    CaseStatsBucket.data_collection_key,
+                    CaseStatsBucket.month,
+                ).where(CaseStatsBucket.data_collection_key.in_({x[1] for x in deltas}))
+            )
+        }
+        bucket_rows = []
+        bucket_data_collection_rows = []
+        for key, (data_collection_ids, delta) in deltas.items():
+            bucket_id = bucket_ids.get(key)
+            if bucket_id is not None:
+                session.execute(
+                    update(CaseStatsBucket)
+                    .where(CaseStatsBucket.id == bucket_id)
+                    .values(n_cases=CaseStatsBucket.n_cases + delta)
+                )
+                continue
+            if delta < 0:
+                # Bucket missing, i.e. out of date: left to the next rebuild
+                continue
+            bucket_id = uuid4()
+            bucket_rows.append(
+                {
+                    "id": bucket_id,
+                    "case_type_id": key[0],
+                    "data_collection_key": key[1],
+                    "month": key[2],
+                    "n_cases": delta,
+                }
+            )
+            bucket_data_collection_rows.extend(
+                {"bucket_id": bucket_id, "data_collection_id": x}
+                for x in data_collection_ids
+            )
+        if bucket_rows:
+            session.execute(insert(CaseStatsBucket), bucket_rows)
+            session.execute(
+                insert(CaseStatsBucketDataCollection), bucket_data_collection_rows
+            )
+
+    @staticmethod
+    def _get_case_stats_data_collection_key(
+        data_collection_ids: frozenset[UUID],
+    ) -> str:
+        """
+        Get the key identifying a combination of data collections in the case stats
+        buckets.
+        """
+        return hashlib.sha256(
+            ",".join(sorted(str(x) for x in data_collection_ids)).encode()
+        ).hexdigest()
+
+    def _get_data_collection_access_clause(
+        self,
+        model_class: Type[model.Case] | Type[model.CaseSet],
+        has_access: dict[UUID, set[UUID]],
+    ) -> sa.ColumnElement:
+        """
+        Get the where clause for the cases or case sets that are accessible given
+        has_access: the case type and either the created in data collection or a
+        linked data collection must be in has_access.
+        """
+        link_class, link_field_name = CaseSARepository.DATA_COLLECTION_LINKS[
+            model_class
+        ]
+        row_class = self.get_mapper(model_class).row_class
+        link_row_class = self.get_mapper(link_class).row_class
+        return sa.or_(
+            CaseSARepository._get_case_type_data_collection_clause(
+                row_class.case_type_id,
+                row_class.created_in_data_collection_id,
+                has_access,
+            ),
+            select(link_row_class.id)
+            .where(
+                getattr(link_row_class, link_field_name) == row_class.id,
+                CaseSARepository._get_case_type_data_collection_clause(
+                    row_class.case_type_id,
+                    link_row_class.data_collection_id,
+                    has_access,
+                ),
+            )
+            .exists(),
+        )
+
+    @staticmethod
+    def _get_case_type_data_collection_clause(
+        case_type_id_column: sa.Column,
+        data_collection_id_column: sa.Column,
+        combinations: dict[UUID, set[UUID]],
+    ) -> sa.ColumnElement:
+        """
+        Get the where clause for the (case_type_id, data_collection_id) pairs in
+        combinations, given as dict[case_type_id, set[data_collection_id]].
+        """
+        clauses = [
+            sa.and_(case_type_id_column == x, data_collection_id_column.in_(y))
+            for x, y in combinations.items()
+            if y
+        ]
+        return sa.or_(*clauses) if clauses else sa.false()
@@ -2,12 +2,14 @@
 # This module defines base classes, methods are added later
 
 
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Any, Type
 from uuid import UUID
 
 import sqlalchemy as sa
-from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy_utils.types.uuid import UUIDType
 
 from gen_epix.casedb.domain import enum, model
 from gen_epix.casedb.repositories.sa_model.base import RowMetadataMixin
@@ -15,6 +17,7 @@ from gen_epix.casedb.repositories.sa_model.util import (
     create_mapped_column,
     create_table_args,
 )
+from gen_epix.fastapp.repositories.sa import ServerUtcCurrentTime
 
 Base: Type = sa.orm.declarative_base(name=enum.ServiceType.CASE.value)
 
@@ -269,6 +272,127 @@ class Case(Base, RowMetadataMixin):
     case_type: Mapped[CaseType] = relationship(CaseType, foreign_keys=[case_type_id])
 
 
+class CaseContentValue(Base):
+    """
+    Typed copy of the case content values whose column type has a native SQL type
+    or is text, with one row per case and case type column. Not a domain model:
+    maintained by CaseSARepository when typed content is enabled, so that content
+    filters can be evaluated on native types using the indexes.
+    """
+
+    __tablename__ = "case_content_value"
+    __table_args__ = (
+        sa.Index("ix_case_content_value_number", "case_type_col_id", "value_number"),
+        sa.Index("ix_case_content_value_date", "case_type_col_id", "value_date"),
+        {"schema": model.Case.ENTITY.schema_name},
+    )
+
+    case_id: Mapped[UUID] = mapped_column(
+        UUIDType(),
+        sa.ForeignKey(
+            f"{model.Case.ENTITY.schema_name}.{model.Case.ENTITY.table_name}.id",
+            ondelete="CASCADE",
+            name="fk_case_content_value_case_id",
+        ),
+        primary_key=True,
+    )
+    case_type_col_id: Mapped[UUID] = mapped_column(UUIDType(), primary_key=True)
+    value_number: Mapped[Decimal | None] = mapped_column(
+        sa.Numeric(38, 6), nullable=True
+    )
+    value_date: Mapped[date | None] = mapped_column(sa.Date, nullable=True)
+    # Not indexed by default, since text can be too long for a regular index. A
+    # trigram index can be added through the text_index_columns setting.
+    value_text: Mapped[str | None] = mapped_column(sa.Text, nullable=True)
+
+
+class CaseContentState(Base):
+    """
+    State of the typed case content in case_content_value. Not a domain model: a
+    single row is added by CaseSARepository when it rebuilds the typed content, and
+    removed when cases, cols or case type cols change while typed content is not
+    enabled. The typed content is therefore only rebuilt on startup when there is
+    no such row, i.e. when it is missing or out of date.
+    """
+
+    __tablename__ = "case_content_state"
+    __table_args__ = ({"schema": model.Case.ENTITY.schema_name},)
+
+    id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
+    rebuilt_at: Mapped[datetime] = mapped_column(
+        sa.DateTime, nullable=False, server_default=ServerUtcCurrentTime()
+    )
+
+
+class CaseStatsBucket(Base):
+    """
+    Number of cases per case type, combination of data collections and month of
+    the case date, the data collections being the created in and linked data
+    collections of the case. Not a domain model: maintained by CaseSARepository
+    when case stats are enabled, in the same transaction as the writes to cases
+    and their data collection links. Each case is counted in exactly one bucket,
+    so that the case type statistics of any access combination can be obtained by
+    summing the buckets that match it.
+    """
+
+    __tablename__ = "case_stats_bucket"
+    __table_args__ = (
+        sa.UniqueConstraint(
+            "case_type_id",
+            "data_collection_key",
+            "month",
+            name="uq_case_stats_bucket",
+        ),
+        {"schema": model.Case.ENTITY.schema_name},
+    )
+
+    id: Mapped[UUID] = mapped_column(UUIDType(), primary_key=True)
+    case_type_id: Mapped[UUID] = mapped_column(UUIDType(), nullable=False)
+    # Hash of the sorted data collection ids, to identify the combination
+    data_collection_key: Mapped[str] = mapped_column(sa.String(64), nullable=False)
+    # Month of the case date formatted as YYYY-MM
+    month: Mapped[str | None] = mapped_column(sa.String(7), nullable=True)
+    n_cases: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+
+
+class CaseStatsBucketDataCollection(Base):
+    """
+    Data collections of a case stats bucket. Not a domain model, see
+    CaseStatsBucket.
+    """
+
+    __tablename__ = "case_stats_bucket_data_collection"
+    __table_args__ = ({"schema": model.Case.ENTITY.schema_name},)
+
+    bucket_id: Mapped[UUID] = mapped_column(
+        UUIDType(),
+        sa.ForeignKey(
+            f"{model.Case.ENTITY.schema_name}.case_stats_bucket.id",
+            ondelete="CASCADE",
+            name="fk_case_stats_bucket_data_collection_bucket_id",
+        ),
+        primary_key=True,
+    )
+    data_collection_id: Mapped[UUID] = mapped_column(UUIDType(), primary_key=True)
+
+
+class CaseStatsState(Base):
+    """
+    State of the case stats buckets. Not a domain model: a single row is added by
+    CaseSARepository when it rebuilds the buckets, and removed when cases or their
+    data collection links change while case stats are not enabled. The buckets
+    are therefore only rebuilt on startup when they are missing or out of date.
+    """
+
+    __tablename__ = "case_stats_state"
+    __table_args__ = ({"schema": model.Case.ENTITY.schema_name},)
+
+    id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
+    rebuilt_at: Mapped[datetime] = mapped_column(
+        sa.DateTime, nullable=False, server_default=ServerUtcCurrentTime()
+    )
+
+
 class CaseDataCollectionLink(Base, RowMetadataMixin):
     __tablename__, __table_args__ = create_table_args(model.CaseDataCollectionLink)
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Type
+from typing import Any, NamedTuple, Type
 from uuid import UUID
 
 from cachetools import TTLCache, cached
@@ -32,6 +32,17 @@ from gen_epix.filter import (
 from util.util import map_paired_elements
 
 
+class OrganizationAdminPolicyFields(NamedTuple):
+    """
+    The fields of an organization admin policy that are read to determine the
+    organizations under admin of a user.
+    """
+
+    organization_id: UUID
+    user_id: UUID
+    is_active: bool
+
+
 class AbacService(BaseAbacService):
 
     CACHE_INVALIDATION_COMMANDS: tuple[Type[Command], ...] = (
@@ -86,16 +97,17 @@ class AbacService(BaseAbacService):
         # TODO: inefficient implementation, retrieving first all objs and then filtering.
         # To be improved with e.g. CQS.
         with self.repository.uow() as uow:
-            organization_admin_policies: list[
-                model.OrganizationAdminPolicy
-            ] = self.repository.crud(
-                uow,
-                user_id=user.id,
-                model_class=model.OrganizationAdminPolicy,
-                objs=None,
-                obj_ids=None,
-                operation=CrudOperation.READ_ALL,
-            )  # type: ignore
+            organization_admin_policies: list[OrganizationAdminPolicyFields] = (
+                self.repository.crud(  # type: ignore[assignment]
+                    uow,
+                    user_id=user.id,
+                    model_class=model.OrganizationAdminPolicy,
+                    objs=None,
+                    obj_ids=None,
+                    operation=CrudOperation.READ_ALL,
+                    fields=list(OrganizationAdminPolicyFields._fields),  # type: ignore[arg-type]
+                )
+            )
         return set(
             x.organization_id
             for x in organization_admin_policies
@@ -413,17 +425,15 @@ class AbacService(BaseAbacService):
             )
             # Retrieve case type cols per case type
             case_type_col_map: dict[UUID, set[UUID]] = map_paired_elements(  # type: ignore[assignment]
-                [
-                    (x.case_type_id, x.id)
-                    for x in self.app.handle(
-                        command.CaseTypeColCrudCommand(
-                            user=user,
-                            objs=None,
-                            obj_ids=None,
-                            operation=CrudOperation.READ_ALL,
-                        ),
-                    )
-                ],
+                self.app.handle(
+                    command.CaseTypeColCrudCommand(
+                        user=user,
+                        objs=None,
+                        obj_ids=None,
+                        operation=CrudOperation.READ_ALL,
+                        props={"fields": ["case_type_id", "id"]},
+                    ),
+                ),
                 as_set=True,
             )
             # Retrieve relevant case type set members and case type col set members
@@ -435,21 +445,19 @@ class AbacService(BaseAbacService):
             )
             case_type_set_ids = frozenset(x.case_type_set_id for x in all_case_policies)
             case_type_set_member_map: dict[UUID, set[UUID]] = map_paired_elements(  # type: ignore[assignment]
-                [
-                    (x.case_type_set_id, x.case_type_id)
-                    for x in self.app.handle(
-                        command.CaseTypeSetMemberCrudCommand(
-                            user=user,
-                            objs=None,
-                            obj_ids=None,
-                            operation=CrudOperation.READ_ALL,
-                            query_filter=UuidSetFilter(
-                                key="case_type_set_id",
-                                members=case_type_set_ids,
-                            ),
+                self.app.handle(
+                    command.CaseTypeSetMemberCrudCommand(
+                        user=user,
+                        objs=None,
+                        obj_ids=None,
+                        operation=CrudOperation.READ_ALL,
+                        query_filter=UuidSetFilter(
+                            key="case_type_set_id",
+                            members=case_type_set_ids,
                         ),
-                    )
-                ],
+                        props={"fields": ["case_type_set_id", "case_type_id"]},
+                    ),
+                ),
                 as_set=True,
             )
             all_access_case_policies: list[
@@ -465,21 +473,19 @@ class AbacService(BaseAbacService):
                 if x.write_case_type_col_set_id
             )
             case_type_col_set_member_map: dict[UUID, set[UUID]] = map_paired_elements(  # type: ignore[assignment]
-                [
-                    (x.case_type_col_set_id, x.case_type_col_id)
-                    for x in self.app.handle(
-                        command.CaseTypeColSetMemberCrudCommand(
-                            user=user,
-                            objs=None,
-                            obj_ids=None,
-                            operation=CrudOperation.READ_ALL,
-                            query_filter=UuidSetFilter(
-                                key="case_type_col_set_id",
-                                members=frozenset(case_type_col_set_ids),
-                            ),
+                self.app.handle(
+                    command.CaseTypeColSetMemberCrudCommand(
+                        user=user,
+                        objs=None,
+                        obj_ids=None,
+                        operation=CrudOperation.READ_ALL,
+                        query_filter=UuidSetFilter(
+                            key="case_type_col_set_id",
+                            members=frozenset(case_type_col_set_ids),
                         ),
-                    )
-                ],
+                        props={"fields": ["case_type_col_set_id", "case_type_col_id"]},
+                    ),
+                ),
                 as_set=True,
             )
 
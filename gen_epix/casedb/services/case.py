@@ -1,15 +1,20 @@
 import datetime
+import logging
+import threading
 from decimal import Decimal
-from typing import Any, Callable, Iterable, Type
+from typing import Any, Callable, Iterable, Iterator, Type
 from uuid import UUID
 
+from cachetools import TTLCache
+
 import gen_epix.casedb.domain.command as command
 import gen_epix.casedb.domain.enum as enum
 import gen_epix.casedb.domain.model as model
 from gen_epix.casedb.domain import exc
 from gen_epix.casedb.domain.policy.abac import BaseCaseAbacPolicy
+from gen_epix.casedb.domain.repository import BaseCaseRepository
 from gen_epix.casedb.domain.service import BaseCaseService
-from gen_epix.fastapp import BaseUnitOfWork, CrudOperation
+from gen_epix.fastapp import App, BaseUnitOfWork, CrudOperation, EventTiming
 from gen_epix.fastapp.enum import CrudOperationSet
 from gen_epix.filter import (
     BooleanOperator,
@@ -23,6 +28,16 @@ from util.util import map_paired_elements
 
 
 class CaseService(BaseCaseService):
+    DEFAULT_CFG = {
+        "cases_cache_max_n_cases": 100000,  # Total number of cases over all users
+        "cases_cache_ttl": 300,  # Five minutes in seconds
+    }
+
+    CASES_CACHE_INVALIDATION_COMMANDS: tuple[Type[command.Command], ...] = (
+        command.CaseCrudCommand,
+        command.CaseDataCollectionLinkCrudCommand,
+    )
+
     _VALUE_TO_STR = {
         enum.ColType.TIME_DAY: lambda x: None if not x else f"{x}",
         enum.ColType.TIME_WEEK: lambda x: None if not x else f"{x}",
@@ -57,6 +72,57 @@ class CaseService(BaseCaseService):
         ),
     }
 
+    def __init__(
+        self,
+        app: App,
+        repository: BaseCaseRepository | None = None,
+        logger: logging.Logger | None = None,
+        **kwargs: dict,
+    ):
+        super().__init__(
+            app, repository=repository, logger=logger, **kwargs  # type: ignore[arg-type]
+        )
+        # Per user cache of the content filtered cases resulting from the last
+        # RetrieveCasesByQueryCommand, so that the subsequent RetrieveCasesByIdCommand
+        # for (a subset of) the same cases need not retrieve them again. The size of
+        # an entry is its number of cases, so that the memory used is bounded by the
+        # total number of cases rather than the number of users.
+        self._cases_cache: TTLCache = TTLCache(
+            maxsize=self.props.get(
+                "cases_cache_max_n_cases",
+                CaseService.DEFAULT_CFG["cases_cache_max_n_cases"],
+            ),
+            ttl=self.props.get(
+                "cases_cache_ttl", CaseService.DEFAULT_CFG["cases_cache_ttl"]
+            ),
+            getsizeof=lambda x: max(len(x[1]), 1),
+        )
+        self._cases_cache_lock = threading.Lock()
+        # Incremented whenever the cache is cleared, so that cases retrieved before
+        # are not put in it afterwards
+        self._cases_cache_generation = 0
+        self._cases_cache_hits = 0
+        self._cases_cache_misses = 0
+
+    @property
+    def cases_cache_info(self) -> dict[str, int]:
+        """
+        The number of hits and misses of the cases cache used by
+        RetrieveCasesByIdCommand, and the number of users and cases currently in it.
+        """
+        with self._cases_cache_lock:
+            return {
+                "hits": self._cases_cache_hits,
+                "misses": self._cases_cache_misses,
+                "size": len(self._cases_cache),
+                "n_cases": self._cases_cache.currsize,
+            }
+
+    def clear_cases_cache(self) -> None:
+        with self._cases_cache_lock:
+            self._cases_cache.clear()
+            self._cases_cache_generation += 1
+
     def crud(  # type:ignore[override]
         self, cmd: command.CrudCommand
     ) -> list[model.Model] | model.Model | list[UUID] | UUID | list[bool] | bool | None:
@@ -69,23 +135,38 @@ class CaseService(BaseCaseService):
             # No ABAC restrictions
             return super().crud(cmd)  # type: ignore[return-value]
 
+        # Invalidate cases cache if cases or their data collections change, both
+        # before and after the unit of work so that it cannot be filled with cases
+        # that are being changed
+        invalidate_cases_cache = (
+            cmd.operation in CrudOperationSet.NON_READ_OR_EXISTS.value
+            and issubclass(type(cmd), CaseService.CASES_CACHE_INVALIDATION_COMMANDS)
+        )
+        if invalidate_cases_cache:
+            self.clear_cases_cache()
+
         # Start unit of work and execute all within this scope
-        with self.repository.uow() as uow:
-            # Metadata commands
-            if any(
-                isinstance(cmd, x)
-                for x in BaseCaseService.ABAC_METADATA_COMMAND_CLASSES
-            ):
-                return self._crud_metadata(uow, cmd)  # type: ignore[no-any-return]
-            # Data commands
-            elif any(
-                isinstance(cmd, x) for x in BaseCaseService.ABAC_DATA_COMMAND_CLASSES
-            ):
-                return self._crud_data(uow, cmd)
-            else:
-                raise AssertionError(
-                    f"Unexpected command {cmd.__class__.__name__} with operation {cmd.operation.value}"
-                )
+        try:
+            with self.repository.uow() as uow:
+                # Metadata commands
+                if any(
+                    isinstance(cmd, x)
+                    for x in BaseCaseService.ABAC_METADATA_COMMAND_CLASSES
+                ):
+                    return self._crud_metadata(uow, cmd)  # type: ignore[no-any-return]
+                # Data commands
+                elif any(
+                    isinstance(cmd, x)
+                    for x in BaseCaseService.ABAC_DATA_COMMAND_CLASSES
+                ):
+                    return self._crud_data(uow, cmd)
+                else:
+                    raise AssertionError(
+                        f"Unexpected command {cmd.__class__.__name__} with operation {cmd.operation.value}"
+                    )
+        finally:
+            if invalidate_cases_cache:
+                self.clear_cases_cache()
 
     def create_cases_or_set(
         self, cmd: command.CaseSetCreateCommand | command.CasesCreateCommand
@@ -490,123 +571,127 @@ class CaseService(BaseCaseService):
         case_abac = BaseCaseAbacPolicy.get_case_abac_from_command(cmd)
         assert case_abac is not None
         case_type_ids = cmd.case_type_ids
+        datetime_range_filter = cmd.datetime_range_filter
+        if datetime_range_filter:
+            CaseService._set_datetime_range_filter_key(datetime_range_filter)
+        # @ABAC: aggregate over the cases with read access
+        has_access = (
+            None
+            if case_abac.is_full_access
+            else case_abac.get_combinations_with_access_right(enum.CaseRight.READ_CASE)
+        )
+        stats: dict[UUID, tuple[int, str | None, str | None]] | None = None
         with repository.uow() as uow:
-            cases: list[model.Case] = self._retrieve_cases_with_content_right(
-                uow,
-                user.id,
-                case_abac,
-                # user_case_access,
-                enum.CaseRight.READ_CASE,
-                datetime_range_filter=cmd.datetime_range_filter,
-                filter_content=False,
+            if not datetime_range_filter:
+                # Combine the case stats buckets if maintained by the repository,
+                # which only have month resolution and can therefore not be used
+                # when filtering on case date
+                stats = repository.retrieve_case_stats_by_case_type_from_buckets(  # type: ignore[attr-defined]
+                    uow, user.id, has_access, case_type_ids=case_type_ids
+                )
+            if stats is None:
+                stats = {
+                    x: (y[0], y[1].isoformat()[0:7], y[2].isoformat()[0:7])
+                    for x, y in repository.retrieve_case_stats_by_case_type(  # type: ignore[attr-defined]
+                        uow,
+                        user.id,
+                        has_access,
+                        case_type_ids=case_type_ids,
+                        datetime_range_filter=datetime_range_filter,
+                    ).items()
+                }
+        if case_type_ids is None:
+            case_type_ids = set(stats.keys())
+        # Get case type stats, with first/last date as month only
+        case_type_stats = []
+        for case_type_id in case_type_ids:
+            n_cases, first_case_month, last_case_month = stats.get(
+                case_type_id, (0, None, None)
+            )
+            case_type_stats.append(
+                model.CaseTypeStat(
+                    case_type_id=case_type_id,
+                    n_cases=n_cases,
+                    first_case_month=first_case_month,
+                    last_case_month=last_case_month,
+                )
             )
-            if case_type_ids is not None:
-                cases = [x for x in cases if x.case_type_id in case_type_ids]
-            else:
-                case_type_ids = {x.case_type_id for x in cases}
-            # Derive stats
-            empty_stat = {
-                "n_cases": 0,
-                "first_case_month": None,
-                "last_case_month": None,
-            }
-            stats = {x: dict(empty_stat) for x in case_type_ids}
-            for case in cases:
-                case_type_id = case.case_type_id
-                date_ = case.case_date
-                stat = stats[case_type_id]
-                if stat["n_cases"] == 0:
-                    stat["n_cases"] = 1
-                    stat["first_case_month"] = date_  # type: ignore[assignment]
-                    stat["last_case_month"] = date_  # type: ignore[assignment]
-                else:
-                    stat["n_cases"] += 1
-                    stat["first_case_month"] = min(stat["first_case_month"], date_)  # type: ignore[type-var,assignment]
-                    stat["last_case_month"] = max(stat["last_case_month"], date_)  # type: ignore[type-var,assignment]
-            # Convert first/last date to month only
-            for stat in stats.values():
-                for key in ("first_case_month", "last_case_month"):
-                    stat[key] = stat[key].isoformat()[0:7]  # type: ignore[union-attr]
-            # Get case type stats
-            case_type_stats = [
-                model.CaseTypeStat(case_type_id=x, **stats[x]) for x in case_type_ids  # type: ignore[arg-type]
-            ]
         return case_type_stats
 
+    def rebuild_case_stats(self, cmd: command.RebuildCaseStatsCommand) -> bool:
+        assert cmd.user is not None
+        with self.repository.uow() as uow:
+            is_consistent = self.repository.rebuild_case_stats(  # type: ignore[attr-defined]
+                uow, cmd.user.id
+            )
+        if is_consistent is None:
+            raise exc.ServiceException("Case stats not enabled")
+        return is_consistent  # type: ignore[no-any-return]
+
+    def rebuild_typed_case_content(
+        self, cmd: command.RebuildTypedCaseContentCommand
+    ) -> None:
+        assert cmd.user is not None
+        with self.repository.uow() as uow:
+            is_enabled = self.repository.rebuild_typed_content(  # type: ignore[attr-defined]
+                uow, cmd.user.id
+            )
+        if not is_enabled:
+            raise exc.ServiceException("Typed case content not enabled")
+
     def retrieve_case_set_stats(
         self,
         cmd: command.RetrieveCaseSetStatsCommand,
     ) -> list[model.CaseSetStat]:
         user, repository = self._get_user_and_repository(cmd)
         case_set_ids = cmd.case_set_ids
-        # Create filter, even if no case_set_ids are provided, to avoid unallowed read
-        # all without filter
-        query_filter: Filter | None = None
-        if case_set_ids:
-            query_filter = UuidSetFilter(
-                key="case_set_id", members=cmd.case_set_ids  # type: ignore[arg-type]
-            )
-        with self.repository.uow() as uow:
-            curr_cmd = command.CaseSetMemberCrudCommand(
-                user=user,
-                operation=CrudOperation.READ_ALL,
-                query_filter=query_filter,
-            )
-            curr_cmd._policies.extend(cmd._policies)
-            case_set_members: list[model.CaseSetMember] = self.crud(curr_cmd)  # type: ignore[assignment]
-            case_set_case_ids: dict[UUID, set[UUID]] = map_paired_elements(  # type: ignore[assignment]
-                ((x.case_set_id, x.case_id) for x in case_set_members), as_set=True
-            )
-            if not case_set_ids:
-                case_set_ids = list(case_set_case_ids.keys())
-            # Get cases
-            # @ABAC: case_set_case_ids is already filtered on cases with access, no
-            # need to apply here again
-            cases_: list[model.Case] = self.repository.crud(  # type: ignore[assignment]
+        case_abac = BaseCaseAbacPolicy.get_case_abac_from_command(cmd)
+        with repository.uow() as uow:
+            # @ABAC: aggregate over the cases in the case sets with read access. Own
+            # cases are those created in a private data collection of the user.
+            if case_abac is None or case_abac.is_full_access:
+                has_access = None
+                own_data_collections = {}
+            else:
+                has_access = case_abac.get_combinations_with_access_right(
+                    enum.CaseRight.READ_CASE_SET
+                )
+                own_data_collections = (
+                    case_abac.get_combinations_with_private_data_collection()
+                )
+            stats = repository.retrieve_case_stats_by_case_set(  # type: ignore[attr-defined]
                 uow,
                 user.id,
-                model.Case,
-                None,
-                list(set.union(set(), *list(case_set_case_ids.values()))),
-                CrudOperation.READ_SOME,
-            )
-            cases = {x.id: x for x in cases_}
-            # Create case set stats
-            case_set_stats = []
-            case_dates = {x.id: x.case_date for x in cases.values()}
-            all_case_ids = set(cases.keys())
-            for case_set_id in case_set_ids:
-                case_ids = case_set_case_ids.get(case_set_id, set()).intersection(
-                    all_case_ids
-                )
-                # TODO: calculate n_own_cases as the number of cases with a created_in data collection that is associated with the user
-                n_own_cases = 0
-                first_case_month = (
-                    min(case_dates[x] for x in case_ids).isoformat()[0:7]
-                    if case_ids
-                    else None
-                )
-                last_case_month = (
-                    max(case_dates[x] for x in case_ids).isoformat()[0:7]
-                    if case_ids
-                    else None
-                )
-                case_set_stats.append(
-                    model.CaseSetStat(
-                        case_set_id=case_set_id,
-                        n_cases=len(case_ids),
-                        n_own_cases=n_own_cases,
-                        first_case_month=first_case_month,
-                        last_case_month=last_case_month,
-                    )
+                has_access,
+                own_data_collections,
+                case_set_ids=set(case_set_ids) if case_set_ids else None,
+            )
+        if not case_set_ids:
+            case_set_ids = list(stats.keys())
+        # Get case set stats, converting first/last date to month only
+        case_set_stats = []
+        for case_set_id in case_set_ids:
+            n_cases, n_own_cases, first_case_date, last_case_date = stats.get(
+                case_set_id, (0, 0, None, None)
+            )
+            case_set_stats.append(
+                model.CaseSetStat(
+                    case_set_id=case_set_id,
+                    n_cases=n_cases,
+                    n_own_cases=n_own_cases,
+                    first_case_month=(
+                        first_case_date.isoformat()[0:7] if first_case_date else None
+                    ),
+                    last_case_month=(
+                        last_case_date.isoformat()[0:7] if last_case_date else None
+                    ),
                 )
-
+            )
         return case_set_stats
 
     def retrieve_cases_by_query(
         self, cmd: command.RetrieveCasesByQueryCommand
     ) -> list[UUID]:
-        # TODO: This is an inefficient call first loading all cases, then filtering them and then keeping only the ids. To be replaced by optimized query.
         user, repository = self._get_user_and_repository(cmd)
         case_query = cmd.case_query
         case_set_ids = case_query.case_set_ids
@@ -627,6 +712,10 @@ class CaseService(BaseCaseService):
             enum.CaseRight.READ_CASE
         )
 
+        # Get the cache generation before retrieving the cases, see below
+        with self._cases_cache_lock:
+            cases_cache_generation = self._cases_cache_generation
+
         # @ABAC: Verify read access to all given case types if applicable
         if case_type_ids and not is_full_access:
             if not case_type_ids.issubset(set(has_case_read.keys())):
@@ -661,25 +750,55 @@ class CaseService(BaseCaseService):
                     )
 
             # @ABAC: Verify validity of filter
+            candidate_case_ids: list[UUID] | None = None
             if case_query.filter:
                 # Make sure filter keys are UUIDs
                 case_query.filter.set_keys(
                     lambda x: UUID(x) if isinstance(x, str) else x
                 )
-                cols = self._verify_case_filter(uow, user, case_query.filter)
+                case_type_cols, cols = self._verify_case_filter(
+                    uow, user, case_query.filter
+                )
+                # Apply the filter to the case content in the repository if
+                # possible, so that only the matching cases need to be retrieved.
+                # The filter is still applied below as well, since the content is
+                # only filtered on case type col read access afterwards.
+                if datetime_range_filter:
+                    CaseService._set_datetime_range_filter_key(datetime_range_filter)
+                candidate_case_ids = repository.retrieve_case_ids_by_content_filter(  # type: ignore[attr-defined]
+                    uow,
+                    user.id,
+                    case_query.filter,
+                    {x.id: y.col_type for x, y in zip(case_type_cols, cols)},
+                    case_type_ids=case_type_ids,
+                    datetime_range_filter=datetime_range_filter,
+                )
+                if candidate_case_ids is not None and not candidate_case_ids:
+                    return []
 
-            # @ABAC: Retrieve all cases with read access, and content filtered on case type
-            # col read access
-            cases = self._retrieve_cases_with_content_right(
-                uow,
-                user.id,
-                case_abac,
-                # user_case_access,
-                enum.CaseRight.READ_CASE,
-                case_ids=None,
-                datetime_range_filter=datetime_range_filter,
-                filter_content=True,
-            )
+            # @ABAC: Retrieve all (candidate) cases with read access, and content
+            # filtered on case type col read access
+            if candidate_case_ids is not None:
+                cases = self._retrieve_cases_with_content_right(
+                    uow,
+                    user.id,
+                    case_abac,
+                    enum.CaseRight.READ_CASE,
+                    case_ids=candidate_case_ids,
+                    on_invalid_case_id="ignore",
+                    filter_content=True,
+                )
+            else:
+                cases = self._retrieve_cases_with_content_right(
+                    uow,
+                    user.id,
+                    case_abac,
+                    # user_case_access,
+                    enum.CaseRight.READ_CASE,
+                    case_ids=None,
+                    datetime_range_filter=datetime_range_filter,
+                    filter_content=True,
+                )
 
             # Filter cases by case types
             if case_type_ids:
@@ -698,19 +817,29 @@ class CaseService(BaseCaseService):
             # Filter cases by filters
             if case_query.filter:
                 map_funs = CaseService._get_map_funs_for_filters(cols)
-                cases = [
-                    x
-                    for x, y in zip(
-                        cases,
-                        case_query.filter.match_rows(
-                            (x.content for x in cases), map_fun=map_funs  # type: ignore[misc]
-                        ),
-                    )
-                    if y
-                ]
-
-        # TODO: consider putting these cases, with their data already filtered, in a
-        # cache, so that the expected subsequent call to retrieve them can be sped up
+                is_match = case_query.filter.match_batch(
+                    Filter.get_columns(
+                        (x.content for x in cases), case_query.filter.get_keys()
+                    ),
+                    map_fun=map_funs,  # type: ignore[arg-type]
+                )
+                cases = [x for x, y in zip(cases, is_match) if y]
+
+        # Put the cases, with their content already filtered, in the cache, so that
+        # the expected subsequent call to retrieve them by id can be sped up. Results
+        # with more cases than the cache can hold are not cached, removing any
+        # previous entry of the user. Nor are the cases cached if the cache was
+        # cleared meanwhile, since they may then have changed after being retrieved.
+        cache_entry = (case_abac, {x.id: x for x in cases})
+        with self._cases_cache_lock:
+            if self._cases_cache_generation == cases_cache_generation:
+                if (
+                    self._cases_cache.getsizeof(cache_entry)
+                    <= self._cases_cache.maxsize
+                ):
+                    self._cases_cache[user.id] = cache_entry
+                else:
+                    self._cases_cache.pop(user.id, None)
 
         # Return case ids
         case_ids = [x.id for x in cases]
@@ -718,15 +847,39 @@ class CaseService(BaseCaseService):
 
     def retrieve_cases_by_id(
         self, cmd: command.RetrieveCasesByIdCommand
-    ) -> list[model.Case]:
+    ) -> list[model.Case] | Iterator[list[model.Case]]:
         case_ids = cmd.case_ids
         user, repository = self._get_user_and_repository(cmd)
         if not case_ids:
-            return []
+            return iter([]) if cmd.batch_size else []
         # @ABAC: get case abac
         case_abac = BaseCaseAbacPolicy.get_case_abac_from_command(cmd)
         assert case_abac is not None
 
+        # Use the cases from the last query if they include all the requested cases
+        # and were retrieved with the same case abac
+        with self._cases_cache_lock:
+            cache_entry = self._cases_cache.get(user.id)
+            if (
+                cache_entry is not None
+                and cache_entry[0] is case_abac
+                and len(set(case_ids)) == len(case_ids)
+                and all(x in cache_entry[1] for x in case_ids)
+            ):
+                self._cases_cache_hits += 1
+                cases = [cache_entry[1][x] for x in case_ids]
+                if cmd.batch_size:
+                    return (
+                        cases[i : i + cmd.batch_size]
+                        for i in range(0, len(cases), cmd.batch_size)
+                    )
+                return cases
+            self._cases_cache_misses += 1
+
+        if cmd.batch_size:
+            return self._iter_cases_with_content_right(
+                user.id, case_abac, case_ids, cmd.batch_size
+            )
         with repository.uow() as uow:
             cases = self._retrieve_cases_with_content_right(
                 uow,
@@ -1115,7 +1268,11 @@ class CaseService(BaseCaseService):
         # App admin or above: no @ABAC applied
         if cmd.user.roles.intersection(enum.RoleSet.GE_APP_ADMIN.value):
             return self._crud_data_by_admin(uow, cmd)
-        return self._crud_data_by_non_admin(uow, cmd)
+        retval = self._crud_data_by_non_admin(uow, cmd)
+        if cmd.operation == CrudOperation.READ_ALL:
+            # @ABAC: the page is read by the repository after applying access
+            self.set_next_cursor(cmd, retval)  # type: ignore[arg-type]
+        return retval
 
     def _crud_data_by_admin(
         self,
@@ -1180,6 +1337,7 @@ class CaseService(BaseCaseService):
                     enum.CaseRight.READ_CASE_SET,
                     case_set_ids=case_set_ids,  # type:ignore[arg-type]
                     filter=cmd.query_filter,
+                    **(CaseService._get_page_kwargs(cmd) if is_read_all else {}),
                 )
                 return (
                     retval[0] if cmd.operation == CrudOperation.READ_ONE else retval
@@ -1305,7 +1463,26 @@ class CaseService(BaseCaseService):
                 # Must be able to write the case set and read the case
                 case_set_members = cmd.get_objs()  # type:ignore[assignment]
             elif is_read_all:
-                # Must be able to read or write the case set and read the case
+                # Must be able to read the case set and read the case. Only the
+                # members of case sets with read access are read, so that any page is
+                # taken after applying access.
+                readable_case_set_ids = frozenset(
+                    x.id
+                    for x in self._retrieve_case_sets_with_content_right(
+                        uow,
+                        cmd.user.id,
+                        case_abac,
+                        enum.CaseRight.READ_CASE_SET,
+                    )
+                )
+                member_filter: Filter = UuidSetFilter(
+                    key="case_set_id", members=readable_case_set_ids  # type: ignore[arg-type]
+                )
+                if cmd.query_filter:
+                    member_filter = CompositeFilter(
+                        filters=[member_filter, cmd.query_filter],  # type: ignore[list-item]
+                        operator=BooleanOperator.AND,
+                    )
                 case_set_members = self.repository.crud(  # type:ignore[assignment]
                     uow,
                     cmd.user.id,
@@ -1313,7 +1490,8 @@ class CaseService(BaseCaseService):
                     None,
                     None,
                     CrudOperation.READ_ALL,
-                    filter=cmd.query_filter,
+                    filter=member_filter,
+                    **CaseService._get_page_kwargs(cmd),
                 )
             elif is_read or is_delete:
                 # Must be able to read or write the case set and read the case
@@ -1423,6 +1601,7 @@ class CaseService(BaseCaseService):
                         None,
                         CrudOperation.READ_ALL,
                         filter=cmd.query_filter,
+                        **CaseService._get_page_kwargs(cmd),
                     )
                 )
             elif is_read or is_delete:
@@ -1558,6 +1737,7 @@ class CaseService(BaseCaseService):
                         None,
                         CrudOperation.READ_ALL,
                         filter=cmd.query_filter,
+                        **CaseService._get_page_kwargs(cmd),
                     )
                 )
             elif is_read or is_delete:
@@ -1698,7 +1878,6 @@ class CaseService(BaseCaseService):
         # the instances in cmd
         for link_model_class in link_model_classes:
             assert link_model_class.ENTITY is not None
-            get_obj_id = link_model_class.ENTITY.get_obj_id
             if cmd.operation == CrudOperation.DELETE_ALL:
                 # Special case: delete all instances
                 self.repository.crud(
@@ -1711,29 +1890,25 @@ class CaseService(BaseCaseService):
                 )
                 continue
             assert obj_ids is not None
-            # Get the instances that are linked to the instances in cmd
-            get_link_id = link_model_class.ENTITY.get_link_id(model_class)
-            link_objs: list = self.repository.crud(  # type:ignore[assignment]
+            # Delete the instances that are linked to the instances in cmd
+            link_field_name = link_model_class.ENTITY.get_link_field_name(model_class)
+            self.repository.delete_by_filter(
                 uow,
                 cmd.user.id,
                 link_model_class,
-                None,
-                None,
-                CrudOperation.READ_ALL,
-            )
-            link_obj_ids = [
-                get_obj_id(x) for x in link_objs if get_link_id(x) in obj_ids
-            ]
-            # Delete these instances
-            self.repository.crud(
-                uow,
-                cmd.user.id,
-                link_model_class,
-                None,
-                link_obj_ids,
-                CrudOperation.DELETE_SOME,
+                UuidSetFilter(key=link_field_name, members=obj_ids),  # type: ignore[arg-type]
             )
 
+    @staticmethod
+    def _get_page_kwargs(cmd: command.CrudCommand) -> dict[str, Any]:
+        """
+        Get the pagination of a read all command, if any, as kwargs for the
+        repository.
+        """
+        return {
+            x: cmd.props[x] for x in ("limit", "cursor") if cmd.props.get(x) is not None
+        }
+
     def _crud_with_access_filter(
         self,
         uow: BaseUnitOfWork,
@@ -1834,9 +2009,15 @@ class CaseService(BaseCaseService):
                     "match_all1 and match_all2 must be False if valid_ids1 and valid_ids2 are None"
                 )
             filter = None
-        # Query repository
+        # Query repository, reading only the link fields unless objs are returned
+        props = {}
+        if return_type != "objects":
+            props["fields"] = [field_name1, field_name2]
         cmd = command_class(
-            user=user, operation=CrudOperation.READ_ALL, query_filter=filter
+            user=user,
+            operation=CrudOperation.READ_ALL,
+            query_filter=filter,
+            props=props,
         )
         objs: list[model.Model]
         if uow:
@@ -1914,40 +2095,68 @@ class CaseService(BaseCaseService):
         case_type_ids: set[UUID] | None = None,
         filter: Filter | None = None,
         on_invalid_case_set_id: str = "raise",
+        limit: int | None = None,
+        cursor: UUID | None = None,
     ) -> list[model.CaseSet]:
-        # TODO: This is a temporary implementation, to be replaced by optimized query
         if right not in enum.CaseRightSet.CASE_SET_CONTENT.value:
             raise exc.InvalidArgumentsError(f"Invalid case abac right: {right.value}")
         if on_invalid_case_set_id not in {"raise", "ignore"}:
             raise exc.InvalidArgumentsError(
                 f"Invalid on_invalid_case_set_id: {on_invalid_case_set_id}"
             )
+        if case_set_ids and filter:
+            raise exc.InvalidArgumentsError(
+                "Cannot use datetime range filter with case set ids"
+            )
+        if (case_set_ids or case_type_ids is not None) and (
+            limit is not None or cursor is not None
+        ):
+            raise exc.InvalidArgumentsError(
+                "Cannot paginate case sets with case set ids or case type ids"
+            )
 
-        # Retrieve all case sets, potentially filtered
+        # Retrieve case sets, potentially filtered. Unless the user has full access,
+        # the repository restricts the case sets to those the user has access to,
+        # or in case of case_set_ids indicates which ones are accessible.
         case_sets: list[model.CaseSet]
-        if case_set_ids:
-            if filter:
-                raise exc.InvalidArgumentsError(
-                    "Cannot use datetime range filter with case set ids"
+        accessible_case_set_ids: set[UUID] = set()
+        if case_abac.is_full_access:
+            if case_set_ids:
+                case_sets = self.repository.crud(  # type:ignore[assignment]
+                    uow,
+                    user_id,
+                    model.CaseSet,
+                    None,
+                    case_set_ids,
+                    CrudOperation.READ_SOME,
+                )
+            else:
+                case_sets = self.repository.crud(  # type:ignore[assignment]
+                    uow,
+                    user_id,
+                    model.CaseSet,
+                    None,
+                    None,
+                    CrudOperation.READ_ALL,
+                    filter=filter,
+                    limit=limit,
+                    cursor=cursor,
                 )
-            case_sets = self.repository.crud(  # type:ignore[assignment]
-                uow,
-                user_id,
-                model.CaseSet,
-                None,
-                case_set_ids,
-                CrudOperation.READ_SOME,
-            )
         else:
-            case_sets = self.repository.crud(  # type:ignore[assignment]
+            # @ABAC: retrieve case sets together with the ones the user has access
+            # to
+            retval: tuple[list[model.CaseSet], set[UUID], dict[UUID, set[UUID]]]
+            retval = self.repository.retrieve_by_data_collection_access(  # type: ignore[attr-defined]
                 uow,
                 user_id,
                 model.CaseSet,
-                None,
-                None,
-                CrudOperation.READ_ALL,
+                case_abac.get_combinations_with_access_right(right),
+                obj_ids=case_set_ids if case_set_ids else None,
                 filter=filter,
+                limit=limit,
+                cursor=cursor,
             )
+            case_sets, accessible_case_set_ids, _ = retval
 
         # Filter on case_type_ids if any or verify that all case sets have a valid
         # case_type_id if case_set_ids is given
@@ -1972,49 +2181,13 @@ class CaseService(BaseCaseService):
         if case_abac.is_full_access:
             return case_sets
 
-        # @ABAC: filter case sets to which the user has read access
-        case_set_data_collections, _ = self._retrieve_case_set_data_collections_map(
-            uow, user_id
-        )
-        has_access = case_abac.get_combinations_with_access_right(right)
-        filtered_case_sets = []
-        for case_set in case_sets:
-            # Check if user has any access to case
-            case_type_id = case_set.case_type_id
-            if case_type_id not in has_access:
-                if case_set_ids:
-                    if on_invalid_case_set_id == "raise":
-                        raise exc.UnauthorizedAuthError(
-                            f"User {user_id} has no access to some requested cases"
-                        )
-                    elif on_invalid_case_set_id == "ignore":
-                        pass
-                    else:
-                        raise AssertionError(
-                            f"Invalid on_invalid_case_id: {on_invalid_case_set_id}"
-                        )
-                continue
-            # Check if user has access to any of the data collections of the case set
-            data_collection_ids = case_set_data_collections.get(
-                case_set.id, set()
-            )  # type:ignore[arg-type]
-            data_collection_ids.add(case_set.created_in_data_collection_id)
-            if not data_collection_ids.intersection(has_access[case_type_id]):
-                if case_set_ids:
-                    if on_invalid_case_set_id == "raise":
-                        raise exc.UnauthorizedAuthError(
-                            f"User {user_id} has no access to some requested case sets"
-                        )
-                    elif on_invalid_case_set_id == "ignore":
-                        pass
-                    else:
-                        raise AssertionError(
-                            f"Invalid on_invalid_case_set_id: {on_invalid_case_set_id}"
-                        )
-                continue
-            # Keep case
-            filtered_case_sets.append(case_set)
-        return filtered_case_sets
+        # @ABAC: filter case sets to which the user has access
+        if case_set_ids and on_invalid_case_set_id == "raise":
+            if not all(x.id in accessible_case_set_ids for x in case_sets):
+                raise exc.UnauthorizedAuthError(
+                    f"User {user_id} has no access to some requested case sets"
+                )
+        return [x for x in case_sets if x.id in accessible_case_set_ids]
 
     def _retrieve_cases_with_content_right(
         self,
@@ -2029,7 +2202,6 @@ class CaseService(BaseCaseService):
         filter_content: bool = True,
         extra_access_case_type_col_ids: set[UUID] | None = None,
     ) -> list[model.Case]:
-        # TODO: This is a temporary implementation, to be replaced by optimized query
         if right not in enum.CaseRightSet.CASE_CONTENT.value:
             raise exc.InvalidArgumentsError(f"Invalid case abac right: {right.value}")
         if on_invalid_case_id not in {"raise", "ignore"}:
@@ -2037,37 +2209,51 @@ class CaseService(BaseCaseService):
                 f"Invalid on_invalid_case_id: {on_invalid_case_id}"
             )
 
-        # Retrieve all cases, potentially filtered by datetime range
+        # Retrieve cases, potentially filtered by datetime range. Unless the user has
+        # full access, the repository restricts the cases to those the user has
+        # access to, or in case of case_ids indicates which ones are accessible.
         if datetime_range_filter:
-            if datetime_range_filter.key and datetime_range_filter.key != "case_date":
-                raise exc.InvalidArgumentsError(
-                    f"Invalid datetime range filter key: {datetime_range_filter.key}"
-                )
-            datetime_range_filter.key = "case_date"
+            CaseService._set_datetime_range_filter_key(datetime_range_filter)
+        if case_ids and datetime_range_filter:
+            raise exc.InvalidArgumentsError(
+                "Cannot use datetime range filter with case ids"
+            )
         cases: list[model.Case]
-        if case_ids:
-            if datetime_range_filter:
-                raise exc.InvalidArgumentsError(
-                    "Cannot use datetime range filter with case ids"
+        accessible_case_ids: set[UUID] = set()
+        case_data_collections: dict[UUID, set[UUID]] = {}
+        if case_abac.is_full_access:
+            if case_ids:
+                cases = self.repository.crud(  # type:ignore[assignment]
+                    uow,
+                    user_id,
+                    model.Case,
+                    None,
+                    case_ids,
+                    CrudOperation.READ_SOME,
+                )
+            else:
+                cases = self.repository.crud(  # type:ignore[assignment]
+                    uow,
+                    user_id,
+                    model.Case,
+                    None,
+                    None,
+                    CrudOperation.READ_ALL,
+                    filter=datetime_range_filter,
                 )
-            cases = self.repository.crud(  # type:ignore[assignment]
-                uow,
-                user_id,
-                model.Case,
-                None,
-                case_ids,
-                CrudOperation.READ_SOME,
-            )
         else:
-            cases = self.repository.crud(  # type:ignore[assignment]
+            # @ABAC: retrieve cases together with the ones the user has access to
+            # and their data collections
+            retval: tuple[list[model.Case], set[UUID], dict[UUID, set[UUID]]]
+            retval = self.repository.retrieve_by_data_collection_access(  # type: ignore[attr-defined]
                 uow,
                 user_id,
                 model.Case,
-                None,
-                None,
-                CrudOperation.READ_ALL,
+                case_abac.get_combinations_with_access_right(right),
+                obj_ids=case_ids if case_ids else None,
                 filter=datetime_range_filter,
             )
+            cases, accessible_case_ids, case_data_collections = retval
 
         # Filter on case_type_ids if any or verify that all cases have a valid
         # case_type_id if case_ids is given
@@ -2097,45 +2283,20 @@ class CaseService(BaseCaseService):
             return cases
 
         # @ABAC: filter cases to which the user has read access, and optionally also
-        # the content (case type cols)
-        case_data_collections, _ = self._retrieve_case_data_collections_map(
-            uow, user_id
-        )
-        has_access = case_abac.get_combinations_with_access_right(right)
+        # the content (case type cols). The case type cols only depend on the case
+        # type and the data collections of the case, so they are determined once per
+        # such access signature rather than per case.
+        if case_ids and on_invalid_case_id == "raise":
+            if not all(x.id in accessible_case_ids for x in cases):
+                raise exc.UnauthorizedAuthError(
+                    f"User {user_id} has no access to some requested cases"
+                )
         filtered_cases = []
+        case_type_col_ids_by_signature: dict[
+            tuple[UUID, frozenset[UUID]], frozenset[UUID]
+        ] = {}
         for case in cases:
-            # Check if user has any access to case
-            case_type_id = case.case_type_id
-            if case_type_id not in has_access:
-                if case_ids:
-                    if on_invalid_case_id == "raise":
-                        raise exc.UnauthorizedAuthError(
-                            f"User {user_id} has no access to some requested cases"
-                        )
-                    elif on_invalid_case_id == "ignore":
-                        pass
-                    else:
-                        raise AssertionError(
-                            f"Invalid on_invalid_case_id: {on_invalid_case_id}"
-                        )
-                continue
-            # Check if user has access to any data collection of the case
-            data_collection_ids = case_data_collections.get(
-                case.id, set()
-            )  # type:ignore[index]
-            data_collection_ids.add(case.created_in_data_collection_id)
-            if not data_collection_ids.intersection(has_access[case_type_id]):
-                if case_ids:
-                    if on_invalid_case_id == "raise":
-                        raise exc.UnauthorizedAuthError(
-                            f"User {user_id} has no access to some requested cases"
-                        )
-                    elif on_invalid_case_id == "ignore":
-                        pass
-                    else:
-                        raise AssertionError(
-                            f"Invalid on_invalid_case_id: {on_invalid_case_id}"
-                        )
+            if case.id not in accessible_case_ids:
                 continue
             # Keep case
             filtered_cases.append(case)
@@ -2143,36 +2304,103 @@ class CaseService(BaseCaseService):
             if not filter_content:
                 continue
             # Determine which case type cols the user has access to
-            data_collection_col_access = case_abac.case_type_access_abacs[case_type_id]
-            case_type_col_ids = set()
-            for data_collection_id in data_collection_ids:
-                # Add case type cols with access to the case for this data
-                # collection
-                case_type_access_abac = data_collection_col_access.get(
-                    data_collection_id
+            data_collection_ids = frozenset(
+                case_data_collections.get(case.id, set())
+                | {case.created_in_data_collection_id}
+            )
+            signature = (case.case_type_id, data_collection_ids)
+            case_type_col_ids = case_type_col_ids_by_signature.get(signature)
+            if case_type_col_ids is None:
+                case_type_col_ids = self._get_case_type_col_ids_with_access(
+                    case_abac,
+                    case.case_type_id,
+                    data_collection_ids,
+                    extra_access_case_type_col_ids=extra_access_case_type_col_ids,
                 )
-                if case_type_access_abac is not None:
-                    case_type_col_ids.update(
-                        case_type_access_abac.read_case_type_col_ids
+                if not case_type_col_ids:
+                    data_collection_ids_str = ", ".join(
+                        [str(x) for x in data_collection_ids]
                     )
-            if extra_access_case_type_col_ids is not None:
-                case_type_col_ids.update(extra_access_case_type_col_ids)
-            if not case_type_col_ids:
-                data_collection_ids_str = ", ".join(
-                    [str(x) for x in data_collection_ids]
-                )
-                raise AssertionError(
-                    f"User {user_id} has zero columns with {right.value} access to case {case.id}, data collections ({data_collection_ids_str}) even though the case has some {right.value} access"
-                )
-            # Filter case content
-            case.content = {
-                x: y for x, y in case.content.items() if x in case_type_col_ids
-            }
+                    raise AssertionError(
+                        f"User {user_id} has zero columns with {right.value} access to case {case.id}, data collections ({data_collection_ids_str}) even though the case has some {right.value} access"
+                    )
+                case_type_col_ids_by_signature[signature] = case_type_col_ids
+            # Filter case content, unless all of it is accessible
+            if not case_type_col_ids.issuperset(case.content):
+                case.content = {
+                    x: y for x, y in case.content.items() if x in case_type_col_ids
+                }
         return filtered_cases
 
+    def _iter_cases_with_content_right(
+        self,
+        user_id: UUID,
+        case_abac: model.CaseAbac,
+        case_ids: list[UUID],
+        batch_size: int,
+    ) -> Iterator[list[model.Case]]:
+        """
+        Retrieve the cases with read access and their content filtered, one batch of
+        case ids at a time. All batches are read in a single unit of work, so that
+        they are consistent with each other. The unit of work is not entered as a
+        context, since the batches may be consumed in different contexts such as
+        threads, and its transaction is rolled back once the batches are consumed
+        since the cases are only read.
+        """
+        uow = self.repository.uow()
+        try:
+            for i in range(0, len(case_ids), batch_size):
+                cases = self._retrieve_cases_with_content_right(
+                    uow,
+                    user_id,
+                    case_abac,
+                    enum.CaseRight.READ_CASE,
+                    case_ids=case_ids[i : i + batch_size],
+                    filter_content=True,
+                )
+                yield cases
+        finally:
+            uow.rollback()
+
+    @staticmethod
+    def _set_datetime_range_filter_key(
+        datetime_range_filter: DatetimeRangeFilter,
+    ) -> None:
+        """
+        Verify that the datetime range filter applies to the case date, and set its
+        key accordingly.
+        """
+        if datetime_range_filter.key and datetime_range_filter.key != "case_date":
+            raise exc.InvalidArgumentsError(
+                f"Invalid datetime range filter key: {datetime_range_filter.key}"
+            )
+        datetime_range_filter.key = "case_date"
+
+    @staticmethod
+    def _get_case_type_col_ids_with_access(
+        case_abac: model.CaseAbac,
+        case_type_id: UUID,
+        data_collection_ids: frozenset[UUID],
+        extra_access_case_type_col_ids: set[UUID] | None = None,
+    ) -> frozenset[UUID]:
+        """
+        Get the case type cols with read access for a case of the given case type in
+        the given data collections.
+        """
+        data_collection_col_access = case_abac.case_type_access_abacs[case_type_id]
+        case_type_col_ids = set()
+        for data_collection_id in data_collection_ids:
+            # Add case type cols with access to the case for this data collection
+            case_type_access_abac = data_collection_col_access.get(data_collection_id)
+            if case_type_access_abac is not None:
+                case_type_col_ids.update(case_type_access_abac.read_case_type_col_ids)
+        if extra_access_case_type_col_ids is not None:
+            case_type_col_ids.update(extra_access_case_type_col_ids)
+        return frozenset(case_type_col_ids)
+
     def _retrieve_case_data_collections_map(
         self, uow: BaseUnitOfWork, user_id: UUID, **kwargs: dict
-    ) -> tuple[dict[UUID, set[UUID]], list[model.CaseDataCollectionLink]]:
+    ) -> tuple[dict[UUID, set[UUID]], list[tuple[UUID, UUID]]]:
         return self._retrieve_association_map(  # type:ignore[return-value]
             uow,
             user_id,
@@ -2184,7 +2412,7 @@ class CaseService(BaseCaseService):
 
     def _retrieve_case_set_data_collections_map(
         self, uow: BaseUnitOfWork, user_id: UUID, **kwargs: dict
-    ) -> tuple[dict[UUID, set[UUID]], list[model.CaseSetDataCollectionLink]]:
+    ) -> tuple[dict[UUID, set[UUID]], list[tuple[UUID, UUID]]]:
         return self._retrieve_association_map(  # type:ignore[return-value]
             uow,
             user_id,
@@ -2196,7 +2424,7 @@ class CaseService(BaseCaseService):
 
     def _retrieve_case_case_sets_map(
         self, uow: BaseUnitOfWork, user_id: UUID, **kwargs: dict
-    ) -> tuple[dict[UUID, set[UUID]], list[model.CaseSetMember]]:
+    ) -> tuple[dict[UUID, set[UUID]], list[tuple[UUID, UUID]]]:
         return self._retrieve_association_map(  # type:ignore[return-value]
             uow,
             user_id,
@@ -2214,9 +2442,11 @@ class CaseService(BaseCaseService):
         link_field_name1: str,
         link_field_name2: str,
         **kwargs: dict,
-    ) -> tuple[dict[UUID, set[UUID]], list[model.Model]]:
+    ) -> tuple[dict[UUID, set[UUID]], list[tuple[UUID, UUID]]]:
         """
         Get a dict[obj_id1, set[obj_ids]] based on the association stored in the association_class objs.
+        Only the link fields are read, and are returned as well as a list of
+        (obj_id1, obj_id2) tuples.
         """
         obj_ids1: frozenset[UUID] | None = kwargs.pop(  # type:ignore[assignment]
             "obj_ids1", None
@@ -2244,8 +2474,8 @@ class CaseService(BaseCaseService):
             filter = filter2
         else:
             filter = None
-        # Retrieve association objs and convert to map
-        association_objs: list = self.repository.crud(  # type:ignore[assignment]
+        # Retrieve association link ids and convert to map
+        association_id_pairs: list = self.repository.crud(  # type:ignore[assignment]
             uow,
             user_id,
             association_class,
@@ -2253,18 +2483,15 @@ class CaseService(BaseCaseService):
             None,
             CrudOperation.READ_ALL,
             filter=filter,
+            fields=[link_field_name1, link_field_name2],
         )
         association_map: dict[UUID, set[UUID]] = (
             map_paired_elements(  # type:ignore[assignment]
-                (
-                    (getattr(x, link_field_name1), getattr(x, link_field_name2))
-                    for x in association_objs
-                ),
-                as_set=True,
+                association_id_pairs, as_set=True
             )
         )
 
-        return association_map, association_objs
+        return association_map, association_id_pairs
 
     def _retrieve_sequence_column_data(
         self, uow: BaseUnitOfWork, user: model.User, seq_case_type_col_id: UUID
@@ -2294,7 +2521,7 @@ class CaseService(BaseCaseService):
 
     def _verify_case_filter(
         self, uow: BaseUnitOfWork, user: model.User, filter: CompositeFilter
-    ) -> list[model.Col]:
+    ) -> tuple[list[model.CaseTypeCol], list[model.Col]]:
         # Retrieve case type cols corresponding to filter keys
         filter_case_type_col_ids = filter.get_keys()
         filter_case_type_cols: list[model.CaseTypeCol] = (
@@ -2387,7 +2614,7 @@ class CaseService(BaseCaseService):
                         f"Column {case_type_col.id}: invalid filter type: {filter.__class__.__name__}"
                     )
 
-        return cols
+        return filter_case_type_cols, cols
 
     def _verify_case_set_member_case_type(
         self, user: model.User, case_set_members: list[model.CaseSetMember]
@@ -10,6 +10,7 @@ from gen_epix.fastapp.enum import CrudEndpointType as CrudEndpointType
 from gen_epix.fastapp.enum import CrudOperation as CrudOperation
 from gen_epix.fastapp.enum import CrudOperationSet as CrudOperationSet
 from gen_epix.fastapp.enum import EventTiming as EventTiming
+from gen_epix.fastapp.enum import ExecutionStrategy as ExecutionStrategy
 from gen_epix.fastapp.enum import FieldType as FieldType
 from gen_epix.fastapp.enum import FieldTypeSet as FieldTypeSet
 from gen_epix.fastapp.enum import IsolationLevel as IsolationLevel
@@ -1,5 +1,8 @@
 # pylint: disable=useless-import-alias
+from gen_epix.fastapp.api.command_executor import CommandExecutor as CommandExecutor
+from gen_epix.fastapp.api.command_executor import ExecutionMetrics as ExecutionMetrics
 from gen_epix.fastapp.api.crud_endpoint_generator import (
     CrudEndpointGenerator as CrudEndpointGenerator,
 )
 from gen_epix.fastapp.api.crud_endpoint_set import CrudEndpointSet as CrudEndpointSet
+from gen_epix.fastapp.api.streaming import ModelStreamEncoder as ModelStreamEncoder
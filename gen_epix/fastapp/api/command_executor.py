@@ -0,0 +1,226 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Type
+
+import anyio
+import anyio.to_thread
+from pydantic import BaseModel
+
+from gen_epix.fastapp import exc
+from gen_epix.fastapp.app import App
+from gen_epix.fastapp.enum import ExecutionStrategy
+from gen_epix.fastapp.model import Command
+
+# App of a process of the process pool, created by the app factory of the executor
+_PROCESS_APP: App | None = None
+
+
+def _init_process(app_factory: Callable[[], App]) -> None:
+    global _PROCESS_APP
+    _PROCESS_APP = app_factory()
+
+
+def _handle_in_process(cmd: Command) -> tuple[float, bool, Any, dict[str, Any]]:
+    # Return the time at which handling started, so that the wait time can be
+    # determined, and return any exception rather than raising it. The props are
+    # returned as well, since the handler may set them, e.g. the cursor of the next
+    # page, and the command itself is a copy.
+    started_at = time.time()
+    assert _PROCESS_APP is not None
+    try:
+        return started_at, False, _PROCESS_APP.handle(cmd), cmd.props
+    except Exception as exception:
+        return started_at, True, exception, cmd.props
+
+
+class ExecutionMetrics(BaseModel):
+    """
+    Metrics of the commands executed with one execution strategy. The queue depth is
+    the number of commands waiting for a thread or process to become available, and
+    the wait time is the time in seconds between submitting a command and starting
+    to handle it.
+    """
+
+    strategy: ExecutionStrategy
+    max_workers: int | None = None
+    n_in_flight: int = 0
+    n_completed: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_wait_time: float = 0
+    max_wait_time: float = 0
+
+
+class CommandExecutor:
+    """
+    Handles the commands of async endpoints according to an execution strategy, so
+    that synchronous command handlers doing blocking I/O or CPU-heavy work need not
+    block the event loop:
+    - EVENT_LOOP: handle the command in the event loop itself.
+    - THREAD_POOL: handle the command in a thread through anyio, with at most
+      max_threads commands being handled at the same time.
+    - PROCESS_POOL: handle the command in one of max_processes processes, each with
+      its own app created by app_factory, for CPU-bound commands. The command and
+      its return value must be picklable. Changes made to the props of the command
+      by its handler are copied back to the command, any other changes to it are
+      not.
+
+    The strategy can be set per command class, applying to its subclasses as well,
+    with strategy used for any other command.
+    """
+
+    DEFAULT_MAX_THREADS = 40
+    DEFAULT_MAX_PROCESSES = 2
+
+    def __init__(
+        self,
+        app: App,
+        strategy: ExecutionStrategy = ExecutionStrategy.THREAD_POOL,
+        strategy_by_command_class: dict[Type[Command], ExecutionStrategy] | None = None,
+        max_threads: int = DEFAULT_MAX_THREADS,
+        max_processes: int = DEFAULT_MAX_PROCESSES,
+        app_factory: Callable[[], App] | None = None,
+    ):
+        self._app = app
+        self._strategy = strategy
+        self._strategy_by_command_class = strategy_by_command_class or {}
+        self._max_threads = max_threads
+        self._max_processes = max_processes
+        self._app_factory = app_factory
+        if app_factory is None and ExecutionStrategy.PROCESS_POOL in {
+            strategy,
+            *self._strategy_by_command_class.values(),
+        }:
+            raise exc.InitializationServiceError(
+                "An app factory is required to handle commands in a process pool"
+            )
+        # Initialize other members. The thread limiter and the process pool are
+        # created on first use, the limiter since it belongs to an event loop.
+        self._limiter: anyio.CapacityLimiter | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            ExecutionStrategy.EVENT_LOOP: ExecutionMetrics(
+                strategy=ExecutionStrategy.EVENT_LOOP
+            ),
+            ExecutionStrategy.THREAD_POOL: ExecutionMetrics(
+                strategy=ExecutionStrategy.THREAD_POOL, max_workers=max_threads
+            ),
+            ExecutionStrategy.PROCESS_POOL: ExecutionMetrics(
+                strategy=ExecutionStrategy.PROCESS_POOL, max_workers=max_processes
+            ),
+        }
+
+    @property
+    def app(self) -> App:
+        return self._app
+
+    @property
+    def strategy(self) -> ExecutionStrategy:
+        return self._strategy
+
+    def get_strategy(self, command_class: Type[Command]) -> ExecutionStrategy:
+        for type_ in command_class.__mro__:
+            strategy = self._strategy_by_command_class.get(type_)
+            if strategy:
+                return strategy
+        return self._strategy
+
+    def get_metrics(self) -> dict[ExecutionStrategy, ExecutionMetrics]:
+        with self._lock:
+            return {x: y.model_copy() for x, y in self._metrics.items()}
+
+    async def handle(self, cmd: Command) -> Any:
+        strategy = self.get_strategy(type(cmd))
+        if strategy == ExecutionStrategy.EVENT_LOOP:
+            self._start(strategy)
+            try:
+                return self._app.handle(cmd)
+            finally:
+                self._finish(strategy, 0)
+        if strategy == ExecutionStrategy.THREAD_POOL:
+            return await self._handle_in_thread(cmd)
+        if strategy == ExecutionStrategy.PROCESS_POOL:
+            return await self._handle_in_process(cmd)
+        raise NotImplementedError(f"Execution strategy {strategy} not implemented")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(cancel_futures=True)
+                self._process_pool = None
+
+    async def _handle_in_thread(self, cmd: Command) -> Any:
+        with self._lock:
+            if self._limiter is None:
+                self._limiter = anyio.CapacityLimiter(self._max_threads)
+            limiter = self._limiter
+        started_at: list[float] = []
+
+        def _handle() -> Any:
+            started_at.append(time.perf_counter())
+            return self._app.handle(cmd)
+
+        submitted_at = time.perf_counter()
+        self._start(ExecutionStrategy.THREAD_POOL)
+        try:
+            return await anyio.to_thread.run_sync(_handle, limiter=limiter)
+        finally:
+            self._finish(
+                ExecutionStrategy.THREAD_POOL,
+                started_at[0] - submitted_at if started_at else None,
+            )
+
+    async def _handle_in_process(self, cmd: Command) -> Any:
+        with self._lock:
+            if self._process_pool is None:
+                # Spawn rather than fork the processes, so that they do not inherit
+                # the connections and locks of this process
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self._max_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_process,
+                    initargs=(self._app_factory,),
+                )
+            process_pool = self._process_pool
+        submitted_at = time.time()
+        wait_time = None
+        self._start(ExecutionStrategy.PROCESS_POOL)
+        try:
+            started_at, is_exception, retval, props = await asyncio.wrap_future(
+                process_pool.submit(_handle_in_process, cmd)
+            )
+            wait_time = max(started_at - submitted_at, 0)
+            cmd.props.clear()
+            cmd.props.update(props)
+        finally:
+            self._finish(ExecutionStrategy.PROCESS_POOL, wait_time)
+        if is_exception:
+            raise retval
+        return retval
+
+    def _start(self, strategy: ExecutionStrategy) -> None:
+        with self._lock:
+            metrics = self._metrics[strategy]
+            metrics.n_in_flight += 1
+            self._update_queue_depth(metrics)
+
+    def _finish(self, strategy: ExecutionStrategy, wait_time: float | None) -> None:
+        with self._lock:
+            metrics = self._metrics[strategy]
+            metrics.n_in_flight -= 1
+            metrics.n_completed += 1
+            self._update_queue_depth(metrics)
+            if wait_time is not None:
+                metrics.total_wait_time += wait_time
+                metrics.max_wait_time = max(metrics.max_wait_time, wait_time)
+
+    @staticmethod
+    def _update_queue_depth(metrics: ExecutionMetrics) -> None:
+        if metrics.max_workers is None:
+            return
+        metrics.queue_depth = max(metrics.n_in_flight - metrics.max_workers, 0)
+        metrics.max_queue_depth = max(metrics.max_queue_depth, metrics.queue_depth)
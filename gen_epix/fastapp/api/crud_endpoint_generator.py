@@ -1,18 +1,22 @@
+import base64
 import itertools
 import json
 from typing import Annotated, Any, Callable, Hashable, Type
 from uuid import UUID
 
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, FastAPI, Query, Request, Response
 from pydantic import Field
 
 from gen_epix.fastapp import exc, model
+from gen_epix.fastapp.api.command_executor import CommandExecutor
 from gen_epix.fastapp.api.crud_endpoint_set import CrudEndpointSet
+from gen_epix.fastapp.api.streaming import ModelStreamEncoder
 from gen_epix.fastapp.app import App
 from gen_epix.fastapp.domain.entity import Entity
 from gen_epix.fastapp.enum import (
     CrudEndpointType,
     CrudOperation,
+    ExecutionStrategy,
     HttpMethod,
     PermissionType,
     PermissionTypeSet,
@@ -50,10 +54,25 @@ def _default_validate_query_filter(
     return True
 
 
+_LIMIT_DESCRIPTION = "The maximum number of objects to return, ordered by id. If more objects are available, the cursor for the next page is returned in the X-Next-Cursor response header."
+_CURSOR_DESCRIPTION = "The cursor returned in the X-Next-Cursor response header of the previous page, to continue after that page."
+
+
 class CrudEndpointGenerator:
     DEFAULT_BATCH_ROUTE_SUFFIX = "/batch"
     DEFAULT_QUERY_ROUTE_SUFFIX = "/query"
     DEFAULT_IDS_ROUTE_SUFFIX = "/ids"
+    NEXT_CURSOR_HEADER = "X-Next-Cursor"
+    # Additional media types of endpoints that stream their response when
+    # requested in the Accept header, for the OpenAPI schema
+    STREAMING_RESPONSES: dict[int | str, dict[str, Any]] = {
+        200: {
+            "content": {
+                ModelStreamEncoder.NDJSON_MEDIA_TYPE: {},
+                ModelStreamEncoder.ARROW_STREAM_MEDIA_TYPE: {},
+            }
+        }
+    }
 
     CRUD_OPERATION_TO_ENDPOINT_TYPE: dict[CrudOperation, CrudEndpointType] = {
         CrudOperation.READ_ALL: CrudEndpointType.GET_ALL,
@@ -103,22 +122,79 @@ class CrudEndpointGenerator:
                 ids = None
         return ids, invalid_ids
 
+    @staticmethod
+    def encode_cursor(obj_id: Hashable) -> str:
+        """
+        Encode the id of the last object of a page as an opaque cursor.
+        """
+        return base64.urlsafe_b64encode(str(obj_id).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(id_class: Type, cursor: str) -> Hashable:
+        try:
+            return id_class(base64.urlsafe_b64decode(cursor.encode()).decode())  # type: ignore[no-any-return]
+        except Exception as exception:
+            raise exc.InvalidArgumentsError(f"Invalid cursor: {cursor}") from exception
+
     @staticmethod
     def generate_get_all(
         fast_api: FastAPI | APIRouter,
         route: CrudEndpointSet,
         handle_exception_fun: Callable,
     ) -> None:
-        async def endpoint_function(user: route.user_dependency) -> Any:  # type: ignore
+        async def endpoint_function(
+            user: route.user_dependency,  # type: ignore
+            request: Request,
+            response: Response,
+            limit: Annotated[
+                int | None, Query(ge=1, description=_LIMIT_DESCRIPTION)
+            ] = None,
+            cursor: Annotated[
+                str | None, Query(description=_CURSOR_DESCRIPTION)
+            ] = None,
+        ) -> Any:
             obj_ids = None
-            cmd = route.crud_command_class(
-                user=user,
-                operation=CrudOperation.READ_ALL,
-            )
             try:
-                retval = route.app.handle(cmd)
-                if route.model_class is not route.read_api_model_class:
+                # Stream the serialised objects if requested in the Accept header.
+                # Unless paginated, the objects are then also read from the
+                # repository in batches as they are streamed.
+                media_type = ModelStreamEncoder.get_media_type(
+                    request.headers.get("accept")
+                )
+                props = CrudEndpointGenerator._get_page_props(route, limit, cursor)
+                if (
+                    media_type
+                    and not props
+                    and CrudEndpointGenerator._can_stream_command(route)
+                ):
+                    props["batch_size"] = ModelStreamEncoder.DEFAULT_BATCH_SIZE
+                cmd = route.crud_command_class(
+                    user=user,
+                    operation=CrudOperation.READ_ALL,
+                    props=props,
+                )
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
+                if media_type:
+                    batches = (
+                        ModelStreamEncoder.get_batches(retval)
+                        if isinstance(retval, list)
+                        else retval
+                    )
+                    if route.model_class is not route.read_api_model_class:
+                        batches = (
+                            [route.read_api_model_class.from_model(x) for x in y]
+                            for y in batches
+                        )
+                    retval = await ModelStreamEncoder.create_response(
+                        media_type,
+                        route.read_api_model_class,
+                        batches,
+                        exclude_none=bool(route.response_model_exclude_none),
+                    )
+                    response = retval
+                elif route.model_class is not route.read_api_model_class:
                     retval = [route.read_api_model_class.from_model(x) for x in retval]
+                CrudEndpointGenerator._set_next_cursor_header(cmd, response)
             except Exception as exception:
                 handle_exception_fun(
                     "79d26f4f" + route.endpoint_basename,
@@ -137,6 +213,7 @@ class CrudEndpointGenerator:
             route,
             operation_id=(route.operation_id_basename or route.endpoint_basename)
             + "__get_all",
+            responses=CrudEndpointGenerator.STREAMING_RESPONSES,
         )
 
     @staticmethod
@@ -171,7 +248,7 @@ class CrudEndpointGenerator:
                 operation=CrudOperation.READ_SOME,
             )
             try:
-                retval = route.app.handle(cmd)
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
                 if route.model_class is not route.read_api_model_class:
                     retval = [route.read_api_model_class.from_model(x) for x in retval]
 
@@ -222,6 +299,7 @@ class CrudEndpointGenerator:
 
         async def endpoint_function(
             user: route.user_dependency,  # type: ignore
+            response: Response,
             filter: Annotated[
                 TypedExistsFilter
                 | TypedEqualsBooleanFilter
@@ -240,6 +318,12 @@ class CrudEndpointGenerator:
                 | TypedCompositeFilter,
                 Field(discriminator="type"),
             ],
+            limit: Annotated[
+                int | None, Query(ge=1, description=_LIMIT_DESCRIPTION)
+            ] = None,
+            cursor: Annotated[
+                str | None, Query(description=_CURSOR_DESCRIPTION)
+            ] = None,
         ) -> Any:
             if validate_query_filter and not validate_query_filter(filter):
                 handle_exception_fun(
@@ -247,16 +331,18 @@ class CrudEndpointGenerator:
                     user,
                     exc.InvalidArgumentsError("Invalid filter"),
                 )
-            cmd = route.crud_command_class(
-                user=user,
-                operation=CrudOperation.READ_ALL,
-                query_filter=filter,
-                props={
-                    "return_id": return_id,
-                },
-            )
             try:
-                retval = route.app.handle(cmd)
+                cmd = route.crud_command_class(
+                    user=user,
+                    operation=CrudOperation.READ_ALL,
+                    query_filter=filter,
+                    props={
+                        "return_id": return_id,
+                        **CrudEndpointGenerator._get_page_props(route, limit, cursor),
+                    },
+                )
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
+                CrudEndpointGenerator._set_next_cursor_header(cmd, response)
                 if (
                     not return_id
                     and route.model_class is not route.read_api_model_class
@@ -296,7 +382,7 @@ class CrudEndpointGenerator:
                     operation=CrudOperation.READ_ONE,
                     obj_ids=object_id,
                 )
-                obj = route.app.handle(cmd)
+                obj = await CrudEndpointGenerator.handle_command(route, cmd)
                 if route.model_class is not route.read_api_model_class:
                     obj = route.read_api_model_class.from_model(obj)
 
@@ -341,7 +427,7 @@ class CrudEndpointGenerator:
                     ),
                     props={"return_id": route.post_returns_id},
                 )
-                retval = route.app.handle(cmd)
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
                 if (
                     not route.post_returns_id
                     and route.model_class is not route.read_api_model_class
@@ -400,7 +486,7 @@ class CrudEndpointGenerator:
                     ),
                     props={"return_id": route.post_returns_id},
                 )
-                retval = route.app.handle(cmd)
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
                 if (
                     not route.post_returns_id
                     and route.model_class is not route.read_api_model_class
@@ -460,7 +546,7 @@ class CrudEndpointGenerator:
                     ),
                     props={"return_id": route.put_returns_id},
                 )
-                retval = route.app.handle(cmd)
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
                 if (
                     not route.put_returns_id
                     and route.model_class is not route.read_api_model_class
@@ -511,7 +597,7 @@ class CrudEndpointGenerator:
                     ),
                     props={"return_id": route.put_returns_id},
                 )
-                retval = route.app.handle(cmd)
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
                 if (
                     not route.put_returns_id
                     and route.model_class is not route.read_api_model_class
@@ -555,7 +641,7 @@ class CrudEndpointGenerator:
                     operation=CrudOperation.DELETE_ONE,
                     obj_ids=object_id,
                 )
-                retval = route.app.handle(cmd)
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
             except Exception as exception:
                 handle_exception_fun(
                     "ab4df15f" + route.endpoint_basename + f"/{object_id}",
@@ -590,7 +676,7 @@ class CrudEndpointGenerator:
                 props={"return_id": route.delete_all_returns_id},
             )
             try:
-                retval = route.app.handle(cmd)
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
             # TODO: Add a specific exception for NotImplementedError
             except Exception as exception:
                 handle_exception_fun(
@@ -648,7 +734,7 @@ class CrudEndpointGenerator:
                 props={"return_id": route.delete_all_returns_id},
             )
             try:
-                retval = route.app.handle(cmd)
+                retval = await CrudEndpointGenerator.handle_command(route, cmd)
             # TODO: Add a specific exception for NotImplementedError
             except Exception as exception:
                 handle_exception_fun(
@@ -670,6 +756,47 @@ class CrudEndpointGenerator:
             + "__delete_some",
         )
 
+    @staticmethod
+    async def handle_command(route: CrudEndpointSet, cmd: model.Command) -> Any:
+        """
+        Handle a command of an endpoint with the command executor of the route, or in
+        the event loop if the route has none.
+        """
+        if route.command_executor is None:
+            return route.app.handle(cmd)
+        return await route.command_executor.handle(cmd)
+
+    @staticmethod
+    def _can_stream_command(route: CrudEndpointSet) -> bool:
+        # The return value of a command handled in a process pool must be picklable,
+        # so that it cannot be an iterator
+        return (
+            route.command_executor is None
+            or route.command_executor.get_strategy(route.crud_command_class)
+            != ExecutionStrategy.PROCESS_POOL
+        )
+
+    @staticmethod
+    def _get_page_props(
+        route: CrudEndpointSet, limit: int | None, cursor: str | None
+    ) -> dict[str, Any]:
+        props: dict[str, Any] = {}
+        if limit is not None:
+            props["limit"] = limit
+        if cursor is not None:
+            props["cursor"] = CrudEndpointGenerator.decode_cursor(
+                route.id_class, cursor
+            )
+        return props
+
+    @staticmethod
+    def _set_next_cursor_header(cmd: model.CrudCommand, response: Response) -> None:
+        next_cursor = cmd.props.get("next_cursor")
+        if next_cursor is not None:
+            response.headers[CrudEndpointGenerator.NEXT_CURSOR_HEADER] = (
+                CrudEndpointGenerator.encode_cursor(next_cursor)
+            )
+
     @staticmethod
     def _add_route(
         fast_api: FastAPI | APIRouter,
@@ -679,6 +806,7 @@ class CrudEndpointGenerator:
         response_model: Any | None,
         route: CrudEndpointSet,
         operation_id: str | None = None,
+        responses: dict[int | str, dict[str, Any]] | None = None,
     ) -> None:
         if not operation_id:
             tokens = endpoint.split("/")
@@ -696,6 +824,7 @@ class CrudEndpointGenerator:
             description=route.description,
             operation_id=operation_id,
             response_model_exclude_none=bool(route.response_model_exclude_none),
+            responses=responses,
         )
 
     @staticmethod
@@ -709,6 +838,7 @@ class CrudEndpointGenerator:
         validate_query_filter: (
             Callable[[Filter], bool] | None
         ) = _default_validate_query_filter,
+        command_executor: CommandExecutor | None = None,
     ) -> None:
         # Map endpoint types to functions
         function_map = {
@@ -727,6 +857,10 @@ class CrudEndpointGenerator:
         }
         # Go over each route and create the endpoints
         for route in routes:
+            # Handle the commands of the endpoints with the command executor, unless
+            # the route has its own
+            if route.command_executor is None:
+                route.command_executor = command_executor
             # Create each endpoint type in order to avoid path conflicts, e.g. if
             # /batch overlaps with /{object_id} then /batch should be created first
             for endpoint_type in CrudEndpointGenerator.CRUD_ENDPOINT_TYPE_ORDER:
@@ -3,6 +3,7 @@ from typing import Any, Callable, Type
 from pydantic import BaseModel, ConfigDict, model_validator
 
 from gen_epix.fastapp import App, CrudCommand
+from gen_epix.fastapp.api.command_executor import CommandExecutor
 from gen_epix.fastapp.enum import CrudEndpointType
 from gen_epix.filter import Filter
 
@@ -25,6 +26,7 @@ class CrudEndpointSet(BaseModel):
     delete_all_returns_id: bool | None = False
     response_model_exclude_none: bool | None = False
     query_filter_validator: Callable[[Filter], bool] | None = None
+    command_executor: CommandExecutor | None = None
 
     @model_validator(mode="before")
     @classmethod
@@ -0,0 +1,194 @@
+import datetime
+import io
+import itertools
+import types
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, Type, Union, get_args, get_origin
+from uuid import UUID
+
+import anyio.to_thread
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic_core import to_json
+
+from gen_epix.fastapp import exc
+
+try:
+    import pyarrow as pa
+except ImportError:
+    # Optional dependency, only required for Apache Arrow responses
+    pa = None
+
+
+class ModelStreamEncoder:
+    """
+    Encodes batches of models as a streaming response, so that the full payload is
+    never held in memory at once. Supported media types are newline delimited JSON,
+    with one model per line, and the Apache Arrow IPC stream format, with one record
+    batch per batch of models. The latter requires pyarrow to be installed.
+    """
+
+    NDJSON_MEDIA_TYPE = "application/x-ndjson"
+    ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+    MEDIA_TYPES = (NDJSON_MEDIA_TYPE, ARROW_STREAM_MEDIA_TYPE)
+    DEFAULT_BATCH_SIZE = 1000
+
+    @staticmethod
+    def get_media_type(accept: str | None) -> str | None:
+        """
+        Get the streaming media type requested in an Accept header, or None if no
+        streaming media type is requested.
+        """
+        if not accept:
+            return None
+        for media_range in accept.split(","):
+            media_type = media_range.split(";")[0].strip().lower()
+            if media_type in ModelStreamEncoder.MEDIA_TYPES:
+                return media_type
+        return None
+
+    @staticmethod
+    def get_batches(objs: list, batch_size: int | None = None) -> Iterator[list]:
+        batch_size = batch_size or ModelStreamEncoder.DEFAULT_BATCH_SIZE
+        for i in range(0, len(objs), batch_size):
+            yield objs[i : i + batch_size]
+
+    @staticmethod
+    async def create_response(
+        media_type: str,
+        model_class: Type[PydanticBaseModel],
+        batches: Iterable[list[PydanticBaseModel]],
+        exclude_none: bool = False,
+    ) -> StreamingResponse:
+        """
+        Create a streaming response for the batches of models. The first batch is
+        retrieved before the response is created, so that any error in retrieving it
+        can still be returned as an error response. An error in retrieving a later
+        batch terminates the stream. All batches are retrieved in a worker thread,
+        since doing so is blocking.
+        """
+        if media_type == ModelStreamEncoder.NDJSON_MEDIA_TYPE:
+            encode: Callable[[Iterable[list]], Iterator[bytes]] = partial(
+                ModelStreamEncoder.encode_ndjson, exclude_none=exclude_none
+            )
+        elif media_type == ModelStreamEncoder.ARROW_STREAM_MEDIA_TYPE:
+            schema, converters = ModelStreamEncoder.get_arrow_schema(model_class)
+            encode = partial(
+                ModelStreamEncoder.encode_arrow, schema=schema, converters=converters
+            )
+        else:
+            raise exc.InvalidArgumentsError(f"Unsupported media type: {media_type}")
+        batches = iter(batches)
+        first_batch = await anyio.to_thread.run_sync(next, batches, [])
+        return StreamingResponse(
+            encode(itertools.chain([first_batch], batches)), media_type=media_type
+        )
+
+    @staticmethod
+    def encode_ndjson(
+        batches: Iterable[list[PydanticBaseModel]], exclude_none: bool = False
+    ) -> Iterator[bytes]:
+        for batch in batches:
+            if batch:
+                yield b"".join(
+                    x.model_dump_json(exclude_none=exclude_none).encode() + b"\n"
+                    for x in batch
+                )
+
+    @staticmethod
+    def encode_arrow(
+        batches: Iterable[list[PydanticBaseModel]],
+        schema: Any,
+        converters: dict[str, Callable[[Any], Any]],
+    ) -> Iterator[bytes]:
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in batches:
+                if not batch:
+                    continue
+                writer.write_batch(
+                    pa.record_batch(
+                        [
+                            pa.array(
+                                [converter(getattr(x, name)) for x in batch],
+                                type=schema.field(name).type,
+                            )
+                            for name, converter in converters.items()
+                        ],
+                        schema=schema,
+                    )
+                )
+                yield ModelStreamEncoder._drain(sink)
+        yield ModelStreamEncoder._drain(sink)
+
+    @staticmethod
+    def get_arrow_schema(
+        model_class: Type[PydanticBaseModel],
+    ) -> tuple[Any, dict[str, Callable[[Any], Any]]]:
+        """
+        Get the Arrow schema for a model class, together with the function to convert
+        the value of each field to its Arrow value. Scalar fields are mapped to the
+        corresponding Arrow type and dicts of scalars to an Arrow map, while any
+        other field is encoded as a JSON string.
+        """
+        if pa is None:
+            raise exc.ServiceUnavailableError(
+                "Apache Arrow responses require pyarrow to be installed"
+            )
+        fields = []
+        converters = {}
+        for name, field_info in model_class.model_fields.items():
+            arrow_type, converter = ModelStreamEncoder._get_arrow_type(
+                field_info.annotation
+            )
+            fields.append(pa.field(name, arrow_type))
+            converters[name] = ModelStreamEncoder._skip_none(converter)
+        return pa.schema(fields), converters
+
+    @staticmethod
+    def _get_arrow_type(annotation: Any) -> tuple[Any, Callable[[Any], Any]]:
+        # Strip None from optional types
+        if get_origin(annotation) in (Union, types.UnionType):
+            args = [x for x in get_args(annotation) if x is not type(None)]
+            if len(args) == 1:
+                annotation = args[0]
+        if isinstance(annotation, type):
+            if issubclass(annotation, bool):
+                return pa.bool_(), bool
+            if issubclass(annotation, Enum):
+                return pa.string(), lambda x: x.value
+            if issubclass(annotation, int):
+                return pa.int64(), int
+            if issubclass(annotation, float):
+                return pa.float64(), float
+            if issubclass(annotation, (str, UUID)):
+                return pa.string(), str
+            if issubclass(annotation, datetime.datetime):
+                return pa.timestamp("us"), lambda x: x
+            if issubclass(annotation, datetime.date):
+                return pa.date32(), lambda x: x
+        if get_origin(annotation) is dict:
+            key_type, key_converter = ModelStreamEncoder._get_arrow_type(
+                get_args(annotation)[0]
+            )
+            value_type, value_converter = ModelStreamEncoder._get_arrow_type(
+                get_args(annotation)[1]
+            )
+            if pa.types.is_primitive(key_type) or pa.types.is_string(key_type):
+                value_converter = ModelStreamEncoder._skip_none(value_converter)
+                return pa.map_(key_type, value_type), lambda x: [
+                    (key_converter(y), value_converter(z)) for y, z in x.items()
+                ]
+        return pa.string(), lambda x: to_json(x).decode()
+
+    @staticmethod
+    def _skip_none(converter: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        return lambda x: None if x is None else converter(x)
+
+    @staticmethod
+    def _drain(sink: io.BytesIO) -> bytes:
+        value = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return value
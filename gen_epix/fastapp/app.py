@@ -3,8 +3,9 @@ from __future__ import annotations
 import json
 import logging
 import uuid
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Callable, Hashable, Type
+from typing import Any, Callable, Hashable, Iterator, Type
 
 from gen_epix.fastapp import exc
 from gen_epix.fastapp.domain import Domain
@@ -14,6 +15,17 @@ from gen_epix.fastapp.model import Command, CrudCommand, Model, Policy
 from gen_epix.fastapp.pdp import PolicyDecisionPoint
 from gen_epix.fastapp.user_manager import BaseUserManager
 
+# Stacks of the commands being handled in the current thread or task, per App
+# instance. A single context variable is used for all instances, since a context
+# keeps a strong reference to each context variable set in it and these should
+# therefore not be created per instance.
+_COMMAND_STACKS: ContextVar[dict[int, tuple[Command, ...]]] = ContextVar(
+    "app_command_stacks", default={}
+)
+
+# Marks the end of a streamed return value
+_END_OF_ITERATOR = object()
+
 
 class App:
     """
@@ -73,7 +85,6 @@ class App:
         self._command_listeners: dict[
             EventTiming, dict[Type[Command], list[Callable[[Command, Any], None]]]
         ] = {x: {} for x in EventTiming}
-        self._command_stack: list[Command] = []
         # Log start
         if self._logger:
             self._logger.info(
@@ -132,6 +143,13 @@ class App:
     def generate_timestamp(self) -> datetime:
         return self._timestamp_factory()
 
+    def get_command_stack(self) -> tuple[Command, ...]:
+        """
+        Get the stack of commands being handled in the current thread or task, with
+        the initial command first.
+        """
+        return _COMMAND_STACKS.get().get(id(self), ())
+
     def register_command(
         self,
         command_class: Type[Command],
@@ -278,8 +296,14 @@ class App:
         )
 
     def handle(self, cmd: Command) -> Any:
-        self._command_stack.append(cmd)
-        is_initial_command = len(self._command_stack) == 1
+        # Push the command, replacing rather than updating the dict since it is
+        # shared with the contexts copied from the current one. Resetting the token
+        # pops it again, removing the key for the initial command.
+        command_stack = self.get_command_stack() + (cmd,)
+        command_stack_token = _COMMAND_STACKS.set(
+            _COMMAND_STACKS.get() | {id(self): command_stack}
+        )
+        is_initial_command = len(command_stack) == 1
         if self._logger:
             if self._logger.level <= logging.DEBUG:
                 self._logger.debug(
@@ -309,7 +333,7 @@ class App:
                             "fd923dbf", "NOT_AUTHORIZED", add_debug_info=False, cmd=cmd
                         )
                     )
-                self._command_stack.pop()
+                _COMMAND_STACKS.reset(command_stack_token)
                 raise exception
             except Exception as exception:
                 # Any other error: add stack trace
@@ -321,7 +345,7 @@ class App:
                         exc_info=True,
                         stack_info=True,
                     )
-                self._command_stack.pop()
+                _COMMAND_STACKS.reset(command_stack_token)
                 raise exception
         # Get handler
         try:
@@ -333,7 +357,7 @@ class App:
                     exc_info=True,
                     stack_info=True,
                 )
-            self._command_stack.pop()
+            _COMMAND_STACKS.reset(command_stack_token)
             raise exception
 
         # Execute command
@@ -370,7 +394,7 @@ class App:
                         "e8891b42", "DOMAIN_EXCEPTION", cmd=cmd, exception=exception  # type: ignore[arg-type]
                     )
                 )
-            self._command_stack.pop()
+            _COMMAND_STACKS.reset(command_stack_token)
             raise exception
         except Exception as exception:
             # Any other unexpected error: add stack trace
@@ -380,7 +404,7 @@ class App:
                     exc_info=True,
                     stack_info=True,
                 )
-            self._command_stack.pop()
+            _COMMAND_STACKS.reset(command_stack_token)
             raise exception
 
         if self._logger:
@@ -391,9 +415,30 @@ class App:
                 self._logger.debug(msg)
             elif is_initial_command:
                 self._logger.info(msg)
-        self._command_stack.pop()
+        _COMMAND_STACKS.reset(command_stack_token)
+        # A streamed return value is consumed after the command has been handled,
+        # and possibly in another thread, so that its batches are to be retrieved
+        # with the command stack restored, for any command issued in doing so to be
+        # handled as part of this command
+        if isinstance(retval, Iterator):
+            return self._iterate_in_command_stack(command_stack, retval)
         return retval
 
+    def _iterate_in_command_stack(
+        self, command_stack: tuple[Command, ...], retval: Iterator
+    ) -> Iterator:
+        while True:
+            command_stack_token = _COMMAND_STACKS.set(
+                _COMMAND_STACKS.get() | {id(self): command_stack}
+            )
+            try:
+                batch = next(retval, _END_OF_ITERATOR)
+            finally:
+                _COMMAND_STACKS.reset(command_stack_token)
+            if batch is _END_OF_ITERATOR:
+                return
+            yield batch
+
     def create_log_message(
         self,
         code: str,
@@ -409,17 +454,16 @@ class App:
                 "name": self.name,
             }
             if cmd:
-                is_initial_command = len(self._command_stack) < 2
+                command_stack = self.get_command_stack()
+                is_initial_command = len(command_stack) < 2
                 content["command"] = kwargs.pop("command", {}) | {
                     "class": cmd.__class__.__name__,
                     "object": json.loads(cmd.model_dump_json(exclude_none=True)),
                     "parent_command_id": (
-                        None if is_initial_command else f"{self._command_stack[-2].id}"
+                        None if is_initial_command else f"{command_stack[-2].id}"
                     ),
                     "stack_trace": (
-                        "->".join(
-                            [f"{x.__class__.__name__}" for x in self._command_stack]
-                        )
+                        "->".join([f"{x.__class__.__name__}" for x in command_stack])
                     ),
                 }
             if kwargs:
@@ -43,6 +43,7 @@ class Entity(BaseModel):
     id_field_name: str = "id"
     keys: dict[int, Key] = {}
     links: dict[int, Link] = {}
+    query_keys: dict[int, Key] = {}
 
     _model_class: Type[BaseModel] | None = None
     _db_model_class: Type | None = None
@@ -75,7 +76,7 @@ class Entity(BaseModel):
     def _validate_names(cls, value: str | Enum | None) -> str | None:
         return str(value.value) if isinstance(value, Enum) else value
 
-    @field_validator("keys", mode="before")
+    @field_validator("keys", "query_keys", mode="before")
     @classmethod
     def _validate_keys(cls, value: dict[int, Any]) -> dict[int, Key]:
         """
@@ -208,6 +209,15 @@ class Entity(BaseModel):
                     "type"
                 ] = FieldType.RELATIONSHIP
 
+        # Verify query keys
+        for key in self.query_keys.values():
+            for field_name in key.field_names:
+                if field_name not in self._fields:
+                    raise ValueError(
+                        f"Query key field name {field_name} for model "
+                        f"{model_class.__name__} is not a valid field name"
+                    )
+
         # Set COMPUTED fields
         for field_name in model_class.model_computed_fields:
             self._fields[field_name]["type"] = FieldType.COMPUTED
@@ -333,6 +343,52 @@ class Entity(BaseModel):
             ]
         return [x.field_names for x in self.keys.values()]
 
+    def get_query_keys_field_names(
+        self, by_alias: bool = True
+    ) -> list[tuple[str, ...]]:
+        if by_alias:
+            return [
+                tuple(self._fields[y]["alias"] for y in x.field_names)
+                for x in self.query_keys.values()
+            ]
+        return [x.field_names for x in self.query_keys.values()]
+
+    def get_index_field_names(self, by_alias: bool = True) -> list[tuple[str, ...]]:
+        """
+        Get the field names of the (non-unique) indexes for the entity, being one
+        for each query key and one for each link field. An index is left out if its
+        field names are the leading field names of a key, of another index or the
+        ID field, since the corresponding unique constraint, index or primary key
+        can be used instead.
+
+        Parameters
+        ----------
+        by_alias : bool, optional
+            If True, return the field names by alias. Defaults to True.
+
+        Returns
+        -------
+        list[tuple[str, ...]]
+            A list of tuples of field names, one for each index.
+        """
+        candidates = self.get_query_keys_field_names(by_alias=by_alias) + [
+            (x,) for x in self.get_link_field_names(by_alias=by_alias)
+        ]
+        covering_field_names = self.get_keys_field_names(by_alias=by_alias) + [
+            (self.get_id_field_name(by_alias=by_alias),)
+        ]
+        index_field_names: list[tuple[str, ...]] = []
+        for field_names in candidates:
+            n = len(field_names)
+            if field_names in index_field_names or any(
+                x[:n] == field_names for x in covering_field_names
+            ):
+                continue
+            if any(len(x) > n and x[:n] == field_names for x in candidates):
+                continue
+            index_field_names.append(field_names)
+        return index_field_names
+
     def get_link_field_names(self, by_alias: bool = True) -> list[str]:
         """
         Get the link field names of the entity.
@@ -411,6 +467,18 @@ class Entity(BaseModel):
             )
         return fun
 
+    def get_link_field_name(self, link_model_class: Type) -> str:
+        link_field_names = [
+            x.link_field_name
+            for x in self.links.values()
+            if x.link_model_class == link_model_class
+        ]
+        if len(link_field_names) != 1:
+            raise ValueError(
+                f"No link or several links to {link_model_class.__name__} exist for entity {self.name}"
+            )
+        return link_field_names[0]
+
     def get_link_entity(self, link_field_name: str) -> Any | None:
         """
         Get the linked entity, if any.
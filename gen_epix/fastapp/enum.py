@@ -233,6 +233,12 @@ class CrudEndpointType(Enum):
     POST_QUERY_IDS = "POST_QUERY_IDS"
 
 
+class ExecutionStrategy(Enum):
+    EVENT_LOOP = "EVENT_LOOP"
+    THREAD_POOL = "THREAD_POOL"
+    PROCESS_POOL = "PROCESS_POOL"
+
+
 class IsolationLevel(Enum):
     READ_UNCOMMITED = "READ_UNCOMMITED"
     READ_COMMITED = "READ_COMMITED"
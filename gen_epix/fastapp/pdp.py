@@ -1,4 +1,4 @@
-from typing import Any, Type
+from typing import Any, Iterator, Type
 
 from gen_epix.fastapp import exc, model
 from gen_epix.fastapp.enum import EventTiming
@@ -106,7 +106,14 @@ class PolicyDecisionPoint:
             cmd._policies.extend(policies)
             return None
         elif timing == EventTiming.AFTER:
-            # Execute policies that may alter the return value
-            for policy in policies:
-                retval = policy.filter(cmd, retval)
-            return retval
+            # Execute policies that may alter the return value, for each batch of a
+            # streamed return value as it is consumed
+            if isinstance(retval, Iterator):
+                return (PolicyDecisionPoint._filter(cmd, policies, x) for x in retval)
+            return PolicyDecisionPoint._filter(cmd, policies, retval)
+
+    @staticmethod
+    def _filter(cmd: model.Command, policies: list[model.Policy], retval: Any) -> Any:
+        for policy in policies:
+            retval = policy.filter(cmd, retval)
+        return retval
@@ -4,6 +4,8 @@ import pickle
 from typing import Any, Callable, Hashable, Iterable, Type
 from uuid import UUID
 
+import numpy as np
+
 from gen_epix.fastapp import (
     BaseRepository,
     BaseUnitOfWork,
@@ -252,27 +254,54 @@ class DictRepository(BaseRepository):
             query_filter = None
         # Get matching objects
         if query_filter:
+            is_match = DictRepository._match_objs(query_filter, df.values())
             if return_id:
-                objs = [
-                    x
-                    for x, y in zip(
-                        df.keys(), query_filter.match_rows(df.values(), is_model=True)
-                    )
-                    if y
-                ]
+                objs = [x for x, y in zip(df.keys(), is_match) if y]
             else:
-                objs = list(query_filter.filter_rows(df.values(), is_model=True))
+                objs = [x for x, y in zip(df.values(), is_match) if y]
         elif return_id:
             objs: list[Hashable] = list(df.keys())
         else:
             objs: list[Model] = list(df.values())
-        # Make copy of objects for returning
-        if not return_id:
-            objs = [x.model_copy() for x in objs if x]
-        # Cascade read linked objects if necessary
-        if cascade_read and not return_id:
-            self._cascade_read(model_class, objs)
-        return objs
+        # Paginate if necessary
+        limit: int | None = kwargs.get("limit")  # type: ignore[assignment]
+        cursor: Hashable | None = kwargs.get("cursor")  # type: ignore[assignment]
+        batch_size: int | None = kwargs.get("batch_size")  # type: ignore[assignment]
+        if batch_size is not None and (limit is not None or cursor is not None):
+            raise exc.InvalidArgumentsError(
+                "Read all cannot be both paginated and streamed"
+            )
+        if limit is not None or cursor is not None:
+            assert model_class.ENTITY is not None
+            objs = BaseRepository.get_page(
+                objs,
+                (lambda x: x) if return_id else model_class.ENTITY.get_obj_id,
+                limit=limit,
+                cursor=cursor,
+            )
+        fields: list[str] | None = kwargs.get("fields")  # type: ignore[assignment]
+
+        def _get_retval(objs: list) -> list:
+            # Return only the requested fields if necessary
+            if fields and not return_id:
+                return BaseRepository.to_fields(model_class, objs, fields)
+            # Make copy of objects for returning
+            if not return_id:
+                objs = [x.model_copy() for x in objs if x]
+            # Cascade read linked objects if necessary
+            if cascade_read and not return_id:
+                self._cascade_read(
+                    model_class, objs, kwargs.get("cascade_depth", 1)  # type: ignore[arg-type]
+                )
+            return objs
+
+        # Return batches of objs if necessary, copied as they are consumed
+        if batch_size is not None:
+            return (  # type: ignore[return-value]
+                _get_retval(objs[i : i + batch_size])
+                for i in range(0, len(objs), batch_size)
+            )
+        return _get_retval(objs)
 
     def read_one(
         self,
@@ -316,6 +345,10 @@ class DictRepository(BaseRepository):
             DictRepository._verify_valid_ids(model_class, obj_ids, objs)
             if not allow_duplicate_ids:
                 DictRepository._verify_duplicate_ids(model_class, obj_ids)
+            # Return only the requested fields if necessary
+            fields: list[str] | None = kwargs.get("fields")  # type: ignore[assignment]
+            if fields:
+                return BaseRepository.to_fields(model_class, objs, fields)  # type: ignore[return-value]
 
         # Make copy of objects for returning
         if not return_id:
@@ -323,7 +356,9 @@ class DictRepository(BaseRepository):
 
         # Cascade read linked objects if necessary
         if cascade_read and not return_id:
-            self._cascade_read(model_class, objs)
+            self._cascade_read(
+                model_class, objs, kwargs.get("cascade_depth", 1)  # type: ignore[arg-type]
+            )
         return objs
 
     def upsert_some(
@@ -471,7 +506,7 @@ class DictRepository(BaseRepository):
             obj_ids = [
                 x
                 for x, y in zip(
-                    df.keys(), query_filter.match_rows(df.values(), is_model=True)
+                    df.keys(), DictRepository._match_objs(query_filter, df.values())
                 )
                 if y
             ]
@@ -519,6 +554,7 @@ class DictRepository(BaseRepository):
         self,
         model_class: Type[Model],
         objs: list[Model],
+        cascade_depth: int = 1,
     ) -> None:
         for (
             link_field_name,
@@ -535,7 +571,8 @@ class DictRepository(BaseRepository):
             linked_objs = self.read_some(
                 link_model_class,
                 linked_obj_ids,
-                cascade_read=False,
+                cascade_read=cascade_depth > 1,
+                cascade_depth=cascade_depth - 1,
                 allow_duplicate_ids=True,
             )
             for obj, linked_obj in zip(objs, linked_objs):
@@ -574,6 +611,14 @@ class DictRepository(BaseRepository):
                     ids=missing_ids,
                 )
 
+    @staticmethod
+    def _match_objs(query_filter: Filter, objs: Iterable[Model]) -> np.ndarray:
+        # Match column-wise, extracting only the fields used by the filter instead of
+        # dumping each object
+        return query_filter.match_batch(
+            Filter.get_columns(objs, query_filter.get_keys(), is_model=True)
+        )
+
     @staticmethod
     def _verify_valid_ids(
         model_class: Type[Model],
@@ -2,6 +2,8 @@
 from gen_epix.fastapp.repositories.sa.mapper import SAMapper as SAMapper
 from gen_epix.fastapp.repositories.sa.repository import SARepository as SARepository
 from gen_epix.fastapp.repositories.sa.unit_of_work import SAUnitOfWork as SAUnitOfWork
+from gen_epix.fastapp.repositories.sa.util import CastAsDate as CastAsDate
+from gen_epix.fastapp.repositories.sa.util import JsonValue as JsonValue
 from gen_epix.fastapp.repositories.sa.util import (
     ServerUtcCurrentTime as ServerUtcCurrentTime,
 )
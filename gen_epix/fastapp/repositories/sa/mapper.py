@@ -1,6 +1,11 @@
 import abc
-from typing import Any, Callable, Hashable, Iterable, Type
+import types
+from operator import attrgetter
+from typing import Any, Callable, Hashable, Iterable, Type, Union, get_args, get_origin
 
+import sqlalchemy as sa
+from pydantic import TypeAdapter
+from pydantic.fields import FieldInfo
 from sqlalchemy import Row
 from sqlalchemy.orm import MappedColumn
 
@@ -82,6 +87,12 @@ class BaseSAMapper(abc.ABC):
     def get_row_id(self, row: Row | Type[Row]) -> Hashable:
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def get_row_relationship_field_name(
+        self, relationship_field_name: str
+    ) -> str | None:
+        raise NotImplementedError()
+
     def generate_service_metadata(self, obj: Model, user_id: Hashable) -> dict:
         raise NotImplementedError()
 
@@ -90,7 +101,19 @@ class BaseSAMapper(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def load(self, row: Row, **kwargs: dict) -> Model:
+    def load(self, row: Row, trusted: bool = False, **kwargs: dict) -> Model:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_load_columns(self) -> tuple:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_fields_columns(self, field_names: Iterable[str]) -> tuple:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_fields_loader(self, field_names: Iterable[str]) -> Callable[[Any], tuple]:
         raise NotImplementedError
 
     @staticmethod
@@ -123,12 +146,14 @@ class SAMapper(BaseSAMapper):
         self._row_field_names_by_set: dict[FieldTypeSet, tuple] = {}
         self._relationship_field_name_map: dict[str, str] = {}
         self._relationship_field_name_reverse_map: dict[str, str] = {}
+        self._row_relationship_names: frozenset[str] | None = None
         self._init_field_names(model_class, row_class, field_name_map)
         self._init_row_metadata_field_names(
             row_class, service_metadata_field_names, db_metadata_field_names
         )
         self._init_relationship_field_names(model_class, row_class, field_name_map)
         self._init_extract_primary_key(model_class)
+        self._init_load(model_class, row_class)
         self._generate_service_metadata = (
             generate_service_metadata if generate_service_metadata else lambda x, y: {}
         )
@@ -160,6 +185,24 @@ class SAMapper(BaseSAMapper):
     def get_id(self, obj: Model) -> Hashable:
         return self._get_id(obj)
 
+    def get_row_relationship_field_name(
+        self, relationship_field_name: str
+    ) -> str | None:
+        """
+        Get the name of the relationship of the row class that corresponds to the
+        given relationship field of the model, or None if the row class does not
+        declare such a relationship.
+        """
+        if self._row_relationship_names is None:
+            # Determined on first use, when the row classes have been configured
+            self._row_relationship_names = frozenset(
+                sa.inspect(self.row_class).relationships.keys()
+            )
+        row_field_name = self._relationship_field_name_map.get(relationship_field_name)
+        if row_field_name not in self._row_relationship_names:
+            return None
+        return row_field_name
+
     def get_row_id(self, row: Row | Type[Row]) -> Hashable | MappedColumn:
         return self._get_row_id(row)
 
@@ -188,23 +231,98 @@ class SAMapper(BaseSAMapper):
             return self.row_class(**(mapped_dict | kwargs))
         return self.row_class(**mapped_dict)
 
-    def load(self, row: Row, **kwargs: dict) -> Model:
-        if self._is_identical_common_field_names:
-            mapped_dict = {
-                x: getattr(row, x)
-                for x in self._row_field_names_by_set[FieldTypeSet.MODEL_DB_COMMON]
-            }
-        else:
-            mapped_dict = {
-                x: getattr(row, y)
-                for x, y in zip(
-                    self._field_names_by_set[FieldTypeSet.MODEL_DB_COMMON],
-                    self._row_field_names_by_set[FieldTypeSet.MODEL_DB_COMMON],
-                )
-            }
+    def load(self, row: Row, trusted: bool = False, **kwargs: dict) -> Model:
+        """
+        Load a model instance from a row, which can be an instance of the row class
+        or a result row of the columns returned by get_load_columns.
+
+        If trusted is True, the row is considered to contain valid data, e.g. since it
+        was validated when it was stored, and the model instance is constructed
+        without validation by setting its attributes directly. Only the fields whose
+        column values are not already of the type of the field, such as JSON columns,
+        are converted by validating them individually. Model validators are not
+        called.
+        """
+        mapped_dict = dict(zip(self._load_field_names, self._get_load_values(row)))
         if kwargs:
-            return self.model_class(**(mapped_dict | kwargs))
-        return self.model_class(**mapped_dict)
+            mapped_dict |= kwargs
+        if not trusted:
+            return self.model_class(**mapped_dict)
+        for field_name, validate in self._load_validators:
+            value = mapped_dict[field_name]
+            if value is not None:
+                mapped_dict[field_name] = validate(value)
+        return self._construct(mapped_dict)
+
+    def _construct(self, values: dict[str, Any]) -> Model:
+        # Equivalent to model_class.model_construct, which is slower than validation
+        # by pydantic-core for most models
+        if not self._is_direct_construct:
+            return self.model_class.model_construct(**values)
+        fields_set = set(values)
+        for field_name, field in self._load_default_fields:
+            if field_name not in values:
+                values[field_name] = field.get_default(call_default_factory=True)
+        obj = self.model_class.__new__(self.model_class)
+        object.__setattr__(obj, "__dict__", values)
+        object.__setattr__(obj, "__pydantic_fields_set__", fields_set)
+        object.__setattr__(obj, "__pydantic_extra__", None)
+        object.__setattr__(obj, "__pydantic_private__", None)
+        return obj
+
+    def get_load_columns(self) -> tuple:
+        """
+        Get the columns to select to load model instances from the result rows
+        directly, without creating instances of the row class.
+        """
+        return self._load_columns
+
+    def get_fields_columns(self, field_names: Iterable[str]) -> tuple:
+        """
+        Get the columns to select to load the values of the given model fields, see
+        get_fields_loader.
+        """
+        row_field_names = self._get_load_row_field_names(field_names)
+        return tuple(getattr(self.row_class, x) for x in row_field_names)
+
+    def get_fields_loader(self, field_names: Iterable[str]) -> Callable[[Any], tuple]:
+        """
+        Get a function that returns the values of the given model fields from a row,
+        which can be an instance of the row class or a result row that includes the
+        columns returned by get_fields_columns. The values are converted as in a
+        trusted load.
+        """
+        field_names = tuple(field_names)
+        row_field_names = self._get_load_row_field_names(field_names)
+        get_values: Callable[[Any], tuple] = (
+            attrgetter(*row_field_names)
+            if len(row_field_names) > 1
+            else lambda x: (getattr(x, row_field_names[0]),)
+        )
+        validators = [self._load_validator_by_field_name.get(x) for x in field_names]
+        if not any(validators):
+            return get_values
+        return lambda x: tuple(
+            y if z is None or y is None else z(y)
+            for y, z in zip(get_values(x), validators)
+        )
+
+    def _get_load_row_field_names(self, field_names: Iterable[str]) -> tuple:
+        field_names = tuple(field_names)
+        row_field_names = tuple(
+            self._load_row_field_name_by_field_name.get(x) for x in field_names
+        )
+        if not row_field_names or None in row_field_names:
+            invalid_field_names_str = ", ".join(
+                x
+                for x in field_names
+                if x not in self._load_row_field_name_by_field_name
+            )
+            raise exc.InvalidArgumentsError(
+                f"Model {self.model_class.__name__}: field(s) without column: "
+                f"{invalid_field_names_str}"
+            )
+        return row_field_names
 
     def _init_field_names(
         self, model_class: Type[Model], row_class: Type, field_name_map: dict[str, str]
@@ -385,3 +503,68 @@ class SAMapper(BaseSAMapper):
         self._get_row_id: Callable[[Row | Type[Row]], Hashable | MappedColumn] = (
             lambda x: getattr(x, row_id_field_name)
         )
+
+    def _init_load(self, model_class: Type[Model], row_class: Type) -> None:
+        # Generate the accessors to load model instances from rows once
+        field_names = self._field_names_by_set[FieldTypeSet.MODEL_DB_COMMON]
+        row_field_names = self._row_field_names_by_set[FieldTypeSet.MODEL_DB_COMMON]
+        self._load_field_names: tuple = field_names
+        self._load_columns: tuple = tuple(
+            getattr(row_class, x) for x in row_field_names
+        )
+        self._get_load_values: Callable[[Any], tuple] = (
+            attrgetter(*row_field_names)
+            if len(row_field_names) > 1
+            else lambda x: (getattr(x, row_field_names[0]),)
+        )
+        # Determine the fields that are to be validated in a trusted load, with the
+        # validator of their annotation
+        self._load_validators: list[tuple[str, Callable[[Any], Any]]] = []
+        for field_name, row_field_name in zip(field_names, row_field_names):
+            annotation = model_class.model_fields[field_name].annotation
+            column = row_class.__table__.columns[row_field_name]
+            if SAMapper._is_column_of_type(column, annotation):
+                continue
+            self._load_validators.append(
+                (field_name, TypeAdapter(annotation).validate_python)
+            )
+        self._load_row_field_name_by_field_name = dict(
+            zip(field_names, row_field_names)
+        )
+        self._load_validator_by_field_name = dict(self._load_validators)
+        # Determine the remaining fields, which are set to their default, and whether
+        # the model instance can be constructed by setting its attributes directly
+        self._load_default_fields: list[tuple[str, FieldInfo]] = [
+            (x, y)
+            for x, y in model_class.model_fields.items()
+            if x not in set(field_names)
+        ]
+        self._is_direct_construct = (
+            not model_class.__private_attributes__
+            and model_class.model_config.get("extra") != "allow"
+        )
+
+    @staticmethod
+    def _is_column_of_type(column: sa.Column, annotation: Any) -> bool:
+        """
+        Determine whether the values of the column are instances of the annotation,
+        which can be a class or an optional class.
+        """
+        if get_origin(annotation) in {Union, types.UnionType}:
+            classes = [x for x in get_args(annotation) if x is not type(None)]
+            if len(classes) != 1:
+                return False
+            annotation = classes[0]
+        if not isinstance(annotation, type) or get_origin(annotation) is not None:
+            return False
+        sa_type = column.type
+        try:
+            python_type = sa_type.python_type
+        except NotImplementedError:
+            if not isinstance(sa_type, sa.TypeDecorator):
+                return False
+            try:
+                python_type = sa_type.impl_instance.python_type
+            except NotImplementedError:
+                return False
+        return issubclass(python_type, annotation)
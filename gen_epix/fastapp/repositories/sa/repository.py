@@ -2,11 +2,13 @@ import os
 import re
 import uuid
 import warnings
-from typing import Any, Callable, Hashable, Iterable, Self, Sequence, Type
+from contextlib import contextmanager, suppress
+from typing import Any, Callable, Hashable, Iterable, Iterator, Self, Sequence, Type
 
 import sqlalchemy as sa
-from sqlalchemy import Engine, delete, select
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import Engine, delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload, sessionmaker
 
 import gen_epix.fastapp.exc as exc
 from gen_epix.fastapp import CrudOperation, Link
@@ -17,6 +19,14 @@ from gen_epix.fastapp.model import Model
 from gen_epix.fastapp.repositories.sa.engine_factory import EngineFactory
 from gen_epix.fastapp.repositories.sa.mapper import BaseSAMapper, SAMapper
 from gen_epix.fastapp.repositories.sa.unit_of_work import SAUnitOfWork
+from gen_epix.fastapp.repositories.sa.util import (
+    CastAsDate,
+    JsonValue,
+    get_castable_regex,
+    get_regex_literal_prefix,
+    is_portable_regex,
+    sqlite_regex_match,
+)
 from gen_epix.fastapp.repository import BaseRepository
 from gen_epix.fastapp.unit_of_work import BaseUnitOfWork
 from gen_epix.filter import (
@@ -32,15 +42,26 @@ from gen_epix.filter import (
     EqualsUuidFilter,
     ExistsFilter,
     Filter,
+    FilterOptimizer,
     NumberRangeFilter,
     NumberSetFilter,
     RangeFilter,
+    RegexFilter,
     StringSetFilter,
     UuidSetFilter,
 )
 
 
 class SARepository(BaseRepository):
+    # Number of ids above which they are joined as a temporary table or array
+    # instead of being passed as parameters of an IN clause
+    DEFAULT_ID_JOIN_THRESHOLD = 1000
+    # Number of ids inserted per statement in a temporary table
+    ID_JOIN_BATCH_SIZE = 1000
+    # Number of rows per executemany in bulk upserts and updates
+    BULK_BATCH_SIZE = 1000
+    # Number of levels of linked objs that are read in a cascade read
+    DEFAULT_CASCADE_DEPTH = 1
 
     def __init__(self, engine: Engine, **kwargs: dict):
         register_mappers = kwargs.pop("register_mappers", True)
@@ -48,6 +69,10 @@ class SARepository(BaseRepository):
         self._id: str = kwargs.get("id", str(uuid.uuid4()))  # type: ignore[assignment]
         self._name: str = kwargs.get("name", self._id)  # type: ignore[assignment]
         self._engine = engine
+        self._id_join_threshold: int | None = kwargs.get(
+            "id_join_threshold", SARepository.DEFAULT_ID_JOIN_THRESHOLD
+        )  # type: ignore[assignment]
+        self._trusted_load: bool = kwargs.get("trusted_load", False)  # type: ignore[assignment]
 
         # Create a session maker per isolation level
         self._default_isolation_level: IsolationLevel = IsolationLevel.SERIALIZABLE
@@ -59,7 +84,6 @@ class SARepository(BaseRepository):
         # Initialize remaining properties
         self._mapper_by_model: dict[Type[Any], BaseSAMapper] = {}
         self._mapper_by_row: dict[Type[Any], BaseSAMapper] = {}
-        self._uow_context_stack: list[BaseUnitOfWork] = []
 
         # Register mappers if necessary
         if register_mappers:
@@ -73,6 +97,34 @@ class SARepository(BaseRepository):
     def name(self) -> str:
         return self._name
 
+    @property
+    def engine(self) -> Engine:
+        return self._engine
+
+    @property
+    def dialect_name(self) -> str:
+        return self._engine.dialect.name
+
+    @property
+    def id_join_threshold(self) -> int | None:
+        return self._id_join_threshold
+
+    @id_join_threshold.setter
+    def id_join_threshold(self, value: int | None) -> None:
+        self._id_join_threshold = value
+
+    @property
+    def trusted_load(self) -> bool:
+        """
+        Whether to load models from rows without validating them by default, see
+        SAMapper.load. Can be overridden per read by passing trusted_load as kwarg.
+        """
+        return self._trusted_load
+
+    @trusted_load.setter
+    def trusted_load(self, value: bool) -> None:
+        self._trusted_load = value
+
     @property
     def default_isolation_level(self) -> IsolationLevel:
         return self._default_isolation_level
@@ -85,15 +137,17 @@ class SARepository(BaseRepository):
         self,
         **kwargs: dict,
     ) -> BaseUnitOfWork:
-        if self._uow_context_stack:
+        # Stack of the units of work of the current thread or task
+        uow_context_stack = SAUnitOfWork.get_context_stack(id(self))
+        if uow_context_stack:
             # Nested within another context -> reuse the session of that context
             if kwargs:
                 raise exc.RepositoryServiceError(
                     "Cannot pass arguments when creating a nested UnitOfWork"
                 )
             return SAUnitOfWork(
-                self._uow_context_stack[-1].session,
-                context_stack=self._uow_context_stack,
+                uow_context_stack[-1].session,  # type: ignore[attr-defined]
+                context_key=id(self),
             )
         isolation_level: IsolationLevel = kwargs.pop(
             "isolation_level", self._default_isolation_level
@@ -105,7 +159,7 @@ class SARepository(BaseRepository):
                 expire_on_commit=expire_on_commit,
                 **kwargs,
             ),
-            context_stack=self._uow_context_stack,
+            context_key=id(self),
         )
 
     def get_session(
@@ -200,12 +254,17 @@ class SARepository(BaseRepository):
         return [mapper.dump(user_id, x, **kwargs) for x in obj]
 
     def from_sql(
-        self, model_class: Type, row: Any | Iterable[Any], **kwargs: dict
+        self,
+        model_class: Type,
+        row: Any | Iterable[Any],
+        trusted: bool | None = None,
+        **kwargs: dict,
     ) -> Any | list[Any]:
         mapper = self._mapper_by_model[model_class]
-        if isinstance(row, Iterable):
-            return [mapper.load(x, **kwargs) for x in row]
-        return mapper.load(row, **kwargs)
+        trusted = self._trusted_load if trusted is None else trusted
+        if isinstance(row, Iterable) and not isinstance(row, sa.Row):
+            return [mapper.load(x, trusted=trusted, **kwargs) for x in row]
+        return mapper.load(row, trusted=trusted, **kwargs)
 
     def crud(  # type: ignore
         self,
@@ -321,31 +380,73 @@ class SARepository(BaseRepository):
         """
         :param optimize_parameter_handling, optional kwarg:
            if True, avoid parameterized query that using SQL's IN that is
-           more many parameters nonperformant by creating and joining with a temporary table instead
-           default = False, but possibly recommend to set dynamically based on number of parameters
+           more many parameters nonperformant by joining with the ids as a temporary
+           table or array instead, see _in_session_get_id_where_clause. Default is
+           None, in which case this is done when there are more ids than
+           id_join_threshold.
+        :param trusted_load, optional kwarg:
+           if True, select the columns of the rows and load the objs from them
+           without validation, see SAMapper.load. Default is None, in which case the
+           trusted_load property of the repository is used.
+        :param fields, optional kwarg:
+           if given, select only the columns of these fields and return a NamedTuple
+           with their values per obj instead of a model, see
+           BaseRepository.get_fields_class.
+        :param cascade_depth, optional kwarg:
+           the number of levels of linked objs to read in a cascade read, see
+           _get_cascade_read_plan. Default is DEFAULT_CASCADE_DEPTH.
         """
         # Check arguments
         session: Session = kwargs.get("session")  # type: ignore[assignment]
         obj_ids = obj_ids if isinstance(obj_ids, list) else list(obj_ids)
         SARepository._verify_duplicate_ids(model_class, obj_ids)
+        trusted_load = self._is_trusted_load(kwargs.get("trusted_load"))  # type: ignore[arg-type]
+        fields: list[str] | None = kwargs.get("fields")  # type: ignore[assignment]
         # Retrieve rows and verify result
         mapper = self.get_mapper(model_class)
         row_class = mapper.row_class
-        cascade_read = kwargs.get("cascade_read", False)
-        optimize_parameter_handling = kwargs.get("optimize_parameter_handling", False)
+        cascade_read = kwargs.get("cascade_read", False) and not fields
+        use_id_join = self._is_id_join(
+            obj_ids, kwargs.get("optimize_parameter_handling")  # type: ignore[arg-type]
+        )
+        columns = SARepository._get_select_columns(mapper, trusted_load, fields)
+        load_fields = self._get_fields_loader(model_class, fields) if fields else None
+        # If links were not passed explicitly, retrieve them from model
+        cascade_read_plan = (
+            self._get_cascade_read_plan(
+                mapper,
+                kwargs.get("links", model_class.ENTITY.links),  # type: ignore[arg-type]
+                kwargs.get("cascade_depth", SARepository.DEFAULT_CASCADE_DEPTH),  # type: ignore[arg-type]
+            )
+            if cascade_read
+            else []
+        )
+        load_options = self._get_cascade_read_options(row_class, cascade_read_plan)
+        if load_options:
+            # Linked rows are loaded through the relationships of row_class
+            columns = None
 
         def _execute(session: Session) -> list[Model] | list[Hashable]:
             rows, row_ids = SARepository._in_session_read_some(
-                mapper, session, row_class, obj_ids, optimize_parameter_handling
+                mapper,
+                session,
+                row_class,
+                obj_ids,
+                use_id_join,
+                columns,
+                load_options=load_options,
             )
 
             # Reorder objs to guarantee same order as obj_ids and at the
             # same time detect missing objs
             map_to_index = {x: i for i, x in enumerate(row_ids)}
-            objs = self.from_sql(
-                model_class,
-                [rows[map_to_index[x]] if x in map_to_index else None for x in obj_ids],
-            )
+            rows = [
+                rows[map_to_index[x]] if x in map_to_index else None for x in obj_ids
+            ]
+            if load_fields is not None:
+                objs = [None if x is None else load_fields(x) for x in rows]
+            else:
+                objs = self.from_sql(model_class, rows, trusted=trusted_load)
             if any(x is None for x in objs):
                 invalids_ids = [x for x, y in zip(obj_ids, objs) if y is None]
                 invalids_ids_str = ", ".join([str(x) for x in invalids_ids])
@@ -354,10 +455,10 @@ class SARepository(BaseRepository):
                     ids=obj_ids,
                 )
             # Read links if requested and known
-            # If links were not passed explicitly, retrieve them from model
-            if cascade_read:
-                links = kwargs.get("links", model_class.ENTITY.links)
-                self._in_session_add_cascade_read(session, links, objs)
+            if cascade_read_plan:
+                self._in_session_set_cascade_read(
+                    session, cascade_read_plan, rows, objs, trusted_load
+                )
 
             return objs
 
@@ -376,41 +477,149 @@ class SARepository(BaseRepository):
         cascade_read: bool = kwargs.get("cascade_read", False)  # type: ignore[assignment]
         return_id: bool = kwargs.get("return_id", False)  # type: ignore[assignment]
         obj_filter: Filter | None = kwargs.get("obj_filter", None)  # type: ignore[assignment]
-
-        def _execute(session: Session) -> list[Model] | list[Hashable]:
-            # Get either rows or row_ids
-            if return_id:
-                # Select only row_ids
-                stmt = select(get_row_id(row_class))
-            else:
-                # Select entire row
-                stmt = select(row_class)
-            if filter:
-                # Convert filter to where clause and add to statement
-                stmt = stmt.where(self.get_where_clause_from_filter(row_class, filter))
+        limit: int | None = kwargs.get("limit")  # type: ignore[assignment]
+        cursor: Hashable | None = kwargs.get("cursor")  # type: ignore[assignment]
+        batch_size: int | None = kwargs.get("batch_size")  # type: ignore[assignment]
+        trusted_load = self._is_trusted_load(kwargs.get("trusted_load"))  # type: ignore[arg-type]
+        fields: list[str] | None = kwargs.get("fields")  # type: ignore[assignment]
+        # Select only the columns of the fields unless the objs are still to be
+        # filtered with obj_filter, in which case they are converted afterwards
+        columns = SARepository._get_select_columns(
+            mapper, trusted_load, None if obj_filter else fields
+        )
+        load_fields = (
+            self._get_fields_loader(model_class, fields)
+            if fields and not obj_filter
+            else None
+        )
+        cascade_read_plan = (
+            self._get_cascade_read_plan(
+                mapper,
+                kwargs.get("links", {}),  # type: ignore[arg-type]
+                kwargs.get("cascade_depth", SARepository.DEFAULT_CASCADE_DEPTH),  # type: ignore[arg-type]
+            )
+            if cascade_read and not return_id and not fields
+            else []
+        )
+        load_options = self._get_cascade_read_options(row_class, cascade_read_plan)
+        if load_options:
+            # Linked rows are loaded through the relationships of row_class
+            columns = None
+
+        def _load(
+            session: Session, rows: Sequence[sa.Row]
+        ) -> tuple[list[Model] | list[Hashable], list[Hashable]]:
+            # Load the rows read and apply obj_filter, returning the objs or their ids
+            # and the ids of all rows that were read
             if return_id:
-                row_ids = [x[0] for x in session.execute(stmt).all()]
+                row_ids = [x[0] for x in rows]
+                objs = row_ids
                 if obj_filter:
                     # Retrieve entire rows and filter them with obj_filter, then get
                     # remaining IDs
                     stmt2 = select(row_class).where(get_row_id(row_class).in_(row_ids))
                     rows = [x[0] for x in session.execute(stmt2).all()]
-                    objs = self.from_sql(model_class, rows)
-                    objs = list(obj_filter.filter_rows(objs, is_model=True))
-                    if len(objs) < len(row_ids):
-                        row_ids = [mapper.get_id(x) for x in objs]
-                objs = row_ids
+                    filtered_objs = self.from_sql(
+                        model_class, rows, trusted=trusted_load
+                    )
+                    filtered_objs = list(
+                        obj_filter.filter_rows(filtered_objs, is_model=True)
+                    )
+                    if len(filtered_objs) < len(row_ids):
+                        filtered_ids = {mapper.get_id(x) for x in filtered_objs}
+                        objs = [x for x in row_ids if x in filtered_ids]
             else:
-                rows = [x[0] for x in session.execute(stmt).all()]
-                objs = self.from_sql(model_class, rows)
-                if obj_filter:
-                    objs = list(obj_filter.filter_rows(objs, is_model=True))
-                # Read links if needed
-                if cascade_read:
-                    links = kwargs.get("links", {})
-                    self._in_session_add_cascade_read(session, links, objs)
+                if columns is None:
+                    rows = [x[0] for x in rows]
+                # Otherwise rows of the selected columns rather than instances of
+                # row_class
+                row_ids = [get_row_id(x) for x in rows]
+                if load_fields is not None:
+                    objs = [load_fields(x) for x in rows]
+                else:
+                    objs = self.from_sql(model_class, rows, trusted=trusted_load)
+                    if obj_filter and cascade_read_plan:
+                        # Keep the rows of the remaining objs to read their links
+                        is_match = list(obj_filter.match_rows(objs, is_model=True))
+                        objs = [x for x, y in zip(objs, is_match) if y]
+                        rows = [x for x, y in zip(rows, is_match) if y]
+                    elif obj_filter:
+                        objs = list(obj_filter.filter_rows(objs, is_model=True))
+                    if cascade_read_plan:
+                        self._in_session_set_cascade_read(
+                            session, cascade_read_plan, rows, objs, trusted_load
+                        )
+            return objs, row_ids
+
+        def _read(
+            session: Session, stmt: sa.sql.Select
+        ) -> tuple[list[Model] | list[Hashable], list[Hashable]]:
+            return _load(session, session.execute(stmt).all())
+
+        def _get_stmt() -> sa.sql.Select:
+            row_id_column = get_row_id(row_class)
+            if return_id:
+                # Select only row_ids
+                stmt = select(row_id_column)
+            elif columns is not None:
+                # Select the columns to load the objs or fields from
+                stmt = select(*columns)
+            else:
+                # Select entire row, with any linked rows
+                stmt = select(row_class).options(*load_options)
+            if filter:
+                # Convert filter to where clause and add to statement
+                stmt = stmt.where(self.get_where_clause_from_filter(row_class, filter))
+            return stmt
+
+        def _execute(session: Session) -> list[Model] | list[Hashable]:
+            # Get either rows or row_ids
+            row_id_column = get_row_id(row_class)
+            stmt = _get_stmt()
+            if limit is None and cursor is None:
+                objs, _ = _read(session, stmt)
+            else:
+                # Keyset pagination: read the rows ordered by id after the cursor, in
+                # batches until limit objs remain after applying obj_filter
+                stmt = stmt.order_by(row_id_column)
+                objs = []
+                last_row_id = cursor
+                while True:
+                    curr_stmt = stmt
+                    if last_row_id is not None:
+                        curr_stmt = curr_stmt.where(row_id_column > last_row_id)
+                    n_rows = None if limit is None else limit - len(objs)
+                    if n_rows is not None:
+                        curr_stmt = curr_stmt.limit(n_rows)
+                    curr_objs, row_ids = _read(session, curr_stmt)
+                    objs.extend(curr_objs)  # type: ignore[arg-type]
+                    if n_rows is None or len(row_ids) < n_rows or len(objs) == limit:
+                        break
+                    last_row_id = row_ids[-1]
+            if fields and obj_filter and not return_id:
+                objs = BaseRepository.to_fields(model_class, objs, fields)
             return objs
 
+        def _stream() -> Iterator[list[Model] | list[Hashable]]:
+            # Read the rows in a session of its own, in a single transaction that
+            # lasts until the iterator is exhausted or closed, with the database
+            # driver fetching batch_size rows at a time
+            with self.get_session() as session, session.begin():
+                result = session.execute(
+                    _get_stmt().execution_options(yield_per=batch_size)
+                )
+                for rows in result.partitions():
+                    objs, _ = _load(session, rows)
+                    if fields and obj_filter and not return_id:
+                        objs = BaseRepository.to_fields(model_class, objs, fields)
+                    yield objs
+
+        if batch_size is not None:
+            if limit is not None or cursor is not None:
+                raise exc.InvalidArgumentsError(
+                    "Read all cannot be both paginated and streamed"
+                )
+            return _stream()  # type: ignore[return-value]
         objs = self._execute_sa(session, _execute, kwargs)
         return objs
 
@@ -426,10 +635,19 @@ class SARepository(BaseRepository):
         objs: Iterable[Model],
         **kwargs: dict,
     ) -> list[Model] | list[Hashable]:
+        """
+        :param return_id, optional kwarg:
+           if True, update the rows with a bulk UPDATE ... WHERE id = :id per batch
+           instead of reading and comparing them through the ORM, and return the ids
+           of the objs. As with the ORM, rows whose data fields do not change are not
+           updated.
+        """
         # Check arguments
         objs = objs if isinstance(objs, list) else list(objs)
         session: Session = kwargs.get("session")  # type: ignore[assignment]
         flush = kwargs.get("flush", True)
+        if kwargs.get("return_id", False):
+            return self._bulk_update_some(model_class, user_id, objs, **kwargs)
         # Retrieve row
         mapper = self.get_mapper(model_class)
         row_class = mapper.row_class
@@ -441,7 +659,7 @@ class SARepository(BaseRepository):
             updated_rows = self.to_sql(user_id, model_class, objs)
             obj_ids = [get_row_id(x) for x in updated_rows]
             rows, row_ids = SARepository._in_session_read_some(
-                mapper, session, row_class, obj_ids
+                mapper, session, row_class, obj_ids, self._is_id_join(obj_ids)
             )
             map_rows = dict(zip(row_ids, rows))
             for updated_row in updated_rows:
@@ -476,11 +694,83 @@ class SARepository(BaseRepository):
     def upsert_some(
         self,
         model_class: Type,
-        _user_id: Hashable,
-        _objs: Iterable[Model],
+        user_id: Hashable,
+        objs: Iterable[Model],
         **kwargs: dict,
     ) -> list[Model] | list[Hashable]:
-        raise NotImplementedError
+        """
+        Insert the objs that do not exist yet and update those that do, in batches
+        with the native statement of the dialect: INSERT ... ON CONFLICT DO UPDATE on
+        SQLite and PostgreSQL and MERGE on MS SQL Server. Other dialects fall back to
+        create_some and update_some. As with update_some, existing rows whose data
+        fields do not change are not updated.
+        """
+        # Check arguments
+        session: Session = kwargs.get("session")  # type: ignore[assignment]
+        return_id: bool = kwargs.get("return_id", False)  # type: ignore[assignment]
+        objs = objs if isinstance(objs, list) else list(objs)
+        if not objs:
+            return []
+        if not all(isinstance(x, model_class) for x in objs):
+            raise ValueError("Not all objs are of the correct Model")
+        mapper = self.get_mapper(model_class)
+        row_class = mapper.row_class
+        obj_ids = [mapper.get_id(x) for x in objs]
+        if any(x is None for x in obj_ids):
+            raise exc.InvalidIdsError(f"{model_class} object(s) without id")
+        SARepository._verify_duplicate_ids(model_class, obj_ids)
+
+        def _execute(session: Session) -> list[Model] | list[Hashable]:
+            dialect = session.get_bind().dialect
+            if dialect.name in {"sqlite", "postgresql", "mssql"}:
+                # Flush pending changes first, since the statement bypasses the ORM
+                session.flush()
+                column_keys, values = self._get_row_values(user_id, model_class, objs)
+                stmt = SARepository._get_upsert_statement(mapper, column_keys, dialect)
+                if dialect.name == "mssql":
+                    # Pass the scalar defaults that are not applied by MERGE
+                    insert_defaults = SARepository._get_insert_defaults(
+                        row_class.__table__, column_keys
+                    )
+                    values = [x | insert_defaults for x in values]
+                batch_size = SARepository.BULK_BATCH_SIZE
+                for i in range(0, len(values), batch_size):
+                    session.execute(stmt, values[i : i + batch_size])
+                SARepository._in_session_expire_rows(session, row_class, obj_ids)
+            else:
+                is_existing = self.exists_some(model_class, obj_ids, session=session)
+                new_objs = [x for x, y in zip(objs, is_existing) if not y]
+                existing_objs = [x for x, y in zip(objs, is_existing) if y]
+                if new_objs:
+                    self.create_some(
+                        model_class, user_id, new_objs, session=session, return_id=True
+                    )
+                if existing_objs:
+                    self.update_some(
+                        model_class,
+                        user_id,
+                        existing_objs,
+                        session=session,
+                        return_id=True,
+                    )
+            if return_id:
+                return obj_ids
+            trusted_load = self._is_trusted_load(kwargs.get("trusted_load"))  # type: ignore[arg-type]
+            rows, row_ids = SARepository._in_session_read_some(
+                mapper,
+                session,
+                row_class,
+                obj_ids,
+                self._is_id_join(obj_ids),
+                SARepository._get_select_columns(mapper, trusted_load),
+            )
+            map_rows = dict(zip(row_ids, rows))
+            return self.from_sql(
+                model_class, [map_rows[x] for x in obj_ids], trusted=trusted_load
+            )
+
+        upserted_objs = self._execute_sa(session, _execute, kwargs)
+        return upserted_objs  # type: ignore[return-value]
 
     def delete_one(
         self, model_class: Type, user_id: Hashable, row_id: Hashable, **kwargs: dict
@@ -502,17 +792,31 @@ class SARepository(BaseRepository):
         mapper = self.get_mapper(model_class)
         row_class = mapper.row_class
         get_row_id = mapper.get_row_id
+        use_id_join = self._is_id_join(
+            row_ids, kwargs.get("optimize_parameter_handling")  # type: ignore[arg-type]
+        )
+
+        SARepository._verify_duplicate_ids(model_class, row_ids)
 
         def _execute(session: Session) -> None:
-            is_existing = self.exists_some(model_class, row_ids)
-            if not all(is_existing):
-                invalid_ids = [x for x, y in zip(row_ids, is_existing) if not y]
+            # Delete the rows in a single statement, deriving any non-existing ids
+            # from the ids of the deleted rows. Raising the exception rolls back the
+            # deletion together with the rest of the unit of work.
+            with SARepository._in_session_get_id_where_clause(
+                session, get_row_id(row_class), row_ids, use_id_join
+            ) as where_clause:
+                deleted_row_ids = set(
+                    SARepository._in_session_delete(
+                        session, row_class, get_row_id(row_class), where_clause
+                    )
+                )
+            if len(deleted_row_ids) < len(row_ids):
+                invalid_ids = [x for x in row_ids if x not in deleted_row_ids]
                 invalid_ids_str = ", ".join([str(x) for x in invalid_ids])
                 raise exc.InvalidIdsError(
                     f"{model_class} object(s) do not exist: {invalid_ids_str}",
                     ids=invalid_ids,
                 )
-            session.execute(delete(row_class).where(get_row_id(row_class).in_(row_ids)))
             if flush:
                 session.flush()
 
@@ -536,16 +840,35 @@ class SARepository(BaseRepository):
         obj_filter: Filter | None = kwargs.get("obj_filter", None)
 
         def _execute(session: Session) -> list[Hashable] | None:
-
-            if filter or obj_filter:
-                raise NotImplementedError("Filter not implemented for delete_all")
-            row_ids = None
-            if return_id:
-                # Get ids
-                row_ids = session.execute(select(get_row_id(row_class))).all()
-                row_ids = [x[0] for x in row_ids]
-            session.execute(delete(row_class))
-            return row_ids
+            id_column = get_row_id(row_class)
+            if obj_filter:
+                # The obj_filter cannot be converted into a where clause: read the
+                # ids of the matching objs first and delete these
+                row_ids = self.read_all(
+                    model_class,
+                    filter,
+                    session=session,
+                    return_id=True,
+                    obj_filter=obj_filter,
+                )
+                with SARepository._in_session_get_id_where_clause(
+                    session, id_column, row_ids, self._is_id_join(row_ids)
+                ) as where_clause:
+                    SARepository._in_session_delete(
+                        session, row_class, id_column, where_clause, return_id=False
+                    )
+                return row_ids
+            # Delete the rows in a single statement
+            if not filter:
+                return SARepository._in_session_delete(
+                    session, row_class, id_column, None, return_id=return_id
+                )
+            with self._in_session_get_where_clause_from_filter(
+                session, row_class, filter
+            ) as where_clause:
+                return SARepository._in_session_delete(
+                    session, row_class, id_column, where_clause, return_id=return_id
+                )
 
         deleted_row_ids = self._execute_sa(session, _execute, kwargs)
         return deleted_row_ids if return_id else None
@@ -560,16 +883,22 @@ class SARepository(BaseRepository):
 
         mapper = self.get_mapper(model_class)
         row_class = mapper.row_class
+        obj_ids = obj_ids if isinstance(obj_ids, list) else list(obj_ids)
         SARepository._verify_duplicate_ids(model_class, obj_ids)
+        use_id_join = self._is_id_join(
+            obj_ids, kwargs.get("optimize_parameter_handling")  # type: ignore[arg-type]
+        )
 
         def _execute(session: Session) -> list[bool]:
             # select(mapper.get_row_id(row_class)) works because mapper.get_row_id returns the attribute of the row class
             # that functions as the primary key and this attribute is an SQLalchemy Column object that is aware of which table it is in
-            rows: Sequence = session.execute(
-                select(mapper.get_row_id(row_class)).where(
-                    mapper.get_row_id(row_class).in_(obj_ids)
-                )
-            ).all()
+            id_column = mapper.get_row_id(row_class)
+            with SARepository._in_session_get_id_where_clause(
+                session, id_column, obj_ids, use_id_join
+            ) as where_clause:
+                rows: Sequence = session.execute(
+                    select(id_column).where(where_clause)
+                ).all()
             found_obj_ids = {x[0] for x in rows}
             is_existing_obj = [x in found_obj_ids for x in obj_ids]
             return is_existing_obj
@@ -582,36 +911,45 @@ class SARepository(BaseRepository):
         if not filter:
             return None, None
         field_name_map = self.get_mapper(model_class).get_field_name_map()
-        return self._split_filter_recursion(field_name_map, filter)
+        # Optimize the filter first, so that negations are pushed down and common
+        # sub-filters are factored out of OR filters, allowing a larger part of it
+        # to be converted into a where clause
+        return self._split_filter_recursion(
+            field_name_map, FilterOptimizer.optimize(filter)
+        )
 
-    def get_where_clause_from_filter(self, row_class: Type, filter: Filter) -> Any:
-        invert = filter.invert
+    def get_where_clause_from_filter(
+        self, row_class: Type, filter: Filter, negate: bool = False
+    ) -> Any:
+        invert = filter.invert != negate
         if isinstance(filter, CompositeFilter):
+            # Push the negation down to the non-composite filters (De Morgan)
+            # rather than negating the composite where clause, since the negation
+            # of a comparison with null is null in SQL, whereas an inverted filter
+            # matches a null value when matching a row in Python
             args = []
             for sub_filter in filter.filters:
-                args.append(self.get_where_clause_from_filter(row_class, sub_filter))
+                args.append(
+                    self.get_where_clause_from_filter(row_class, sub_filter, invert)
+                )
             if filter.operator == BooleanOperator.AND:
-                return sa.and_(*args) if not invert else sa.not_(sa.and_(*args))
+                return sa.and_(*args) if not invert else sa.or_(*args)
             if filter.operator == BooleanOperator.OR:
-                return sa.or_(*args) if not invert else sa.not_(sa.or_(*args))
+                return sa.or_(*args) if not invert else sa.and_(*args)
             raise exc.InvalidArgumentsError(
                 f"Unsupported filter operator: {filter.operator.value}"
             )
         column = getattr(row_class, filter.get_key())
+        if isinstance(filter, ExistsFilter):
+            return column != None if not invert else column == None
         if (
             isinstance(filter, StringSetFilter)
             or isinstance(filter, NumberSetFilter)
             or isinstance(filter, UuidSetFilter)
         ):
-            return (
-                column.in_(filter.members)
-                if not invert
-                else sa.not_(column.in_(filter.members))
-            )
-        elif isinstance(filter, ExistsFilter):
-            return column != None if not invert else column == None
+            where_clause = column.in_(filter.members)
         elif isinstance(filter, EqualsFilter):
-            return column == filter.value if not invert else column != filter.value
+            where_clause = column == filter.value
         elif isinstance(filter, RangeFilter):
             args = []
             if filter.lower_bound:
@@ -624,13 +962,221 @@ class SARepository(BaseRepository):
                     args.append(column < filter.upper_bound)
                 elif filter.upper_bound_censor == ComparisonOperator.STE:
                     args.append(column <= filter.upper_bound)
-            if len(args) == 1:
-                return args[0] if not invert else sa.not_(args[0])
-            return sa.and_(*args) if not invert else sa.not_(sa.and_(*args))
+            where_clause = args[0] if len(args) == 1 else sa.and_(*args)
+        elif isinstance(filter, RegexFilter):
+            where_clause = SARepository.get_where_clause_from_regex(
+                column, filter.pattern, self.dialect_name
+            )
+        else:
+            raise exc.InvalidArgumentsError(
+                f"Unsupported filter type: {filter.__class__.__name__}"
+            )
+        if invert:
+            # An inverted filter matches a null value, as when matching a row in
+            # Python, whereas the negation of a comparison with null is null in SQL
+            return sa.or_(column == None, sa.not_(where_clause))
+        return where_clause
+
+    def get_where_clause_from_json_filter(
+        self,
+        column: Any,
+        filter: Filter,
+        key_types: dict[Hashable, sa.types.TypeEngine | None] | None = None,
+    ) -> Any:
+        """
+        Convert a filter whose keys refer to top-level keys of a JSON column into a
+        where clause on that column. The values are extracted as text and cast to
+        the type in key_types, if any, before being compared, see cast_text_value. A
+        missing key, null value or value that cannot be cast never matches, in line
+        with the filter matching a row in Python.
+
+        Inverted filters and operators other than AND/OR are not supported, since
+        SQL three-valued logic would then deviate from the Python semantics for
+        missing values. An InvalidArgumentsError is raised for any unsupported
+        filter, operator or filter/type combination.
+        """
+        if key_types is None:
+            key_types = {}
+        if filter.invert:
+            raise exc.InvalidArgumentsError("Unsupported inverted filter")
+        if isinstance(filter, CompositeFilter):
+            args = [
+                self.get_where_clause_from_json_filter(column, x, key_types)
+                for x in filter.filters
+            ]
+            if filter.operator == BooleanOperator.AND:
+                return sa.and_(*args)
+            if filter.operator == BooleanOperator.OR:
+                return sa.or_(*args)
+            raise exc.InvalidArgumentsError(
+                f"Unsupported filter operator: {filter.operator.value}"
+            )
+        key = filter.get_key()
+        sa_type = key_types.get(key)
+        value = JsonValue(column, key)
+        if isinstance(filter, ExistsFilter):
+            return value != None
+        # Cast the extracted text to the kind of value the filter compares against
+        if isinstance(sa_type, (sa.Date, sa.Integer, sa.Numeric)):
+            value = SARepository.cast_text_value(value, sa_type, self.dialect_name)
+        return SARepository.get_where_clause_from_value_filter(
+            value, filter, sa_type, dialect_name=self.dialect_name
+        )
+
+    @staticmethod
+    def get_where_clause_from_value_filter(
+        value: Any,
+        filter: Filter,
+        sa_type: sa.types.TypeEngine | None = None,
+        dialect_name: str | None = None,
+    ) -> Any:
+        """
+        Convert a non-composite, non-inverted filter into a where clause on a value
+        expression of the given SQL type, or text if None. A null value never
+        matches. An InvalidArgumentsError is raised for any unsupported filter or
+        filter/type combination. A RegexFilter is only supported if the SQL dialect
+        is given, see get_where_clause_from_regex.
+        """
+        key = filter.get_key()
+        is_number_type = isinstance(sa_type, (sa.Integer, sa.Numeric))
+        is_date_type = isinstance(sa_type, sa.Date)
+        is_string_type = sa_type is None or isinstance(sa_type, sa.String)
+        if filter.invert:
+            raise exc.InvalidArgumentsError("Unsupported inverted filter")
+        if isinstance(filter, ExistsFilter):
+            return value != None
+        if isinstance(filter, StringSetFilter) and is_string_type:
+            if filter.case_sensitive:
+                return value.in_(filter.members)
+            return sa.func.lower(value).in_({x.lower() for x in filter.members})
+        if isinstance(filter, EqualsStringFilter) and is_string_type:
+            return value == filter.value
+        if isinstance(filter, RegexFilter) and is_string_type:
+            return SARepository.get_where_clause_from_regex(
+                value, filter.pattern, dialect_name
+            )
+        if isinstance(filter, NumberSetFilter) and is_number_type:
+            return value.in_(filter.members)
+        if isinstance(filter, EqualsNumberFilter) and is_number_type:
+            return value == filter.value
+        if (isinstance(filter, NumberRangeFilter) and is_number_type) or (
+            isinstance(filter, DateRangeFilter) and is_date_type
+        ):
+            args = []
+            if filter.lower_bound is not None:
+                if filter.lower_bound_censor == ComparisonOperator.GT:
+                    args.append(value > filter.lower_bound)
+                elif filter.lower_bound_censor == ComparisonOperator.GTE:
+                    args.append(value >= filter.lower_bound)
+            if filter.upper_bound is not None:
+                if filter.upper_bound_censor == ComparisonOperator.ST:
+                    args.append(value < filter.upper_bound)
+                elif filter.upper_bound_censor == ComparisonOperator.STE:
+                    args.append(value <= filter.upper_bound)
+            return args[0] if len(args) == 1 else sa.and_(*args)
         raise exc.InvalidArgumentsError(
-            f"Unsupported filter type: {filter.__class__.__name__}"
+            f"Unsupported filter type for key {key}: {filter.__class__.__name__}"
+        )
+
+    @staticmethod
+    def cast_text_value(
+        value: Any, sa_type: sa.types.TypeEngine, dialect_name: str | None
+    ) -> Any:
+        """
+        Cast a text value expression to a date or number type, such that a value
+        that cannot be cast results in null rather than in an error that fails the
+        entire statement: with TRY_CAST on MSSQL and otherwise by only casting the
+        values that match the regular expression for the type, see
+        get_castable_regex. An InvalidArgumentsError is raised for any other type
+        or, through get_where_clause_from_regex, dialect.
+        """
+        if dialect_name == "mssql":
+            return sa.try_cast(value, sa_type)
+        pattern = get_castable_regex(sa_type)
+        if pattern is None:
+            raise exc.InvalidArgumentsError(f"Unsupported type for cast: {sa_type}")
+        return sa.case(
+            (
+                SARepository.get_where_clause_from_regex(value, pattern, dialect_name),
+                (
+                    CastAsDate(value)
+                    if isinstance(sa_type, sa.Date)
+                    else sa.cast(value, sa_type)
+                ),
+            )
         )
 
+    @staticmethod
+    def is_regex_supported(pattern: str, dialect_name: str | None) -> bool:
+        """
+        Check if get_where_clause_from_regex supports the regular expression for
+        the SQL dialect.
+        """
+        if dialect_name == "sqlite":
+            return True
+        if dialect_name == "postgresql":
+            return is_portable_regex(pattern)
+        if dialect_name == "mssql":
+            return get_regex_literal_prefix(pattern) is not None
+        return False
+
+    @staticmethod
+    def get_where_clause_from_regex(
+        value: Any, pattern: str, dialect_name: str | None
+    ) -> Any:
+        """
+        Get the where clause to match a text value expression to a regular
+        expression from its start, as RegexFilter does with re.match, using the
+        native matching of the SQL dialect:
+        - SQLite: the regex_match function registered by create_sa_repository,
+          which applies re.match itself.
+        - PostgreSQL: the ~ operator, anchored at the start, for regular
+          expressions that have the same meaning in PostgreSQL.
+        - MSSQL: a case and accent sensitive LIKE, for regular expressions that
+          are equivalent to a literal prefix.
+        An InvalidArgumentsError is raised for any other dialect or regular
+        expression.
+        """
+        if not SARepository.is_regex_supported(pattern, dialect_name):
+            raise exc.InvalidArgumentsError(
+                f"Unsupported regular expression for dialect {dialect_name}: {pattern}"
+            )
+        if dialect_name == "sqlite":
+            return sa.func.regex_match(pattern, value, type_=sa.Boolean)
+        if dialect_name == "postgresql":
+            # Embedded option p: a dot does not match a newline, as in Python
+            return value.regexp_match(f"(?p)^(?:{pattern})")
+        # Escape the LIKE wildcards in the literal prefix
+        prefix = get_regex_literal_prefix(pattern)
+        assert prefix is not None
+        prefix = re.sub(r"([\\%_\[])", r"\\\1", prefix)
+        return value.collate("Latin1_General_BIN2").like(prefix + "%", escape="\\")
+
+    @staticmethod
+    def create_text_indexes(engine: Engine, columns: Iterable[str]) -> None:
+        """
+        Create a trigram index on each of the given text columns, formatted as
+        schema.table.column, so that matching a regular expression or a substring
+        can use the index rather than a full scan. Only PostgreSQL is supported,
+        using the pg_trgm extension, and the columns are ignored for any other
+        dialect.
+        """
+        if engine.dialect.name != "postgresql":
+            return
+        quote = engine.dialect.identifier_preparer.quote
+        with engine.begin() as conn:
+            conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for column in columns:
+                names = column.split(".")
+                index_name = "ix_" + "_".join(names[-2:]) + "_trgm"
+                conn.execute(
+                    sa.text(
+                        f"CREATE INDEX IF NOT EXISTS {quote(index_name)} ON "
+                        + ".".join(quote(x) for x in names[:-1])
+                        + f" USING gin ({quote(names[-1])} gin_trgm_ops)"
+                    )
+                )
+
     def _split_filter_recursion(
         self, field_name_map: dict[str, str], filter: Filter
     ) -> tuple[Filter | None, Filter | None]:
@@ -646,28 +1192,36 @@ class SARepository(BaseRepository):
             DateRangeFilter,
             DatetimeRangeFilter,
             NumberRangeFilter,
+            RegexFilter,
         ]
         # Convert composite filter if possible
         if isinstance(filter, CompositeFilter):
             where_clause_filters = []
             remainder_filters = []
+            if filter.invert:
+                # Filter cannot be converted due to unsupported inverted operator
+                return None, filter
             if filter.operator == BooleanOperator.OR:
-                # Split only when all sub-filters can fully be converted into a where
-                # clause
+                # Split all sub-filters. If each has a where clause part, the OR of
+                # these is implied by the filter and can be used as where clause,
+                # with the filter itself as remainder unless all sub-filters could
+                # be converted completely.
+                is_remainder = False
                 for sub_filter in filter.filters:
                     where_clause_filter, remainder_filter = (
                         self._split_filter_recursion(field_name_map, sub_filter)
                     )
-                    if remainder_filter is not None:
-                        # Subfilter could not be converted completely -> filter cannot
+                    if where_clause_filter is None:
+                        # Subfilter could not be converted at all -> filter cannot
                         # be converted
                         return None, filter
                     where_clause_filters.append(where_clause_filter)
+                    is_remainder = is_remainder or remainder_filter is not None
                 return (
                     CompositeFilter(
                         filters=where_clause_filters, operator=BooleanOperator.OR
                     ),
-                    None,
+                    filter if is_remainder else None,
                 )
             if filter.operator == BooleanOperator.AND:
                 # Split all sub-filters
@@ -704,9 +1258,14 @@ class SARepository(BaseRepository):
         if not mapped_key:
             # Field name cannot be mapped
             return None, filter
+        if isinstance(filter, RegexFilter) and not SARepository.is_regex_supported(
+            filter.pattern, self.dialect_name
+        ):
+            # Regular expression cannot be matched natively
+            return None, filter
         for filter_class in map_key_only_classes:
             if isinstance(filter, filter_class):
-                values = filter.model_dump()
+                values = filter.model_dump(exclude_unset=True)
                 values["key"] = mapped_key
                 return filter_class(**values), None
         # Filter cannot be converted
@@ -737,7 +1296,8 @@ class SARepository(BaseRepository):
         session: Session,
         links: dict[int, Link],
         objs: list[Model],
-        optimize_parameter_handling: bool = False,
+        optimize_parameter_handling: bool | None = None,
+        trusted_load: bool = False,
     ) -> None:
         # Go over each link
         for link in links.values():
@@ -752,9 +1312,12 @@ class SARepository(BaseRepository):
                 session,
                 link_mapper.row_class,
                 list(uq_link_ids),
-                optimize_parameter_handling,
+                self._is_id_join(uq_link_ids, optimize_parameter_handling),
+                SARepository._get_select_columns(link_mapper, trusted_load),
+            )
+            uq_link_objs = self.from_sql(
+                link.link_model_class, uq_link_rows, trusted=trusted_load
             )
-            uq_link_objs = self.from_sql(link.link_model_class, uq_link_rows)
             # Map link objs to ids and set in objs
             uq_link_objs = dict(zip(uq_link_ids, uq_link_objs))
             uq_link_objs[None] = None
@@ -765,6 +1328,105 @@ class SARepository(BaseRepository):
                     uq_link_objs[link_id],
                 )
 
+    def _get_cascade_read_plan(
+        self, mapper: BaseSAMapper, links: dict[int, Link], depth: int
+    ) -> list[tuple[Link, str | None, list]]:
+        """
+        Get the links to read in a cascade read, as a list of (link,
+        row_relationship_field_name, link_plan) tuples. Links that have a relationship
+        in the row class are loaded through it together with the rows themselves,
+        while the others are read afterwards with a query per link. Up to depth
+        levels of links are read, the levels beyond the first one only through
+        relationships to row classes of this repository, with link_plan the plan for
+        the links of the linked model.
+        """
+        plan = []
+        for link in links.values():
+            if link.relationship_field_name is None:
+                continue
+            row_relationship_field_name = mapper.get_row_relationship_field_name(
+                link.relationship_field_name
+            )
+            link_plan: list = []
+            if row_relationship_field_name is not None and depth > 1:
+                assert link.link_model_class.ENTITY is not None
+                link_plan = [
+                    x
+                    for x in self._get_cascade_read_plan(
+                        self.get_mapper(link.link_model_class),
+                        {
+                            x: y
+                            for x, y in link.link_model_class.ENTITY.links.items()
+                            if y.link_model_class in self._mapper_by_model
+                        },
+                        depth - 1,
+                    )
+                    if x[1] is not None
+                ]
+            plan.append((link, row_relationship_field_name, link_plan))
+        return plan
+
+    def _get_cascade_read_options(
+        self, row_class: Type, plan: list[tuple[Link, str | None, list]]
+    ) -> list:
+        # Get the loader options to load the linked rows of a cascade read plan with
+        # a join, which are all many-to-one
+        options = []
+        for link, row_relationship_field_name, link_plan in plan:
+            if row_relationship_field_name is None:
+                continue
+            option = joinedload(getattr(row_class, row_relationship_field_name))
+            link_options = self._get_cascade_read_options(
+                self.get_mapper(link.link_model_class).row_class, link_plan
+            )
+            if link_options:
+                option = option.options(*link_options)
+            options.append(option)
+        return options
+
+    def _in_session_set_cascade_read(
+        self,
+        session: Session,
+        plan: list[tuple[Link, str | None, list]],
+        rows: list[Any],
+        objs: list[Model],
+        trusted_load: bool = False,
+    ) -> None:
+        # Set the linked objs that were loaded through the relationships of the rows,
+        # loading each linked row once
+        other_links = {}
+        for i, (link, row_relationship_field_name, link_plan) in enumerate(plan):
+            if row_relationship_field_name is None:
+                other_links[i] = link
+                continue
+            link_mapper = self.get_mapper(link.link_model_class)
+            get_link_row_id = link_mapper.get_row_id
+            uq_link_rows: dict[Hashable, Any] = {}
+            uq_link_objs: dict[Hashable, Model | None] = {None: None}
+            for obj, row in zip(objs, rows):
+                link_row = getattr(row, row_relationship_field_name)
+                link_id = None if link_row is None else get_link_row_id(link_row)
+                if link_id not in uq_link_objs:
+                    uq_link_rows[link_id] = link_row
+                    uq_link_objs[link_id] = link_mapper.load(
+                        link_row, trusted=trusted_load
+                    )
+                setattr(obj, link.relationship_field_name, uq_link_objs[link_id])  # type: ignore[arg-type]
+            if link_plan and uq_link_rows:
+                del uq_link_objs[None]
+                self._in_session_set_cascade_read(
+                    session,
+                    link_plan,
+                    list(uq_link_rows.values()),
+                    list(uq_link_objs.values()),  # type: ignore[arg-type]
+                    trusted_load,
+                )
+        # Read the remaining linked objs with a query per link
+        if other_links:
+            self._in_session_add_cascade_read(
+                session, other_links, objs, trusted_load=trusted_load
+            )
+
     def verify_valid_ids(
         self,
         uow: BaseUnitOfWork,
@@ -802,61 +1464,416 @@ class SARepository(BaseRepository):
                 # TODO: determine invalid obj_ids and pass them to the exception
                 raise exc.InvalidIdsError("Invalid obj_ids", ids=None) from e
 
+    def _bulk_update_some(
+        self,
+        model_class: Type,
+        user_id: Hashable,
+        objs: list[Model],
+        **kwargs: dict,
+    ) -> list[Hashable]:
+        # Update the rows with Core UPDATE statements, see update_some
+        session: Session = kwargs.get("session")  # type: ignore[assignment]
+        if not all(isinstance(x, model_class) for x in objs):
+            raise ValueError("Not all objs are of the correct Model")
+        mapper = self.get_mapper(model_class)
+        row_class = mapper.row_class
+        obj_ids = [mapper.get_id(x) for x in objs]
+        SARepository._verify_duplicate_ids(model_class, obj_ids)
+
+        def _execute(session: Session) -> list[Hashable]:
+            if not objs:
+                return []
+            # Flush pending changes first, since the statement bypasses the ORM
+            session.flush()
+            column_keys, values = self._get_row_values(user_id, model_class, objs)
+            stmt = SARepository._get_update_statement(mapper, column_keys)
+            # Bind parameters cannot have the same name as the columns
+            values = [{f"b_{x}": y for x, y in z.items()} for z in values]
+            batch_size = SARepository.BULK_BATCH_SIZE
+            n_updated = 0
+            for i in range(0, len(values), batch_size):
+                n_updated += session.execute(stmt, values[i : i + batch_size]).rowcount
+            # All rows exist if all were updated. Otherwise, since rows with unchanged
+            # data are not updated and not all drivers report the number of rows
+            # updated by an executemany, check which ones exist. The rows already
+            # updated are then rolled back together with the unit of work.
+            if n_updated != len(obj_ids) or not (
+                session.get_bind().dialect.supports_sane_multi_rowcount
+            ):
+                is_existing = self.exists_some(
+                    model_class,
+                    obj_ids,
+                    session=session,
+                    optimize_parameter_handling=self._is_id_join(obj_ids),
+                )
+                if not all(is_existing):
+                    invalid_ids = [x for x, y in zip(obj_ids, is_existing) if not y]
+                    invalid_ids_str = ", ".join([str(x) for x in invalid_ids])
+                    raise exc.InvalidIdsError(
+                        f"{model_class} object(s) do not exist: {invalid_ids_str}",
+                        ids=invalid_ids,
+                    )
+            SARepository._in_session_expire_rows(session, row_class, obj_ids)
+            return obj_ids
+
+        return self._execute_sa(session, _execute, kwargs)  # type: ignore[return-value]
+
+    def _get_row_values(
+        self, user_id: Hashable, model_class: Type, objs: list[Model]
+    ) -> tuple[list[str], list[dict[str, Any]]]:
+        """
+        Get the keys of the id, data and service metadata columns of the rows for the
+        objs and the values of these columns for each obj, for use in Core
+        statements.
+        """
+        mapper = self.get_mapper(model_class)
+        row_mapper = sa.inspect(mapper.row_class)
+        row_field_names = [
+            *mapper.get_row_field_names_by_set(FieldTypeSet.ID),
+            *mapper.get_row_field_names_by_set(FieldTypeSet.DATA),
+            *mapper.get_row_field_names_by_set(FieldTypeSet.SERVICE_METADATA),
+        ]
+        column_keys = [row_mapper.columns[x].key for x in row_field_names]
+        rows = self.to_sql(user_id, model_class, objs)
+        values = [
+            {x: getattr(y, z) for x, z in zip(column_keys, row_field_names)}
+            for y in rows
+        ]
+        return column_keys, values
+
+    @staticmethod
+    def _get_data_column_keys(
+        mapper: BaseSAMapper, column_keys: list[str]
+    ) -> tuple[str, list[str], list[str]]:
+        # Split the column keys into the id, the data and the other column keys
+        row_mapper = sa.inspect(mapper.row_class)
+        id_key = row_mapper.columns[
+            mapper.get_row_field_names_by_set(FieldTypeSet.ID)[0]
+        ].key
+        data_keys = {
+            row_mapper.columns[x].key
+            for x in mapper.get_row_field_names_by_set(FieldTypeSet.DATA)
+        }
+        return (
+            id_key,
+            [x for x in column_keys if x in data_keys],
+            [x for x in column_keys if x != id_key and x not in data_keys],
+        )
+
+    @staticmethod
+    def _get_update_values(table: sa.Table, row_class: Type) -> dict[str, Any]:
+        # Get the values of the columns that are set on each update, being those
+        # with an onupdate SQL expression and the version column
+        update_values = {
+            x.key: x.onupdate.arg
+            for x in table.c
+            if x.onupdate is not None and x.onupdate.is_clause_element
+        }
+        version_column = sa.inspect(row_class).version_id_col
+        if version_column is not None:
+            update_values[version_column.key] = version_column + 1
+        return update_values
+
+    @staticmethod
+    def _get_insert_defaults(table: sa.Table, column_keys: list[str]) -> dict:
+        # Get the scalar defaults of the columns that are not in column_keys
+        return {
+            x.key: x.default.arg
+            for x in table.c
+            if x.key not in column_keys
+            and x.default is not None
+            and x.default.is_scalar
+        }
+
+    @staticmethod
+    def _is_distinct_from(column: Any, value: Any) -> Any:
+        # Compare JSON as text, since e.g. PostgreSQL has no equality for JSON
+        if isinstance(column.type, sa.JSON):
+            return sa.cast(column, sa.Text).is_distinct_from(sa.cast(value, sa.Text))
+        return column.is_distinct_from(value)
+
     @staticmethod
-    def _select_with_id_join(
-        session: sa.orm.Session,
-        get_row_id: Callable[[Type], sa.Column],
+    def _get_update_statement(mapper: BaseSAMapper, column_keys: list[str]) -> Any:
+        # UPDATE ... WHERE id = :b_id, only for rows with changed data
+        row_class = mapper.row_class
+        table = row_class.__table__
+        id_key, data_keys, other_keys = SARepository._get_data_column_keys(
+            mapper, column_keys
+        )
+        params = {x: sa.bindparam(f"b_{x}", type_=table.c[x].type) for x in column_keys}
+        stmt = update(table).where(table.c[id_key] == params[id_key])
+        if data_keys:
+            stmt = stmt.where(
+                sa.or_(
+                    *[
+                        SARepository._is_distinct_from(table.c[x], params[x])
+                        for x in data_keys
+                    ]
+                )
+            )
+        return stmt.values(
+            {x: params[x] for x in data_keys + other_keys}
+            | SARepository._get_update_values(table, row_class)
+        )
+
+    @staticmethod
+    def _get_upsert_statement(
+        mapper: BaseSAMapper, column_keys: list[str], dialect: sa.Dialect
+    ) -> Any:
+        # Insert or, for an existing id, update only rows with changed data
+        row_class = mapper.row_class
+        table = row_class.__table__
+        id_key, data_keys, other_keys = SARepository._get_data_column_keys(
+            mapper, column_keys
+        )
+        if dialect.name in {"sqlite", "postgresql"}:
+            insert = sqlite.insert if dialect.name == "sqlite" else postgresql.insert
+            stmt = insert(table)
+            if not data_keys:
+                return stmt.on_conflict_do_nothing(index_elements=[table.c[id_key]])
+            return stmt.on_conflict_do_update(
+                index_elements=[table.c[id_key]],
+                set_={x: stmt.excluded[x] for x in data_keys + other_keys}
+                | SARepository._get_update_values(table, row_class),
+                where=sa.or_(
+                    *[
+                        SARepository._is_distinct_from(table.c[x], stmt.excluded[x])
+                        for x in data_keys
+                    ]
+                ),
+            )
+        if dialect.name != "mssql":
+            raise NotImplementedError(f"Upsert not implemented for {dialect.name}")
+
+        # MERGE statement, passing the rows as parameters of a VALUES clause
+        quote = dialect.identifier_preparer.quote
+        insert_keys = column_keys + list(
+            SARepository._get_insert_defaults(table, column_keys)
+        )
+        names = {x: quote(table.c[x].name) for x in insert_keys}
+        set_strs = [f"{names[x]} = source.{names[x]}" for x in data_keys + other_keys]
+        for column in table.c:
+            if column.onupdate is not None and column.onupdate.is_clause_element:
+                onupdate_str = column.onupdate.arg.compile(dialect=dialect)
+                set_strs.append(f"{quote(column.name)} = {onupdate_str}")
+        version_column = sa.inspect(row_class).version_id_col
+        if version_column is not None:
+            version_name = quote(version_column.name)
+            set_strs.append(f"{version_name} = target.{version_name} + 1")
+        distinct_strs = [
+            f"NOT EXISTS (SELECT target.{names[x]} INTERSECT SELECT source.{names[x]})"
+            for x in data_keys
+        ]
+        sql = (
+            f"MERGE {dialect.identifier_preparer.format_table(table)} WITH (HOLDLOCK)"
+            " AS target USING (VALUES ("
+            + ", ".join(f":{x}" for x in insert_keys)
+            + ")) AS source ("
+            + ", ".join(names[x] for x in insert_keys)
+            + f") ON target.{names[id_key]} = source.{names[id_key]}"
+        )
+        if data_keys:
+            sql += (
+                " WHEN MATCHED AND ("
+                + " OR ".join(distinct_strs)
+                + ") THEN UPDATE SET "
+                + ", ".join(set_strs)
+            )
+        sql += (
+            " WHEN NOT MATCHED THEN INSERT ("
+            + ", ".join(names[x] for x in insert_keys)
+            + ") VALUES ("
+            + ", ".join(f"source.{names[x]}" for x in insert_keys)
+            + ");"
+        )
+        return sa.text(sql).bindparams(
+            *[sa.bindparam(x, type_=table.c[x].type) for x in insert_keys]
+        )
+
+    @staticmethod
+    def _in_session_expire_rows(
+        session: Session, row_class: Type, obj_ids: list[Hashable]
+    ) -> None:
+        # Expire the rows in the session that were changed by a Core statement, so
+        # that they are read again when accessed
+        for obj_id in obj_ids:
+            row = session.identity_map.get(session.identity_key(row_class, obj_id))
+            if row is not None:
+                session.expire(row)
+
+    @staticmethod
+    def _in_session_delete(
+        session: Session,
         row_class: Type,
-        obj_ids: list[Hashable],
-    ) -> sa.sql.Select:
+        id_column: Any,
+        where_clause: Any | None,
+        return_id: bool = True,
+    ) -> list[Hashable] | None:
+        """
+        Delete the rows matching where_clause, or all rows if it is None, returning
+        the ids of the deleted rows if return_id is True. If the dialect supports it,
+        the ids are returned by the delete statement itself (RETURNING, or OUTPUT on
+        MS SQL Server). Otherwise they are selected first within the same session.
+        """
+        stmt = delete(row_class)
+        if where_clause is not None:
+            stmt = stmt.where(where_clause)
+        if not return_id:
+            session.execute(stmt)
+            return None
+        if session.get_bind().dialect.delete_returning:
+            return list(session.execute(stmt.returning(id_column)).scalars().all())
+        select_stmt = select(id_column)
+        if where_clause is not None:
+            select_stmt = select_stmt.where(where_clause)
+        row_ids = list(session.execute(select_stmt).scalars().all())
+        session.execute(stmt)
+        return row_ids
+
+    @contextmanager
+    def _in_session_get_where_clause_from_filter(
+        self, session: Session, row_class: Type, filter: Filter
+    ) -> Iterator[Any]:
+        """
+        Get the where clause for the filter, see get_where_clause_from_filter. The
+        where clause must be used within the context.
+
+        A non-inverted set filter with more members than id_join_threshold, e.g. on
+        a link field when cascading a delete, is joined with its members instead, see
+        _in_session_get_id_where_clause.
+        """
+        if (
+            isinstance(filter, (StringSetFilter, NumberSetFilter, UuidSetFilter))
+            and not filter.invert
+            and self._is_id_join(filter.members)
+        ):
+            with SARepository._in_session_get_id_where_clause(
+                session,
+                getattr(row_class, filter.get_key()),
+                list(filter.members),
+                True,
+            ) as where_clause:
+                yield where_clause
+            return
+        yield self.get_where_clause_from_filter(row_class, filter)
+
+    def _get_fields_loader(
+        self, model_class: Type[Model], fields: Iterable[str]
+    ) -> Callable[[Any], tuple]:
+        # Get a function that converts a row to the NamedTuple with the given fields
+        fields_class = BaseRepository.get_fields_class(model_class, fields)
+        load_values = self.get_mapper(model_class).get_fields_loader(fields)
+        return lambda x: fields_class._make(load_values(x))  # type: ignore[attr-defined]
+
+    @staticmethod
+    def _get_select_columns(
+        mapper: BaseSAMapper, trusted_load: bool, fields: Iterable[str] | None = None
+    ) -> tuple | None:
+        """
+        Get the columns to select instead of instances of the row class, if any: the
+        columns of the given fields plus the id column, or the columns to load the
+        objs from in a trusted load.
+        """
+        if fields:
+            id_field_name = mapper.model_class.ENTITY.id_field_name  # type: ignore[union-attr]
+            if id_field_name not in fields:
+                fields = [id_field_name, *fields]  # type: ignore[list-item]
+            return mapper.get_fields_columns(fields)
+        if trusted_load:
+            return mapper.get_load_columns()
+        return None
+
+    def _is_trusted_load(self, trusted_load: bool | None = None) -> bool:
+        """
+        Determine whether to load models from rows without validation, either as
+        given by trusted_load or, if that is None, by the trusted_load property.
+        """
+        return self._trusted_load if trusted_load is None else trusted_load
+
+    def _is_id_join(
+        self,
+        obj_ids: list[Hashable] | set[Hashable],
+        optimize_parameter_handling: bool | None = None,
+    ) -> bool:
         """
-        Implement a SELECT statement with an INNER JOIN to restrict to the obj_ids passed
-        using dialect-specific temporary table creation. Concept is generic and can
-        be implemented with essentially any SQL dialect but implementation specifics
-        vary; at present, only MS SQL Server is supported.
+        Determine whether to join with the obj_ids instead of passing them as
+        parameters, either as given by optimize_parameter_handling or, if that is
+        None, when there are more than id_join_threshold ids.
         """
+        if optimize_parameter_handling is not None:
+            return optimize_parameter_handling
+        if self._id_join_threshold is None:
+            return False
+        return len(obj_ids) > self._id_join_threshold
 
+    @staticmethod
+    @contextmanager
+    def _in_session_get_id_where_clause(
+        session: Session,
+        id_column: Any,
+        obj_ids: list[Hashable],
+        use_id_join: bool = False,
+    ) -> Iterator[Any]:
+        """
+        Get a where clause restricting id_column to the obj_ids passed. The where
+        clause must be used within the context.
+
+        If use_id_join is False, this is a parameterized IN clause. Otherwise the ids
+        are joined as a single array parameter that is unnested on PostgreSQL and as a
+        temporary table on other dialects, which is much faster for many ids and
+        avoids the limit on the number of parameters of e.g. MS SQL Server. Testing on
+        IlesSampleContext with MS SQL Server:
+          parameterized query on IlesResult: approx 20 rows per second
+          CTE method: approx 1,400 rows per second (10k rows)
+          temporary table method: approx 7,000 rows per second (10k rows)
+
+        The temporary table has a unique name per call, so that contexts can be
+        nested, and is dropped when leaving the context, also when an exception is
+        raised.
+        """
+        if not use_id_join or not obj_ids:
+            yield id_column.in_(obj_ids)
+            return
         dialect = session.get_bind().dialect
+        if dialect.name == "postgresql":
+            ids_param = sa.literal(list(obj_ids), postgresql.ARRAY(id_column.type))
+            yield id_column.in_(select(sa.func.unnest(ids_param)))
+            return
+
+        # Create the temporary table, which is local to the connection of the
+        # session. On MS SQL Server this is indicated by the name rather than by the
+        # TEMPORARY prefix.
+        suffix = uuid.uuid4().hex
         if dialect.name == "mssql":
-            # TODO: check if temp table exists and take a different name in that case
-            temp_table_name = f"#temp_{str(uuid.uuid4()).replace('-','_')}"
-            id_col_name = get_row_id(row_class).name
-            id_datatype = row_class.__table__.c[id_col_name].type
-            id_datatype_sql = id_datatype.compile(dialect=dialect)
-            # TODO: finalize this part
-            # Create the temp table
-            # we might think to introspect after CREATE TABLE, but that opens us up to session/database sync and lock issues...
-            # which we did experience in testing
-            temp_table_obj = sa.Table(
-                temp_table_name, row_class.metadata, sa.Column(id_col_name, id_datatype)
-            )
-            session.execute(
-                sa.text(
-                    f"CREATE TABLE {temp_table_name} ({id_col_name} {id_datatype_sql})"
-                )
-            )
-            # session.flush()  # need to be able to introspect!
-            # temp_table_obj = sa.Table(temp_table_name, row_class.metadata, autoload_with=session.get_bind().engine)
-            # hard-coded batch size; MS SQL Server limit is 2,100; we just use something reasonable
-            # no urgent need to turn hard-coding into a parameter as this is dialect-specific issues
-            # handled in dialect-specific code
-            batch_size = 1000
-            for i in range(0, len(obj_ids), batch_size):
-                oid_batch = obj_ids[i : i + batch_size]
-                values = [{id_col_name: v} for v in oid_batch]
-                session.execute(sa.insert(temp_table_obj), values)
-                session.flush()
+            temp_table_name = f"#temp_ids_{suffix}"
+            prefixes = []
         else:
-            raise NotImplementedError(
-                "Only MS SQL Server is supported by _select_with_id_join"
-            )
-
-        # Select with join to restrict to ids passed
-        sql_select = select(row_class).join(
-            temp_table_obj,
-            row_class.__table__.c[id_col_name] == temp_table_obj.c[id_col_name],
+            temp_table_name = f"temp_ids_{suffix}"
+            prefixes = ["TEMPORARY"]
+        temp_table = sa.Table(
+            temp_table_name,
+            sa.MetaData(),
+            sa.Column("id", id_column.type, primary_key=True),
+            prefixes=prefixes,
         )
-        return sql_select
+        connection = session.connection()
+        temp_table.create(connection)
+        uq_obj_ids = list(dict.fromkeys(obj_ids))
+        batch_size = SARepository.ID_JOIN_BATCH_SIZE
+        for i in range(0, len(uq_obj_ids), batch_size):
+            connection.execute(
+                sa.insert(temp_table),
+                [{"id": x} for x in uq_obj_ids[i : i + batch_size]],
+            )
+        try:
+            yield id_column.in_(select(temp_table.c.id))
+        except BaseException:
+            # Drop the table if the transaction still allows it, without masking
+            # the original exception
+            with suppress(sa.exc.SQLAlchemyError):
+                temp_table.drop(connection)
+            raise
+        temp_table.drop(connection)
 
     @staticmethod
     def _in_session_read_some(
@@ -865,42 +1882,31 @@ class SARepository(BaseRepository):
         row_class: Type,
         obj_ids: list[Hashable],
         optimize_parameter_handling: bool = False,
+        columns: tuple | None = None,
+        load_options: Sequence | None = None,
     ) -> tuple[list[Any], list[Hashable]]:
         """
         :param optimize_parameter_handling: if True, avoid parameterized query that using SQL's IN that is
-           more many parameters nonperformant by creating and joining with a temporary table instead
-           default = False, but possibly recommend to set dynamically based on number of parameters
+           more many parameters nonperformant by joining with the ids as a temporary
+           table or array instead, see _in_session_get_id_where_clause
+        :param columns: if given, select these columns, which must include the id
+           column, and return the result rows instead of instances of row_class, see
+           _get_select_columns
+        :param load_options: loader options for selecting instances of row_class,
+           e.g. to load linked rows through their relationships
         """
-        # n = len(obj_ids)
         # Get rows as list[(Row,)], convert to list[Row]
         get_row_id = mapper.get_row_id
-        if obj_ids and optimize_parameter_handling:
-            # TODO: finalize this part, remove the example
-            # One approach to optmization relative to parameterized query with many params
-            # is to create CTE and join with it; this improves performance relative to
-            # parameterized query with many params and avoids dialect issues and works with
-            # arbitrarily many parameters, but is less performant than temporary table
-            # method.
-            # Testing on IlesSampleContext:
-            #   parameterized query on IlesResult: approx 20 rows per second
-            #   CTE method: approx 1,400 rows per second (10k rows)
-            #   temporary table method: approx 7,000 rows per second (10k rows)
-            # Leaving here in case anyone wants to revisit
-            # create a SQLAlchemy CTE from the obj_ids passed as parameters
-            # union_stmt = sa.union_all(*[select(sa.literal(oid).label("obj_ids")) for oid in obj_ids])
-            # cte = union_stmt.cte("cte_parms")
-            # id_col_name = get_row_id(row_class).name
-            # sql_select = select(row_class).join(cte, row_class.__table__.c[id_col_name] == cte.c.obj_ids)
-
-            # Or.... the temporary table method
-            sql_select = SARepository._select_with_id_join(
-                session, get_row_id, row_class, obj_ids
-            )
+        if columns is None:
+            stmt = select(row_class).options(*(load_options or []))
         else:
-            sql_select = select(row_class).where(get_row_id(row_class).in_(obj_ids))
-
-        rows = session.execute(sql_select).all()
-        rows = [x[0] for x in rows]
+            stmt = select(*columns)
+        with SARepository._in_session_get_id_where_clause(
+            session, get_row_id(row_class), obj_ids, optimize_parameter_handling
+        ) as where_clause:
+            rows = session.execute(stmt.where(where_clause)).all()
+        if columns is None:
+            rows = [x[0] for x in rows]
         # Further process rows
         row_ids = [get_row_id(x) for x in rows]
         SARepository._in_session_verify_retrieved_ids(mapper, obj_ids, row_ids)
@@ -964,6 +1970,7 @@ class SARepository(BaseRepository):
         echo = kwargs.pop("echo", False)
         register_mappers = kwargs.pop("register_mappers", True)
         recreate_sqlite_file = kwargs.pop("recreate_sqlite_file", False)
+        text_index_columns: list[str] = kwargs.pop("text_index_columns", [])  # type: ignore[assignment]
         schema_names = {x.schema_name for x in entities if x.persistable}
 
         is_sqlite = str(connection_string).lower().startswith("sqlite:///")
@@ -989,6 +1996,11 @@ class SARepository(BaseRepository):
                 sa.exc.SAWarning,
             )
 
+            if len(schema_names) > 1:
+                raise NotImplementedError(
+                    "Multiple schemas: " + ", ".join(schema_names)
+                )
+
             # Create engine, creating the sqlite file(s) if needed
             engine = sa.create_engine("sqlite:///:memory:", echo=echo)
 
@@ -1000,19 +2012,20 @@ class SARepository(BaseRepository):
             ) -> None:
                 cursor = dbapi_connection.cursor()
                 cursor.execute("PRAGMA foreign_keys=ON")
-
-                cursor.close()
-
-            # Add each schema as a separate database, as sqlite does not support schemas
-            with engine.connect() as conn:
-                if len(schema_names) > 1:
-                    raise NotImplementedError(
-                        "Multiple schemas: " + ", ".join(schema_names)
-                    )
+                # Add each schema as a separate database, as sqlite does not support
+                # schemas. This is done for each connection, since the in-memory
+                # database has a connection per thread.
                 for schema_name in schema_names:
-                    conn.execute(
-                        sa.text(f"attach database '{sqlite_file}' as '{schema_name}';")
+                    cursor.execute(
+                        f"attach database '{sqlite_file}' as '{schema_name}';"
                     )
+                cursor.close()
+                # Register the function to match regular expressions, see
+                # get_where_clause_from_regex
+                dbapi_connection.create_function(
+                    "regex_match", 2, sqlite_regex_match, deterministic=True
+                )
+
         else:
             engine = EngineFactory.create_engine(connection_string, echo)
 
@@ -1039,6 +2052,8 @@ class SARepository(BaseRepository):
             metadata_set.add(db_model_class.metadata)
         for metadata in metadata_set:
             metadata.create_all(engine)
+        if text_index_columns:
+            SARepository.create_text_indexes(engine, text_index_columns)
 
         # Create repository
         repository = cls(
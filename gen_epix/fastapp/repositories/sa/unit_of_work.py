@@ -1,5 +1,6 @@
+from contextvars import ContextVar
 from types import TracebackType
-from typing import Self, Type
+from typing import Hashable, Self, Type
 
 from pydantic import ValidationError as PydanticValidationError
 from sqlalchemy import exc as sa_exc
@@ -8,24 +9,57 @@ from sqlalchemy.orm import Session
 from gen_epix.fastapp import exc
 from gen_epix.fastapp.unit_of_work import BaseUnitOfWork
 
+# Stacks of the units of work of the current thread or task, per context key. A
+# single context variable is used for all keys, since a context keeps a strong
+# reference to each context variable set in it and these should therefore not be
+# created per instance.
+_CONTEXT_STACKS: ContextVar[dict[Hashable, tuple[BaseUnitOfWork, ...]]] = ContextVar(
+    "sa_uow_context_stacks", default={}
+)
+
 
 class SAUnitOfWork(BaseUnitOfWork):
     """
     Unit of work class wrapping the SQLAlchemy session.
 
-    The context stack that can be passed during construction indicates whether work
+    The context key that can be passed during construction, typically identifying
+    the repository, refers to a stack of units of work that indicates whether work
     would be executed within another unit of work's context. If so, that context will
     be responsible for committing or rolling back the session and this unit of work will
     not commit or rollback on exit when used as a context manager. This avoids creating
-    nested sessions.
+    nested sessions. The stacks are kept in a context variable, so that each thread or
+    task has its own stack and concurrent units of work do not share a session.
     """
 
     def __init__(
-        self, session: Session, context_stack: list[BaseUnitOfWork] | None = None
+        self,
+        session: Session,
+        context_key: Hashable | None = None,
     ):
         super().__init__()
         self._session = session
-        self._context_stack = context_stack
+        self._context_key = context_key
+
+    @staticmethod
+    def get_context_stack(context_key: Hashable) -> tuple[BaseUnitOfWork, ...]:
+        """
+        Get the stack of units of work of the current thread or task for the context
+        key, with the innermost one last.
+        """
+        return _CONTEXT_STACKS.get().get(context_key, ())
+
+    @staticmethod
+    def _set_context_stack(
+        context_key: Hashable, context_stack: tuple[BaseUnitOfWork, ...]
+    ) -> None:
+        # Replace rather than update the dict, since it is shared with the contexts
+        # copied from the current one, and remove the key when the stack is empty
+        context_stacks = {
+            x: y for x, y in _CONTEXT_STACKS.get().items() if x != context_key
+        }
+        if context_stack:
+            context_stacks[context_key] = context_stack
+        _CONTEXT_STACKS.set(context_stacks)
 
     @property
     def session(self) -> Session:
@@ -81,8 +115,11 @@ class SAUnitOfWork(BaseUnitOfWork):
         raise NotImplementedError().with_traceback(traceback)
 
     def __enter__(self) -> Self:
-        if self._context_stack is not None:
-            self._context_stack.append(self)
+        if self._context_key is not None:
+            SAUnitOfWork._set_context_stack(
+                self._context_key,
+                SAUnitOfWork.get_context_stack(self._context_key) + (self,),
+            )
         self._is_managing_context = True
         return self
 
@@ -94,12 +131,13 @@ class SAUnitOfWork(BaseUnitOfWork):
     ) -> None:
         self._is_managing_context = False
         # Handle nested contexts
-        if self._context_stack is not None:
+        if self._context_key is not None:
             # Remove self from stack
-            assert self._context_stack[-1] is self
-            self._context_stack.pop()
+            context_stack = SAUnitOfWork.get_context_stack(self._context_key)
+            assert context_stack[-1] is self
+            SAUnitOfWork._set_context_stack(self._context_key, context_stack[:-1])
             # Check if nested context
-            if self._context_stack:
+            if len(context_stack) > 1:
                 # Nested context since stack is not empty -> do not commit or rollback,
                 # let the outer context handle it instead
                 return
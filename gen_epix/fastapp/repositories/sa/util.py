@@ -1,3 +1,5 @@
+import functools
+import re
 from typing import Any
 from uuid import UUID
 
@@ -63,6 +65,151 @@ def sqlite_utc_current_time(
     return "CURRENT_TIMESTAMP"
 
 
+class JsonValue(expression.FunctionElement):
+    """
+    The scalar value stored under a top-level key of a JSON column, as text. Use as
+    JsonValue(column, key). A missing key results in NULL.
+    """
+
+    type = sa.String()
+    inherit_cache = True
+
+    def __init__(self, column: Any, key: Any):
+        super().__init__(column, sa.literal(f'$."{key}"', sa.String()))
+        self.key = str(key)
+
+
+@compiles(JsonValue, "postgresql")
+def postgresql_json_value(element: JsonValue, compiler: SQLCompiler, **kw: dict) -> str:
+    column = list(element.clauses)[0]
+    return f"({compiler.process(column, **kw)} ->> {compiler.process(sa.literal(element.key, sa.String()), **kw)})"
+
+
+@compiles(JsonValue, "mssql")
+def mssql_json_value(element: JsonValue, compiler: SQLCompiler, **kw: dict) -> str:
+    return f"JSON_VALUE({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(JsonValue, "sqlite")
+def sqlite_json_value(element: JsonValue, compiler: SQLCompiler, **kw: dict) -> str:
+    return f"JSON_EXTRACT({compiler.process(element.clauses, **kw)})"
+
+
+class CastAsDate(expression.FunctionElement):
+    """
+    Cast an ISO formatted text value to a date. SQLite has no date type, so the value
+    is normalised to an ISO date string there instead, which compares correctly with
+    bound date values.
+    """
+
+    type = sa.Date()
+    inherit_cache = True
+
+
+@compiles(CastAsDate)
+def default_cast_as_date(element: CastAsDate, compiler: SQLCompiler, **kw: dict) -> str:
+    return f"CAST({compiler.process(element.clauses, **kw)} AS DATE)"
+
+
+@compiles(CastAsDate, "sqlite")
+def sqlite_cast_as_date(element: CastAsDate, compiler: SQLCompiler, **kw: dict) -> str:
+    return f"DATE({compiler.process(element.clauses, **kw)})"
+
+
+# Characters with a special meaning in a regular expression
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+# Regular expression constructs whose meaning differs between Python and
+# PostgreSQL, or that are not supported by the latter: extension notation other
+# than non-capturing groups, escapes other than character classes and escaped
+# special characters, "{,n}" quantifiers and POSIX bracket expressions
+_NON_PORTABLE_REGEX = re.compile(r"\(\?(?!:)|\\[^dDsSwW\W]|\{,|\[[:.=]")
+
+
+def get_regex_literal_prefix(pattern: str) -> str | None:
+    """
+    Get the string that a value must start with to match a regular expression with
+    re.match, if the regular expression is equivalent to such a prefix, i.e. if it
+    is an optionally anchored literal string, optionally followed by ".*". Returns
+    None otherwise.
+    """
+    if pattern.startswith("^"):
+        pattern = pattern[1:]
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            # An escaped special character is literal
+            if i + 1 == len(pattern) or pattern[i + 1] not in _REGEX_SPECIAL_CHARS:
+                break
+            prefix.append(pattern[i + 1])
+            i += 2
+        elif char in _REGEX_SPECIAL_CHARS:
+            break
+        else:
+            prefix.append(char)
+            i += 1
+    if pattern[i:] not in {"", ".*"}:
+        return None
+    return "".join(prefix)
+
+
+def is_portable_regex(pattern: str) -> bool:
+    """
+    Check if a regular expression only uses constructs that have the same meaning
+    in Python and in PostgreSQL advanced regular expressions.
+    """
+    return _NON_PORTABLE_REGEX.search(pattern) is None
+
+
+# Regular expressions for the text values that can be cast to a number or date
+# type without error on all dialects, excluding values that would overflow the
+# type. Dates must be valid ISO dates from year 1, as with date.fromisoformat.
+_INTEGER_REGEX = r"\s*[-+]?[0-9]{1,9}\s*$"
+_NUMERIC_REGEX = r"\s*[-+]?(?:[0-9]{1,%d}(?:\.[0-9]*)?|\.[0-9]+)\s*$"
+_DATE_REGEX = (
+    r"(?:[1-9][0-9]{3}|0[1-9][0-9]{2}|00[1-9][0-9]|000[1-9])-"
+    r"(?:(?:0[13578]|1[02])-(?:0[1-9]|[12][0-9]|3[01])"
+    r"|(?:0[469]|11)-(?:0[1-9]|[12][0-9]|30)"
+    r"|02-(?:0[1-9]|1[0-9]|2[0-8]))$"
+    r"|(?:[0-9]{2}(?:0[48]|[2468][048]|[13579][26])"
+    r"|(?:0[48]|[2468][048]|[13579][26])00)-02-29$"
+)
+
+
+def get_castable_regex(sa_type: TypeEngine) -> str | None:
+    """
+    Get the regular expression that a text value must match from its start to be
+    castable to the given SQL type, or None if the type is not supported. Numeric
+    types must have a precision and scale.
+    """
+    if isinstance(sa_type, sa.Integer):
+        return _INTEGER_REGEX
+    if isinstance(sa_type, sa.Numeric):
+        if sa_type.precision is None or sa_type.scale is None:
+            return None
+        return _NUMERIC_REGEX % (sa_type.precision - sa_type.scale)
+    if isinstance(sa_type, sa.Date):
+        return _DATE_REGEX
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_regex(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+
+def sqlite_regex_match(pattern: str | None, value: Any) -> bool | None:
+    """
+    SQLite function to match a value to a regular expression from its start, as
+    re.match does. A null value results in NULL.
+    """
+    if pattern is None or value is None:
+        return None
+    return _compile_regex(pattern).match(str(value)) is not None
+
+
 def get_pydantic_field_sa_type(fieldinfo: Any) -> TypeEngine:
     """
     Return a suitable SQLAlchemy type for a Pydantic field.
@@ -1,13 +1,16 @@
 import abc
+import collections
+import functools
 import uuid
 from itertools import chain
-from typing import Callable, Hashable, Iterable, Type
+from operator import attrgetter
+from typing import Any, Callable, Hashable, Iterable, Type
 
 from gen_epix.fastapp import exc
 from gen_epix.fastapp.enum import CrudOperation
 from gen_epix.fastapp.model import Model
 from gen_epix.fastapp.unit_of_work import BaseUnitOfWork
-from gen_epix.filter import Filter
+from gen_epix.filter import BooleanOperator, CompositeFilter, Filter, UuidSetFilter
 
 
 class BaseRepository(abc.ABC):
@@ -44,6 +47,17 @@ class BaseRepository(abc.ABC):
         applied to read and delete all operations. The filter must have keys that
         correspond to the row class fields and must be convertable into a where clause,
         and can e.g. be created by the split_filter method.
+        Read all operations can be paginated by passing limit and/or cursor as kwargs,
+        in which case the results are ordered by id and only the (at most) limit
+        results with an id greater than the cursor id are returned.
+        Read all operations can be streamed by passing batch_size as kwarg, in which
+        case an iterator of lists of at most batch_size results is returned. The
+        results are read as the iterator is consumed, in a single transaction of its
+        own, so that they need not all be held in memory at once.
+        Read operations can return only some fields of each obj by passing their names
+        as the fields kwarg, in which case a NamedTuple with those fields is returned
+        per obj instead of a model, see get_fields_class. Linked objs are then not
+        cascade read.
         """
         raise NotImplementedError()
 
@@ -65,6 +79,53 @@ class BaseRepository(abc.ABC):
         """
         raise NotImplementedError()
 
+    def delete_by_filter(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: Hashable | None,
+        model_class: Type[Model],
+        filter: Filter,
+        **kwargs: dict,
+    ) -> list[Hashable] | None:
+        """
+        Delete all objs matching the filter, which must have keys that correspond to
+        the model class fields. The filter is split with split_filter, so that the
+        part that can be applied by the repository directly is used to select the
+        objs to delete, e.g. as the where clause of a single delete statement. The
+        ids of the deleted objs are returned if return_id is passed as kwarg.
+        """
+        repository_filter, service_filter = self.split_filter(model_class, filter)
+        return self.crud(  # type: ignore[return-value]
+            uow,
+            user_id,
+            model_class,
+            None,
+            None,
+            CrudOperation.DELETE_ALL,
+            filter=repository_filter,
+            obj_filter=service_filter,
+            **kwargs,
+        )
+
+    def _read_by_filter(
+        self,
+        uow: BaseUnitOfWork,
+        user_id: Hashable | None,
+        model_class: Type[Model],
+        filter: Filter,
+    ) -> list[Model]:
+        repository_filter, service_filter = self.split_filter(model_class, filter)
+        return self.crud(  # type: ignore[return-value]
+            uow,
+            user_id,
+            model_class,
+            None,
+            None,
+            CrudOperation.READ_ALL,
+            filter=repository_filter,
+            obj_filter=service_filter,
+        )
+
     def update_association(
         self,
         uow: BaseUnitOfWork,
@@ -93,12 +154,13 @@ class BaseRepository(abc.ABC):
         get_association_id: Callable[[Model], Hashable] = lambda x: getattr(
             x, id_field_name
         )
-        excluded_obj_ids = {get_association_id(x) for x in excluded_association_objs}
-        excluded_id_pairs = {get_id_pair(x) for x in excluded_association_objs}
 
         def get_id_pair(obj: Model) -> tuple[Hashable, Hashable]:
             return (getattr(obj, link_field_name1), getattr(obj, link_field_name2))
 
+        excluded_obj_ids = {get_association_id(x) for x in excluded_association_objs}
+        excluded_id_pairs = {get_id_pair(x) for x in excluded_association_objs}
+
         # Special case: no association objects, i.e. delete all associations of either obj1 or obj2
         if not association_objs:
             # Go over obj_id1 and obj_id2, only one of both should be provided
@@ -107,27 +169,22 @@ class BaseRepository(abc.ABC):
             ):
                 if obj_id is None:
                     continue
-                to_delete_obj_ids = [
-                    get_association_id(x)  # type: ignore
-                    for x in self.crud(  # type: ignore
-                        uow,
-                        user_id,
-                        model_class,
-                        None,
-                        None,
-                        CrudOperation.READ_ALL,
-                    )
-                    if getattr(x, link_field_name) == obj_id
-                    and get_association_id(x) not in excluded_obj_ids  # type: ignore
-                ]
-                self.crud(
-                    uow,
-                    user_id,
-                    model_class,
-                    None,
-                    to_delete_obj_ids,
-                    CrudOperation.DELETE_SOME,
+                filter: Filter = UuidSetFilter(
+                    key=link_field_name, members={obj_id}  # type: ignore[arg-type]
                 )
+                if excluded_obj_ids:
+                    filter = CompositeFilter(
+                        filters=[
+                            filter,
+                            UuidSetFilter(
+                                key=id_field_name,
+                                members=excluded_obj_ids,  # type: ignore[arg-type]
+                                invert=True,
+                            ),
+                        ],
+                        operator=BooleanOperator.AND,
+                    )
+                self.delete_by_filter(uow, user_id, model_class, filter)
             return []
 
         # Get obj_id_pairs and verify uniqueness
@@ -163,19 +220,31 @@ class BaseRepository(abc.ABC):
                     f"Model {model_class.__name__}: association object id pairs contains some excluded pairs",
                 )
 
-        # Retrieve non-excluded existing objects
-        # TODO: replace retrieval of existing objects with a more efficient method
-        existing_objs: list[Model] = [
-            x  # type: ignore
-            for x in self.crud(  # type: ignore
-                uow, user_id, model_class, None, None, CrudOperation.READ_ALL
+        # Retrieve non-excluded existing objects, being all the objects linked to obj1
+        # or obj2 if provided and otherwise those with the same id pairs
+        if obj_id1 is not None:
+            filter = UuidSetFilter(
+                key=link_field_name1, members={obj_id1}  # type: ignore[arg-type]
             )
-            if get_id_pair(x) in obj_dict  # type: ignore
-        ]
+        elif obj_id2 is not None:
+            filter = UuidSetFilter(
+                key=link_field_name2, members={obj_id2}  # type: ignore[arg-type]
+            )
+        else:
+            filter = UuidSetFilter(
+                key=link_field_name1,
+                members={x[0] for x in obj_id_pairs},  # type: ignore[arg-type]
+            )
+        existing_objs: list[Model] = self._read_by_filter(
+            uow, user_id, model_class, filter
+        )
+        if obj_id1 is None and obj_id2 is None:
+            existing_objs = [x for x in existing_objs if get_id_pair(x) in obj_dict]
         existing_obj_dict: dict[Hashable, Model] = {
             get_id_pair(x): x
             for x in existing_objs
             if get_id_pair(x) not in excluded_id_pairs
+            and get_association_id(x) not in excluded_obj_ids
         }
 
         # Determine association objects to create, update or delete
@@ -203,6 +272,7 @@ class BaseRepository(abc.ABC):
                 to_create_objs,
                 None,
                 CrudOperation.CREATE_SOME,
+                return_id=True,
             )
 
         # Update association objects
@@ -221,6 +291,7 @@ class BaseRepository(abc.ABC):
                 to_update_objs,
                 None,
                 CrudOperation.UPDATE_SOME,
+                return_id=True,
             )
 
         # Delete association objects
@@ -267,6 +338,71 @@ class BaseRepository(abc.ABC):
                 ids=duplicate_ids,
             )
 
+    @staticmethod
+    def get_fields_class(
+        model_class: Type[Model], fields: Iterable[str]
+    ) -> Type[tuple]:
+        """
+        Get the NamedTuple class that is returned per obj by read operations with the
+        fields kwarg, having the given fields in the same order. Fields whose name is
+        not a valid NamedTuple field name, such as names starting with an underscore,
+        can only be accessed by position.
+        """
+        field_names = tuple(fields)
+        invalid_field_names = [
+            x for x in field_names if x not in model_class.model_fields
+        ]
+        if not field_names or invalid_field_names:
+            invalid_field_names_str = ", ".join(invalid_field_names)
+            raise exc.InvalidArgumentsError(
+                f"Model {model_class.__name__}: invalid fields: {invalid_field_names_str}"
+            )
+        return BaseRepository._get_fields_class(model_class, field_names)
+
+    @staticmethod
+    def to_fields(
+        model_class: Type[Model], objs: Iterable[Model], fields: Iterable[str]
+    ) -> list[tuple]:
+        """
+        Convert objs to the NamedTuples with the given fields that are returned by
+        read operations with the fields kwarg, see get_fields_class.
+        """
+        field_names = tuple(fields)
+        fields_class = BaseRepository.get_fields_class(model_class, field_names)
+        get_values: Callable[[Model], tuple] = (
+            attrgetter(*field_names)
+            if len(field_names) > 1
+            else lambda x: (getattr(x, field_names[0]),)
+        )
+        return [fields_class._make(get_values(x)) for x in objs]  # type: ignore[attr-defined]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _get_fields_class(
+        model_class: Type[Model], field_names: tuple[str, ...]
+    ) -> Type[tuple]:
+        return collections.namedtuple(  # type: ignore[return-value]
+            f"{model_class.__name__}Fields", field_names, rename=True
+        )
+
+    @staticmethod
+    def get_page(
+        objs: Iterable[Any],
+        get_obj_id: Callable[[Any], Hashable],
+        limit: int | None = None,
+        cursor: Hashable | None = None,
+    ) -> list[Any]:
+        """
+        Get the page of objs ordered by id with an id greater than the cursor id, of at
+        most limit objs. Used to paginate objs that have been retrieved in full.
+        """
+        objs = sorted(objs, key=get_obj_id)  # type: ignore[arg-type]
+        if cursor is not None:
+            objs = [x for x in objs if get_obj_id(x) > cursor]  # type: ignore[operator]
+        if limit is not None:
+            objs = objs[:limit]
+        return objs
+
     @staticmethod
     def verify_crud_args(
         model_class: Type[Model],
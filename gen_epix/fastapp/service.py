@@ -3,7 +3,7 @@ from __future__ import annotations
 import abc
 import datetime
 import logging
-from typing import Any, Callable, Hashable, Iterable, Type
+from typing import Any, Callable, Hashable, Iterable, Iterator, Type
 
 from gen_epix.fastapp import exc
 from gen_epix.fastapp.app import App
@@ -218,6 +218,7 @@ class BaseService(abc.ABC):
             # Call repository CRUD operation
             retval = self.crud_repository(uow, cmd, links=same_service_links)
 
+        def _finish(retval: Any) -> Any:
             # Cascade read objects handled by other services
             if (
                 cascade_read
@@ -228,23 +229,29 @@ class BaseService(abc.ABC):
                     objs = [retval]  # type: ignore
                 else:
                     objs = retval  # type: ignore
+                # Group the links by linked model class, so that the linked objs of
+                # each model class are read with a single command
+                links_by_model_class: dict[Type[Model], list[Link]] = {}
                 for link in other_service_links.values():
                     if link.relationship_field_name is None:
                         continue
-                    # Read in unique linked objects for this relationship_field_name
-                    link_map: dict = {}
-                    for i, obj in enumerate(objs):
-                        link_obj_id = getattr(obj, link.link_field_name)
-                        if link_obj_id:
-                            idxs = link_map.get(link_obj_id, [])
-                            if not idxs:
-                                link_map[link_obj_id] = idxs
-                            idxs.append(i)
-                    link_map_ids = list(link_map.keys())
+                    links_by_model_class.setdefault(link.link_model_class, []).append(
+                        link
+                    )
+                for link_model_class, links in links_by_model_class.items():
+                    # Read in unique linked objects for these links
+                    link_map_ids = list(
+                        dict.fromkeys(
+                            link_obj_id
+                            for link in links
+                            for obj in objs
+                            if (link_obj_id := getattr(obj, link.link_field_name))
+                        )
+                    )
                     if not link_map_ids:
                         continue
-                    cmd = self._app.domain.get_crud_command_for_model(
-                        link.link_model_class
+                    link_cmd = self._app.domain.get_crud_command_for_model(
+                        link_model_class
                     )(
                         user=cmd.user,
                         objs=None,
@@ -253,17 +260,35 @@ class BaseService(abc.ABC):
                         **{
                             x: y
                             for x, y in cmd.props.items()
-                            if x not in {"cascade_read"}
+                            if x not in {"cascade_read", "batch_size"}
                         },
                     )
-                    linked_objects = self._app.handle(cmd)
+                    linked_objs = dict(zip(link_map_ids, self._app.handle(link_cmd)))
                     # Add linked objects to their parent(s)
-                    for link_obj_id, linked_obj in zip(link_map_ids, linked_objects):
-                        for idx in link_map[link_obj_id]:
-                            setattr(objs[idx], link.relationship_field_name, linked_obj)
-        # Call AFTER listeners
-        for listener in self._crud_listeners.get((type(cmd), EventTiming.AFTER), []):
-            _, retval = listener(self, cmd, retval)
+                    for link in links:
+                        for obj in objs:
+                            link_obj_id = getattr(obj, link.link_field_name)
+                            if link_obj_id:
+                                setattr(
+                                    obj,
+                                    link.relationship_field_name,
+                                    linked_objs[link_obj_id],
+                                )
+            # Call AFTER listeners
+            for listener in self._crud_listeners.get(
+                (type(cmd), EventTiming.AFTER), []
+            ):
+                _, retval = listener(self, cmd, retval)
+            return retval
+
+        # A streamed read all returns batches, which are finished as they are
+        # consumed, unless linked objs are to be read by other services, since their
+        # commands are to be handled as part of this command
+        if isinstance(retval, Iterator):
+            if not cascade_read or not other_service_links:
+                return (_finish(x) for x in retval)  # type: ignore[return-value]
+            retval = [x for y in retval for x in y]
+        retval = _finish(retval)
 
         if self._logger and self._logger.level <= logging.DEBUG:
             self._logger.debug(
@@ -350,9 +375,33 @@ class BaseService(abc.ABC):
             links=links,
             **props,
         )
+        if cmd.operation == CrudOperation.READ_ALL:
+            BaseService.set_next_cursor(cmd, retval)  # type: ignore[arg-type]
 
         return retval
 
+    @staticmethod
+    def set_next_cursor(cmd: CrudCommand, objs: list[Model] | list[Hashable]) -> None:
+        """
+        Set the cursor for the next page in the props of a paginated read all command,
+        being the id of the last obj (or id) if the page is full.
+        """
+        limit = cmd.props.get("limit")
+        if limit is None or not isinstance(objs, list) or len(objs) < limit:
+            return
+        cmd.props["next_cursor"] = BaseService._get_page_obj_id_getter(cmd, objs)(
+            objs[-1]
+        )
+
+    @staticmethod
+    def _get_page_obj_id_getter(
+        cmd: CrudCommand, objs: list[Model] | list[Hashable]
+    ) -> Callable[[Any], Hashable]:
+        if objs and isinstance(objs[0], Model):
+            assert cmd.MODEL_CLASS.ENTITY is not None
+            return cmd.MODEL_CLASS.ENTITY.get_obj_id
+        return lambda x: x
+
     def update_association(
         self, cmd: UpdateAssociationCommand, **kwargs: dict
     ) -> list[Hashable] | list[Model] | None:
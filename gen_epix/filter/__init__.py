@@ -44,6 +44,9 @@ from gen_epix.filter.number_range import (
 )
 from gen_epix.filter.number_set import NumberSetFilter as NumberSetFilter
 from gen_epix.filter.number_set import TypedNumberSetFilter as TypedNumberSetFilter
+
+# Import filter utilities
+from gen_epix.filter.optimizer import FilterOptimizer as FilterOptimizer
 from gen_epix.filter.partial_date_range import (
     PartialDateRangeFilter as PartialDateRangeFilter,
 )
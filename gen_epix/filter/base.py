@@ -1,10 +1,25 @@
 import abc
-from typing import Annotated, Any, Callable, Hashable, Iterable, Iterator, Literal, Self
+import math
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    Self,
+)
 
-from pydantic import BaseModel, Field, WithJsonSchema
+import numpy as np
+from pydantic import BaseModel, Field, PlainSerializer, WithJsonSchema, WrapSerializer
 
 from gen_epix.filter.enum import FilterType
 
+# Types of values that model_dump converts rather than returning as is
+_DUMPED_VALUE_TYPES = (BaseModel, dict, list, tuple, set, frozenset)
+
 
 class Filter(BaseModel):
     """
@@ -120,25 +135,9 @@ class Filter(BaseModel):
         Returns:
             bool: True if the row matches the filter, False otherwise.
         """
-        # Match if both key exists, value not null and value matches
-        if self.key is None:
-            raise ValueError("Key must be set to apply filter to a row.")
-        if not map_fun:
-            map_fun = lambda x: x
-        key = self.key
-        row_dict = row.model_dump() if is_model else row
-        if na_values is None:
-            return (
-                key in row_dict
-                and row_dict[key] is not None
-                and self._match(map_fun(row_dict[key]))
-            ) ^ self.invert
-        else:
-            return (
-                key in row_dict
-                and row_dict[key] not in na_values
-                and self._match(map_fun(row_dict[key]))
-            ) ^ self.invert
+        return self.compile(na_values=na_values, map_fun=map_fun, is_model=is_model)(
+            row
+        )
 
     def match_rows(
         self,
@@ -158,28 +157,11 @@ class Filter(BaseModel):
         Yields:
             bool: True if the row matches the filter, False otherwise.
         """
-        # Match if both key exists, value not null and value matches
-        if self.key is None:
-            raise ValueError("Key must be set to apply filter to a row.")
-        if not map_fun:
-            map_fun = lambda x: x
-        key = self.key
-        if na_values is None:
-            for row in rows:
-                row_dict = row.model_dump() if is_model else row
-                yield (
-                    key in row_dict
-                    and row_dict[key] is not None
-                    and self._match(map_fun(row_dict[key]))
-                ) ^ self.invert
-        else:
-            for row in rows:
-                row_dict = row.model_dump() if is_model else row
-                yield (
-                    key in row_dict
-                    and row_dict[key] not in na_values
-                    and self._match(map_fun(row_dict[key]))
-                ) ^ self.invert
+        match_row = self.compile(
+            na_values=na_values, map_fun=map_fun, is_model=is_model
+        )
+        for row in rows:
+            yield match_row(row)
 
     def filter_rows(
         self,
@@ -191,30 +173,278 @@ class Filter(BaseModel):
         """
         Analogous to match_rows, but yields the rows that match the filter instead of a bool.
         """
-        # Match if both key exists, value not null and value matches
+        match_row = self.compile(
+            na_values=na_values, map_fun=map_fun, is_model=is_model
+        )
+        for row in rows:
+            if match_row(row):
+                yield row
+
+    def compile(
+        self,
+        na_values: set[Any] | None = None,
+        map_fun: Callable[[Any], Any] | None = None,
+        is_model: bool = False,
+    ) -> Callable[[dict[Hashable, Any | None] | BaseModel], bool]:
+        """
+        Compile the filter into a function that checks if a row matches the filter,
+        equivalent to match_row. The key, na_values, map_fun and invert are bound
+        once, so that only the checks that apply remain to be done for each row. The
+        function does not reflect any later change to the filter.
+
+        Args:
+            na_values (set[Any] | None, optional): Set of values to be considered as NA values. Defaults to None.
+            map_fun (Callable[[Any], Any] | None, optional): Function to be applied to each value before matching. Defaults to None.
+            is_model (bool, optional): Whether the rows are models instead of dicts. Defaults to False.
+
+        Returns:
+            Callable[[dict[Hashable, Any | None] | BaseModel], bool]: The function to check a row.
+        """
         if self.key is None:
             raise ValueError("Key must be set to apply filter to a row.")
-        if not map_fun:
-            map_fun = lambda x: x
+        return self._compile_row_function(
+            self._compile_row_match(na_values, map_fun), is_model
+        )
+
+    def _compile_row_match(
+        self,
+        na_values: set[Any] | None = None,
+        map_fun: Callable[[Any], Any] | None = None,
+    ) -> Callable[[dict[Hashable, Any | None]], bool]:
+        """
+        Compile the function to check, for a row dict, if both key exists, value not
+        NA and value matches, without applying invert.
+        """
         key = self.key
+        match = self._match
+        if map_fun:
+            match_value = match
+            match = lambda x: match_value(map_fun(x))
         if na_values is None:
-            for row in rows:
-                row_dict = row.model_dump() if is_model else row
-                if (
-                    key in row_dict
-                    and row_dict[key] is not None
-                    and self._match(map_fun(row_dict[key]))
-                ) ^ self.invert:
-                    yield row
+
+            def match_row(row: dict[Hashable, Any | None]) -> bool:
+                value = row.get(key)
+                return value is not None and match(value)
+
         else:
-            for row in rows:
-                row_dict = row.model_dump() if is_model else row
-                if (
-                    key in row_dict
-                    and row_dict[key] not in na_values
-                    and self._match(map_fun(row_dict[key]))
-                ) ^ self.invert:
-                    yield row
+
+            def match_row(row: dict[Hashable, Any | None]) -> bool:
+                return key in row and row[key] not in na_values and match(row[key])
+
+        return match_row
+
+    def _compile_row_exists(
+        self, na_values: set[Any] | None = None
+    ) -> Callable[[dict[Hashable, Any | None]], bool]:
+        """
+        Compile the function to check, for a row dict, if both key exists and value
+        not NA.
+        """
+        key = self.key
+        if na_values is None:
+            return lambda x: x.get(key) is not None
+        return lambda x: key in x and x[key] not in na_values
+
+    def _compile_row_function(
+        self,
+        match_row: Callable[[dict[Hashable, Any | None]], bool],
+        is_model: bool,
+    ) -> Callable[[dict[Hashable, Any | None] | BaseModel], bool]:
+        if is_model:
+            # Only get the fields used by the filter rather than dumping the model
+            get_fields = Filter.compile_model_fields_getter(self.get_keys())
+            match_dict = match_row
+            match_row = lambda x: match_dict(get_fields(x))
+        if self.invert:
+            return lambda x: not match_row(x)
+        return match_row
+
+    @staticmethod
+    def compile_model_fields_getter(
+        keys: Iterable[Hashable],
+    ) -> Callable[[BaseModel], dict[Hashable, Any]]:
+        """
+        Compile a function that gets the given fields of a model as a dict, equal to
+        the corresponding items of model.model_dump(). Only these fields are read,
+        and only fields whose value model_dump converts, such as nested models,
+        containers and fields with a serializer, are dumped, each on its own.
+        """
+        keys = [x for x in dict.fromkeys(keys) if isinstance(x, str)]
+        getters_by_model_class: dict[type, list[tuple[str, bool]]] = {}
+
+        def get_fields(model: BaseModel) -> dict[Hashable, Any]:
+            model_class = type(model)
+            getters = getters_by_model_class.get(model_class)
+            if getters is None:
+                getters = Filter._get_model_field_getters(model_class, keys)
+                getters_by_model_class[model_class] = getters
+            fields: dict[Hashable, Any] = {}
+            for key, is_dumped in getters:
+                value = getattr(model, key)
+                if is_dumped or isinstance(value, _DUMPED_VALUE_TYPES):
+                    value = model.model_dump(include={key})[key]
+                fields[key] = value
+            return fields
+
+        return get_fields
+
+    @staticmethod
+    def _get_model_field_getters(
+        model_class: type[BaseModel], keys: list[str]
+    ) -> list[tuple[str, bool]]:
+        """
+        Get, for each key that model_dump includes, the key and whether its value
+        is always to be dumped because it has a serializer.
+        """
+        serialized_fields = {
+            y
+            for x in model_class.__pydantic_decorators__.field_serializers.values()
+            for y in x.info.fields
+        }
+        getters = []
+        for key in keys:
+            field_info = model_class.model_fields.get(key)
+            if field_info is not None:
+                if field_info.exclude:
+                    continue
+                getters.append(
+                    (
+                        key,
+                        key in serialized_fields
+                        or any(
+                            isinstance(x, (PlainSerializer, WrapSerializer))
+                            for x in field_info.metadata
+                        ),
+                    )
+                )
+            elif key in model_class.model_computed_fields:
+                getters.append((key, False))
+        return getters
+
+    def match_batch(
+        self,
+        columns: Mapping[Hashable, Any],
+        na_values: set[Any] | None = None,
+        map_fun: Callable[[Any], Any] | None = None,
+    ) -> np.ndarray:
+        """
+        Check if each row in a batch of rows, given as columns, matches the filter.
+        Equivalent to match_rows, but evaluating each column at once rather than row
+        by row.
+
+        Args:
+            columns (Mapping[Hashable, Any]): The columns by key, each a numpy array, pyarrow array or sequence with one value per row. A missing column is equivalent to the key not existing in any row.
+            na_values (set[Any] | None, optional): Set of values to be considered as NA values. Defaults to None.
+            map_fun (Callable[[Any], Any] | None, optional): Function to be applied to each value before matching. Defaults to None.
+
+        Returns:
+            np.ndarray: A boolean array with, for each row, True if the row matches the filter, False otherwise.
+        """
+        if self.key is None:
+            raise ValueError("Key must be set to apply filter to a row.")
+        return self._get_batch_masks(columns, na_values, map_fun)[1] ^ self.invert
+
+    @staticmethod
+    def get_columns(
+        rows: Iterable[dict[Hashable, Any | None] | BaseModel],
+        keys: Iterable[Hashable],
+        is_model: bool = False,
+    ) -> dict[Hashable, np.ndarray]:
+        """
+        Convert rows to the columns with the given keys, for use in match_batch. A
+        key that does not exist in a row results in a None value.
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        if is_model:
+            get_fields = Filter.compile_model_fields_getter(keys)
+            rows = [get_fields(x) for x in rows]
+        return {
+            x: np.fromiter((y.get(x) for y in rows), dtype=object, count=len(rows))
+            for x in set(keys)
+        }
+
+    @staticmethod
+    def get_n_rows(columns: Mapping[Hashable, Any]) -> int:
+        for values in columns.values():
+            return len(values)
+        return 0
+
+    @staticmethod
+    def to_array(values: Any) -> np.ndarray:
+        """
+        Convert a column to a numpy array. Columns that are not a numpy or pyarrow
+        array are converted to an array of objects, so that their values are
+        unchanged.
+        """
+        if isinstance(values, np.ndarray):
+            return values
+        if hasattr(values, "null_count") and hasattr(values, "to_pylist"):
+            # pyarrow array, converted to objects if there are nulls so that these
+            # become None
+            if values.null_count:
+                return np.fromiter(values.to_pylist(), dtype=object, count=len(values))
+            return values.to_numpy(zero_copy_only=False)
+        if not isinstance(values, list):
+            values = list(values)
+        return np.fromiter(values, dtype=object, count=len(values))
+
+    @staticmethod
+    def get_not_na_mask(
+        values: np.ndarray, na_values: set[Any] | None = None
+    ) -> np.ndarray:
+        """
+        Get a boolean array with, for each value, True if the value is not None, or
+        not in na_values if given.
+        """
+        if na_values is None:
+            if values.dtype == object:
+                return np.not_equal(values, None)
+            # Arrays of a native type cannot contain None
+            return np.ones(len(values), dtype=bool)
+        is_not_na = np.fromiter(
+            (x not in na_values for x in values), dtype=bool, count=len(values)
+        )
+        if values.dtype.kind == "f" and any(
+            isinstance(x, float) and math.isnan(x) for x in na_values
+        ):
+            is_not_na &= ~np.isnan(values)
+        return is_not_na
+
+    def _get_batch_masks(
+        self,
+        columns: Mapping[Hashable, Any],
+        na_values: set[Any] | None = None,
+        map_fun: Callable[[Any], Any] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get, for each row, whether the key exists and the value is not NA, and
+        whether in addition the value matches the filter, without applying invert.
+        """
+        if self.key not in columns:
+            is_not_na = np.zeros(Filter.get_n_rows(columns), dtype=bool)
+            return is_not_na, is_not_na
+        values = Filter.to_array(columns[self.key])
+        is_not_na = Filter.get_not_na_mask(values, na_values)
+        is_match = np.zeros(len(values), dtype=bool)
+        idx = np.flatnonzero(is_not_na)
+        if len(idx):
+            values = values[idx]
+            if map_fun:
+                values = np.frompyfunc(map_fun, 1, 1)(values)
+            is_match[idx] = self._match_batch(values)
+        return is_not_na, is_match
+
+    def _match_batch(self, values: np.ndarray) -> np.ndarray:
+        """
+        Check if each value in an array of non-NA values matches the filter. To be
+        overridden by subclasses that can evaluate the array at once, otherwise
+        _match is applied to each value.
+        """
+        return Filter._apply(self._match, values)
+
+    @staticmethod
+    def _apply(fun: Callable[[Any], Any], values: np.ndarray) -> np.ndarray:
+        return np.frompyfunc(fun, 1, 1)(values).astype(bool)
 
     @abc.abstractmethod
     def _match(self, value: Any) -> bool:
@@ -240,6 +470,9 @@ class Filter(BaseModel):
     def get_key(self) -> Hashable:
         return self.key
 
+    def get_keys(self) -> list[Hashable]:
+        return [self.key]
+
     def __call__(
         self,
         data: Iterable[Any],
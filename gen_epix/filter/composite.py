@@ -3,18 +3,9 @@
 
 from __future__ import annotations
 
-from typing import (
-    Annotated,
-    Any,
-    Callable,
-    Generator,
-    Hashable,
-    Iterable,
-    Iterator,
-    Literal,
-    Self,
-)
+from typing import Annotated, Any, Callable, Hashable, Literal, Mapping, Self
 
+import numpy as np
 from pydantic import BaseModel, Field, model_validator
 
 from gen_epix.filter import enum
@@ -77,77 +68,36 @@ class CompositeFilter(Filter):
             raise AssertionError("operator must be AND or OR for more than 2 filters.")
         # Generate the function to check if a value matches the composite filter
         # The function is generated instead of defined to be able to optimize the check
-        # Analogously, generate the function to check if a separate value for each
-        # filter
         if self.operator == enum.BooleanOperator.NOT:
             self._match = lambda x: not self.filters[0]._match(x)  # type: ignore
-            self._match_row = lambda x, y: x and not self.filters[0]._match(next(y))  # type: ignore
         elif self.operator == enum.BooleanOperator.AND:
             self._match = lambda x: all(filter._match(x) for filter in self.filters)  # type: ignore
-            # TODO: improve performance by not using filter.match_row for nested composite filter
-            self._match_row = lambda x, y: all(  # type: ignore
-                a
-                and (filter.match_row(b) if filter._is_composite else filter._match(b))
-                for a, b, filter in zip(x, y, self.filters)
-            )
         elif self.operator == enum.BooleanOperator.OR:
             self._match = lambda x: any(filter._match(x) for filter in self.filters)  # type: ignore
-            # TODO: improve performance by not using filter.match_row for nested composite filter
-            self._match_row = lambda x, y: any(  # type: ignore
-                a
-                and (filter.match_row(b) if filter._is_composite else filter._match(b))
-                for a, b, filter in zip(x, y, self.filters)
-            )
         elif self.operator == enum.BooleanOperator.XOR:
             self._match = lambda x: self.filters[0]._match(x) != self.filters[1]._match(  # type: ignore
                 x
             )
-            self._match_row = lambda x, y: all(x) and self.filters[0]._match(  # type: ignore
-                next(y)  # type: ignore
-            ) != self.filters[
-                1
-            ]._match(
-                next(y)  # type: ignore
-            )
         elif self.operator == enum.BooleanOperator.NAND:
             self._match = lambda x: not (  # type: ignore
                 self.filters[0]._match(x) and self.filters[1]._match(x)
             )
-            self._match_row = lambda x, y: all(x) and not (  # type: ignore
-                self.filters[0]._match(next(y)) and self.filters[1]._match(next(y))  # type: ignore
-            )
         elif self.operator == enum.BooleanOperator.NOR:
             self._match = lambda x: not (  # type: ignore
                 self.filters[0]._match(x) or self.filters[1]._match(x)
             )
-            self._match_row = lambda x, y: all(x) and not (  # type: ignore
-                self.filters[0]._match(next(y)) or self.filters[1]._match(next(y))  # type: ignore
-            )
         elif self.operator == enum.BooleanOperator.XNOR:
             self._match = lambda x: self.filters[0]._match(x) == self.filters[1]._match(  # type: ignore
                 x
             )
-            self._match_row = lambda x, y: all(x) and self.filters[0]._match(  # type: ignore
-                next(y)  # type: ignore
-            ) == self.filters[
-                1
-            ]._match(
-                next(y)  # type: ignore
-            )
         elif self.operator == enum.BooleanOperator.IMPLIES:
             self._match = lambda x: (  # type: ignore
                 not self.filters[0]._match(x) or self.filters[1]._match(x)
             )
-            self._match_row = lambda x, y: all(x) and (  # type: ignore
-                not self.filters[0]._match(next(y)) or self.filters[1]._match(next(y))  # type: ignore
-            )
         elif self.operator == enum.BooleanOperator.NIMPLIES:
             self._match = lambda x: (  # type: ignore
                 self.filters[0]._match(x) and not self.filters[1]._match(x)
             )
-            self._match_row = lambda x, y: all(x) and (  # type: ignore
-                self.filters[0]._match(next(y)) and not self.filters[1]._match(next(y))  # type: ignore
-            )
 
         return self
 
@@ -155,28 +105,6 @@ class CompositeFilter(Filter):
         # Function is implemented dynamically in _validate_state
         raise NotImplementedError()
 
-    def _match_row(self, value_exists: Iterable[bool], value: Iterable[Any]) -> bool:
-        # Function is implemented dynamically in _validate_state
-        raise NotImplementedError()
-
-    def _not_none_row_iterator(
-        self, row: dict[Hashable, Any | None] | BaseModel
-    ) -> Generator:
-        for filter in self.filters:  # type: ignore
-            if filter._is_composite:
-                yield all(filter._not_none_row_iterator(row))
-            else:
-                yield filter.key in row and row[filter.key] is not None
-
-    def _not_na_row_iterator(
-        self, row: dict[Hashable, Any | None] | BaseModel, na_values: set[Any]
-    ) -> Generator:
-        for filter in self.filters:  # type: ignore
-            if filter._is_composite:
-                yield all(filter._not_na_row_iterator(row, na_values))
-            else:
-                yield filter.key in row and row[filter.key] not in na_values
-
     def _all_subfilters_have_key(self) -> bool:
         retval = True
         for filter in self.filters:
@@ -209,56 +137,103 @@ class CompositeFilter(Filter):
             raise ValueError("map_fun must have the same length as the filters list.")
         return map_fun
 
-    def match_row(
+    def compile(
         self,
-        row: dict[Hashable, Any | None] | BaseModel,
         na_values: set[Any] | None = None,
         map_fun: (
-            Callable[[Any], Any]
-            | dict[Hashable, Callable[[Any], Any]]
+            dict[Hashable, Callable[[Any], Any]]
+            | Callable[[Any], Any]
             | list[Callable[[Any], Any]]
             | None
         ) = None,
         is_model: bool = False,
-    ) -> bool:
+    ) -> Callable[[dict[Hashable, Any | None] | BaseModel], bool]:
         if not self._all_subfilters_have_key():
             raise ValueError(
                 "Key must be set for each filter to apply filter to a row."
             )
-        # Match, per filter, if both key exists, value not null and value matches
-        map_fun = self._get_map_fun_list(map_fun)
-        row_dict = row.model_dump() if is_model else row
-        if na_values is None:
-            return (
-                self._match_row(
-                    self._not_none_row_iterator(row_dict),
-                    (
-                        y(row_dict) if x._is_composite else y(row_dict.get(x.key))
-                        for x, y in zip(self.filters, map_fun)
-                    ),
-                )
-                ^ self.invert
-            )
-            # yield (
-            #     key in row_dict
-            #     and row_dict[key] is not None
-            #     and self._match(map_fun(row_dict[key]))
-            # ) ^ self.invert
-        else:
-            return (
-                self._match_row(
-                    self._not_na_row_iterator(row_dict, na_values),
-                    (
-                        y(row_dict) if x._is_composite else y(row_dict.get(x.key))
-                        for x, y in zip(self.filters, map_fun)
-                    ),
-                )
-                ^ self.invert
+        return self._compile_row_function(
+            self._compile_row_match(na_values, map_fun), is_model
+        )
+
+    def _compile_row_match(
+        self,
+        na_values: set[Any] | None = None,
+        map_fun: (
+            dict[Hashable, Callable[[Any], Any]]
+            | Callable[[Any], Any]
+            | list[Callable[[Any], Any]]
+            | None
+        ) = None,
+    ) -> Callable[[dict[Hashable, Any | None]], bool]:
+        # Match, per filter, including its invert, with a non-composite filter
+        # only matching if both key exists and value not null. A nested composite
+        # filter gets map_fun if it is a dict and the map_fun of its position
+        # otherwise.
+        map_fun_list = self._get_map_fun_list(map_fun)
+        matches = []
+        for filter, fun in zip(self.filters, map_fun_list):
+            match = filter._compile_row_match(
+                na_values,
+                map_fun if filter._is_composite and isinstance(map_fun, dict) else fun,
             )
+            if filter.invert:
+                matches.append(lambda x, match=match: not match(x))
+            else:
+                matches.append(match)
+        if self.operator == enum.BooleanOperator.AND:
+            if len(matches) == 2:
+                match0, match1 = matches
+                return lambda x: match0(x) and match1(x)
+
+            def match_row(row: dict[Hashable, Any | None]) -> bool:
+                for match in matches:
+                    if not match(row):
+                        return False
+                return True
+
+            return match_row
+        if self.operator == enum.BooleanOperator.OR:
+            if len(matches) == 2:
+                match0, match1 = matches
+                return lambda x: match0(x) or match1(x)
+
+            def match_row(row: dict[Hashable, Any | None]) -> bool:
+                for match in matches:
+                    if match(row):
+                        return True
+                return False
+
+            return match_row
+        if self.operator == enum.BooleanOperator.NOT:
+            match0 = matches[0]
+            return lambda x: not match0(x)
+        # Binary operators, only matching if all values exist
+        value_exists = self._compile_row_exists(na_values)
+        match0, match1 = matches
+        if self.operator == enum.BooleanOperator.XOR:
+            return lambda x: value_exists(x) and match0(x) != match1(x)
+        if self.operator == enum.BooleanOperator.NAND:
+            return lambda x: value_exists(x) and not (match0(x) and match1(x))
+        if self.operator == enum.BooleanOperator.NOR:
+            return lambda x: value_exists(x) and not (match0(x) or match1(x))
+        if self.operator == enum.BooleanOperator.XNOR:
+            return lambda x: value_exists(x) and match0(x) == match1(x)
+        if self.operator == enum.BooleanOperator.IMPLIES:
+            return lambda x: value_exists(x) and (not match0(x) or match1(x))
+        if self.operator == enum.BooleanOperator.NIMPLIES:
+            return lambda x: value_exists(x) and match0(x) and not match1(x)
+        raise NotImplementedError()
+
+    def _compile_row_exists(
+        self, na_values: set[Any] | None = None
+    ) -> Callable[[dict[Hashable, Any | None]], bool]:
+        value_exists = [x._compile_row_exists(na_values) for x in self.filters]
+        return lambda x: all(y(x) for y in value_exists)
 
-    def match_rows(
+    def match_batch(
         self,
-        rows: Iterable[dict[Hashable, Any | None] | BaseModel],
+        columns: Mapping[Hashable, Any],
         na_values: set[Any] | None = None,
         map_fun: (
             dict[Hashable, Callable[[Any], Any]]
@@ -266,44 +241,17 @@ class CompositeFilter(Filter):
             | list[Callable[[Any], Any]]
             | None
         ) = None,
-        is_model: bool = False,
-    ) -> Iterator[bool]:
+    ) -> np.ndarray:
         # Match, per row and filter, if both key exists, value not null and value matches
         if not self._all_subfilters_have_key():
             raise ValueError(
                 "Key must be set for each filter to apply filter to a row."
             )
-        map_fun = self._get_map_fun_list(map_fun)
-        if na_values is None:
-            for row in rows:
-                row_dict = row.model_dump() if is_model else row
-                yield (
-                    self._match_row(
-                        self._not_none_row_iterator(row_dict),
-                        (
-                            y(row_dict) if x._is_composite else y(row_dict.get(x.key))
-                            for x, y in zip(self.filters, map_fun)
-                        ),
-                    )
-                    ^ self.invert
-                )
-        else:
-            for row in rows:
-                row_dict = row.model_dump() if is_model else row
-                yield (
-                    self._match_row(
-                        self._not_na_row_iterator(row_dict, na_values),
-                        (
-                            y(row_dict) if x._is_composite else y(row_dict.get(x.key))
-                            for x, y in zip(self.filters, map_fun)
-                        ),
-                    )
-                    ^ self.invert
-                )
+        return self._get_batch_masks(columns, na_values, map_fun)[1] ^ self.invert
 
-    def filter_rows(
+    def _get_batch_masks(
         self,
-        rows: Iterable[dict[Hashable, Any | None] | BaseModel],
+        columns: Mapping[Hashable, Any],
         na_values: set[Any] | None = None,
         map_fun: (
             dict[Hashable, Callable[[Any], Any]]
@@ -311,42 +259,42 @@ class CompositeFilter(Filter):
             | list[Callable[[Any], Any]]
             | None
         ) = None,
-        is_model: bool = False,
-    ) -> Iterator[dict[Hashable, Any | None]]:
-        # Match, per row and filter, if both key exists, value not null and value matches
-        if not self._all_subfilters_have_key():
-            raise ValueError(
-                "Key must be set for each filter to apply filter to a row."
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Same semantics as _compile_row_match. The first mask is whether all
+        # values exist, as required for the binary operators.
+        map_fun_list = self._get_map_fun_list(map_fun)
+        value_exists = []
+        is_match = []
+        for filter, fun in zip(self.filters, map_fun_list):
+            curr_value_exists, curr_is_match = filter._get_batch_masks(
+                columns,
+                na_values,
+                map_fun if filter._is_composite and isinstance(map_fun, dict) else fun,
             )
-        map_fun = self._get_map_fun_list(map_fun)
-        if na_values is None:
-            for row in rows:
-                row_dict = row.model_dump() if is_model else row
-                if (
-                    self._match_row(
-                        self._not_none_row_iterator(row_dict),
-                        (
-                            y(row_dict) if x._is_composite else y(row_dict.get(x.key))
-                            for x, y in zip(self.filters, map_fun)
-                        ),
-                    )
-                    ^ self.invert
-                ):
-                    yield row
+            value_exists.append(curr_value_exists)
+            is_match.append(curr_is_match ^ filter.invert)
+        all_value_exists = np.logical_and.reduce(value_exists)
+        if self.operator == enum.BooleanOperator.NOT:
+            return all_value_exists, ~is_match[0]
+        if self.operator == enum.BooleanOperator.AND:
+            return all_value_exists, np.logical_and.reduce(is_match)
+        if self.operator == enum.BooleanOperator.OR:
+            return all_value_exists, np.logical_or.reduce(is_match)
+        if self.operator == enum.BooleanOperator.XOR:
+            is_match_ = is_match[0] != is_match[1]
+        elif self.operator == enum.BooleanOperator.NAND:
+            is_match_ = ~(is_match[0] & is_match[1])
+        elif self.operator == enum.BooleanOperator.NOR:
+            is_match_ = ~(is_match[0] | is_match[1])
+        elif self.operator == enum.BooleanOperator.XNOR:
+            is_match_ = is_match[0] == is_match[1]
+        elif self.operator == enum.BooleanOperator.IMPLIES:
+            is_match_ = ~is_match[0] | is_match[1]
+        elif self.operator == enum.BooleanOperator.NIMPLIES:
+            is_match_ = is_match[0] & ~is_match[1]
         else:
-            for row in rows:
-                row_dict = row.model_dump() if is_model else row
-                if (
-                    self._match_row(
-                        self._not_na_row_iterator(row_dict, na_values),
-                        (
-                            y(row_dict) if x._is_composite else y(row_dict.get(x.key))
-                            for x, y in zip(self.filters, map_fun)
-                        ),
-                    )
-                    ^ self.invert
-                ):
-                    yield row
+            raise NotImplementedError()
+        return all_value_exists, all_value_exists & is_match_
 
     def get_keys(self) -> list[Hashable]:
         keys = []
@@ -1,5 +1,6 @@
 from typing import Any
 
+import numpy as np
 from pydantic import Field
 
 from gen_epix.filter.base import Filter
@@ -12,5 +13,8 @@ class EqualsFilter(Filter):
         is_match: bool = value == self.value
         return is_match
 
+    def _match_batch(self, values: np.ndarray) -> np.ndarray:
+        return np.asarray(values == self.value, dtype=bool)
+
 
 # No typed version of this filter is needed since the type of the values would be needed as well
@@ -1,4 +1,6 @@
-from typing import Any, Callable, Hashable, Iterable, Literal
+from typing import Any, Callable, Hashable, Iterable, Literal, Mapping
+
+import numpy as np
 
 from gen_epix.filter.base import Filter
 from gen_epix.filter.enum import FilterType
@@ -29,36 +31,28 @@ class ExistsFilter(Filter):
             for value in values:
                 yield (value not in na_values) ^ self.invert
 
-    def match_row(
+    def _compile_row_match(
         self,
-        row: dict[Hashable, Any | None],
         na_values: set[Any] | None = None,
         map_fun: Callable[[Any], Any] | None = None,
-    ) -> bool:
-        if self.key is None:
-            raise ValueError("Key must be set to apply filter to a row.")
+    ) -> Callable[[dict[Hashable, Any | None]], bool]:
         # Match if both key exists and value not null
-        key = self.key
-        if na_values is None:
-            return ((key in row) and (row[key] is not None)) ^ self.invert
-        return ((key in row) and (row[key] not in na_values)) ^ self.invert
+        return self._compile_row_exists(na_values)
 
-    def match_rows(
+    def _get_batch_masks(
         self,
-        rows: Iterable[dict[Hashable, Any | None]],
+        columns: Mapping[Hashable, Any],
         na_values: set[Any] | None = None,
         map_fun: Callable[[Any], Any] | None = None,
-    ) -> Iterable[bool]:
-        if self.key is None:
-            raise ValueError("Key must be set to apply filter to a row.")
+    ) -> tuple[np.ndarray, np.ndarray]:
         # Match if both key exists and value not null
-        key = self.key
-        if na_values is None:
-            for row in rows:
-                yield ((key in row) and (row[key] is not None)) ^ self.invert
+        if self.key not in columns:
+            is_not_na = np.zeros(Filter.get_n_rows(columns), dtype=bool)
         else:
-            for row in rows:
-                yield ((key in row) and (row[key] not in na_values)) ^ self.invert
+            is_not_na = Filter.get_not_na_mask(
+                Filter.to_array(columns[self.key]), na_values
+            )
+        return is_not_na, is_not_na
 
     def _match(self, value: Any) -> bool:
         return True
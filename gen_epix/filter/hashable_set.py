@@ -1,5 +1,6 @@
 from typing import Hashable
 
+import numpy as np
 from pydantic import Field
 
 from gen_epix.filter.base import Filter
@@ -13,6 +14,11 @@ class HashableSetFilter(Filter):
     def _match(self, value: Hashable) -> bool:
         return value in self.members
 
+    def _match_batch(self, values: np.ndarray) -> np.ndarray:
+        if values.dtype == object:
+            return Filter._apply(self.members.__contains__, values)
+        return np.isin(values, list(self.members))
+
 
 # No typed version of this filter is needed since the type of the values would be needed as well
 # class TypedValueSetFilter(ValueSetFilter):
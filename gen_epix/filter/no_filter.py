@@ -1,6 +1,6 @@
-from typing import Any, Callable, Hashable, Iterable, Iterator, Literal
+from typing import Any, Callable, Hashable, Iterable, Iterator, Literal, Mapping
 
-from pydantic import BaseModel
+import numpy as np
 
 from gen_epix.filter.base import Filter
 from gen_epix.filter.enum import FilterType
@@ -31,36 +31,27 @@ class NoFilter(Filter):
             if not self.invert:
                 yield value
 
-    def match_row(
+    def _compile_row_match(
         self,
-        row: dict[Hashable, Any | None] | BaseModel,
         na_values: set[Any] | None = None,
         map_fun: Callable[[Any], Any] | None = None,
-        is_model: bool = False,
-    ) -> bool:
-        return not self.invert
+    ) -> Callable[[dict[Hashable, Any | None]], bool]:
+        # Match any row, regardless of its values
+        return lambda x: True
 
-    def match_rows(
-        self,
-        rows: Iterable[dict[Hashable, Any | None] | BaseModel],
-        na_values: set[Any] | None = None,
-        map_fun: Callable[[Any], Any] | None = None,
-        is_model: bool = False,
-    ) -> Iterator[bool]:
-        for row in rows:
-            if not self.invert:
-                yield True
+    def _compile_row_exists(
+        self, na_values: set[Any] | None = None
+    ) -> Callable[[dict[Hashable, Any | None]], bool]:
+        return lambda x: True
 
-    def filter_rows(
+    def _get_batch_masks(
         self,
-        rows: Iterable[dict[Hashable, Any | None] | BaseModel],
+        columns: Mapping[Hashable, Any],
         na_values: set[Any] | None = None,
         map_fun: Callable[[Any], Any] | None = None,
-        is_model: bool = False,
-    ) -> Iterator[dict[Hashable, Any | None]]:
-        for row in rows:
-            if not self.invert:
-                yield row
+    ) -> tuple[np.ndarray, np.ndarray]:
+        is_match = np.ones(Filter.get_n_rows(columns), dtype=bool)
+        return is_match, is_match
 
 
 class TypedNoFilter(NoFilter):
@@ -0,0 +1,247 @@
+# pylint: disable=protected-access
+# because _is_composite is checked on sub-filters
+
+from typing import Any
+
+from gen_epix.filter import enum
+from gen_epix.filter.base import Filter
+from gen_epix.filter.composite import CompositeFilter
+from gen_epix.filter.number_set import NumberSetFilter
+from gen_epix.filter.string_set import StringSetFilter
+from gen_epix.filter.uuid_set import UuidSetFilter
+
+# Filter classes whose members can be merged when applied to the same key
+_SET_FILTER_CLASSES = (UuidSetFilter, StringSetFilter, NumberSetFilter)
+
+
+class FilterOptimizer:
+    """
+    Rewrites a filter into an equivalent filter that is cheaper to evaluate and of
+    which a larger part can be converted into e.g. an SQL where clause:
+
+    1. Negations are pushed down to the non-composite filters with De Morgan's
+       laws, so that only these and composite filters with a binary operator such
+       as XOR remain inverted.
+    2. Nested AND and OR composite filters are flattened into their parent if it
+       has the same operator, and duplicate sub-filters are removed.
+    3. Set filters on the same key with the same invert are merged, taking the
+       union or intersection of their members.
+    4. Sub-filters that are common to each sub-filter of an OR composite filter
+       are factored out of it, i.e. (A AND B) OR (A AND C) becomes A AND (B OR C).
+
+    The filter that is passed is not modified. The order of the filters is not
+    preserved, so that a map_fun given as a list of functions per filter does not
+    apply to the optimized filter.
+    """
+
+    @staticmethod
+    def optimize(filter: Filter) -> Filter:
+        return FilterOptimizer._simplify(FilterOptimizer.push_down_negations(filter))
+
+    @staticmethod
+    def push_down_negations(filter: Filter, negate: bool = False) -> Filter:
+        """
+        Get the filter, negated if negate is True, with the invert of any AND, OR
+        and NOT composite filter pushed down to its sub-filters.
+        """
+        if not filter._is_composite:
+            if not negate:
+                return filter
+            return FilterOptimizer._copy(filter, invert=not filter.invert)
+        assert isinstance(filter, CompositeFilter)
+        negate = negate != filter.invert
+        if filter.operator == enum.BooleanOperator.NOT:
+            return FilterOptimizer.push_down_negations(filter.filters[0], not negate)
+        if filter.operator in {enum.BooleanOperator.AND, enum.BooleanOperator.OR}:
+            is_and = (filter.operator == enum.BooleanOperator.AND) != negate
+            return CompositeFilter(
+                filters=[
+                    FilterOptimizer.push_down_negations(x, negate)
+                    for x in filter.filters
+                ],
+                operator=(
+                    enum.BooleanOperator.AND if is_and else enum.BooleanOperator.OR
+                ),
+            )
+        # Binary operator: the operands are independent of the invert
+        return CompositeFilter(
+            filters=[FilterOptimizer.push_down_negations(x) for x in filter.filters],
+            operator=filter.operator,
+            invert=negate,
+        )
+
+    @staticmethod
+    def _simplify(filter: Filter) -> Filter:
+        # Simplify a filter without negated AND and OR composite filters
+        if not filter._is_composite:
+            return filter
+        assert isinstance(filter, CompositeFilter)
+        filters = [FilterOptimizer._simplify(x) for x in filter.filters]
+        if filter.operator not in {enum.BooleanOperator.AND, enum.BooleanOperator.OR}:
+            return CompositeFilter(
+                filters=filters, operator=filter.operator, invert=filter.invert
+            )
+        return FilterOptimizer._combine(filter.operator, filters)
+
+    @staticmethod
+    def _combine(operator: enum.BooleanOperator, filters: list[Filter]) -> Filter:
+        # Combine simplified filters with AND or OR into a simplified filter
+        filters = FilterOptimizer._flatten(operator, filters)
+        filters = FilterOptimizer._merge_set_filters(operator, filters)
+        filters = FilterOptimizer._remove_duplicates(filters)
+        if operator == enum.BooleanOperator.OR and len(filters) > 1:
+            factored_filter = FilterOptimizer._factor_common_filters(filters)
+            if factored_filter is not None:
+                return factored_filter
+        if len(filters) == 1:
+            return filters[0]
+        return CompositeFilter(filters=filters, operator=operator)
+
+    @staticmethod
+    def _flatten(operator: enum.BooleanOperator, filters: list[Filter]) -> list[Filter]:
+        flattened_filters: list[Filter] = []
+        for filter in filters:
+            if FilterOptimizer._is_operator(filter, operator):
+                assert isinstance(filter, CompositeFilter)
+                flattened_filters.extend(filter.filters)
+            else:
+                flattened_filters.append(filter)
+        return flattened_filters
+
+    @staticmethod
+    def _merge_set_filters(
+        operator: enum.BooleanOperator, filters: list[Filter]
+    ) -> list[Filter]:
+        # Merge set filters of the same class with the same key and invert. An
+        # inverted set filter matches a missing value, so that by De Morgan's laws
+        # the members of inverted filters are combined the other way round.
+        merged_filters: list[Filter] = []
+        index_by_group: dict[tuple, int] = {}
+        for filter in filters:
+            group = FilterOptimizer._get_set_filter_group(filter)
+            if group is None:
+                merged_filters.append(filter)
+                continue
+            if group not in index_by_group:
+                index_by_group[group] = len(merged_filters)
+                merged_filters.append(filter)
+                continue
+            idx = index_by_group[group]
+            prev_filter = merged_filters[idx]
+            assert isinstance(prev_filter, _SET_FILTER_CLASSES)
+            assert isinstance(filter, _SET_FILTER_CLASSES)
+            prev_members = FilterOptimizer._get_members(prev_filter)
+            members = FilterOptimizer._get_members(filter)
+            if (operator == enum.BooleanOperator.AND) != filter.invert:
+                members = prev_members & members
+            else:
+                members = prev_members | members
+            merged_filters[idx] = FilterOptimizer._copy(prev_filter, members=members)
+        return merged_filters
+
+    @staticmethod
+    def _get_set_filter_group(filter: Filter) -> tuple | None:
+        for filter_class in _SET_FILTER_CLASSES:
+            if isinstance(filter, filter_class):
+                return (
+                    filter_class,
+                    filter.key,
+                    filter.invert,
+                    getattr(filter, "case_sensitive", None),
+                )
+        return None
+
+    @staticmethod
+    def _get_members(filter: Filter) -> frozenset:
+        if isinstance(filter, StringSetFilter) and not filter.case_sensitive:
+            # Members that only differ in case are equivalent
+            return frozenset(x.lower() for x in filter.members)
+        return filter.members  # type: ignore[attr-defined]
+
+    @staticmethod
+    def _remove_duplicates(filters: list[Filter]) -> list[Filter]:
+        unique_filters: list[Filter] = []
+        for filter in filters:
+            if not any(FilterOptimizer.is_equal(filter, x) for x in unique_filters):
+                unique_filters.append(filter)
+        return unique_filters
+
+    @staticmethod
+    def _factor_common_filters(filters: list[Filter]) -> Filter | None:
+        # Factor out the filters that are common to all AND filters in an OR
+        # filter, or return None if there are none
+        conjuncts = [
+            (
+                x.filters  # type: ignore[attr-defined]
+                if FilterOptimizer._is_operator(x, enum.BooleanOperator.AND)
+                else [x]
+            )
+            for x in filters
+        ]
+        common_filters = [
+            x
+            for x in conjuncts[0]
+            if all(
+                any(FilterOptimizer.is_equal(x, z) for z in y) for y in conjuncts[1:]
+            )
+        ]
+        if not common_filters:
+            return None
+        remainder_filters = []
+        for curr_conjuncts in conjuncts:
+            curr_remainder_filters = [
+                x
+                for x in curr_conjuncts
+                if not any(FilterOptimizer.is_equal(x, y) for y in common_filters)
+            ]
+            if not curr_remainder_filters:
+                # Absorption: A OR (A AND B) equals A
+                return FilterOptimizer._combine(
+                    enum.BooleanOperator.AND, common_filters
+                )
+            remainder_filters.append(
+                FilterOptimizer._combine(
+                    enum.BooleanOperator.AND, curr_remainder_filters
+                )
+            )
+        return FilterOptimizer._combine(
+            enum.BooleanOperator.AND,
+            common_filters
+            + [FilterOptimizer._combine(enum.BooleanOperator.OR, remainder_filters)],
+        )
+
+    @staticmethod
+    def is_equal(filter1: Filter, filter2: Filter) -> bool:
+        """
+        Check if two filters are of the same class and have the same field values,
+        with the members of a set filter that is not case sensitive compared
+        regardless of case.
+        """
+        if type(filter1) is not type(filter2):
+            return False
+        if isinstance(filter1, StringSetFilter) and not filter1.case_sensitive:
+            get_group = FilterOptimizer._get_set_filter_group
+            get_members = FilterOptimizer._get_members
+            return get_group(filter1) == get_group(filter2) and (
+                get_members(filter1) == get_members(filter2)
+            )
+        return filter1.model_dump() == filter2.model_dump()
+
+    @staticmethod
+    def _is_operator(filter: Filter, operator: enum.BooleanOperator) -> bool:
+        return (
+            isinstance(filter, CompositeFilter)
+            and filter.operator == operator
+            and not filter.invert
+        )
+
+    @staticmethod
+    def _copy(filter: Filter, **kwargs: Any) -> Filter:
+        # Create a new filter rather than using model_copy, so that its state is
+        # validated and generated again. Fields that were not set are left out,
+        # since their default value is not necessarily valid input.
+        values: dict[str, Any] = {
+            x: getattr(filter, x) for x in filter.model_fields_set
+        }
+        values.update(kwargs)
+        return type(filter)(**values)
@@ -1,10 +1,13 @@
 import datetime
+import functools
 from typing import Literal, Self
 
 import dateutil
+import numpy as np
 from pydantic import Field, model_validator
 
 from gen_epix.filter import enum
+from gen_epix.filter.base import Filter
 from gen_epix.filter.enum import FilterType
 from gen_epix.filter.range import RangeFilter
 
@@ -22,9 +25,11 @@ class PartialDateRangeFilter(RangeFilter):
         return datetime.datetime.fromisoformat(datetime_str)
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _get_datetime_bounds(value: str) -> tuple[datetime.datetime, datetime.datetime]:
         """
         Get the inclusive lower and exclusive upper bound of an ISO datetime string.
+        Cached, since columns typically contain few distinct partial dates.
         """
         fromisoformat = PartialDateRangeFilter.fromisoformat
         if len(value) == 4:
@@ -168,6 +173,10 @@ class PartialDateRangeFilter(RangeFilter):
         self._match = _match  # type: ignore
         return self
 
+    def _match_batch(self, values: np.ndarray) -> np.ndarray:
+        # Values are parsed one by one, the bounds cannot be compared directly
+        return Filter._apply(self._match, values)
+
 
 class TypedPartialDateRangeFilter(PartialDateRangeFilter):
     type: Literal[FilterType.PARTIAL_DATE_RANGE.value]
@@ -1,5 +1,6 @@
 from typing import Any, Literal, Self
 
+import numpy as np
 from pydantic import Field, model_validator
 
 from gen_epix.filter.base import Filter
@@ -108,6 +109,22 @@ class RangeFilter(Filter):
         # Function is implemented dynamically in _validate_state
         raise NotImplementedError()
 
+    def _match_batch(self, values: np.ndarray) -> np.ndarray:
+        if self.lower_bound is not None and self.lower_bound == self.upper_bound:
+            return np.asarray(values == self.lower_bound, dtype=bool)
+        is_match = np.ones(len(values), dtype=bool)
+        if self.lower_bound is not None:
+            if self.lower_bound_censor == ComparisonOperator.GT:
+                is_match &= values > self.lower_bound
+            else:
+                is_match &= values >= self.lower_bound
+        if self.upper_bound is not None:
+            if self.upper_bound_censor == ComparisonOperator.ST:
+                is_match &= values < self.upper_bound
+            else:
+                is_match &= values <= self.upper_bound
+        return is_match
+
 
 class TypedRangeFilter(RangeFilter):
     type: Literal[FilterType.RANGE.value]
@@ -1,5 +1,6 @@
 from typing import Any, Literal, Self
 
+import numpy as np
 from pydantic import Field, PrivateAttr, model_validator
 
 from gen_epix.filter.base import Filter
@@ -33,6 +34,13 @@ class StringSetFilter(Filter):
         # Function is implemented dynamically in _validate_state
         raise NotImplementedError()
 
+    def _match_batch(self, values: np.ndarray) -> np.ndarray:
+        if values.dtype.kind != "U":
+            return Filter._apply(self._match, values)
+        if not self.case_sensitive:
+            values = np.char.lower(values)
+        return np.isin(values, list(self._members))
+
 
 class TypedStringSetFilter(StringSetFilter):
     type: Literal[FilterType.STRING_SET.value]
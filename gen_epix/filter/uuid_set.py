@@ -1,6 +1,7 @@
 from typing import Any, Literal, Self
 from uuid import UUID
 
+import numpy as np
 from pydantic import Field, model_validator
 
 from gen_epix.filter.base import Filter
@@ -21,6 +22,9 @@ class UuidSetFilter(Filter):
         # Function is implemented dynamically in _validate_state
         raise NotImplementedError()
 
+    def _match_batch(self, values: np.ndarray) -> np.ndarray:
+        return Filter._apply(self.members.__contains__, values)
+
 
 class TypedUuidSetFilter(UuidSetFilter):
     type: Literal[FilterType.UUID_SET.value]
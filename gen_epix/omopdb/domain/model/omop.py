@@ -134,6 +134,7 @@ class ObservationPeriod(Model):
         table_name="observation_period",
         persistable=True,
         keys=create_keys({1: "observation_period_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -180,6 +181,7 @@ class VisitOccurrence(Model):
         table_name="visit_occurrence",
         persistable=True,
         keys=create_keys({1: "visit_occurrence_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -268,6 +270,7 @@ class VisitDetail(Model):
         table_name="visit_detail",
         persistable=True,
         keys=create_keys({1: "visit_detail_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -365,6 +368,7 @@ class ConditionOccurrence(Model):
         table_name="condition_occurrence",
         persistable=True,
         keys=create_keys({1: "condition_occurrence_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -459,6 +463,7 @@ class DrugExposure(Model):
         table_name="drug_exposure",
         persistable=True,
         keys=create_keys({1: "drug_exposure_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -564,6 +569,7 @@ class ProcedureOccurrence(Model):
         table_name="procedure_occurrence",
         persistable=True,
         keys=create_keys({1: "procedure_occurrence_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -644,6 +650,7 @@ class DeviceExposure(Model):
         table_name="device_exposure",
         persistable=True,
         keys=create_keys({1: "device_exposure_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -728,6 +735,7 @@ class Measurement(Model):
         table_name="measurement",
         persistable=True,
         keys=create_keys({1: "measurement_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -840,6 +848,7 @@ class Observation(Model):
         table_name="observation",
         persistable=True,
         keys=create_keys({1: "observation_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -953,6 +962,7 @@ class Note(Model):
         table_name="note",
         persistable=True,
         keys=create_keys({}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -1083,6 +1093,7 @@ class Specimen(Model):
         table_name="specimen",
         persistable=True,
         keys=create_keys({1: "specimen_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -1215,6 +1226,7 @@ class SurveyConduct(Model):
         table_name="survey_conduct",
         persistable=True,
         keys=create_keys({1: "survey_conduct_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -1538,6 +1550,7 @@ class PayerPlanPeriod(Model):
         table_name="payer_plan_period",
         persistable=True,
         keys=create_keys({1: "payer_plan_period_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -1653,6 +1666,7 @@ class Cost(Model):
         table_name="cost",
         persistable=True,
         keys=create_keys({1: "cost_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -1731,6 +1745,7 @@ class DrugEra(Model):
         table_name="drug_era",
         persistable=True,
         keys=create_keys({1: "drug_era_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -1772,6 +1787,7 @@ class DoseEra(Model):
         table_name="dose_era",
         persistable=True,
         keys=create_keys({1: "dose_era_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
@@ -1801,6 +1817,7 @@ class ConditionEra(Model):
         table_name="condition_era",
         persistable=True,
         keys=create_keys({1: "condition_era_id"}),
+        query_keys=create_keys({1: "person_id"}),
         **_ENTITY_KWARGS,
     )
 
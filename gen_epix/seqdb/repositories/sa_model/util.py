@@ -30,11 +30,22 @@ def create_table_args(
                 **kwargs,
             )
         )
+    indexes = []
+    for field_names in entity.get_index_field_names():
+        sa_field_names = (
+            [field_name_map.get(x, x) for x in field_names]
+            if field_name_map
+            else field_names
+        )
+        sa_field_name_str = "_".join(sa_field_names)
+        indexes.append(
+            sa.Index(f"ix_{entity.table_name}_{sa_field_name_str}", *sa_field_names)
+        )
     if entity.schema_name:
         return entity.table_name, tuple(
-            [*uq_constraints, {"schema": entity.schema_name}]
+            [*uq_constraints, *indexes, {"schema": entity.schema_name}]
         )
-    return entity.table_name, tuple([*uq_constraints])
+    return entity.table_name, tuple([*uq_constraints, *indexes])
 
 
 def create_mapped_column(
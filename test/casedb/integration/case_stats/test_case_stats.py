@@ -0,0 +1,212 @@
+import datetime
+import uuid
+from pathlib import Path
+
+import pytest
+
+from gen_epix.casedb.domain import DOMAIN, enum, model
+from gen_epix.casedb.repositories import CaseSARepository
+from gen_epix.fastapp import CrudOperation
+from gen_epix.filter import UuidSetFilter
+
+N_CASES = 20
+N_DATA_COLLECTIONS = 4
+
+
+def create_repository(
+    sqlite_file: Path, use_case_stats: bool, recreate_sqlite_file: bool = False
+) -> CaseSARepository:
+    entities = DOMAIN.get_dag_sorted_entities(service_type=enum.ServiceType.CASE)
+    return CaseSARepository.create_sa_repository(
+        entities,
+        f"sqlite:///{sqlite_file}",
+        recreate_sqlite_file=recreate_sqlite_file,
+        name="CASE",
+        use_case_stats=use_case_stats,
+    )
+
+
+def get_stats(
+    repository: CaseSARepository, has_access: dict[uuid.UUID, set[uuid.UUID]] | None
+) -> tuple[dict, dict]:
+    """
+    Get the case type stats from the buckets and by aggregating the cases.
+    """
+    with repository.uow() as uow:
+        bucket_stats = repository.retrieve_case_stats_by_case_type_from_buckets(
+            uow, None, has_access
+        )
+        case_stats = {
+            x: (y[0], y[1].isoformat()[0:7], y[2].isoformat()[0:7])
+            for x, y in repository.retrieve_case_stats_by_case_type(
+                uow, None, has_access
+            ).items()
+        }
+    return bucket_stats, case_stats  # type: ignore[return-value]
+
+
+def assert_stats(
+    repository: CaseSARepository, has_access: dict[uuid.UUID, set[uuid.UUID]]
+) -> None:
+    for curr_has_access in (None, has_access):
+        bucket_stats, case_stats = get_stats(repository, curr_has_access)
+        assert bucket_stats == case_stats
+    with repository.uow() as uow:
+        assert repository.rebuild_case_stats(uow, None)
+
+
+class TestCaseStats:
+    def test_case_stats(self, tmp_path: Path) -> None:
+        sqlite_file = tmp_path / "case.sqlite"
+        repository = create_repository(
+            sqlite_file, use_case_stats=True, recreate_sqlite_file=True
+        )
+        case_types = [
+            model.CaseType(id=uuid.uuid4(), name=f"case_type{i}") for i in range(2)
+        ]
+        data_collection_ids = [uuid.uuid4() for _ in range(N_DATA_COLLECTIONS)]
+        cases = [
+            model.Case(
+                id=uuid.uuid4(),
+                case_type_id=case_types[i % 2].id,
+                created_in_data_collection_id=data_collection_ids[i % 3],
+                case_date=datetime.datetime(2024, 1 + i % 12, 1),
+                content={},
+            )
+            for i in range(N_CASES)
+        ]
+        links = [
+            model.CaseDataCollectionLink(
+                id=uuid.uuid4(),
+                case_id=x.id,
+                data_collection_id=data_collection_ids[3],
+            )
+            for x in cases[::3]
+        ]
+        has_access = {case_types[0].id: {data_collection_ids[3]}}
+        with repository.uow() as uow:
+            for model_class, objs in [
+                (model.CaseType, case_types),
+                (model.Case, cases),
+                (model.CaseDataCollectionLink, links),
+            ]:
+                repository.crud(
+                    uow, None, model_class, objs, None, CrudOperation.CREATE_SOME
+                )
+        assert_stats(repository, has_access)
+
+        # The buckets are maintained with each write of cases and links
+        with repository.uow() as uow:
+            repository.crud(
+                uow,
+                None,
+                model.CaseDataCollectionLink,
+                None,
+                links[0].id,
+                CrudOperation.DELETE_ONE,
+            )
+        assert_stats(repository, has_access)
+        with repository.uow() as uow:
+            repository.crud(
+                uow,
+                None,
+                model.Case,
+                cases[1].model_copy(
+                    update={"case_date": datetime.datetime(2023, 6, 1)}
+                ),
+                None,
+                CrudOperation.UPDATE_ONE,
+            )
+        assert_stats(repository, has_access)
+        with repository.uow() as uow:
+            repository.delete_by_filter(
+                uow,
+                None,
+                model.CaseDataCollectionLink,
+                UuidSetFilter(key="case_id", members={cases[3].id}),  # type: ignore[arg-type]
+            )
+            repository.delete_by_filter(
+                uow,
+                None,
+                model.Case,
+                UuidSetFilter(key="id", members={cases[3].id, cases[4].id}),  # type: ignore[arg-type]
+            )
+        assert_stats(repository, has_access)
+
+        # The buckets are shared by all repositories of the database, e.g. of other
+        # processes
+        other_repository = create_repository(sqlite_file, use_case_stats=True)
+        with other_repository.uow() as uow:
+            other_repository.crud(
+                uow,
+                None,
+                model.CaseDataCollectionLink,
+                model.CaseDataCollectionLink(
+                    id=uuid.uuid4(),
+                    case_id=cases[0].id,
+                    data_collection_id=data_collection_ids[3],
+                ),
+                None,
+                CrudOperation.CREATE_ONE,
+            )
+        assert_stats(repository, has_access)
+
+        # A write that is rolled back does not change the buckets
+        stats = get_stats(repository, has_access)
+        with pytest.raises(RuntimeError):
+            with repository.uow() as uow:
+                repository.crud(
+                    uow,
+                    None,
+                    model.Case,
+                    None,
+                    cases[2].id,
+                    CrudOperation.DELETE_ONE,
+                )
+                raise RuntimeError()
+        assert get_stats(repository, has_access) == stats
+        assert_stats(repository, has_access)
+
+    def test_rebuild_if_out_of_date(self, tmp_path: Path) -> None:
+        sqlite_file = tmp_path / "case.sqlite"
+        repository = create_repository(
+            sqlite_file, use_case_stats=False, recreate_sqlite_file=True
+        )
+        case_type = model.CaseType(id=uuid.uuid4(), name="case_type")
+        with repository.uow() as uow:
+            repository.crud(
+                uow, None, model.CaseType, case_type, None, CrudOperation.CREATE_ONE
+            )
+            repository.crud(
+                uow,
+                None,
+                model.Case,
+                [
+                    model.Case(
+                        id=uuid.uuid4(),
+                        case_type_id=case_type.id,
+                        created_in_data_collection_id=uuid.uuid4(),
+                        case_date=datetime.datetime(2024, 1, 1),
+                        content={},
+                    )
+                    for _ in range(N_CASES)
+                ],
+                None,
+                CrudOperation.CREATE_SOME,
+            )
+            assert not repository.is_case_stats_current(uow)
+            assert repository.rebuild_case_stats(uow, None) is None
+            assert (
+                repository.retrieve_case_stats_by_case_type_from_buckets(
+                    uow, None, None
+                )
+                is None
+            )
+
+        # The buckets are built once enabled
+        repository = create_repository(sqlite_file, use_case_stats=True)
+        with repository.uow() as uow:
+            assert repository.is_case_stats_current(uow)
+        assert get_stats(repository, None)[0] == {
+            case_type.id: (N_CASES, "2024-01", "2024-01")
+        }
@@ -6,6 +6,7 @@ from test.test_client.enum import TestType as EnumTestType  # to avoid PyTest wa
 import pytest
 
 from gen_epix.casedb.domain import command, enum, model
+from gen_epix.casedb.services import CaseService
 from gen_epix.fastapp import CrudOperation, PermissionType
 from gen_epix.filter import BooleanOperator, TypedCompositeFilter, TypedStringSetFilter
 
@@ -236,3 +237,107 @@ class TestContent:
                     operation=CrudOperation.READ_ALL,
                 )
             )
+
+    def test_cases_cache(self, env: Env) -> None:
+        app = env.app
+        case_service: CaseService = env.services[enum.ServiceType.CASE]  # type: ignore[assignment]
+        root_user = test_util.create_root_user_from_claims(env.cfg, env.app)
+        case_query = model.CaseQuery()
+        case_service.clear_cases_cache()
+        # Cases retrieved by query are subsequently retrieved by id from the cache
+        all_case_ids = app.handle(
+            command.RetrieveCasesByQueryCommand(user=root_user, case_query=case_query)
+        )
+        case_ids = all_case_ids[:10]
+        assert case_ids
+        cache_info = case_service.cases_cache_info
+        assert cache_info["n_cases"] == len(all_case_ids)
+        cached_cases = app.handle(
+            command.RetrieveCasesByIdCommand(user=root_user, case_ids=case_ids)
+        )
+        assert case_service.cases_cache_info["hits"] == cache_info["hits"] + 1
+        # Same cases when not in the cache
+        case_service.clear_cases_cache()
+        cases = app.handle(
+            command.RetrieveCasesByIdCommand(user=root_user, case_ids=case_ids)
+        )
+        assert case_service.cases_cache_info["misses"] == cache_info["misses"] + 1
+        assert [x.id for x in cached_cases] == case_ids
+        assert cached_cases == cases
+        # Changing a case invalidates the cache
+        app.handle(
+            command.RetrieveCasesByQueryCommand(user=root_user, case_query=case_query)
+        )
+        assert case_service.cases_cache_info["size"] > 0
+        app.handle(
+            command.CaseCrudCommand(
+                user=root_user,
+                objs=cases[0],
+                operation=CrudOperation.UPDATE_ONE,
+            )
+        )
+        assert case_service.cases_cache_info["size"] == 0
+        # Cases retrieved while the cache is cleared, e.g. by a concurrent change,
+        # are not cached
+        retrieve_cases = case_service._retrieve_cases_with_content_right
+
+        def _retrieve_cases(*args, **kwargs):  # type: ignore[no-untyped-def]
+            cases = retrieve_cases(*args, **kwargs)
+            case_service.clear_cases_cache()
+            return cases
+
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(
+                case_service, "_retrieve_cases_with_content_right", _retrieve_cases
+            )
+            app.handle(
+                command.RetrieveCasesByQueryCommand(
+                    user=root_user, case_query=case_query
+                )
+            )
+        assert case_service.cases_cache_info["size"] == 0
+
+    def test_read_all_paginated(self, env: Env) -> None:
+        app = env.app
+        root_user = test_util.create_root_user_from_claims(env.cfg, env.app)
+        users = app.handle(
+            command.UserCrudCommand(user=root_user, operation=CrudOperation.READ_ALL)
+        )
+        user_access_case_policies = app.handle(
+            command.UserAccessCasePolicyCrudCommand(
+                user=root_user, operation=CrudOperation.READ_ALL
+            )
+        )
+        org_users = [
+            x
+            for x in users
+            if x.id in {y.user_id for y in user_access_case_policies}
+            and x.roles == {enum.Role.ORG_USER}
+        ]
+        assert org_users
+        # The pages of the objs the user has access to together are all these objs
+        for org_user in org_users:
+            for command_class in (
+                command.CaseSetCrudCommand,
+                command.CaseSetMemberCrudCommand,
+            ):
+                objs = app.handle(
+                    command_class(user=org_user, operation=CrudOperation.READ_ALL)
+                )
+                limit = max(1, len(objs) // 3)
+                paginated_objs = []
+                cursor = None
+                while True:
+                    props = {"limit": limit}
+                    if cursor is not None:
+                        props["cursor"] = cursor
+                    cmd = command_class(
+                        user=org_user, operation=CrudOperation.READ_ALL, props=props
+                    )
+                    page = app.handle(cmd)
+                    assert len(page) <= limit
+                    paginated_objs.extend(page)
+                    cursor = cmd.props.get("next_cursor")
+                    if cursor is None:
+                        break
+                assert paginated_objs == sorted(objs, key=lambda x: x.id)
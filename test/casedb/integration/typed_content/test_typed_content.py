@@ -0,0 +1,219 @@
+import datetime
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from gen_epix.casedb.domain import DOMAIN, enum, model
+from gen_epix.casedb.repositories import CaseSARepository
+from gen_epix.casedb.repositories.sa_model.case import CaseContentValue
+from gen_epix.fastapp import CrudOperation
+from gen_epix.filter import UuidSetFilter
+
+N_CASES = 10
+
+
+def create_repository(
+    sqlite_file: Path, use_typed_content: bool, recreate_sqlite_file: bool = False
+) -> CaseSARepository:
+    entities = DOMAIN.get_dag_sorted_entities(service_type=enum.ServiceType.CASE)
+    return CaseSARepository.create_sa_repository(
+        entities,
+        f"sqlite:///{sqlite_file}",
+        recreate_sqlite_file=recreate_sqlite_file,
+        name="CASE",
+        use_typed_content=use_typed_content,
+    )
+
+
+def create_metadata(
+    repository: CaseSARepository,
+) -> tuple[model.Col, model.CaseType, model.CaseTypeCol]:
+    dim = model.Dim(
+        id=uuid.uuid4(), dim_type=enum.DimType.NUMBER, code="dim", label="dim"
+    )
+    col = model.Col(
+        id=uuid.uuid4(),
+        dim_id=dim.id,
+        code="col",
+        col_type=enum.ColType.DECIMAL_0,
+    )
+    case_type = model.CaseType(id=uuid.uuid4(), name="case_type")
+    case_type_col = model.CaseTypeCol(
+        id=uuid.uuid4(), case_type_id=case_type.id, col_id=col.id, code=col.code
+    )
+    with repository.uow() as uow:
+        for model_class, objs in [
+            (model.Dim, [dim]),
+            (model.Col, [col]),
+            (model.CaseType, [case_type]),
+            (model.CaseTypeCol, [case_type_col]),
+        ]:
+            repository.crud(
+                uow, None, model_class, objs, None, CrudOperation.CREATE_SOME
+            )
+    return col, case_type, case_type_col
+
+
+def create_cases(
+    case_type: model.CaseType, case_type_col: model.CaseTypeCol, n: int
+) -> list[model.Case]:
+    return [
+        model.Case(
+            id=uuid.uuid4(),
+            case_type_id=case_type.id,
+            created_in_data_collection_id=uuid.uuid4(),
+            case_date=datetime.datetime(2024, 1, 1),
+            content={case_type_col.id: str(i)},
+        )
+        for i in range(n)
+    ]
+
+
+def count_typed_content(repository: CaseSARepository) -> int:
+    with repository.uow() as uow:
+        return uow.session.execute(  # type: ignore[attr-defined,no-any-return]
+            select(func.count()).select_from(CaseContentValue)
+        ).scalar_one()
+
+
+class TestTypedContent:
+    def test_rebuild_if_out_of_date(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        sqlite_file = tmp_path / "case.sqlite"
+        repository = create_repository(
+            sqlite_file, use_typed_content=True, recreate_sqlite_file=True
+        )
+        col, case_type, case_type_col = create_metadata(repository)
+        with repository.uow() as uow:
+            repository.crud(
+                uow,
+                None,
+                model.Case,
+                create_cases(case_type, case_type_col, N_CASES),
+                None,
+                CrudOperation.CREATE_SOME,
+            )
+            assert repository.is_typed_content_current(uow)
+        assert count_typed_content(repository) == N_CASES
+
+        # The typed content is not rebuilt when it is current
+        n_rebuilds = 0
+        rebuild_typed_content = CaseSARepository.rebuild_typed_content
+
+        def _rebuild_typed_content(*args, **kwargs):  # type: ignore[no-untyped-def]
+            nonlocal n_rebuilds
+            n_rebuilds += 1
+            return rebuild_typed_content(*args, **kwargs)
+
+        monkeypatch.setattr(
+            CaseSARepository, "rebuild_typed_content", _rebuild_typed_content
+        )
+        repository = create_repository(sqlite_file, use_typed_content=True)
+        assert n_rebuilds == 0
+
+        # Cases added while typed content is not enabled make it out of date, so
+        # that it is rebuilt once enabled again
+        repository = create_repository(sqlite_file, use_typed_content=False)
+        with repository.uow() as uow:
+            repository.crud(
+                uow,
+                None,
+                model.Case,
+                create_cases(case_type, case_type_col, N_CASES),
+                None,
+                CrudOperation.CREATE_SOME,
+            )
+            assert not repository.is_typed_content_current(uow)
+            assert not repository.rebuild_typed_content(uow, None)
+        assert count_typed_content(repository) == N_CASES
+        repository = create_repository(sqlite_file, use_typed_content=True)
+        assert n_rebuilds == 2
+        assert count_typed_content(repository) == 2 * N_CASES
+
+        # The typed content can also be rebuilt explicitly
+        with repository.uow() as uow:
+            uow.session.execute(CaseContentValue.__table__.delete())  # type: ignore[attr-defined]
+            assert repository.rebuild_typed_content(uow, None)
+        assert n_rebuilds == 3
+        assert count_typed_content(repository) == 2 * N_CASES
+
+    def test_delete_cases_by_filter(self, tmp_path: Path) -> None:
+        repository = create_repository(
+            tmp_path / "case.sqlite", use_typed_content=True, recreate_sqlite_file=True
+        )
+        _, case_type, case_type_col = create_metadata(repository)
+        cases = create_cases(case_type, case_type_col, N_CASES)
+        with repository.uow() as uow:
+            repository.crud(
+                uow, None, model.Case, cases, None, CrudOperation.CREATE_SOME
+            )
+            repository.delete_by_filter(
+                uow,
+                None,
+                model.Case,
+                UuidSetFilter(key="id", members={cases[0].id, cases[1].id}),  # type: ignore[arg-type]
+            )
+
+        # Only the typed content of the deleted cases is removed
+        assert count_typed_content(repository) == N_CASES - 2
+
+    def test_rebuild_changed_case_type_cols(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        repository = create_repository(
+            tmp_path / "case.sqlite", use_typed_content=True, recreate_sqlite_file=True
+        )
+        col, case_type, case_type_col = create_metadata(repository)
+        with repository.uow() as uow:
+            repository.crud(
+                uow,
+                None,
+                model.Case,
+                create_cases(case_type, case_type_col, N_CASES),
+                None,
+                CrudOperation.CREATE_SOME,
+            )
+        rebuilt_case_type_col_ids = []
+        rebuild_typed_content = CaseSARepository._rebuild_typed_content
+
+        def _rebuild_typed_content(self, session, case_type_col_ids):  # type: ignore[no-untyped-def]
+            rebuilt_case_type_col_ids.append(case_type_col_ids)
+            return rebuild_typed_content(self, session, case_type_col_ids)
+
+        monkeypatch.setattr(
+            CaseSARepository, "_rebuild_typed_content", _rebuild_typed_content
+        )
+
+        # Changes that leave the col type unchanged do not rebuild anything
+        with repository.uow() as uow:
+            repository.crud(
+                uow,
+                None,
+                model.Col,
+                col.model_copy(update={"code": "col2"}),
+                None,
+                CrudOperation.UPDATE_ONE,
+            )
+        assert not rebuilt_case_type_col_ids
+
+        # A change of col type rebuilds the typed content of its case type cols
+        with repository.uow() as uow:
+            repository.crud(
+                uow,
+                None,
+                model.Col,
+                col.model_copy(update={"col_type": enum.ColType.TEXT}),
+                None,
+                CrudOperation.UPDATE_ONE,
+            )
+        assert rebuilt_case_type_col_ids == [{case_type_col.id}]
+        with repository.uow() as uow:
+            assert (
+                uow.session.execute(  # type: ignore[attr-defined]
+                    select(func.count()).where(CaseContentValue.value_text.is_not(None))
+                ).scalar_one()
+                == N_CASES
+            )
@@ -0,0 +1,139 @@
+import time
+import uuid
+from pathlib import Path
+
+from gen_epix.casedb.domain import DOMAIN, enum, model
+from gen_epix.casedb.repositories import CaseSARepository
+from gen_epix.fastapp import CrudOperation
+
+N_COLS = 1_000
+N_SETS = 125
+N_SET_COLS = 800
+N_REPEATS = 5
+
+
+def create_repository(sqlite_file: Path) -> CaseSARepository:
+    entities = DOMAIN.get_dag_sorted_entities(service_type=enum.ServiceType.CASE)
+    return CaseSARepository.create_sa_repository(
+        entities, f"sqlite:///{sqlite_file}", recreate_sqlite_file=True, name="CASE"
+    )
+
+
+def create_content(
+    repository: CaseSARepository,
+) -> tuple[list[model.CaseTypeColSet], list[model.CaseTypeCol]]:
+    # Create N_SETS case type col sets of N_SET_COLS out of N_COLS case type cols
+    # each, i.e. N_SETS x N_SET_COLS associations
+    dim = model.Dim(
+        id=uuid.uuid4(), dim_type=enum.DimType.TEXT, code="dim", label="dim"
+    )
+    cols = [
+        model.Col(
+            id=uuid.uuid4(),
+            dim_id=dim.id,
+            code=f"col{i}",
+            col_type=enum.ColType.TEXT,
+        )
+        for i in range(N_COLS)
+    ]
+    case_type = model.CaseType(id=uuid.uuid4(), name="case_type")
+    case_type_cols = [
+        model.CaseTypeCol(
+            id=uuid.uuid4(), case_type_id=case_type.id, col_id=x.id, code=x.code
+        )
+        for x in cols
+    ]
+    case_type_col_sets = [
+        model.CaseTypeColSet(id=uuid.uuid4(), name=f"set{i}") for i in range(N_SETS)
+    ]
+    members = [
+        model.CaseTypeColSetMember(
+            id=uuid.uuid4(), case_type_col_set_id=x.id, case_type_col_id=y.id
+        )
+        for i, x in enumerate(case_type_col_sets)
+        for y in (case_type_cols * 2)[i : i + N_SET_COLS]
+    ]
+    with repository.uow() as uow:
+        for model_class, objs in [
+            (model.Dim, [dim]),
+            (model.Col, cols),
+            (model.CaseType, [case_type]),
+            (model.CaseTypeCol, case_type_cols),
+            (model.CaseTypeColSet, case_type_col_sets),
+            (model.CaseTypeColSetMember, members),
+        ]:
+            repository.crud(
+                uow, None, model_class, objs, None, CrudOperation.CREATE_SOME
+            )
+    return case_type_col_sets, case_type_cols
+
+
+class TestUpdateAssociation:
+    def test_update_association(self, tmp_path: Path) -> None:
+        repository = create_repository(tmp_path / "case.sqlite")
+        case_type_col_sets, case_type_cols = create_content(repository)
+
+        # Alternately shift the cols of the first set, so that each update creates,
+        # updates and deletes associations
+        case_type_col_set = case_type_col_sets[0]
+        durations = []
+        for i in range(N_REPEATS):
+            offset = (i + 1) % 2 * (N_COLS - N_SET_COLS)
+            case_type_col_ids = [
+                x.id for x in case_type_cols[offset : offset + N_SET_COLS]
+            ]
+            members = [
+                model.CaseTypeColSetMember(
+                    id=uuid.uuid4(),
+                    case_type_col_set_id=case_type_col_set.id,
+                    case_type_col_id=x,
+                )
+                for x in case_type_col_ids
+            ]
+            start = time.perf_counter()
+            with repository.uow() as uow:
+                repository.update_association(
+                    uow,
+                    None,
+                    model.CaseTypeColSetMember,
+                    "case_type_col_set_id",
+                    "case_type_col_id",
+                    case_type_col_set.id,
+                    None,
+                    members,
+                )
+            durations.append(time.perf_counter() - start)
+
+            with repository.uow() as uow:
+                all_members: list[model.CaseTypeColSetMember] = repository.crud(
+                    uow,
+                    None,
+                    model.CaseTypeColSetMember,
+                    None,
+                    None,
+                    CrudOperation.READ_ALL,
+                )  # type: ignore[assignment]
+            assert len(all_members) == N_SETS * N_SET_COLS
+            assert {
+                x.case_type_col_id
+                for x in all_members
+                if x.case_type_col_set_id == case_type_col_set.id
+            } == set(case_type_col_ids)
+
+        # Reading all associations once, as was done for each update before
+        start = time.perf_counter()
+        with repository.uow() as uow:
+            repository.crud(
+                uow,
+                None,
+                model.CaseTypeColSetMember,
+                None,
+                None,
+                CrudOperation.READ_ALL,
+            )
+        scan_duration = time.perf_counter() - start
+        print(
+            f"\nUpdate association of {N_SET_COLS} out of {N_SETS * N_SET_COLS} rows "
+            f"x {N_REPEATS}: {sum(durations):.3f}s, "
+            f"reading all rows once: {scan_duration:.3f}s"
+        )
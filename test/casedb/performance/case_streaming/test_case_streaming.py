@@ -0,0 +1,155 @@
+import logging
+import test.test_client.util as test_util
+import time
+import tracemalloc
+import uuid
+from test.casedb.casedb_service_test_client import CasedbServiceTestClient as Env
+from test.test_client.enum import TestType as EnumTestType  # to avoid PyTest warning
+from typing import Callable, Iterator
+
+import pytest
+from pydantic import TypeAdapter
+
+from gen_epix.casedb.domain import command, enum, model
+from gen_epix.casedb.services import CaseService
+from gen_epix.fastapp import CrudOperation
+from gen_epix.fastapp.api import ModelStreamEncoder
+
+# Total number of cases to benchmark with, obtained by adding copies of the existing
+# cases. Increase to e.g. 500_000 for a full scale benchmark.
+N_CASES = 20_000
+
+
+@pytest.fixture(scope="module", name="env")
+def get_test_client() -> Env:
+    return Env.get_test_client(
+        test_type=EnumTestType.CASEDB_INTEGRATION_CONTENT,
+        repository_type=enum.RepositoryType.DICT,
+        load_target="full",
+        verbose=False,
+        log_level=logging.ERROR,
+    )
+
+
+def measure(fun: Callable[[], Iterator[bytes]]) -> tuple[float, float, int, bytes]:
+    """
+    Consume the chunks generated by fun, returning the time to the first chunk, the
+    total time, the peak traced memory and the first chunk.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    time_to_first_chunk = 0.0
+    content = b""
+    for chunk in fun():
+        # Only keep the first chunk, as a client would consume the rest
+        if not time_to_first_chunk:
+            time_to_first_chunk = time.perf_counter() - start
+            content = chunk
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return time_to_first_chunk, duration, peak, content
+
+
+class TestCaseStreaming:
+    def test_case_streaming(self, env: Env) -> None:
+        app = env.app
+        case_service: CaseService = env.services[enum.ServiceType.CASE]
+        root_user = test_util.create_root_user_from_claims(env.cfg, app)
+
+        # Add copies of the existing cases up to N_CASES
+        cases: list[model.Case] = app.handle(
+            command.CaseCrudCommand(user=root_user, operation=CrudOperation.READ_ALL)
+        )
+        n_copies = max(0, N_CASES - len(cases))
+        copies = [
+            cases[i % len(cases)].model_copy(update={"id": uuid.uuid4()})
+            for i in range(n_copies)
+        ]
+        with case_service.repository.uow() as uow:
+            case_service.repository.crud(
+                uow, root_user.id, model.Case, copies, None, CrudOperation.CREATE_SOME
+            )
+        try:
+            case_service.clear_cases_cache()
+
+            # Use the regular user with access to the most cases
+            users = [
+                x
+                for x in app.handle(
+                    command.UserCrudCommand(
+                        user=root_user, operation=CrudOperation.READ_ALL
+                    )
+                )
+                if x.roles.intersection(enum.RoleSet.GE_ORG_USER.value)
+            ]
+            case_ids_by_user = {
+                x.id: app.handle(
+                    command.RetrieveCasesByQueryCommand(
+                        user=x, case_query=model.CaseQuery()
+                    )
+                )
+                for x in users
+            }
+            user = max(users, key=lambda x: len(case_ids_by_user[x.id]))
+            case_ids = case_ids_by_user[user.id]
+
+            # List: retrieve all cases and serialise them in one go
+            def retrieve_list() -> Iterator[bytes]:
+                case_service.clear_cases_cache()
+                cases = app.handle(
+                    command.RetrieveCasesByIdCommand(user=user, case_ids=case_ids)
+                )
+                yield TypeAdapter(list[model.Case]).dump_json(cases)
+
+            # Stream: retrieve and serialise the cases in batches
+            def retrieve_stream() -> Iterator[bytes]:
+                case_service.clear_cases_cache()
+                batches = app.handle(
+                    command.RetrieveCasesByIdCommand(
+                        user=user,
+                        case_ids=case_ids,
+                        batch_size=ModelStreamEncoder.DEFAULT_BATCH_SIZE,
+                    )
+                )
+                yield from ModelStreamEncoder.encode_ndjson(batches)
+
+            list_ttfb, list_duration, list_peak, list_content = measure(retrieve_list)
+            stream_ttfb, stream_duration, stream_peak, stream_content = measure(
+                retrieve_stream
+            )
+            print(
+                f"\nRetrieve {len(case_ids)} cases by id: "
+                f"list first byte {list_ttfb:.3f}s, total {list_duration:.3f}s, "
+                f"peak {list_peak / 1e6:.1f}MB; "
+                f"stream first byte {stream_ttfb:.3f}s, total {stream_duration:.3f}s, "
+                f"peak {stream_peak / 1e6:.1f}MB"
+            )
+
+            # Verify that the first streamed batch is equal to the start of the list
+            first_cases = [
+                model.Case.model_validate_json(x) for x in stream_content.splitlines()
+            ]
+            assert len(first_cases) == min(
+                len(case_ids), ModelStreamEncoder.DEFAULT_BATCH_SIZE
+            )
+            assert (
+                first_cases
+                == TypeAdapter(list[model.Case]).validate_json(list_content)[
+                    : len(first_cases)
+                ]
+            )
+            assert stream_ttfb < list_ttfb
+            assert stream_peak < list_peak
+        finally:
+            # Remove the copies again, since the environment is shared
+            with case_service.repository.uow() as uow:
+                case_service.repository.crud(
+                    uow,
+                    root_user.id,
+                    model.Case,
+                    None,
+                    [x.id for x in copies],
+                    CrudOperation.DELETE_SOME,
+                )
+            case_service.clear_cases_cache()
@@ -0,0 +1,99 @@
+import random
+import time
+import uuid
+
+import sqlalchemy as sa
+
+from gen_epix.casedb.repositories.sa_model import case as sa_model
+
+N_LINKS = 1_000_000
+N_CASES = 500_000
+N_DATA_COLLECTIONS = 1_000
+N_REPEATS = 20
+BATCH_SIZE = 100_000
+
+
+def create_link_table(engine: sa.Engine) -> sa.Table:
+    # Copy the columns and indexes of the table without its schema and foreign
+    # keys, so that no database has to be attached and no other table created
+    source_table = sa_model.CaseDataCollectionLink.__table__
+    table = sa.Table(
+        source_table.name,
+        sa.MetaData(),
+        *[x.copy() for x in source_table.columns if not x.foreign_keys],
+        *[
+            sa.Column(x.name, x.type, nullable=x.nullable)
+            for x in source_table.columns
+            if x.foreign_keys
+        ],
+        *[sa.Index(x.name, *[y.name for y in x.columns]) for x in source_table.indexes],
+    )
+    table.create(engine)
+    rng = random.Random(0)
+    case_ids = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(N_CASES)]
+    data_collection_ids = [
+        uuid.UUID(int=rng.getrandbits(128)) for _ in range(N_DATA_COLLECTIONS)
+    ]
+    rows = []
+    for i in range(N_LINKS):
+        # Each case in a few data collections
+        rows.append(
+            {
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "case_id": case_ids[i % N_CASES],
+                "data_collection_id": data_collection_ids[
+                    (i // N_CASES + i * 7) % N_DATA_COLLECTIONS
+                ],
+            }
+        )
+    with engine.begin() as conn:
+        for i in range(0, N_LINKS, BATCH_SIZE):
+            conn.execute(table.insert(), rows[i : i + BATCH_SIZE])
+    return table
+
+
+def read_links(
+    engine: sa.Engine, table: sa.Table, data_collection_ids: list[uuid.UUID]
+) -> tuple[float, set[uuid.UUID]]:
+    stmt = sa.select(table.c.case_id).where(
+        table.c.data_collection_id.in_(data_collection_ids)
+    )
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        for _ in range(N_REPEATS):
+            case_ids = set(conn.execute(stmt).scalars())
+    return time.perf_counter() - start, case_ids
+
+
+class TestIndexes:
+    def test_link_index(self) -> None:
+        index_name = "ix_case_data_collection_link_data_collection_id"
+        table = sa_model.CaseDataCollectionLink.__table__
+        assert index_name in {x.name for x in table.indexes}
+
+        engine = sa.create_engine("sqlite://")
+        table = create_link_table(engine)
+        with engine.connect() as conn:
+            data_collection_ids = list(
+                conn.execute(
+                    sa.select(table.c.data_collection_id).distinct().limit(3)
+                ).scalars()
+            )
+            plan = conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN SELECT case_id FROM {table.name} "
+                "WHERE data_collection_id = ?",
+                (data_collection_ids[0].bytes,),
+            ).all()
+        assert any(index_name in str(x) for x in plan)
+
+        index_duration, index_case_ids = read_links(engine, table, data_collection_ids)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP INDEX {index_name}")
+        scan_duration, scan_case_ids = read_links(engine, table, data_collection_ids)
+        print(
+            f"\nRead links of {len(data_collection_ids)} data collections from "
+            f"{N_LINKS} links x {N_REPEATS}: index {index_duration:.3f}s, "
+            f"scan {scan_duration:.3f}s"
+        )
+        assert index_case_ids == scan_case_ids
+        assert index_case_ids
@@ -95,6 +95,46 @@ class TestRepository:
                     key = f"{env.repository_type}.{n_models}.{content_size}.{iteration}"
                     PERFORMANCE_HTML[key] = profiler.output_html()
 
+    def test_read_all_trusted(self, env: Env) -> None:
+        if not isinstance(env.repository2, SARepository):
+            pytest.skip("Only applicable to SARepository")
+        _, _, bg_models2_1, _ = env.create_all_model_instances()
+        models2_2 = [
+            env.get_model_instance_for_class(Model2_2, set_id=False)
+            for _ in range(10000)
+        ]
+        for model2_2 in models2_2:
+            model2_2.var3 = {str(uuid.uuid4()): str(uuid.uuid4()) for _ in range(10)}
+            model2_2.model2_1_id = bg_models2_1[0].id
+        env.app.handle(
+            Model2_2CrudCommand(objs=models2_2, operation=CrudOperation.CREATE_SOME)
+        )
+
+        # Read all objs with and without validating them, monitoring performance
+        # using cProfile
+        models2_2_read = {}
+        for iteration in range(10):
+            for trusted_load in [False, True]:
+                with cProfile.Profile() as profiler:
+                    models2_2_read[trusted_load] = env.app.handle(
+                        Model2_2CrudCommand(
+                            operation=CrudOperation.READ_ALL,
+                            props={"trusted_load": trusted_load},
+                        )
+                    )
+                stats = pstats.Stats(profiler)
+                stats.sort_stats("tottime")
+                parse_stats(
+                    PERFORMANCE_DF,
+                    stats,
+                    test_name=env.test_name,
+                    repository_type=env.repository_type,
+                    n_models=len(models2_2_read[trusted_load]),
+                    trusted_load=trusted_load,
+                    iteration=iteration,
+                )
+        assert models2_2_read[True] == models2_2_read[False]
+
     def test_tear_down(self, env: Env) -> None:
         # TODO: tearDownClass should be called by the test framework instead
         TestRepository.tearDownClass(env)
@@ -0,0 +1,180 @@
+import asyncio
+import threading
+import time
+import uuid
+from test.fastapp.command import Model1_1CrudCommand, Model2_1CrudCommand
+from test.fastapp.enum import TestType as EnumTestType  # to avoid PyTest warning
+from test.fastapp.service_test_client import ServiceTestClient as Env
+
+import pytest
+
+from gen_epix.fastapp import App, exc
+from gen_epix.fastapp.api import CommandExecutor
+from gen_epix.fastapp.enum import CrudOperation, EventTiming, ExecutionStrategy
+from gen_epix.fastapp.repositories.dict.repository import DictRepository
+
+
+def get_test_client() -> Env:
+    return Env.get_test_client(
+        DictRepository, test_type=EnumTestType.SERVICE_SERVICE_UNIT_REPOSITORY
+    )
+
+
+def create_app() -> App:
+    # App factory for the processes of the process pool, which thereby have their
+    # own test client and repositories
+    return get_test_client().app
+
+
+def create_app_with_model_instances() -> App:
+    env = get_test_client()
+    env.create_all_model_instances()
+    return env.app
+
+
+class TestCommandExecutor:
+    def test_thread_pool(self) -> None:
+        env = get_test_client()
+        env.create_all_model_instances()
+        n_cmds = 8
+        max_threads = 2
+        duration = 0.05
+
+        n_running = 0
+        max_n_running = 0
+        lock = threading.Lock()
+
+        def _delay_command(cmd: Model1_1CrudCommand, _) -> None:  # type: ignore[no-untyped-def]
+            nonlocal n_running, max_n_running
+            with lock:
+                n_running += 1
+                max_n_running = max(max_n_running, n_running)
+            time.sleep(duration)
+            with lock:
+                n_running -= 1
+
+        async def _handle_commands(
+            command_executor: CommandExecutor,
+        ) -> tuple[list, int]:
+            # Count how often another task gets to run while the commands are handled
+            n_ticks = 0
+            is_done = False
+
+            async def _tick() -> None:
+                nonlocal n_ticks
+                while not is_done:
+                    n_ticks += 1
+                    await asyncio.sleep(duration / 10)
+
+            tick_task = asyncio.create_task(_tick())
+            retvals = await asyncio.gather(
+                *[
+                    command_executor.handle(
+                        Model1_1CrudCommand(operation=CrudOperation.READ_ALL)
+                    )
+                    for _ in range(n_cmds)
+                ]
+            )
+            is_done = True
+            await tick_task
+            return retvals, n_ticks
+
+        expected = env.app.handle(Model1_1CrudCommand(operation=CrudOperation.READ_ALL))
+        env.app.register_listener(
+            Model1_1CrudCommand, _delay_command, EventTiming.BEFORE
+        )
+        try:
+            # Handling the commands in the event loop blocks it
+            command_executor = CommandExecutor(
+                env.app, strategy=ExecutionStrategy.EVENT_LOOP
+            )
+            retvals, n_ticks = asyncio.run(_handle_commands(command_executor))
+            assert all(x == expected for x in retvals)
+            assert n_ticks < n_cmds
+            # Handling the commands in the thread pool does not, with the commands
+            # beyond max_threads waiting for a thread
+            max_n_running = 0
+            command_executor = CommandExecutor(env.app, max_threads=max_threads)
+            retvals, n_ticks = asyncio.run(_handle_commands(command_executor))
+            assert all(x == expected for x in retvals)
+            assert n_ticks >= n_cmds
+            assert max_n_running == max_threads
+        finally:
+            env.app.unregister_listener(
+                Model1_1CrudCommand, _delay_command, EventTiming.BEFORE
+            )
+        metrics = command_executor.get_metrics()[ExecutionStrategy.THREAD_POOL]
+        assert metrics.n_completed == n_cmds
+        assert metrics.n_in_flight == 0
+        assert metrics.queue_depth == 0
+        assert metrics.max_queue_depth == n_cmds - max_threads
+        assert metrics.max_wait_time >= duration
+        assert metrics.total_wait_time >= metrics.max_wait_time
+        metrics = command_executor.get_metrics()[ExecutionStrategy.EVENT_LOOP]
+        assert metrics.n_completed == 0
+
+    def test_process_pool(self) -> None:
+        env = get_test_client()
+        env.create_all_model_instances()
+        with pytest.raises(exc.InitializationServiceError):
+            CommandExecutor(env.app, strategy=ExecutionStrategy.PROCESS_POOL)
+        command_executor = CommandExecutor(
+            env.app,
+            strategy=ExecutionStrategy.EVENT_LOOP,
+            strategy_by_command_class={
+                Model1_1CrudCommand: ExecutionStrategy.PROCESS_POOL
+            },
+            max_processes=1,
+            app_factory=create_app,
+        )
+
+        async def _handle_commands() -> tuple[list, list]:
+            return await asyncio.gather(
+                command_executor.handle(
+                    Model1_1CrudCommand(operation=CrudOperation.READ_ALL)
+                ),
+                command_executor.handle(
+                    Model2_1CrudCommand(operation=CrudOperation.READ_ALL)
+                ),
+            )
+
+        try:
+            # The process has its own app, with its own empty repositories
+            models1_1, models2_1 = asyncio.run(_handle_commands())
+            assert models1_1 == []
+            assert models2_1 == env.app.handle(
+                Model2_1CrudCommand(operation=CrudOperation.READ_ALL)
+            )
+            # Exceptions are raised as if the command was handled in this process
+            with pytest.raises(exc.InvalidIdsError):
+                asyncio.run(
+                    command_executor.handle(
+                        Model1_1CrudCommand(
+                            obj_ids=uuid.uuid4(), operation=CrudOperation.READ_ONE
+                        )
+                    )
+                )
+        finally:
+            command_executor.shutdown()
+        metrics = command_executor.get_metrics()
+        assert metrics[ExecutionStrategy.PROCESS_POOL].n_completed == 2
+        assert metrics[ExecutionStrategy.PROCESS_POOL].n_in_flight == 0
+        assert metrics[ExecutionStrategy.PROCESS_POOL].max_wait_time >= 0
+        assert metrics[ExecutionStrategy.EVENT_LOOP].n_completed == 1
+
+    def test_process_pool_props(self) -> None:
+        command_executor = CommandExecutor(
+            get_test_client().app,
+            strategy=ExecutionStrategy.PROCESS_POOL,
+            max_processes=1,
+            app_factory=create_app_with_model_instances,
+        )
+        cmd = Model1_1CrudCommand(operation=CrudOperation.READ_ALL, props={"limit": 1})
+        try:
+            # The props set by the handler in the process are copied back to the
+            # command, such as the cursor of the next page
+            models1_1 = asyncio.run(command_executor.handle(cmd))
+        finally:
+            command_executor.shutdown()
+        assert len(models1_1) == 1
+        assert cmd.props == {"limit": 1, "next_cursor": models1_1[0].id}
@@ -1,3 +1,9 @@
+import datetime
+import os
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from test.fastapp.command import (
     Model1_1CrudCommand,
     Model1_2CrudCommand,
@@ -7,12 +13,31 @@ from test.fastapp.command import (
 from test.fastapp.enum import TestType as EnumTestType  # to avoid PyTest warning
 from test.fastapp.model import Model1_1, Model1_2, Model2_1, Model2_2
 from test.fastapp.service_test_client import ServiceTestClient as Env
+from typing import Any
 
 import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql, postgresql
 
-from gen_epix.fastapp.enum import CrudOperation
+from gen_epix.fastapp import exc
+from gen_epix.fastapp.enum import CrudOperation, EventTiming
+from gen_epix.fastapp.model import Command, Policy
 from gen_epix.fastapp.repositories.dict.repository import DictRepository
 from gen_epix.fastapp.repositories.sa.repository import SARepository
+from gen_epix.fastapp.repositories.sa.unit_of_work import SAUnitOfWork
+from gen_epix.fastapp.repositories.sa.util import sqlite_regex_match
+from gen_epix.filter import (
+    BooleanOperator,
+    CompositeFilter,
+    ExistsFilter,
+    Filter,
+    FilterOptimizer,
+    NumberRangeFilter,
+    NumberSetFilter,
+    RegexFilter,
+    StringSetFilter,
+    UuidSetFilter,
+)
 
 
 def get_test_clients() -> list[Env]:
@@ -245,3 +270,721 @@ class TestRepository:
         )
         model2_2_read_all = {x.id: x for x in model2_2_read_all}
         assert all([x == model2_2_read_all[x.id] for x in models2_2])
+
+    def test_read_all_paginated(self, env: Env) -> None:
+        env.create_all_model_instances()
+        model1_1_ids = sorted(
+            env.app.handle(
+                Model1_1CrudCommand(
+                    operation=CrudOperation.READ_ALL, props={"return_id": True}
+                )
+            )
+        )
+        limit = max(1, len(model1_1_ids) // 3)
+        read_ids = []
+        cursor = None
+        while True:
+            props = {"limit": limit}
+            if cursor is not None:
+                props["cursor"] = cursor
+            cmd = Model1_1CrudCommand(operation=CrudOperation.READ_ALL, props=props)
+            page = env.app.handle(cmd)
+            assert len(page) <= limit
+            read_ids.extend(x.id for x in page)
+            cursor = cmd.props.get("next_cursor")
+            if cursor is None:
+                break
+            assert cursor == page[-1].id
+        assert read_ids == model1_1_ids
+
+    def test_read_all_streamed(self, env: Env) -> None:
+        env.create_all_model_instances()
+        models1_1 = env.app.handle(
+            Model1_1CrudCommand(operation=CrudOperation.READ_ALL)
+        )
+        batch_size = max(1, len(models1_1) // 3)
+        for props in ({}, {"return_id": True}, {"fields": ["id"]}):
+            expected = env.app.handle(
+                Model1_1CrudCommand(operation=CrudOperation.READ_ALL, props=props)
+            )
+            batches = list(
+                env.app.handle(
+                    Model1_1CrudCommand(
+                        operation=CrudOperation.READ_ALL,
+                        props=props | {"batch_size": batch_size},
+                    )
+                )
+            )
+            assert all(0 < len(x) <= batch_size for x in batches)
+            assert [x for y in batches for x in y] == expected
+        with pytest.raises(exc.InvalidArgumentsError):
+            env.app.handle(
+                Model1_1CrudCommand(
+                    operation=CrudOperation.READ_ALL,
+                    props={"batch_size": batch_size, "limit": batch_size},
+                )
+            )
+
+    def test_read_all_streamed_command_stack(self, env: Env) -> None:
+        env.create_all_model_instances()
+        cmd_stacks = []
+
+        class RecordCommandStackPolicy(Policy):
+            def filter(self, cmd: Command, retval: Any) -> Any:
+                cmd_stacks.append(env.app.get_command_stack())
+                return retval
+
+        policy = RecordCommandStackPolicy()
+        env.app.register_policy(Model1_1CrudCommand, policy, EventTiming.AFTER)
+        try:
+            cmd = Model1_1CrudCommand(
+                operation=CrudOperation.READ_ALL, props={"batch_size": 1}
+            )
+            batches = env.app.handle(cmd)
+            assert not env.app.get_command_stack()
+            # The batches are retrieved within the command, also when consumed in
+            # another thread after the command has been handled
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                batches = executor.submit(list, batches).result()
+        finally:
+            env.app.unregister_policy(Model1_1CrudCommand, policy, EventTiming.AFTER)
+        assert len(batches) > 1
+        assert cmd_stacks == [(cmd,)] * len(batches)
+        assert not env.app.get_command_stack()
+
+    def test_read_all_filtered(self, env: Env) -> None:
+        env.create_all_model_instances()
+        models1_1 = env.app.handle(
+            Model1_1CrudCommand(operation=CrudOperation.READ_ALL)
+        )
+        filters: list[Filter] = [
+            # Negation of an AND filter, converted with De Morgan's laws
+            CompositeFilter(
+                filters=[
+                    NumberSetFilter(key="var1", members={0, 1}),
+                    StringSetFilter(key="var2", members={"1", "2"}),
+                ],
+                invert=True,
+            ),
+            # OR filter with a common sub-filter that can be factored out
+            CompositeFilter(
+                filters=[
+                    CompositeFilter(
+                        filters=[
+                            ExistsFilter(key="var1"),
+                            RegexFilter(key="var2", pattern="^1$"),
+                        ]
+                    ),
+                    CompositeFilter(
+                        filters=[
+                            NumberSetFilter(key="var1", members={2}),
+                            ExistsFilter(key="var1"),
+                        ]
+                    ),
+                ],
+                operator=BooleanOperator.OR,
+            ),
+            # OR filter of which only an implied filter can be converted
+            CompositeFilter(
+                filters=[
+                    NumberSetFilter(key="var1", members={0}),
+                    CompositeFilter(
+                        filters=[
+                            NumberRangeFilter(key="var1", lower_bound=1),
+                            RegexFilter(key="var2", pattern="^2$"),
+                        ]
+                    ),
+                ],
+                operator=BooleanOperator.OR,
+            ),
+            # Inverted sub-filters
+            CompositeFilter(
+                filters=[
+                    StringSetFilter(key="var2", members={"0"}, invert=True),
+                    CompositeFilter(
+                        filters=[NumberRangeFilter(key="var1", upper_bound=2)],
+                        operator=BooleanOperator.NOT,
+                    ),
+                ],
+                operator=BooleanOperator.OR,
+            ),
+        ]
+        for filter in filters:
+            if isinstance(env.repository1, SARepository):
+                where_clause_filter, _ = env.repository1.split_filter(Model1_1, filter)
+                assert where_clause_filter is not None
+            expected_ids = {x.id for x in filter.filter_rows(models1_1, is_model=True)}
+            assert 0 < len(expected_ids) < len(models1_1)
+            models1_1_read = env.app.handle(
+                Model1_1CrudCommand(
+                    operation=CrudOperation.READ_ALL, query_filter=filter
+                )
+            )
+            assert {x.id for x in models1_1_read} == expected_ids
+
+    def test_read_all_regex_filtered(self, env: Env) -> None:
+        env.create_all_model_instances()
+        models1_1 = env.app.handle(
+            Model1_1CrudCommand(operation=CrudOperation.READ_ALL)
+        )
+        for pattern in ["1", "^[12]$", "[02]?1", "2.*"]:
+            for invert in [False, True]:
+                filter = RegexFilter(key="var2", pattern=pattern, invert=invert)
+                if isinstance(env.repository1, SARepository):
+                    # Matched natively by SQLite, without a remainder
+                    assert env.repository1.split_filter(Model1_1, filter)[1] is None
+                expected_ids = {
+                    x.id for x in filter.filter_rows(models1_1, is_model=True)
+                }
+                models1_1_read = env.app.handle(
+                    Model1_1CrudCommand(
+                        operation=CrudOperation.READ_ALL, query_filter=filter
+                    )
+                )
+                assert {x.id for x in models1_1_read} == expected_ids
+
+    def test_read_fields(self, env: Env) -> None:
+        env.create_all_model_instances()
+        models2_2 = env.app.handle(
+            Model2_2CrudCommand(operation=CrudOperation.READ_ALL)
+        )
+        fields = ["var3", "model2_1_id", "var1"]
+
+        def _get_expected(objs: list[Model2_2]) -> list[tuple]:
+            return [(x.var3, x.model2_1_id, x.var1) for x in objs]
+
+        # Read one, read some and read all
+        model2_2_read = env.app.handle(
+            Model2_2CrudCommand(
+                obj_ids=models2_2[0].id,
+                operation=CrudOperation.READ_ONE,
+                props={"fields": fields},
+            )
+        )
+        assert model2_2_read == _get_expected(models2_2[:1])[0]
+        assert model2_2_read.var3 == models2_2[0].var3
+        obj_ids = [x.id for x in reversed(models2_2)]
+        models2_2_read = env.app.handle(
+            Model2_2CrudCommand(
+                obj_ids=obj_ids,
+                operation=CrudOperation.READ_SOME,
+                props={"fields": fields},
+            )
+        )
+        assert models2_2_read == _get_expected(list(reversed(models2_2)))
+        models2_2_read = env.app.handle(
+            Model2_2CrudCommand(
+                operation=CrudOperation.READ_ALL, props={"fields": ["id", "var2"]}
+            )
+        )
+        assert sorted(models2_2_read) == sorted((x.id, x.var2) for x in models2_2)
+        # Read all with a filter and with a remainder filter applied to the objs
+        filter = NumberSetFilter(key="var1", members={models2_2[0].var1})
+        expected = _get_expected(filter.filter_rows(models2_2, is_model=True))
+        with env.repository2.uow() as uow:
+            for kwargs in [{"filter": filter}, {"obj_filter": filter}]:
+                models2_2_read = env.repository2.crud(
+                    uow,
+                    None,
+                    Model2_2,
+                    None,
+                    None,
+                    CrudOperation.READ_ALL,
+                    fields=fields,
+                    **kwargs,
+                )
+                assert sorted(models2_2_read, key=repr) == sorted(expected, key=repr)
+        # Invalid fields
+        with pytest.raises(exc.InvalidArgumentsError):
+            env.app.handle(
+                Model2_2CrudCommand(
+                    operation=CrudOperation.READ_ALL, props={"fields": ["var4"]}
+                )
+            )
+
+    def test_read_cascade_queries(self, env: Env) -> None:
+        if not isinstance(env.repository2, SARepository):
+            pytest.skip("Only applicable to SARepository")
+        env.create_all_model_instances(cascade=True)
+        models2_1_by_id = {
+            x.id: x
+            for x in env.app.handle(
+                Model2_1CrudCommand(operation=CrudOperation.READ_ALL)
+            )
+        }
+        models2_2 = env.app.handle(
+            Model2_2CrudCommand(operation=CrudOperation.READ_ALL)
+        )
+        statements = []
+
+        def _count_statement(*args, **kwargs) -> None:  # type: ignore[no-untyped-def]
+            statements.append(args[2])
+
+        # The linked models of the same repository are loaded in the same query
+        sa.event.listen(
+            env.repository2.engine, "before_cursor_execute", _count_statement
+        )
+        try:
+            for operation, obj_ids in [
+                (CrudOperation.READ_SOME, [x.id for x in models2_2]),
+                (CrudOperation.READ_ALL, None),
+            ]:
+                statements.clear()
+                with env.repository2.uow() as uow:
+                    models2_2_read = env.repository2.crud(
+                        uow,
+                        None,
+                        Model2_2,
+                        None,
+                        obj_ids,
+                        operation,
+                        cascade_read=True,
+                        links=Model2_2.ENTITY.links,
+                    )
+                assert len(statements) == 1
+                for model2_2 in models2_2_read:  # type: ignore[union-attr]
+                    model2_1 = models2_1_by_id[model2_2.model2_1_id]
+                    assert model2_2.model2_1 is not None
+                    assert model2_2.model2_1.model_dump(
+                        exclude={"model1_2"}
+                    ) == model2_1.model_dump(exclude={"model1_2"})
+        finally:
+            sa.event.remove(
+                env.repository2.engine, "before_cursor_execute", _count_statement
+            )
+
+    def test_concurrent_commands(self, env: Env) -> None:
+        n_threads = 16
+        n_iterations = 10
+        env.create_all_model_instances()
+        initial_cmds: dict[int, Model2_1CrudCommand] = {}
+        nested_cmd_stacks: list[tuple[int, tuple]] = []
+
+        def _record_command_stack(cmd: Model1_2CrudCommand, _) -> None:  # type: ignore[no-untyped-def]
+            nested_cmd_stacks.append(
+                (threading.get_ident(), env.app.get_command_stack())
+            )
+
+        sessions = {}
+        barrier = threading.Barrier(n_threads)
+
+        def _run(thread_idx: int) -> None:
+            # All threads hold a unit of work at the same time
+            if isinstance(env.repository1, SARepository):
+                with env.repository1.uow() as uow:
+                    with env.repository1.uow() as nested_uow:
+                        assert nested_uow.session is uow.session
+                    barrier.wait()
+                    sessions[thread_idx] = uow.session
+                    assert SAUnitOfWork.get_context_stack(id(env.repository1)) == (uow,)
+                assert not SAUnitOfWork.get_context_stack(id(env.repository1))
+            # Mix of commands, including nested ones issued by the cascade read
+            for i in range(n_iterations):
+                tag = f"thread{thread_idx}_{i}"
+                models1_1 = env.app.handle(
+                    Model1_1CrudCommand(
+                        objs=[
+                            Model1_1(id=None, var1=thread_idx, var2=tag)
+                            for _ in range(3)
+                        ],
+                        operation=CrudOperation.CREATE_SOME,
+                    )
+                )
+                models1_1_read = env.app.handle(
+                    Model1_1CrudCommand(
+                        obj_ids=[x.id for x in models1_1],
+                        operation=CrudOperation.READ_SOME,
+                    )
+                )
+                assert [x.var2 for x in models1_1_read] == [tag] * 3
+                cmd = Model2_1CrudCommand(
+                    operation=CrudOperation.READ_ALL, props={"cascade_read": True}
+                )
+                initial_cmds[threading.get_ident()] = cmd
+                models2_1 = env.app.handle(cmd)
+                assert all(x.model1_2.id == x.model1_2_id for x in models2_1)
+                env.app.handle(
+                    Model1_1CrudCommand(
+                        obj_ids=[x.id for x in models1_1],
+                        operation=CrudOperation.DELETE_SOME,
+                    )
+                )
+                assert not env.app.get_command_stack()
+
+        env.app.register_listener(
+            Model1_2CrudCommand, _record_command_stack, EventTiming.BEFORE
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=n_threads) as executor:
+                for future in [executor.submit(_run, x) for x in range(n_threads)]:
+                    future.result()
+        finally:
+            env.app.unregister_listener(
+                Model1_2CrudCommand, _record_command_stack, EventTiming.BEFORE
+            )
+        # Each nested command was issued by the initial command of its own thread
+        assert nested_cmd_stacks
+        for thread_id, cmd_stack in nested_cmd_stacks:
+            assert len(cmd_stack) == 2
+            assert isinstance(cmd_stack[0], Model2_1CrudCommand)
+            assert isinstance(cmd_stack[1], Model1_2CrudCommand)
+        assert {x for x, _ in nested_cmd_stacks} <= initial_cmds.keys()
+        # Each thread had its own session
+        if isinstance(env.repository1, SARepository):
+            assert len({id(x) for x in sessions.values()}) == n_threads
+
+    def test_sqlite_connection_per_thread(self, env: Env) -> None:
+        if not isinstance(env.repository1, SARepository):
+            pytest.skip("Only applicable to SARepository")
+        models1_1, _, _, _ = env.create_all_model_instances()
+        engine = env.repository1.engine
+        pool = engine.pool
+        assert isinstance(pool, sa.pool.SingletonThreadPool)
+
+        def _read() -> Any:
+            with engine.connect() as connection:
+                dbapi_connection = connection.connection.dbapi_connection
+            models1_1_read = env.app.handle(
+                Model1_1CrudCommand(
+                    obj_ids=[x.id for x in models1_1],
+                    operation=CrudOperation.READ_SOME,
+                )
+            )
+            assert models1_1_read == models1_1
+            return dbapi_connection
+
+        # Other threads each add a connection to the pool, until the connection of
+        # this thread has been evicted. Its new connection must attach the schema
+        # again.
+        dbapi_connection = _read()
+        for _ in range(20):
+            with ThreadPoolExecutor(max_workers=pool.size + 1) as executor:
+                for future in [executor.submit(_read) for _ in range(pool.size + 1)]:
+                    future.result()
+            if _read() is not dbapi_connection:
+                break
+        else:
+            assert False, "Connection not evicted"
+
+    def test_sqlite_multiple_schemas(self, env: Env) -> None:
+        if not isinstance(env.repository1, SARepository):
+            pytest.skip("Only applicable to SARepository")
+        entities = env.app.domain.get_dag_sorted_entities()
+        assert len({x.schema_name for x in entities if x.persistable}) > 1
+        sqlite_file = os.path.join(env.test_dir, "multiple_schemas.sqlite")
+        with pytest.raises(NotImplementedError):
+            SARepository.create_sa_repository(
+                entities, f"sqlite:///{sqlite_file}", recreate_sqlite_file=True
+            )
+
+    def test_upsert(self, env: Env) -> None:
+        models1_1, _, _, models2_2 = env.create_all_model_instances()
+        # Upsert a changed, an unchanged and a new obj
+        models1_1 = [
+            models1_1[0].model_copy(update={"var2": "changed"}),
+            models1_1[1],
+            Model1_1(id=uuid.uuid4(), var1=-1, var2="new"),
+        ]
+        models1_1_upserted = env.app.handle(
+            Model1_1CrudCommand(objs=models1_1, operation=CrudOperation.UPSERT_SOME)
+        )
+        assert models1_1_upserted == models1_1
+        models1_1_read = env.app.handle(
+            Model1_1CrudCommand(
+                obj_ids=[x.id for x in models1_1], operation=CrudOperation.READ_SOME
+            )
+        )
+        assert models1_1_read == models1_1
+        # Update returning ids, including a JSON field
+        models2_2 = [
+            models2_2[0].model_copy(update={"var3": {"changed": 1}}),
+            models2_2[1].model_copy(update={"var1": -1}),
+        ]
+        model2_2_ids = env.app.handle(
+            Model2_2CrudCommand(
+                objs=models2_2,
+                operation=CrudOperation.UPDATE_SOME,
+                props={"return_id": True},
+            )
+        )
+        assert model2_2_ids == [x.id for x in models2_2]
+        models2_2_read = env.app.handle(
+            Model2_2CrudCommand(obj_ids=model2_2_ids, operation=CrudOperation.READ_SOME)
+        )
+        assert models2_2_read == models2_2
+        # Updating unchanged objs succeeds, whereas updating a non-existing obj
+        # raises and updates none of the others
+        model2_2_ids = env.app.handle(
+            Model2_2CrudCommand(
+                objs=models2_2,
+                operation=CrudOperation.UPDATE_SOME,
+                props={"return_id": True},
+            )
+        )
+        assert model2_2_ids == [x.id for x in models2_2]
+        with pytest.raises(exc.InvalidIdsError):
+            env.app.handle(
+                Model2_2CrudCommand(
+                    objs=[
+                        models2_2[0].model_copy(update={"var1": -2}),
+                        models2_2[1].model_copy(update={"id": uuid.uuid4()}),
+                    ],
+                    operation=CrudOperation.UPDATE_SOME,
+                    props={"return_id": True},
+                )
+            )
+        models2_2_read = env.app.handle(
+            Model2_2CrudCommand(obj_ids=model2_2_ids, operation=CrudOperation.READ_SOME)
+        )
+        assert models2_2_read == models2_2
+
+    def test_delete(self, env: Env) -> None:
+        _, _, _, models2_2 = env.create_all_model_instances()
+        # Deleting a non-existing id raises and deletes none of the others
+        with pytest.raises(exc.InvalidIdsError):
+            env.app.handle(
+                Model2_2CrudCommand(
+                    obj_ids=[models2_2[0].id, uuid.uuid4()],
+                    operation=CrudOperation.DELETE_SOME,
+                )
+            )
+        assert env.app.handle(
+            Model2_2CrudCommand(
+                obj_ids=[x.id for x in models2_2], operation=CrudOperation.EXISTS_SOME
+            )
+        ) == [True] * len(models2_2)
+        # Delete all objs matching a filter
+        models2_2 = env.app.handle(
+            Model2_2CrudCommand(operation=CrudOperation.READ_ALL)
+        )
+        for i in range(2):
+            model2_2 = models2_2[0]
+            filter: Filter
+            if i == 0:
+                filter = NumberSetFilter(key="var1", members={model2_2.var1})
+            else:
+                filter = CompositeFilter(
+                    filters=[
+                        NumberRangeFilter(key="var1", lower_bound=model2_2.var1),
+                        RegexFilter(key="var2", pattern=f"^{model2_2.var2}$"),
+                    ]
+                )
+            expected_ids = {x.id for x in filter.filter_rows(models2_2, is_model=True)}
+            assert expected_ids
+            env.app.handle(
+                Model2_2CrudCommand(
+                    operation=CrudOperation.DELETE_ALL, query_filter=filter
+                )
+            )
+            models2_2_read = env.app.handle(
+                Model2_2CrudCommand(operation=CrudOperation.READ_ALL)
+            )
+            assert not expected_ids & {x.id for x in models2_2_read}
+            models2_2 = [x for x in models2_2 if x.id not in expected_ids]
+            assert {x.id for x in models2_2_read} == {x.id for x in models2_2}
+        # Delete all objs linked to some obj
+        model2_1_id = models2_2[0].model2_1_id
+        with env.repository2.uow() as uow:
+            env.repository2.delete_by_filter(
+                uow,
+                None,
+                Model2_2,
+                UuidSetFilter(key="model2_1_id", members={model2_1_id}),
+            )
+        models2_2_read = env.app.handle(
+            Model2_2CrudCommand(operation=CrudOperation.READ_ALL)
+        )
+        assert {x.id for x in models2_2_read} == {
+            x.id for x in models2_2 if x.model2_1_id != model2_1_id
+        }
+
+    def test_id_join(self, env: Env) -> None:
+        if not isinstance(env.repository2, SARepository):
+            pytest.skip("Only applicable to SARepository")
+        models1_1, models1_2, models2_1, models2_2 = env.create_all_model_instances(
+            cascade=True
+        )
+        repositories = [env.repository1, env.repository2]
+        try:
+            # Join with the ids as a temporary table regardless of their number
+            for repository in repositories:
+                repository.id_join_threshold = 0
+            props = {"cascade_read": True}
+            models2_2_read = env.app.handle(
+                Model2_2CrudCommand(
+                    obj_ids=[x.id for x in models2_2],
+                    operation=CrudOperation.READ_SOME,
+                    props=props,
+                )
+            )
+            assert models2_2_read == models2_2
+            with env.repository2.uow() as uow:
+                assert env.repository2.exists_some(
+                    Model2_2,
+                    [models2_2[0].id, uuid.uuid4()],
+                    session=uow.session,
+                ) == [True, False]
+            env.app.handle(
+                Model2_2CrudCommand(
+                    obj_ids=[x.id for x in models2_2[1:]],
+                    operation=CrudOperation.DELETE_SOME,
+                )
+            )
+            with env.repository2.uow() as uow:
+                assert env.repository2.exists_some(
+                    Model2_2, [x.id for x in models2_2], session=uow.session
+                ) == [True] + [False] * (len(models2_2) - 1)
+                env.repository2.delete_by_filter(
+                    uow,
+                    None,
+                    Model2_2,
+                    UuidSetFilter(
+                        key="model2_1_id", members={models2_2[0].model2_1_id}
+                    ),
+                )
+                assert not env.repository2.exists_one(
+                    Model2_2, models2_2[0].id, session=uow.session
+                )
+                # The temporary tables are dropped again
+                assert not uow.session.execute(
+                    sa.text("SELECT name FROM sqlite_temp_master")
+                ).all()
+                # Nested contexts use separate temporary tables, which are also
+                # dropped when an exception is raised
+                id_column = env.repository2.get_mapper(Model2_2).row_class.id
+                obj_ids = [models2_2[0].id]
+                with pytest.raises(ValueError):
+                    with SARepository._in_session_get_id_where_clause(
+                        uow.session, id_column, obj_ids, use_id_join=True
+                    ):
+                        with SARepository._in_session_get_id_where_clause(
+                            uow.session, id_column, obj_ids, use_id_join=True
+                        ):
+                            temp_table_names = uow.session.execute(
+                                sa.text(
+                                    "SELECT name FROM sqlite_temp_master"
+                                    " WHERE type = 'table'"
+                                )
+                            ).all()
+                            assert len(temp_table_names) == 2
+                            raise ValueError()
+                assert not uow.session.execute(
+                    sa.text("SELECT name FROM sqlite_temp_master")
+                ).all()
+        finally:
+            for repository in repositories:
+                repository.id_join_threshold = SARepository.DEFAULT_ID_JOIN_THRESHOLD
+
+
+def _get_random_filter(
+    rng: random.Random, uuids: list[uuid.UUID], depth: int
+) -> Filter:
+    invert = rng.random() < 0.3
+    if depth > 0 and rng.random() < 0.6:
+        return CompositeFilter(
+            filters=[
+                _get_random_filter(rng, uuids, depth - 1)
+                for _ in range(rng.randint(1, 3))
+            ],
+            operator=rng.choice([BooleanOperator.AND, BooleanOperator.OR]),
+            invert=invert,
+        )
+    filter_type = rng.randrange(4)
+    if filter_type == 0:
+        return UuidSetFilter(key="a", members=set(uuids[0:2]), invert=invert)
+    if filter_type == 1:
+        return StringSetFilter(
+            key="b", members={"x", "y"}, case_sensitive=True, invert=invert
+        )
+    if filter_type == 2:
+        return NumberRangeFilter(
+            key="c",
+            lower_bound=1,
+            upper_bound=2,
+            upper_bound_censor="<=",
+            invert=invert,
+        )
+    return ExistsFilter(key=rng.choice(["a", "b", "c"]), invert=invert)
+
+
+class TestWhereClause:
+
+    def test_random_filters_equivalent(self) -> None:
+        # The where clause of a filter, with or without optimizing it, selects the
+        # same rows as matching the filter in Python, including for null values
+        # and inverted composite filters
+        repository = Env.get_test_client(
+            SARepository, test_type=EnumTestType.SERVICE_SERVICE_UNIT_REPOSITORY
+        ).repository1
+        assert isinstance(repository, SARepository)
+        uuids = [uuid.uuid4() for _ in range(3)]
+        rows: list[dict] = [{"id": 0}]
+        for key, values in [("a", uuids), ("b", ["x", "y", "z"]), ("c", range(4))]:
+            rows = [x | {key: y} for x in rows for y in [None, *values]]
+        rows = [x | {"id": i} for i, x in enumerate(rows)]
+        metadata = sa.MetaData()
+        table = sa.Table(
+            "test",
+            metadata,
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("a", sa.Uuid, nullable=True),
+            sa.Column("b", sa.String, nullable=True),
+            sa.Column("c", sa.Integer, nullable=True),
+        )
+        engine = sa.create_engine("sqlite://")
+        metadata.create_all(engine)
+        rng = random.Random(0)
+        with engine.begin() as connection:
+            connection.execute(sa.insert(table), rows)
+            for _ in range(300):
+                filter = _get_random_filter(rng, uuids, 3)
+                expected_ids = {x["id"] for x in filter.filter_rows(rows)}
+                for curr_filter in [filter, FilterOptimizer.optimize(filter)]:
+                    where_clause = repository.get_where_clause_from_filter(
+                        table.c, curr_filter
+                    )
+                    ids = connection.execute(
+                        sa.select(table.c.id).where(where_clause)
+                    ).scalars()
+                    assert set(ids) == expected_ids, curr_filter
+
+    def test_cast_text_value(self) -> None:
+        # Values that cannot be cast result in null instead of an error, also on
+        # dialects whose cast fails on them
+        values = ["1", " -2 ", "1.5", "abc", "", "2024-02-29", "2023-02-29", None]
+        expected = {
+            sa.Integer(): [1, -2, None, None, None, None, None, None],
+            sa.Numeric(38, 6): [1, -2, 1.5, None, None, None, None, None],
+            sa.Date(): [None] * 5 + [datetime.date(2024, 2, 29), None, None],
+        }
+        engine = sa.create_engine("sqlite://")
+        sa.event.listen(
+            engine,
+            "connect",
+            lambda x, _: x.create_function("regex_match", 2, sqlite_regex_match),
+        )
+        with engine.connect() as connection:
+            for sa_type, expected_values in expected.items():
+                cast_values = [
+                    connection.execute(
+                        sa.select(
+                            SARepository.cast_text_value(
+                                sa.literal(x, sa.String()), sa_type, "sqlite"
+                            )
+                        )
+                    ).scalar_one()
+                    for x in values
+                ]
+                assert cast_values == expected_values, sa_type
+        for dialect, cast_function in [
+            (postgresql.dialect(), "CAST("),
+            (mssql.dialect(), "TRY_CAST ("),
+        ]:
+            sql = str(
+                SARepository.cast_text_value(
+                    sa.column("x", sa.String()), sa.Integer(), dialect.name
+                ).compile(dialect=dialect)
+            )
+            assert f"{cast_function}x AS INTEGER)" in sql
+        with pytest.raises(exc.InvalidArgumentsError):
+            SARepository.cast_text_value(sa.column("x"), sa.Integer(), "oracle")
@@ -0,0 +1,56 @@
+import random
+import time
+import uuid
+
+from gen_epix.filter import (
+    CompositeFilter,
+    NumberRangeFilter,
+    PartialDateRangeFilter,
+    StringSetFilter,
+    UuidSetFilter,
+)
+
+N_ROWS = 1_000_000
+
+
+class TestFilterCompile:
+    def test_compile(self) -> None:
+        rng = random.Random(0)
+        uuids = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(5)]
+        months = [f"{x}-{y:02d}" for x in (2021, 2022) for y in range(1, 13)]
+        rows = [
+            {
+                "a": rng.randint(0, 100),
+                "b": rng.choice(["x", "y", "z", None]),
+                "c": rng.choice(months),
+                "d": rng.choice(uuids),
+            }
+            for _ in range(N_ROWS)
+        ]
+        filter = CompositeFilter(
+            filters=[
+                NumberRangeFilter(key="a", lower_bound=10, upper_bound=90),
+                StringSetFilter(key="b", members={"x", "y"}),
+                PartialDateRangeFilter(
+                    key="c", lower_bound="2021-03", upper_bound="2022-06"
+                ),
+                UuidSetFilter(key="d", members=set(uuids[0:3])),
+            ],
+        )
+
+        # Per row: the filter is compiled again for each row
+        start = time.perf_counter()
+        row_results = [filter.match_row(x) for x in rows]
+        row_duration = time.perf_counter() - start
+
+        # Compiled once for all rows
+        start = time.perf_counter()
+        compiled_results = list(filter.match_rows(rows))
+        compiled_duration = time.perf_counter() - start
+
+        print(
+            f"\nMatch {N_ROWS} rows: per row {row_duration:.3f}s, "
+            f"compiled {compiled_duration:.3f}s"
+        )
+        assert compiled_results == row_results
+        assert compiled_duration < row_duration
@@ -1,17 +1,56 @@
 import datetime
+import enum
 import uuid
 from test.filter.unit import util
+from typing import Annotated
 
 import numpy as np
 import pytest
+from pydantic import BaseModel, Field, PlainSerializer, computed_field, field_serializer
 
-from gen_epix.filter import ExistsFilter, NumberRangeFilter
+from gen_epix.filter import (
+    EqualsNumberFilter,
+    EqualsStringFilter,
+    ExistsFilter,
+    Filter,
+    NumberRangeFilter,
+    NumberSetFilter,
+    UuidSetFilter,
+)
 from gen_epix.filter.composite import CompositeFilter
 from gen_epix.filter.date_range import DateRangeFilter
 from gen_epix.filter.partial_date_range import PartialDateRangeFilter
 from gen_epix.filter.string_set import StringSetFilter
 
 
+class _Color(enum.Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class _NestedModel(BaseModel):
+    a: int = 1
+
+
+class _Model(BaseModel):
+    a: int | None = None
+    color: _Color = _Color.RED
+    b: Annotated[int, PlainSerializer(lambda x: x * 10)] = 1
+    c: int = Field(default=1, exclude=True)
+    nested: _NestedModel | None = None
+
+    @field_serializer("color")
+    def _serialize_color(self, value: _Color) -> str:
+        return value.value
+
+    @computed_field
+    def d(self) -> int:
+        return (self.a or 0) * 2
+
+    def e(self) -> int:
+        return 1
+
+
 class TestFilterMatch:
 
     def test_exists_match(self) -> None:
@@ -317,3 +356,180 @@ class TestFilterMatch:
             {"a": "a"},
         ]
         util._test_filter(filter, rows, [True])
+
+    def test_composite_sub_filter_invert_match(self) -> None:
+        # The invert of a sub-filter is applied, with an inverted sub-filter
+        # matching a null value
+        filter = CompositeFilter(
+            filters=[StringSetFilter(members={"a"}, key="a", invert=True)],
+            operator="AND",
+        )
+        rows = [{"a": "a"}, {"a": "b"}, {"a": None}]
+        util._test_filter(filter, rows, [False, True, True])
+
+        # The same for an inverted nested composite filter
+        filter = CompositeFilter(
+            filters=[
+                StringSetFilter(members={"a"}, key="a"),
+                CompositeFilter(
+                    filters=[StringSetFilter(members={"b"}, key="b")],
+                    operator="OR",
+                    invert=True,
+                ),
+            ],
+            operator="AND",
+        )
+        rows = [
+            {"a": "a", "b": "b"},
+            {"a": "a", "b": "c"},
+            {"a": "a", "b": None},
+            {"a": None, "b": None},
+        ]
+        util._test_filter(filter, rows, [False, True, True, False])
+
+    def test_nested_composite_null_match(self) -> None:
+        # A nested composite filter does not require all its values to exist
+        filter = CompositeFilter(
+            filters=[
+                StringSetFilter(members={"a"}, key="a"),
+                CompositeFilter(
+                    filters=[
+                        StringSetFilter(members={"b"}, key="b"),
+                        StringSetFilter(members={"c"}, key="c"),
+                    ],
+                    operator="OR",
+                ),
+            ],
+            operator="AND",
+        )
+        rows = [
+            {"a": "a", "b": "b", "c": None},
+            {"a": "a", "b": None, "c": "c"},
+            {"a": "a", "b": None, "c": None},
+            {"a": None, "b": "b", "c": "c"},
+        ]
+        util._test_filter(filter, rows, [True, True, False, False])
+
+    def test_binary_composite_null_match(self) -> None:
+        # A binary operator only matches if all values exist
+        filter = CompositeFilter(
+            filters=[
+                StringSetFilter(members={"a"}, key="a"),
+                StringSetFilter(members={"b"}, key="b"),
+            ],
+            operator="XOR",
+        )
+        rows = [
+            {"a": "a", "b": "c"},
+            {"a": "a", "b": "b"},
+            {"a": "a", "b": None},
+            {"a": None, "b": "b"},
+        ]
+        util._test_filter(filter, rows, [True, False, False, False])
+
+    def _get_batch_filters(self, uuids: list[uuid.UUID]) -> list:
+        return [
+            NumberRangeFilter(key="a", lower_bound=10, upper_bound=50),
+            NumberRangeFilter(
+                key="a", lower_bound=10, lower_bound_censor=">", invert=True
+            ),
+            NumberSetFilter(key="a", members={1, 20, 40}),
+            EqualsNumberFilter(key="a", value=20),
+            StringSetFilter(key="b", members={"X", "y"}),
+            StringSetFilter(key="b", members={"X", "y"}, case_sensitive=True),
+            UuidSetFilter(key="c", members=set(uuids[0:2])),
+            ExistsFilter(key="c"),
+            CompositeFilter(
+                filters=[
+                    NumberRangeFilter(key="a", upper_bound=30),
+                    CompositeFilter(
+                        filters=[
+                            StringSetFilter(key="b", members={"x"}),
+                            ExistsFilter(key="c"),
+                        ],
+                        operator="OR",
+                        invert=True,
+                    ),
+                ],
+                operator="AND",
+            ),
+            CompositeFilter(
+                filters=[
+                    NumberSetFilter(key="a", members={20}),
+                    StringSetFilter(key="b", members={"z"}),
+                ],
+                operator="XOR",
+            ),
+        ]
+
+    def test_match_batch_columns(self) -> None:
+        # Compare match_batch on native numpy arrays and on object columns with
+        # None values with match_rows
+        uuids = [uuid.uuid4() for _ in range(3)]
+        n_rows = 100
+        a = np.arange(n_rows) % 60
+        b = np.array(["x", "X", "y", "z"])[np.arange(n_rows) % 4]
+        c = [None if i % 5 == 0 else uuids[i % 3] for i in range(n_rows)]
+        rows = [{"a": int(x), "b": str(y), "c": z} for x, y, z in zip(a, b, c)]
+        for filter in self._get_batch_filters(uuids):
+            expected_results = list(filter.match_rows(rows))
+            for columns in [
+                {"a": a, "b": b, "c": c},
+                {"a": list(a), "b": list(b), "c": c},
+            ]:
+                results = filter.match_batch(columns)
+                assert results.dtype == np.bool_
+                assert results.tolist() == expected_results
+
+    def test_match_batch_arrow_columns(self) -> None:
+        pa = pytest.importorskip("pyarrow")
+        uuids = [uuid.uuid4() for _ in range(3)]
+        n_rows = 100
+        a = [None if i % 7 == 0 else i % 60 for i in range(n_rows)]
+        b = [["x", "X", "y", "z"][i % 4] for i in range(n_rows)]
+        c = [None if i % 5 == 0 else uuids[i % 3] for i in range(n_rows)]
+        rows = [{"a": x, "b": y, "c": z} for x, y, z in zip(a, b, c)]
+        columns = {"a": pa.array(a), "b": pa.array(b), "c": c}
+        for filter in self._get_batch_filters(uuids):
+            assert filter.match_batch(columns).tolist() == list(filter.match_rows(rows))
+
+    def test_model_match(self) -> None:
+        # Matching models must give the same result as matching their dump
+        models = [
+            _Model(
+                a=[None, 1, 5, 20][i % 4],
+                color=list(_Color)[i % 2],
+                b=i % 3,
+                nested=None if i % 5 else _NestedModel(),
+            )
+            for i in range(20)
+        ]
+        filters = [
+            StringSetFilter(key="color", members={"red"}),
+            EqualsStringFilter(key="color", value="blue"),
+            NumberRangeFilter(key="b", lower_bound=10, upper_bound=25),
+            NumberRangeFilter(key="d", lower_bound=5),
+            ExistsFilter(key="a"),
+            ExistsFilter(key="c"),
+            ExistsFilter(key="e"),
+            ExistsFilter(key="nested"),
+            CompositeFilter(
+                filters=[
+                    ExistsFilter(key="a"),
+                    StringSetFilter(key="color", members={"blue"}),
+                ],
+                operator="OR",
+            ),
+        ]
+        for filter in filters:
+            expected_results = [filter.match_row(x.model_dump()) for x in models]
+            assert list(filter.match_rows(models, is_model=True)) == expected_results
+            assert [
+                filter.match_row(x, is_model=True) for x in models
+            ] == expected_results
+            assert (
+                filter.match_batch(
+                    Filter.get_columns(models, filter.get_keys(), is_model=True)
+                ).tolist()
+                == expected_results
+            )
@@ -0,0 +1,206 @@
+import random
+import uuid
+
+from gen_epix.filter import (
+    BooleanOperator,
+    CompositeFilter,
+    ExistsFilter,
+    Filter,
+    FilterOptimizer,
+    NumberRangeFilter,
+    NumberSetFilter,
+    StringSetFilter,
+    UuidSetFilter,
+)
+
+UUIDS = [uuid.uuid4() for _ in range(4)]
+STRINGS = ["x", "X", "y", "z"]
+
+
+def _get_random_filter(rng: random.Random, depth: int) -> Filter:
+    invert = rng.random() < 0.3
+    if depth > 0 and rng.random() < 0.6:
+        operator = rng.choice(list(BooleanOperator))
+        if operator == BooleanOperator.NOT:
+            n_filters = 1
+        elif operator in {BooleanOperator.AND, BooleanOperator.OR}:
+            n_filters = rng.randint(1, 4)
+        else:
+            n_filters = 2
+        return CompositeFilter(
+            filters=[_get_random_filter(rng, depth - 1) for _ in range(n_filters)],
+            operator=operator,
+            invert=invert,
+        )
+    filter_type = rng.randrange(5)
+    if filter_type == 0:
+        return UuidSetFilter(
+            key="a", members=set(rng.sample(UUIDS, rng.randint(0, 3))), invert=invert
+        )
+    if filter_type == 1:
+        return StringSetFilter(
+            key="b",
+            members=set(rng.sample(STRINGS, rng.randint(1, 3))),
+            case_sensitive=rng.random() < 0.5,
+            invert=invert,
+        )
+    if filter_type == 2:
+        return NumberSetFilter(
+            key="c", members=set(rng.sample(range(4), 2)), invert=invert
+        )
+    if filter_type == 3:
+        return NumberRangeFilter(
+            key="c",
+            lower_bound=1,
+            upper_bound=rng.randint(1, 3),
+            upper_bound_censor="<=",
+            invert=invert,
+        )
+    return ExistsFilter(key=rng.choice(["a", "b", "c"]), invert=invert)
+
+
+def _get_rows() -> list[dict]:
+    # All combinations of a missing, null and regular value for each key
+    rows: list[dict] = [{}]
+    for key, values in [("a", UUIDS), ("b", STRINGS), ("c", range(4))]:
+        rows = (
+            rows
+            + [row | {key: None} for row in rows]
+            + [row | {key: x} for row in rows for x in values]
+        )
+    return rows
+
+
+def _assert_equivalent(filter: Filter, optimized_filter: Filter, rows: list) -> None:
+    columns = {x: [y.get(x) for y in rows] for x in ["a", "b", "c"]}
+    expected_results = list(filter.match_rows(rows))
+    assert list(optimized_filter.match_rows(rows)) == expected_results, (
+        filter,
+        optimized_filter,
+    )
+    assert optimized_filter.match_batch(columns).tolist() == expected_results
+    assert filter.match_batch(columns).tolist() == expected_results
+
+
+def _is_negation_normal_form(filter: Filter) -> bool:
+    if not isinstance(filter, CompositeFilter):
+        return True
+    if filter.operator in {BooleanOperator.AND, BooleanOperator.OR}:
+        if filter.invert:
+            return False
+    elif filter.operator == BooleanOperator.NOT:
+        return False
+    return all(_is_negation_normal_form(x) for x in filter.filters)
+
+
+class TestFilterOptimizer:
+
+    def test_random_filters_equivalent(self) -> None:
+        rng = random.Random(0)
+        rows = _get_rows()
+        for _ in range(500):
+            filter = _get_random_filter(rng, 3)
+            orig_filter = filter.model_copy(deep=True)
+            optimized_filter = FilterOptimizer.optimize(filter)
+            assert filter == orig_filter
+            assert _is_negation_normal_form(optimized_filter)
+            _assert_equivalent(filter, optimized_filter, rows)
+
+    def test_push_down_negations(self) -> None:
+        filter1 = StringSetFilter(key="b", members={"x"})
+        filter2 = NumberRangeFilter(key="c", lower_bound=1, invert=True)
+        filter = CompositeFilter(
+            filters=[
+                CompositeFilter(filters=[filter1], operator=BooleanOperator.NOT),
+                filter2,
+            ],
+            operator=BooleanOperator.OR,
+            invert=True,
+        )
+        optimized_filter = FilterOptimizer.optimize(filter)
+        assert isinstance(optimized_filter, CompositeFilter)
+        assert optimized_filter.operator == BooleanOperator.AND
+        assert not optimized_filter.invert
+        assert optimized_filter.filters == [
+            filter1,
+            NumberRangeFilter(key="c", lower_bound=1),
+        ]
+        _assert_equivalent(filter, optimized_filter, _get_rows())
+
+    def test_merge_set_filters(self) -> None:
+        # Union for OR, intersection for AND and the reverse when inverted
+        for operator, invert, members in [
+            (BooleanOperator.OR, False, set(UUIDS[0:3])),
+            (BooleanOperator.AND, False, {UUIDS[1]}),
+            (BooleanOperator.OR, True, {UUIDS[1]}),
+            (BooleanOperator.AND, True, set(UUIDS[0:3])),
+        ]:
+            filter = CompositeFilter(
+                filters=[
+                    UuidSetFilter(key="a", members=set(UUIDS[0:2]), invert=invert),
+                    CompositeFilter(
+                        filters=[
+                            UuidSetFilter(
+                                key="a", members=set(UUIDS[1:3]), invert=invert
+                            ),
+                            ExistsFilter(key="b"),
+                        ],
+                        operator=operator,
+                    ),
+                ],
+                operator=operator,
+            )
+            optimized_filter = FilterOptimizer.optimize(filter)
+            assert isinstance(optimized_filter, CompositeFilter)
+            assert optimized_filter.filters == [
+                UuidSetFilter(key="a", members=members, invert=invert),
+                ExistsFilter(key="b"),
+            ]
+            _assert_equivalent(filter, optimized_filter, _get_rows())
+
+        # Set filters that are not case sensitive are merged regardless of case,
+        # but not with case sensitive ones
+        filter = CompositeFilter(
+            filters=[
+                StringSetFilter(key="b", members={"x", "y"}),
+                StringSetFilter(key="b", members={"X"}),
+                StringSetFilter(key="b", members={"x"}, case_sensitive=True),
+            ],
+            operator=BooleanOperator.AND,
+        )
+        optimized_filter = FilterOptimizer.optimize(filter)
+        assert isinstance(optimized_filter, CompositeFilter)
+        assert optimized_filter.filters == [
+            StringSetFilter(key="b", members={"x"}),
+            StringSetFilter(key="b", members={"x"}, case_sensitive=True),
+        ]
+        _assert_equivalent(filter, optimized_filter, _get_rows())
+
+    def test_factor_common_filters(self) -> None:
+        filter1 = ExistsFilter(key="a")
+        filter2 = StringSetFilter(key="b", members={"x"})
+        filter3 = NumberRangeFilter(key="c", upper_bound=2)
+        # (A AND B) OR (A AND C) = A AND (B OR C)
+        filter = CompositeFilter(
+            filters=[
+                CompositeFilter(filters=[filter1, filter2]),
+                CompositeFilter(filters=[filter3, filter1]),
+            ],
+            operator=BooleanOperator.OR,
+        )
+        optimized_filter = FilterOptimizer.optimize(filter)
+        assert optimized_filter == CompositeFilter(
+            filters=[
+                filter1,
+                CompositeFilter(
+                    filters=[filter2, filter3], operator=BooleanOperator.OR
+                ),
+            ]
+        )
+        _assert_equivalent(filter, optimized_filter, _get_rows())
+        # A OR (A AND B) = A
+        filter = CompositeFilter(
+            filters=[filter1, CompositeFilter(filters=[filter1, filter2])],
+            operator=BooleanOperator.OR,
+        )
+        assert FilterOptimizer.optimize(filter) == filter1
@@ -40,6 +40,20 @@ def _test_filter(
                 continue
             _print_result()
             assert False
+        # Keys that do not exist in any row are left out of the columns
+        columns = {
+            x: [y[x] for y in rows]
+            for x in filter.get_keys()
+            if all(x in y for y in rows)
+        }
+        for result, expected_result in zip(
+            filter.match_batch(columns, na_values=na_values, map_fun=map_fun),
+            expected_results,
+        ):
+            if result == (expected_result ^ invert):
+                continue
+            _print_result()
+            assert False
         if isinstance(filter, CompositeFilter):
             continue
         values = [x.get(filter.key) for x in rows]